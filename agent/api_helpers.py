@@ -1,8 +1,12 @@
 """
 httpx 기반 비동기 Flask API 클라이언트.
 기존 streamlit_utils/api_client.py 패턴을 async로 재구현.
+응답 압축: httpx가 Accept-Encoding(gzip, deflate, brotli 설치 시 br)을 보내고 본문을 자동 해제.
 """
+import json
 import os
+from collections import OrderedDict
+
 import httpx
 from dotenv import load_dotenv
 
@@ -10,6 +14,7 @@ load_dotenv()
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:5000").rstrip("/")
 TIMEOUT = 15.0
+VALIDATOR_CACHE_MAX = 256  # 조건부 GET 검증자(ETag) 캐시 최대 항목 수
 
 
 def _url(path: str) -> str:
@@ -37,6 +42,8 @@ class ApiClient:
 
     def __init__(self):
         self._client: httpx.AsyncClient | None = None
+        # (경로, 쿼리) → (ETag, 응답 JSON). 변경 없으면 서버는 304(헤더만) 응답
+        self._validators: OrderedDict = OrderedDict()
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -47,6 +54,27 @@ class ApiClient:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
+    async def _get(self, path: str, params: dict | None = None) -> httpx.Response:
+        """GET + If-None-Match. 304면 저장해 둔 본문으로 200 응답을 만들어 반환"""
+        c = await self._get_client()
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._validators.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        r = await c.get(_url(path), params=params, headers=headers)
+        if r.status_code == 304 and cached:
+            self._validators.move_to_end(key)
+            return httpx.Response(200, json=cached[1], request=r.request)
+        etag = r.headers.get("ETag")
+        if r.status_code == 200 and etag:
+            try:
+                self._validators[key] = (etag, r.json())
+            except ValueError:
+                return r
+            self._validators.move_to_end(key)
+            while len(self._validators) > VALIDATOR_CACHE_MAX:
+                self._validators.popitem(last=False)
+        return r
+
     # ── Stats & Health ──
 
     async def health_check(self) -> tuple:
@@ -61,17 +89,40 @@ class ApiClient:
 
     async def get_stats(self) -> tuple:
         try:
-            c = await self._get_client()
-            r = await c.get(_url("/api/stats"))
+            r = await self._get("/api/stats")
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
 
+    # ── Streaming (NDJSON) ──
+
+    async def iter_rows(self, path: str, params: dict | None = None):
+        """목록 API(/api/sites, /api/personnel, /api/certificates)를 stream=1로 호출해
+        행을 1건씩 반환하는 async generator. 첫 행부터 바로 소비 가능. 실패 시 RuntimeError"""
+        c = await self._get_client()
+        query = {**(params or {}), "stream": 1}
+        async with c.stream("GET", _url(path), params=query,
+                            headers={"Accept": "application/x-ndjson"}) as r:
+            if r.status_code >= 400:
+                await r.aread()
+                _, err = _check(r)
+                raise RuntimeError(err)
+            async for line in r.aiter_lines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("success") is False and "error" in row:
+                    raise RuntimeError(row["error"].get("message") or "스트리밍 중 오류")
+                yield row
+
     # ── Sites ──
 
     async def get_sites(self, company=None, status=None, state=None,
-                        limit=None, offset=None) -> tuple:
+                        limit=None, offset=None, cursor=None) -> tuple:
+        """cursor 지정 시(빈 문자열 = 첫 페이지) {"data", "next_cursor"} 반환"""
         params = {}
+        if cursor is not None:
+            params["cursor"] = cursor
         if company:
             params["company"] = company
         if status:
@@ -83,26 +134,29 @@ class ApiClient:
         if offset is not None:
             params["offset"] = offset
         try:
-            c = await self._get_client()
-            r = await c.get(_url("/api/sites"), params=params)
-            return _check(r)
+            r = await self._get("/api/sites", params=params)
+            data, err = _check(r)
+            if err or cursor is None:
+                return data, err
+            return {"data": data or [], "next_cursor": r.json().get("next_cursor")}, None
         except Exception as e:
             return None, f"API 연결 실패: {e}"
 
-    async def search_sites(self, q: str) -> tuple:
+    async def search_sites(self, q: str, limit=None) -> tuple:
         if not q or not q.strip():
             return [], None
+        params = {"q": q.strip()}
+        if limit:
+            params["limit"] = limit
         try:
-            c = await self._get_client()
-            r = await c.get(_url("/api/sites/search"), params={"q": q.strip()})
+            r = await self._get("/api/sites/search", params=params)
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
 
     async def get_site(self, site_id: str) -> tuple:
         try:
-            c = await self._get_client()
-            r = await c.get(_url(f"/api/sites/{site_id}"))
+            r = await self._get(f"/api/sites/{site_id}")
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
@@ -163,16 +217,14 @@ class ApiClient:
         if role:
             params["role"] = role
         try:
-            c = await self._get_client()
-            r = await c.get(_url("/api/personnel"), params=params)
+            r = await self._get("/api/personnel", params=params)
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
 
     async def get_personnel_detail(self, personnel_id: str) -> tuple:
         try:
-            c = await self._get_client()
-            r = await c.get(_url(f"/api/personnel/{personnel_id}"))
+            r = await self._get(f"/api/personnel/{personnel_id}")
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
@@ -192,16 +244,14 @@ class ApiClient:
         if available is not None:
             params["available"] = available
         try:
-            c = await self._get_client()
-            r = await c.get(_url("/api/certificates"), params=params)
+            r = await self._get("/api/certificates", params=params)
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
 
     async def get_certificate_detail(self, cert_id: str) -> tuple:
         try:
-            c = await self._get_client()
-            r = await c.get(_url(f"/api/certificates/{cert_id}"))
+            r = await self._get(f"/api/certificates/{cert_id}")
             return _check(r)
         except Exception as e:
             return None, f"API 연결 실패: {e}"
@@ -41,6 +41,10 @@ TOOLS = [
                 "offset": {
                     "type": "integer",
                     "description": "페이지 오프셋 (0부터 시작)"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "커서 페이지네이션. 첫 페이지는 빈 문자열, 다음 페이지는 이전 결과의 next_cursor (null이면 마지막 페이지). 대량 조회 시 offset 대신 사용"
                 }
             },
             "required": []
@@ -49,13 +53,17 @@ TOOLS = [
     # 2. 현장 검색
     {
         "name": "search_sites",
-        "description": "현장명 또는 주소 키워드로 현장을 검색합니다.",
+        "description": "현장명 또는 주소 키워드로 현장을 검색합니다. 부분 일치·초성(예: ㅍㅌ)·오타를 허용하며 관련도순으로 반환합니다.",
         "input_schema": {
             "type": "object",
             "properties": {
                 "q": {
                     "type": "string",
                     "description": "검색 키워드 (현장명 또는 주소)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "최대 결과 수 (기본값: 50)"
                 }
             },
             "required": ["q"]
@@ -321,13 +329,14 @@ async def handle_tool(name: str, input_data: dict) -> str:
             state=input_data.get("state"),
             limit=input_data.get("limit"),
             offset=input_data.get("offset"),
+            cursor=input_data.get("cursor"),
         )
         if err:
             return _err(err)
         return _fmt("현장 목록", data)
 
     if name == "search_sites":
-        data, err = await api.search_sites(input_data["q"])
+        data, err = await api.search_sites(input_data["q"], limit=input_data.get("limit"))
         if err:
             return _err(err)
         return _fmt(f"'{input_data['q']}' 검색 결과", data)
@@ -12,6 +12,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from api.services.db_service import get_db
+from api.utils.assets import IMMUTABLE, get_manifest
+from api.utils.columnar import wire_format
+from api.utils.compression import compress_response
+from api.utils.etag import make_etag, resource_tables
+from api.utils.streaming import wants_stream
+
 # 프로젝트 루트 (프론트엔드 정적 파일 서빙용)
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,6 +32,53 @@ def assign_request_id():
     g.request_id = request.headers.get('X-Request-ID') or str(uuid.uuid4())[:8]
 
 
+@app.before_request
+def check_not_modified():
+    """GET 조회: 컬렉션 버전으로 ETag 계산, If-None-Match가 일치하면 뷰 실행 없이 304"""
+    g.etag = None
+    if request.method != 'GET' or request.args.get('fresh'):
+        return None
+    tables = resource_tables(request.path)
+    if not tables:
+        return None
+    db = get_db()
+    if not hasattr(db, 'collection_versions'):
+        return None
+    try:
+        versions = db.collection_versions(tables)
+    except Exception as e:
+        # 버전을 알 수 없으면 조건부 응답 없이 평소대로 처리
+        logger.warning('collection_versions failed: %s', e)
+        return None
+    variant = 'ndjson' if wants_stream() else wire_format()
+    g.etag = make_etag(request.full_path, variant, versions)
+    # 약한 비교: 압축 응답은 W/ ETag로 나가므로 그 값으로 재검증해도 일치
+    if request.if_none_match.contains_weak(g.etag):
+        response = app.response_class(status=304)
+        response.set_etag(g.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+
+@app.after_request
+def compress_api_response(response):
+    """/api JSON 응답 gzip/br 압축. after_request는 등록 역순으로 실행 → ETag/헤더 설정 뒤 마지막에 압축"""
+    if request.path.startswith('/api/'):
+        return compress_response(response, request)
+    return response
+
+
+@app.after_request
+def set_etag(response):
+    """조건부 GET 대상 200 응답에 ETag 부여 (no-cache: 매번 재검증, 변경 없으면 304)"""
+    etag = getattr(g, 'etag', None)
+    if etag and request.method == 'GET' and response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @app.after_request
 def set_security_headers(response):
     """보안 헤더 설정 (XSS, Clickjacking 방지 등)"""
@@ -103,17 +157,21 @@ CORS(app, resources={
     r"/api/*": {
         "origins": ALLOWED_ORIGINS,
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "X-API-Key", "If-Match"],
+        "allow_headers": ["Content-Type", "Authorization", "X-API-Key", "If-Match", "If-None-Match", "Last-Event-ID"],
+        "expose_headers": ["ETag"],
     }
 })
 
 # 라우트 등록 (2-1: GET 전용)
-from api.routes import sites, personnel, certificates, stats
+from api.routes import sites, personnel, certificates, stats, imports, changes, events
 
 app.register_blueprint(sites.bp, url_prefix='/api')
 app.register_blueprint(personnel.bp, url_prefix='/api')
 app.register_blueprint(certificates.bp, url_prefix='/api')
 app.register_blueprint(stats.bp, url_prefix='/api')
+app.register_blueprint(imports.bp, url_prefix='/api')
+app.register_blueprint(changes.bp, url_prefix='/api')
+app.register_blueprint(events.bp, url_prefix='/api')
 
 
 @app.route('/api-info')
@@ -134,15 +192,44 @@ def api_info():
             'certificates': 'GET /api/certificates',
             'certificates_detail': 'GET/PUT /api/certificates/<id>',
             'stats': 'GET /api/stats',
+            'import': 'POST /api/import?type=sites|personnel|certificates',
+            'changes': 'GET /api/changes?since=커서',
+            'events': 'GET /api/events (SSE)',
             'health': 'GET /api/health',
         },
     })
 
 
+def _asset_response(asset, immutable=False):
+    """미리 압축한 본문 중 Accept-Encoding에 맞는 것으로 응답 (지문 URL은 1년 immutable, 그 외 ETag 재검증)"""
+    body, encoding = asset.body(request.headers.get('Accept-Encoding', ''))
+    response = app.response_class(body, mimetype=asset.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # 인코딩별 본문이 다르므로 ETag도 구분
+    response.set_etag(f'{asset.etag}-{encoding}' if encoding else asset.etag)
+    response.headers['Cache-Control'] = IMMUTABLE if immutable else 'no-cache'
+    return response.make_conditional(request)
+
+
+def _serve_asset(folder, subpath):
+    """css/js/ui 정적 파일: 자산 목록에 있으면 해시/압축본, 없으면 디스크에서 그대로"""
+    if '..' in subpath:
+        return jsonify({'error': 'Forbidden'}), 403
+    asset, immutable = get_manifest(PROJECT_ROOT).lookup(f'{folder}/{subpath}')
+    if asset is None:
+        return send_from_directory(os.path.join(PROJECT_ROOT, folder), subpath)
+    return _asset_response(asset, immutable)
+
+
 @app.route('/')
 def index():
-    """프론트엔드 메인 페이지 (로컬 확인용)"""
-    return send_from_directory(PROJECT_ROOT, 'site-management.html')
+    """프론트엔드 메인 페이지 (로컬 확인용). css/js 참조는 내용 해시 URL로 교체"""
+    page = get_manifest(PROJECT_ROOT).html_page('site-management.html')
+    if page is None:
+        return send_from_directory(PROJECT_ROOT, 'site-management.html')
+    return _asset_response(page)
 
 
 @app.route('/streamlit-assets/<path:subpath>')
@@ -153,10 +240,10 @@ def serve_streamlit_assets(subpath):
     
     # CSS 파일
     if subpath.endswith('.css'):
-        return send_from_directory(os.path.join(PROJECT_ROOT, 'css'), subpath.replace('css/', ''))
+        return _serve_asset('css', subpath.replace('css/', ''))
     # JS 파일
     elif subpath.endswith('.js'):
-        return send_from_directory(os.path.join(PROJECT_ROOT, 'js'), subpath.replace('js/', ''))
+        return _serve_asset('js', subpath.replace('js/', ''))
     else:
         return jsonify({'error': 'Not Found'}), 404
 
@@ -164,25 +251,19 @@ def serve_streamlit_assets(subpath):
 @app.route('/css/<path:subpath>')
 def serve_css(subpath):
     """css 정적 파일"""
-    if '..' in subpath:
-        return jsonify({'error': 'Forbidden'}), 403
-    return send_from_directory(os.path.join(PROJECT_ROOT, 'css'), subpath)
+    return _serve_asset('css', subpath)
 
 
 @app.route('/js/<path:subpath>')
 def serve_js(subpath):
     """js 정적 파일"""
-    if '..' in subpath:
-        return jsonify({'error': 'Forbidden'}), 403
-    return send_from_directory(os.path.join(PROJECT_ROOT, 'js'), subpath)
+    return _serve_asset('js', subpath)
 
 
 @app.route('/ui/<path:subpath>')
 def serve_ui(subpath):
     """ui 정적 파일 (체크리스트 등)"""
-    if '..' in subpath:
-        return jsonify({'error': 'Forbidden'}), 403
-    return send_from_directory(os.path.join(PROJECT_ROOT, 'ui'), subpath)
+    return _serve_asset('ui', subpath)
 
 
 @app.route('/api/health')
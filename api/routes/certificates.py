@@ -5,7 +5,11 @@ import uuid
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 from api.services.db_service import get_db
+from api.services.event_bus import publish
 from api.services.validation import validate_certificate_data, ValidationError
+from api.utils.columnar import list_response
+from api.utils.filters import certificate_filter
+from api.utils.streaming import ndjson_response, wants_stream
 
 bp = Blueprint('certificates', __name__)
 
@@ -68,6 +72,7 @@ def create_certificate():
             '등록일': now,
         }
         db.create_certificate(row_data)
+        publish('certificate.created', cert_id)
 
         return jsonify({
             'success': True,
@@ -89,18 +94,23 @@ def create_certificate():
 
 @bp.route('/certificates', methods=['GET'])
 def get_certificates():
-    """자격증 목록 조회. 쿼리: available (true/false)"""
+    """자격증 목록 조회. 쿼리: available (true/false), stream=1 (NDJSON 스트리밍), format=columnar (열 기반)"""
     try:
         db = get_db()
-        certificates = db.get_all_certificates()
-
         available = request.args.get('available')
+
+        if wants_stream():
+            if hasattr(db, 'iter_certificates'):
+                return ndjson_response(db.iter_certificates(available=available))
+            return ndjson_response(filter(certificate_filter(available), db.get_all_certificates()))
+
+        certificates = db.get_all_certificates()
         if available == 'true':
             certificates = [c for c in certificates if c['사용가능여부'] == '사용가능']
         elif available == 'false':
             certificates = [c for c in certificates if c['사용가능여부'] != '사용가능']
 
-        return jsonify({
+        return list_response({
             'success': True,
             'data': certificates,
             'count': len(certificates),
@@ -166,6 +176,7 @@ def update_certificate(cert_id):
         update_data = {k: v for k, v in data.items() if k in allowed}
         if update_data:
             db.update_certificate(cert_id, update_data)
+            publish('certificate.updated', cert_id, fields=list(update_data.keys()))
 
         return jsonify({
             'success': True,
@@ -0,0 +1,36 @@
+"""
+변경 피드 API 라우트 (GET /api/changes)
+"""
+from datetime import datetime
+from flask import Blueprint, jsonify, request
+from api.services.db_service import get_db
+from api.utils.pagination import CursorError
+
+bp = Blueprint('changes', __name__)
+
+
+@bp.route('/changes', methods=['GET'])
+def get_changes():
+    """커서 이후 추가/수정/삭제된 행
+
+    쿼리: since=<이전 응답의 cursor> (없으면 현재 커서만 반환), limit=1000
+    응답 data: {sites|personnel|certificates: {upserted: [행], deleted: [ID]}}
+    reset=true면 이어 받을 수 없는 커서(재시작/로그 정리) → 전체 재조회 후 응답 cursor부터 다시 요청
+    has_more=true면 같은 방식으로 바로 다음 요청
+    """
+    since = (request.args.get('since') or '').strip() or None
+    limit = request.args.get('limit', type=int)
+    try:
+        result = get_db().get_changes(since=since, limit=limit)
+    except CursorError as e:
+        return jsonify({'success': False, 'error': {'code': 'INVALID_CURSOR', 'message': str(e)}}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': {'code': 'CHANGES_ERROR', 'message': str(e)}}), 500
+    return jsonify({
+        'success': True,
+        'data': result['changes'],
+        'cursor': result['cursor'],
+        'has_more': result['has_more'],
+        'reset': result['reset'],
+        'timestamp': datetime.now().isoformat(),
+    })
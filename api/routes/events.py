@@ -0,0 +1,56 @@
+"""
+실시간 이벤트 API 라우트 (GET /api/events, Server-Sent Events)
+"""
+import json
+import os
+import time
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from api.services.event_bus import TooManySubscribers, bus
+
+bp = Blueprint('events', __name__)
+
+# 이벤트가 없을 때 보내는 주석 줄 간격 (프록시 유휴 종료 방지 + 끊긴 연결 감지)
+EVENT_HEARTBEAT = float(os.getenv('EVENT_HEARTBEAT', '15') or 15)
+# 연결 최대 유지 시간. 지나면 닫고 EventSource가 Last-Event-ID로 자동 재연결 (워커 스레드 순환)
+EVENT_STREAM_MAX_AGE = float(os.getenv('EVENT_STREAM_MAX_AGE', '300') or 300)
+# 클라이언트 재연결 대기(ms)
+EVENT_RETRY_MS = 3000
+
+
+def _frame(event) -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event['event_id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+@bp.route('/events', methods=['GET'])
+def stream_events():
+    """현장/인력/자격증 변경 이벤트 스트림 (text/event-stream)
+
+    이벤트: site.created|site.updated|site.assigned|site.unassigned|personnel.updated|
+            certificate.created|certificate.updated|import.completed|resync
+    data: {"type", "entity_id", "tables": [다시 읽을 테이블], "ts", ...}
+    재연결 시 Last-Event-ID 헤더(또는 ?last_event_id=) 이후 이벤트를 먼저 재전송
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        sub, backlog = bus.subscribe(last_event_id)
+    except TooManySubscribers as e:
+        return jsonify({'success': False, 'error': {'code': 'TOO_MANY_SUBSCRIBERS', 'message': str(e)}}), 503
+
+    def generate():
+        deadline = time.monotonic() + EVENT_STREAM_MAX_AGE
+        try:
+            yield f'retry: {EVENT_RETRY_MS}\n\n'
+            for event in backlog:
+                yield _frame(event)
+            while time.monotonic() < deadline:
+                event = sub.get(timeout=min(EVENT_HEARTBEAT, max(0.0, deadline - time.monotonic())))
+                yield _frame(event) if event is not None else ': ping\n\n'
+        finally:
+            # 클라이언트 연결 종료(GeneratorExit) 포함 항상 구독 해제
+            sub.close()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
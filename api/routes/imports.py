@@ -0,0 +1,75 @@
+"""
+대량 가져오기 API 라우트 (POST /api/import)
+"""
+import io
+from datetime import datetime
+from flask import Blueprint, jsonify, request
+from api.services.db_service import ConfigRequiredError, get_db
+from api.services.event_bus import publish
+from api.services.import_service import (
+    FORMATS,
+    IMPORT_KINDS,
+    ImportRequestError,
+    detect_format,
+    import_records,
+    read_records,
+)
+
+bp = Blueprint('imports', __name__)
+
+
+def _error(code, message, status):
+    return jsonify({'success': False, 'error': {'code': code, 'message': message}}), status
+
+
+@bp.route('/import', methods=['POST'])
+def import_data():
+    """CSV/JSON 일괄 가져오기
+
+    쿼리: type=sites|personnel|certificates (필수), format=csv|json (없으면 파일명/Content-Type),
+          dry_run=1 (검증/중복 검사만), chunk_size=500
+    본문: multipart의 file 필드 또는 파일 내용 그대로 (UTF-8, BOM 허용)
+    모든 행 성공 시 200, 일부 행 실패/중복 시 207 (data.errors에 행 번호/사유)
+    """
+    kind = (request.args.get('type') or '').strip()
+    if kind not in IMPORT_KINDS:
+        return _error('INVALID_TYPE', f'type은 {", ".join(IMPORT_KINDS)} 중 하나여야 합니다', 400)
+    upload = request.files.get('file')
+    if upload is not None:
+        raw, filename, content_type = upload.stream, upload.filename, upload.mimetype
+    else:
+        raw, filename, content_type = request.stream, None, request.content_type
+    fmt = (request.args.get('format') or detect_format(filename, content_type)).lower()
+    if fmt not in FORMATS:
+        return _error('INVALID_FORMAT', f'format은 {", ".join(FORMATS)} 중 하나여야 합니다', 400)
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    chunk_size = request.args.get('chunk_size', type=int)
+
+    try:
+        # 본문을 통째로 읽지 않고 행 단위로 디코딩
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        result = import_records(get_db(), kind, read_records(stream, fmt),
+                                chunk_size=chunk_size, dry_run=dry_run)
+    except ImportRequestError as e:
+        return _error('INVALID_FILE', str(e), 400)
+    except UnicodeDecodeError:
+        return _error('INVALID_FILE', '파일은 UTF-8 인코딩이어야 합니다', 400)
+    except ConfigRequiredError as e:
+        return _error('CONFIG_REQUIRED', str(e), 503)
+    except Exception as e:
+        return _error('IMPORT_ERROR', str(e), 500)
+
+    if result['inserted'] and not dry_run:
+        publish('import.completed', None, tables=[kind], inserted=result['inserted'])
+    partial = result['failed'] or result['skipped']
+    return jsonify({
+        'success': not result['aborted'],
+        'data': result,
+        'summary': {
+            'total': result['total'],
+            'inserted': result['inserted'],
+            'skipped': result['skipped'],
+            'failed': result['failed'],
+        },
+        'timestamp': datetime.now().isoformat(),
+    }), (207 if partial else 200)
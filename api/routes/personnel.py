@@ -4,26 +4,34 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 from api.services.db_service import get_db
+from api.services.event_bus import publish
+from api.utils.columnar import list_response
+from api.utils.filters import personnel_filter
+from api.utils.streaming import ndjson_response, wants_stream
 
 bp = Blueprint('personnel', __name__)
 
 
 @bp.route('/personnel', methods=['GET'])
 def get_personnel():
-    """인력 목록 조회. 쿼리: status, role"""
+    """인력 목록 조회. 쿼리: status, role, stream=1 (NDJSON 스트리밍), format=columnar (열 기반)"""
     try:
         db = get_db()
-        personnel = db.get_all_personnel()
-
         status = request.args.get('status')
         role = request.args.get('role')
 
+        if wants_stream():
+            if hasattr(db, 'iter_personnel'):
+                return ndjson_response(db.iter_personnel(status=status, role=role))
+            return ndjson_response(filter(personnel_filter(status, role), db.get_all_personnel()))
+
+        personnel = db.get_all_personnel()
         if status:
             personnel = [p for p in personnel if p['현재상태'] == status]
         if role:
             personnel = [p for p in personnel if p['직책'] == role]
 
-        return jsonify({
+        return list_response({
             'success': True,
             'data': personnel,
             'count': len(personnel),
@@ -80,6 +88,7 @@ def update_personnel(personnel_id):
         update_data = {k: v for k, v in data.items() if k in allowed}
         if update_data:
             db.update_personnel(personnel_id, update_data)
+            publish('personnel.updated', personnel_id, fields=list(update_data.keys()))
 
         return jsonify({
             'success': True,
@@ -4,9 +4,15 @@
 import uuid
 from datetime import datetime
 from flask import Blueprint, jsonify, request
+from api.services import unit_of_work
 from api.services.db_service import get_db
+from api.services.event_bus import publish, publish_many
 from api.services.validation import validate_site_data, validate_assignment, ValidationError
-from api.services.sync_manager import get_sync_manager, ConflictError
+from api.services.sync_manager import ConflictError, parse_version, row_version, version_conflict
+from api.utils.columnar import list_response
+from api.utils.pagination import CursorError, clamp_page_size
+from api.utils.filters import site_filter
+from api.utils.streaming import ndjson_response, wants_stream
 
 bp = Blueprint('sites', __name__)
 
@@ -20,19 +26,44 @@ def _generate_site_id():
 
 @bp.route('/sites', methods=['GET'])
 def get_sites():
-    """현장 목록 조회. 쿼리: company, status, state, limit, offset"""
+    """현장 목록 조회. 쿼리: company, status, state, limit, offset 또는 cursor
+
+    cursor 파라미터가 있으면(빈 값 = 첫 페이지) 키셋 페이지네이션으로 조회하고
+    응답에 next_cursor를 포함 (마지막 페이지면 null). 없으면 기존 offset 방식.
+    stream=1 또는 Accept: application/x-ndjson 이면 필터된 전체 목록을 NDJSON(한 줄에 1건)으로 스트리밍.
+    format=columnar 또는 Accept: application/x-msgpack 이면 data를 열 기반(사전 인코딩)으로 응답.
+    """
     try:
         db = get_db()
         
         # 페이지네이션 파라미터
         limit = request.args.get('limit', type=int)
         offset = request.args.get('offset', type=int, default=0)
+        cursor = request.args.get('cursor')
         
         # 필터 파라미터
         company = request.args.get('company')
         status = request.args.get('status')
         state = request.args.get('state')
 
+        if wants_stream():
+            if hasattr(db, 'iter_sites'):
+                return ndjson_response(db.iter_sites(company=company, status=status, state=state))
+            return ndjson_response(filter(site_filter(company, status, state), db.get_all_sites()))
+
+        if cursor is not None and hasattr(db, 'get_sites_page'):
+            page = db.get_sites_page(company=company, status=status, state=state, limit=limit, cursor=cursor)
+            sites = page.get('data', [])
+            return list_response({
+                'success': True,
+                'data': sites,
+                'count': len(sites),
+                'limit': limit,
+                'cursor': cursor,
+                'next_cursor': page.get('next_cursor'),
+                'timestamp': datetime.now().isoformat(),
+            })
+
         # 서버 사이드 페이지네이션 지원 여부 확인
         if hasattr(db, 'get_sites_paginated'):
             # 페이지네이션 지원 메서드 사용
@@ -62,7 +93,7 @@ def get_sites():
             if limit:
                 sites = sites[offset:offset + limit]
 
-        return jsonify({
+        return list_response({
             'success': True,
             'data': sites,
             'count': len(sites),
@@ -71,6 +102,11 @@ def get_sites():
             'offset': offset,
             'timestamp': datetime.now().isoformat(),
         })
+    except CursorError as e:
+        return jsonify({
+            'success': False,
+            'error': {'code': 'INVALID_CURSOR', 'message': str(e)},
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -80,7 +116,7 @@ def get_sites():
 
 @bp.route('/sites/search', methods=['GET'])
 def search_sites():
-    """현장 검색. 쿼리: q (현장명 또는 주소)"""
+    """현장 검색. 쿼리: q (현장명 또는 주소), limit (기본 50, 최대 500). 결과는 관련도순"""
     try:
         query = (request.args.get('q') or '').strip().lower()
         if not query:
@@ -88,18 +124,23 @@ def search_sites():
                 'success': False,
                 'error': {'code': 'INVALID_QUERY', 'message': '검색어를 입력해주세요 (q=)'},
             }), 400
+        limit = clamp_page_size(request.args.get('limit', type=int))
 
         db = get_db()
-        sites = db.get_all_sites()
-        results = [
-            s for s in sites
-            if query in (s.get('현장명') or '').lower() or query in (s.get('주소') or '').lower()
-        ]
+        if hasattr(db, 'search_sites'):
+            results = db.search_sites(query, limit=limit)
+        else:
+            sites = db.get_all_sites()
+            results = [
+                s for s in sites
+                if query in (s.get('현장명') or '').lower() or query in (s.get('주소') or '').lower()
+            ][:limit]
         return jsonify({
             'success': True,
             'data': results,
             'count': len(results),
             'query': query,
+            'limit': limit,
             'timestamp': datetime.now().isoformat(),
         })
     except Exception as e:
@@ -125,8 +166,8 @@ def get_site_detail(site_id):
             }), 404
 
         site = dict(site)
-        # 2-3: 낙관적 잠금용 버전(수정일). 수정/배정 시 If-Match 또는 body.version으로 전달
-        site['version'] = site.get('수정일') or ''
+        # 2-3: 낙관적 잠금용 행 버전(정수). 수정/배정 시 If-Match 또는 body.version으로 전달
+        site['version'] = row_version(site)
         if site.get('담당소장ID'):
             site['manager'] = {
                 'id': site['담당소장ID'],
@@ -216,6 +257,7 @@ def create_site():
             '수정일': now,
         }
         db.create_site(row_data)
+        publish('site.created', data['현장ID'])
 
         return jsonify({
             'success': True,
@@ -232,10 +274,14 @@ def create_site():
 
 @bp.route('/sites/<site_id>', methods=['PUT'])
 def update_site(site_id):
-    """현장 정보 수정. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사"""
+    """현장 정보 수정. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사
+
+    409 CONFLICT: 쓰기 시점 버전 불일치. Supabase는 프로세스 간 원자적, Sheets는 API 프로세스 1개 기준
+    (다른 프로세스/시트 직접 편집은 검출 못 할 수 있음, api/README.md 참고)
+    """
     try:
         db = get_db()
-        site = db.get_site_by_id(site_id)
+        site = unit_of_work.load('sites', site_id, db.get_site_by_id)
         if not site:
             return jsonify({
                 'success': False,
@@ -243,14 +289,8 @@ def update_site(site_id):
             }), 404
 
         data = request.json or {}
-        version = request.headers.get('If-Match') or data.get('version')
-        try:
-            get_sync_manager().require_site_version(site_id, version)
-        except ConflictError as e:
-            return jsonify({
-                'success': False,
-                'error': {'code': 'CONFLICT', 'message': str(e)},
-            }), 409
+        # 버전 비교는 쓰기 안에서 (compare-and-swap)
+        expected_version = parse_version(request.headers.get('If-Match') or data.get('version'))
 
         try:
             validate_site_data(data, is_update=True)
@@ -265,11 +305,12 @@ def update_site(site_id):
         update_data = {k: v for k, v in data.items() if k in allowed}
         now = datetime.now().strftime('%Y-%m-%d')
         update_data['수정일'] = now
-        db.update_site(site_id, update_data)
+        version = db.update_site(site_id, update_data, expected_version=expected_version)
+        publish('site.updated', site_id, fields=list(update_data.keys()))
 
         return jsonify({
             'success': True,
-            'data': {'현장ID': site_id, 'updated_fields': list(update_data.keys()), 'version': now},
+            'data': {'현장ID': site_id, 'updated_fields': list(update_data.keys()), 'version': version},
             'message': '현장 정보가 수정되었습니다',
             'timestamp': datetime.now().isoformat(),
         })
@@ -287,10 +328,10 @@ def update_site(site_id):
 
 @bp.route('/sites/<site_id>/assign', methods=['POST'])
 def assign_manager(site_id):
-    """소장 배정. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사"""
+    """소장 배정. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사 (409 보장 범위는 update_site 참고)"""
     try:
         db = get_db()
-        site = db.get_site_by_id(site_id)
+        site = unit_of_work.load('sites', site_id, db.get_site_by_id)
         if not site:
             return jsonify({
                 'success': False,
@@ -307,14 +348,14 @@ def assign_manager(site_id):
                 'error': {'code': 'MISSING_PARAMS', 'message': 'manager_id와 certificate_id가 필요합니다'},
             }), 400
 
-        manager = db.get_personnel_by_id(manager_id)
+        manager = unit_of_work.load('personnel', manager_id, db.get_personnel_by_id)
         if not manager:
             return jsonify({
                 'success': False,
                 'error': {'code': 'MANAGER_NOT_FOUND', 'message': f'인력ID {manager_id}를 찾을 수 없습니다'},
             }), 404
 
-        certificate = db.get_certificate_by_id(certificate_id)
+        certificate = unit_of_work.load('certificates', certificate_id, db.get_certificate_by_id)
         if not certificate:
             return jsonify({
                 'success': False,
@@ -335,18 +376,10 @@ def assign_manager(site_id):
                 'error': {'code': 'VALIDATION_ERROR', 'message': str(e)},
             }), 400
 
-        version = request.headers.get('If-Match') or data.get('version')
-        try:
-            get_sync_manager().require_site_version(site_id, version)
-        except ConflictError as e:
-            return jsonify({
-                'success': False,
-                'error': {'code': 'CONFLICT', 'message': str(e)},
-            }), 409
-
-        db.assign_site(site_id, manager_id, certificate_id)
+        expected_version = parse_version(request.headers.get('If-Match') or data.get('version'))
+        version = db.assign_site(site_id, manager_id, certificate_id, expected_version=expected_version)
+        publish('site.assigned', site_id, manager_id=manager_id, certificate_id=certificate_id)
 
-        now = datetime.now().strftime('%Y-%m-%d')
         return jsonify({
             'success': True,
             'data': {
@@ -354,7 +387,7 @@ def assign_manager(site_id):
                 '현장명': site.get('현장명', ''),
                 '담당소장': manager.get('성명', ''),
                 '자격증': certificate.get('자격증명', ''),
-                'version': now,
+                'version': version,
             },
             'message': '소장이 배정되었습니다',
             'timestamp': datetime.now().isoformat(),
@@ -371,27 +404,192 @@ def assign_manager(site_id):
         }), 500
 
 
+MAX_BATCH_ASSIGN = 200
+
+
+def _batch_item_error(index, item, status, code, message):
+    return {
+        'index': index,
+        '현장ID': item.get('site_id') if isinstance(item, dict) else None,
+        'success': False,
+        'status': status,
+        'error': {'code': code, 'message': message},
+    }
+
+
+def _load_assign_snapshot(db):
+    """일괄 배정 검증용 스냅샷 (현장/인력/자격증 ID 인덱스)"""
+    if hasattr(db, 'get_all_tables'):
+        tables = db.get_all_tables()
+        sites, personnel, certificates = tables['sites'], tables['personnel'], tables['certificates']
+    else:
+        sites, personnel, certificates = db.get_all_sites(), db.get_all_personnel(), db.get_all_certificates()
+    return (
+        {s.get('현장ID'): dict(s) for s in sites if s.get('현장ID')},
+        {p.get('인력ID'): dict(p) for p in personnel if p.get('인력ID')},
+        {c.get('자격증ID'): dict(c) for c in certificates if c.get('자격증ID')},
+    )
+
+
+def _write_conflicts(db, pending):
+    """쓰기 CAS 충돌(전체 취소) 후 최신 현장 행과 버전이 다른 항목 → [(항목, ConflictError)]"""
+    conflicts = []
+    for item in pending:
+        site_id, expected_version = item[1], item[4]
+        if expected_version is None:
+            continue
+        # 쓰기 직후라 캐시는 무효화된 상태 → 백엔드 최신 행
+        current = row_version(db.get_site_by_id(site_id))
+        if current != expected_version:
+            conflicts.append((item, version_conflict(site_id, current, expected_version)))
+    return conflicts
+
+
+@bp.route('/sites/assign:batch', methods=['POST'])
+def assign_managers_batch():
+    """
+    여러 현장 일괄 배정. body: {"items": [{site_id, manager_id, certificate_id, version}, ...]}
+    - 전체 항목을 스냅샷 1개로 검증 (항목 간 중복 자격증/현장도 검출)
+    - 통과한 항목만 batchUpdate 1회(Sheets) / RPC 1회(Supabase)로 반영
+    - 버전 충돌은 쓰기의 compare-and-swap이 최신 행으로 판단. 쓰기 충돌 시 해당 항목만 409로 빼고 나머지 재반영
+      (Sheets는 단일 프로세스 기준, update_site 참고)
+    - 항목별 결과(status: 200/400/404/409) 반환. 일부 실패 시 HTTP 207
+    """
+    try:
+        data = request.json
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'error': {'code': 'MISSING_PARAMS', 'message': 'items 배열이 필요합니다'},
+            }), 400
+        if len(items) > MAX_BATCH_ASSIGN:
+            return jsonify({
+                'success': False,
+                'error': {'code': 'TOO_MANY_ITEMS', 'message': f'한 번에 최대 {MAX_BATCH_ASSIGN}건까지 배정할 수 있습니다'},
+            }), 400
+
+        db = get_db()
+        sites, personnel, certificates = _load_assign_snapshot(db)
+
+        results, accepted = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append(_batch_item_error(index, item, 400, 'INVALID_ITEM', '항목은 객체여야 합니다'))
+                continue
+            site_id = item.get('site_id')
+            manager_id = item.get('manager_id')
+            certificate_id = item.get('certificate_id')
+            if not site_id or not manager_id or not certificate_id:
+                results.append(_batch_item_error(index, item, 400, 'MISSING_PARAMS',
+                                                 'site_id, manager_id, certificate_id가 필요합니다'))
+                continue
+            site = sites.get(site_id)
+            if not site:
+                results.append(_batch_item_error(index, item, 404, 'SITE_NOT_FOUND', f'현장ID {site_id}를 찾을 수 없습니다'))
+                continue
+            manager = personnel.get(manager_id)
+            if not manager:
+                results.append(_batch_item_error(index, item, 404, 'MANAGER_NOT_FOUND', f'인력ID {manager_id}를 찾을 수 없습니다'))
+                continue
+            certificate = certificates.get(certificate_id)
+            if not certificate:
+                results.append(_batch_item_error(index, item, 404, 'CERTIFICATE_NOT_FOUND',
+                                                 f'자격증ID {certificate_id}를 찾을 수 없습니다'))
+                continue
+
+            # 스냅샷(캐시)은 오래됐을 수 있으므로 스냅샷 버전이 요청보다 새로울 때(확실한 충돌)만 여기서 409.
+            # 같거나 오래된 경우는 쓰기의 compare-and-swap이 최신 행으로 비교
+            try:
+                expected_version = parse_version(item.get('version'))
+                if expected_version is not None and row_version(site) > expected_version:
+                    raise version_conflict(site_id, row_version(site), expected_version)
+            except ConflictError as e:
+                results.append(_batch_item_error(index, item, 409, 'CONFLICT', str(e)))
+                continue
+            if certificate.get('사용가능여부') != '사용가능':
+                results.append(_batch_item_error(index, item, 400, 'CERTIFICATE_NOT_AVAILABLE',
+                                                 f'자격증 {certificate_id}는 사용할 수 없습니다'))
+                continue
+            try:
+                validate_assignment(site, manager, certificate)
+            except ValidationError as e:
+                results.append(_batch_item_error(index, item, 400, 'VALIDATION_ERROR', str(e)))
+                continue
+
+            # 스냅샷에 반영해 같은 요청 안의 뒤 항목이 이 배정을 보고 검증하도록 함
+            site['배정상태'] = '배정완료'
+            certificate['사용가능여부'] = '사용중'
+            manager['현재상태'] = '투입중'
+            accepted.append((index, site_id, manager_id, certificate_id, expected_version, site, manager, certificate))
+            results.append(None)
+
+        versions = []
+        while accepted:
+            try:
+                versions = db.assign_sites_batch([item[1:5] for item in accepted]) or []
+                break
+            except ConflictError:
+                # 백엔드는 충돌 시 아무것도 쓰지 않음 → 충돌 항목만 409로 빼고 나머지 다시 반영
+                conflicts = _write_conflicts(db, accepted)
+                if not conflicts:
+                    raise
+                for item, error in conflicts:
+                    results[item[0]] = _batch_item_error(item[0], items[item[0]], 409, 'CONFLICT', str(error))
+                accepted = [item for item in accepted if all(item is not c[0] for c in conflicts)]
+        if accepted:
+            publish_many('site.assigned', [item[1] for item in accepted])
+
+        for pos, (index, site_id, _, _, _, site, manager, certificate) in enumerate(accepted):
+            results[index] = {
+                'index': index,
+                '현장ID': site_id,
+                'success': True,
+                'status': 200,
+                'data': {
+                    '현장ID': site_id,
+                    '현장명': site.get('현장명', ''),
+                    '담당소장': manager.get('성명', ''),
+                    '자격증': certificate.get('자격증명', ''),
+                    'version': versions[pos] if pos < len(versions) else None,
+                },
+            }
+
+        failed = len(items) - len(accepted)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'summary': {'total': len(items), 'assigned': len(accepted), 'failed': failed},
+            'message': f'{len(accepted)}건 배정, {failed}건 실패',
+            'timestamp': datetime.now().isoformat(),
+        }), (207 if failed else 200)
+    except ConflictError as e:
+        return jsonify({
+            'success': False,
+            'error': {'code': 'CONFLICT', 'message': str(e)},
+        }), 409
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': {'code': 'ASSIGN_ERROR', 'message': str(e)},
+        }), 500
+
+
 @bp.route('/sites/<site_id>/unassign', methods=['POST'])
 def unassign_manager(site_id):
-    """소장 배정 해제. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사"""
+    """소장 배정 해제. 2-3: If-Match 또는 body.version으로 버전 전달 시 충돌 검사 (409 보장 범위는 update_site 참고)"""
     try:
         db = get_db()
-        site = db.get_site_by_id(site_id)
+        site = unit_of_work.load('sites', site_id, db.get_site_by_id)
         if not site:
             return jsonify({
                 'success': False,
                 'error': {'code': 'SITE_NOT_FOUND', 'message': f'현장ID {site_id}를 찾을 수 없습니다'},
             }), 404
 
-        data = request.json or {}
-        version = request.headers.get('If-Match') or data.get('version')
-        try:
-            get_sync_manager().require_site_version(site_id, version)
-        except ConflictError as e:
-            return jsonify({
-                'success': False,
-                'error': {'code': 'CONFLICT', 'message': str(e)},
-            }), 409
+        # 본문 없이 If-Match 헤더만 보내는 경우도 허용
+        data = request.get_json(silent=True) or {}
+        expected_version = parse_version(request.headers.get('If-Match') or data.get('version'))
 
         if not site.get('담당소장ID'):
             return jsonify({
@@ -399,12 +597,12 @@ def unassign_manager(site_id):
                 'error': {'code': 'NOT_ASSIGNED', 'message': '배정된 소장이 없습니다'},
             }), 400
 
-        db.unassign_site(site_id)
+        version = db.unassign_site(site_id, expected_version=expected_version)
+        publish('site.unassigned', site_id)
 
-        now = datetime.now().strftime('%Y-%m-%d')
         return jsonify({
             'success': True,
-            'data': {'현장ID': site_id, '현장명': site.get('현장명', ''), 'version': now},
+            'data': {'현장ID': site_id, '현장명': site.get('현장명', ''), 'version': version},
             'message': '소장 배정이 해제되었습니다',
             'timestamp': datetime.now().isoformat(),
         })
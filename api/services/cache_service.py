@@ -0,0 +1,492 @@
+"""
+DB 읽기 캐시 - get_db() 백엔드(Supabase/Sheets) 래퍼
+
+- 테이블(sites/personnel/certificates)별 버전 스냅샷 + TTL + LRU 제거
+- create_*/update_*/assign_site/unassign_site/create_many 완료 즉시 관련 테이블 무효화 (write-through)
+- 조회 시작 시점의 버전을 기록해 두고, 조회 중 쓰기가 끼어들면 결과를 저장하지 않음
+- 통계(/api/stats)는 StatsCounter에 쓰기 데이터로 계산한 행 차이만 반영 (stats_service 참고)
+  쓰기 경로에서 행을 다시 읽지 않음: 변경 전 행은 이번 요청이 읽은 행(UnitOfWork)/캐시된 행만 사용.
+  배정/해제는 현장 배정상태·소장 현재상태·자격증 사용가능여부 변화를 같은 방식으로 계산.
+  변경 전 행을 알 수 없으면(또는 시드 전 쓰기) 카운터를 무효화 → 다음 /api/stats 조회 때 1회 재집계
+
+환경 변수:
+- DB_CACHE_TTL=30          → 스냅샷 유효 시간(초). 0이면 캐시 비활성화
+- DB_CACHE_MAX_ENTRIES=256 → LRU 최대 항목 수
+"""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from api.services.stats_service import STATS_FIELDS, StatsCounter
+from api.services.unit_of_work import current_uow
+from api.utils.filters import certificate_filter, personnel_filter, site_filter
+
+TABLE_SITES = 'sites'
+TABLE_PERSONNEL = 'personnel'
+TABLE_CERTIFICATES = 'certificates'
+ALL_TABLES = (TABLE_SITES, TABLE_PERSONNEL, TABLE_CERTIFICATES)
+
+DB_CACHE_TTL = float(os.getenv('DB_CACHE_TTL', '30') or 0)
+DB_CACHE_MAX_ENTRIES = int(os.getenv('DB_CACHE_MAX_ENTRIES', '256') or 256)
+
+# 쓰기 메서드별 무효화 대상 테이블
+# (현장 응답에는 소장/자격증 정보가, 자격증 응답에는 소유자 정보가 JOIN되어 있음)
+WRITE_INVALIDATES = {
+    'create_site': (TABLE_SITES,),
+    'update_site': (TABLE_SITES,),
+    'create_personnel': (TABLE_PERSONNEL,),
+    'update_personnel': ALL_TABLES,
+    'create_certificate': (TABLE_CERTIFICATES,),
+    'update_certificate': (TABLE_CERTIFICATES, TABLE_SITES),
+    'assign_site': ALL_TABLES,
+    'unassign_site': ALL_TABLES,
+    'assign_sites_batch': ALL_TABLES,
+}
+
+
+class SnapshotCache:
+    """테이블 버전 태그가 붙은 TTL + LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl: float = DB_CACHE_TTL, max_entries: int = DB_CACHE_MAX_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max(1, max_entries)
+        # key -> (tables, versions, expires_at, value)
+        self._entries: 'OrderedDict[Tuple, Tuple]' = OrderedDict()
+        self._versions: Dict[str, int] = {t: 0 for t in ALL_TABLES}
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+
+    def version(self, table: str) -> int:
+        """테이블의 현재 버전 (쓰기/무효화마다 1씩 증가)"""
+        with self._lock:
+            return self._versions.get(table, 0)
+
+    def versions(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """(hit 여부, 값) 반환. 만료되었거나 버전이 바뀐 항목은 miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            tables, versions, expires_at, value = entry
+            if expires_at < time.monotonic() or versions != tuple(self._versions.get(t, 0) for t in tables):
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: Tuple, tables: Tuple[str, ...], versions: Tuple[int, ...], value: Any) -> bool:
+        """조회 시작 시점 버전(versions)이 아직 유효할 때만 저장"""
+        with self._lock:
+            if versions != tuple(self._versions.get(t, 0) for t in tables):
+                return False
+            self._entries[key] = (tables, versions, time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *tables: str) -> None:
+        """테이블 버전을 올리고 해당 테이블이 포함된 항목 제거"""
+        targets = set(tables or ALL_TABLES)
+        with self._lock:
+            for t in targets:
+                self._versions[t] = self._versions.get(t, 0) + 1
+            stale = [k for k, e in self._entries.items() if targets.intersection(e[0])]
+            for k in stale:
+                del self._entries[k]
+
+    def clear(self) -> None:
+        self.invalidate(*ALL_TABLES)
+
+    def key_lock(self, key: Tuple) -> threading.Lock:
+        """같은 키에 대한 동시 miss 시 백엔드 조회를 1회로 묶기 위한 잠금"""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                if len(self._key_locks) > self._max_entries * 4:
+                    self._key_locks.clear()
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'versions': dict(self._versions), 'ttl': self._ttl}
+
+
+def _copy(value):
+    """
+    행 단위 복사: 목록(및 {'data': [...]} 같은 dict 안의 목록)의 행 dict까지 새로 만듦.
+    저장/반환 양쪽에서 사용 → 호출자의 행 수정이나 백엔드 내부 행 변경(SheetsRepository.on_update)이
+    캐시 값에 번지지 않음 (행 값은 문자열/숫자라 행 dict 복사로 충분)
+    """
+    if isinstance(value, list):
+        return [dict(v) if isinstance(v, dict) else v for v in value]
+    if isinstance(value, dict):
+        return {k: (_copy(v) if isinstance(v, (list, dict)) else v) for k, v in value.items()}
+    return value
+
+
+# 쓰기 메서드별 통계 증분 대상: (섹션, 인자 위치 또는 data 키)
+# 배정/해제/일괄 배정은 여러 행이 바뀌므로 _assignment_deltas에서 계산
+ASSIGNMENT_WRITES = ('assign_site', 'unassign_site', 'assign_sites_batch')
+STATS_TARGETS = {
+    'create_site': ('sites', '현장ID'),
+    'update_site': ('sites', 0),
+    'create_personnel': ('personnel', '인력ID'),
+    'update_personnel': ('personnel', 0),
+    'create_certificate': ('certificates', '자격증ID'),
+    'update_certificate': ('certificates', 0),
+}
+
+ID_FIELDS = {TABLE_SITES: '현장ID', TABLE_PERSONNEL: '인력ID', TABLE_CERTIFICATES: '자격증ID'}
+
+
+def _count(value) -> int:
+    try:
+        return int(str(value or 0).strip() or 0)
+    except ValueError:
+        return 0
+
+
+class CachedBackend:
+    """백엔드(SupabaseService / _SheetsAdapter)를 감싸 읽기 결과를 캐시"""
+
+    def __init__(self, backend, cache: Optional[SnapshotCache] = None, stats: Optional[StatsCounter] = None):
+        self._backend = backend
+        self._cache = cache or SnapshotCache()
+        self._stats = stats
+        self._backend_versions: Dict[str, str] = {}  # 마지막으로 본 백엔드 컬렉션 버전
+
+    def __getattr__(self, name):
+        # 캐시 대상이 아닌 메서드는 백엔드로 위임
+        return getattr(self._backend, name)
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def cache(self) -> SnapshotCache:
+        return self._cache
+
+    @property
+    def stats_counter(self) -> Optional[StatsCounter]:
+        return self._stats
+
+    def _cached(self, key: Tuple, tables: Tuple[str, ...], loader: Callable[[], Any]):
+        hit, value = self._cache.get(key)
+        if hit:
+            return _copy(value)
+        with self._cache.key_lock(key):
+            hit, value = self._cache.get(key)
+            if hit:
+                return _copy(value)
+            versions = self._cache.versions(tables)
+            value = _copy(loader())
+            self._cache.put(key, tables, versions, value)
+        return _copy(value)
+
+    def _by_id(self, table: str, id_field: str, entity_id, list_loader_key: Tuple, loader: Callable[[], Any]):
+        """전체 스냅샷이 캐시되어 있으면 인덱스에서, 없으면 단건 조회 결과를 캐시"""
+        hit, _ = self._cache.get(list_loader_key)
+        if hit:
+            index = self._index(table, id_field, list_loader_key)
+            if index is not None and entity_id in index:
+                return dict(index[entity_id])
+        return self._cached((table, 'id', entity_id), (table,), loader)
+
+    def _index(self, table: str, id_field: str, list_key: Tuple):
+        """ID → 행 인덱스 (내부 전용이라 복사하지 않음. 행은 꺼낼 때 dict로 복사)"""
+        hit, index = self._cache.get((table, 'index'))
+        if not hit:
+            versions = self._cache.versions((table,))
+            index = self._build_index(list_key, id_field)
+            if index is not None:
+                self._cache.put((table, 'index'), (table,), versions, index)
+        return index
+
+    def _build_index(self, list_key: Tuple, id_field: str):
+        hit, rows = self._cache.get(list_key)
+        if not hit:
+            return None
+        return {r.get(id_field): r for r in (rows or []) if r.get(id_field)}
+
+    # ---- 읽기 ----
+    def get_all_sites(self, limit=None, offset=0):
+        if limit:
+            return self._cached((TABLE_SITES, 'all', limit, offset), (TABLE_SITES,),
+                                lambda: self._backend.get_all_sites(limit=limit, offset=offset))
+        return self._cached((TABLE_SITES, 'all'), (TABLE_SITES,), self._backend.get_all_sites)
+
+    def get_sites_paginated(self, company=None, status=None, state=None, limit=None, offset=0):
+        key = (TABLE_SITES, 'page', company, status, state, limit, offset)
+        return self._cached(key, (TABLE_SITES,), lambda: self._backend.get_sites_paginated(
+            company=company, status=status, state=state, limit=limit, offset=offset))
+
+    def get_sites_page(self, company=None, status=None, state=None, limit=None, cursor=None):
+        key = (TABLE_SITES, 'cursor', company, status, state, limit, cursor)
+        return self._cached(key, (TABLE_SITES,), lambda: self._backend.get_sites_page(
+            company=company, status=status, state=state, limit=limit, cursor=cursor))
+
+    def search_sites(self, query, limit=None):
+        return self._cached((TABLE_SITES, 'search', query, limit), (TABLE_SITES,),
+                            lambda: self._backend.search_sites(query, limit=limit))
+
+    def get_site_by_id(self, site_id):
+        return self._by_id(TABLE_SITES, '현장ID', site_id, (TABLE_SITES, 'all'),
+                           lambda: self._backend.get_site_by_id(site_id))
+
+    def get_all_personnel(self):
+        return self._cached((TABLE_PERSONNEL, 'all'), (TABLE_PERSONNEL,), self._backend.get_all_personnel)
+
+    def get_personnel_by_id(self, personnel_id):
+        return self._by_id(TABLE_PERSONNEL, '인력ID', personnel_id, (TABLE_PERSONNEL, 'all'),
+                           lambda: self._backend.get_personnel_by_id(personnel_id))
+
+    def get_all_certificates(self):
+        return self._cached((TABLE_CERTIFICATES, 'all'), (TABLE_CERTIFICATES,), self._backend.get_all_certificates)
+
+    def get_certificate_by_id(self, cert_id):
+        return self._by_id(TABLE_CERTIFICATES, '자격증ID', cert_id, (TABLE_CERTIFICATES, 'all'),
+                           lambda: self._backend.get_certificate_by_id(cert_id))
+
+    # ---- 컬렉션 버전 (ETag) ----
+    def collection_versions(self, tables: Iterable[str]) -> Dict[str, str]:
+        """
+        테이블별 백엔드 컬렉션 버전. 스냅샷과 같은 TTL로 캐시하고 이 프로세스의 쓰기 시 무효화.
+        백엔드 버전이 직전 값과 다르면(외부 수정) 해당 테이블 스냅샷을 버려,
+        새 ETag에 옛 데이터가 붙어 나가지 않도록 함
+        """
+        tables = tuple(tables)
+        result, missing = {}, []
+        for table in tables:
+            hit, value = self._cache.get((table, 'version'))
+            if hit:
+                result[table] = value
+            else:
+                missing.append(table)
+        if missing:
+            loaded = self._backend.collection_versions(missing)
+            for table in missing:
+                token = loaded[table]
+                previous = self._backend_versions.get(table)
+                self._backend_versions[table] = token
+                if previous is not None and previous != token:
+                    self._cache.invalidate(table)
+                    if self._stats is not None:
+                        self._stats.invalidate()
+                self._cache.put((table, 'version'), (table,), self._cache.versions((table,)), token)
+                result[table] = token
+        return result
+
+    # ---- 스트리밍 조회: 캐시된 전체 목록이 있으면 그대로, 없으면 백엔드 iter_* (캐시에 적재하지 않음) ----
+    def _iter_cached(self, table: str, match, backend_iter: Callable[[], Iterable]):
+        hit, rows = self._cache.get((table, 'all'))
+        if hit:
+            return (dict(r) for r in rows if match(r))
+        return backend_iter()
+
+    def iter_sites(self, company=None, status=None, state=None):
+        return self._iter_cached(TABLE_SITES, site_filter(company, status, state),
+                                 lambda: self._backend.iter_sites(company=company, status=status, state=state))
+
+    def iter_personnel(self, status=None, role=None):
+        return self._iter_cached(TABLE_PERSONNEL, personnel_filter(status, role),
+                                 lambda: self._backend.iter_personnel(status=status, role=role))
+
+    def iter_certificates(self, available=None):
+        return self._iter_cached(TABLE_CERTIFICATES, certificate_filter(available),
+                                 lambda: self._backend.iter_certificates(available=available))
+
+    def get_statistics(self, fresh: bool = False) -> Dict[str, Any]:
+        """증분 카운터가 있으면 O(1) 사본, 없으면 스냅샷 캐시. fresh=True면 전체 재집계"""
+        if self._stats is not None:
+            return self._stats.snapshot(fresh=fresh)
+        if fresh:
+            self._cache.invalidate(*ALL_TABLES)
+        stats = self._cached(('stats',), ALL_TABLES, self._backend.get_statistics)
+        return copy.deepcopy(stats)
+
+    def get_all_tables(self) -> Dict[str, list]:
+        """세 테이블 스냅샷. 빠진 테이블이 있으면 백엔드 일괄 로더(get_all_tables) 1회로 채움"""
+        loaders = {
+            TABLE_SITES: self._backend.get_all_sites,
+            TABLE_PERSONNEL: self._backend.get_all_personnel,
+            TABLE_CERTIFICATES: self._backend.get_all_certificates,
+        }
+        result = {}
+        for table in ALL_TABLES:
+            hit, value = self._cache.get((table, 'all'))
+            if hit:
+                result[table] = _copy(value)
+        missing = [t for t in ALL_TABLES if t not in result]
+        if len(missing) > 1 and hasattr(self._backend, 'get_all_tables'):
+            versions = {t: self._cache.versions((t,)) for t in missing}
+            loaded = self._backend.get_all_tables()
+            for table in missing:
+                rows = _copy(loaded[table])
+                self._cache.put((table, 'all'), (table,), versions[table], rows)
+                result[table] = _copy(rows)
+        else:
+            for table in missing:
+                result[table] = self._cached((table, 'all'), (table,), loaders[table])
+        return result
+
+    # ---- 쓰기 (백엔드 반영 후 즉시 무효화) ----
+    def _write(self, name: str, *args, **kwargs):
+        seeded = self._stats is not None and self._stats.seeded
+        deltas = self._stats_deltas(name, args) if seeded else None
+        ok = False
+        try:
+            result = getattr(self._backend, name)(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            # 실패한 쓰기도 일부 반영되었을 수 있으므로 항상 무효화 (요청 identity map 포함)
+            self._cache.invalidate(*WRITE_INVALIDATES[name])
+            uow = current_uow()
+            if uow is not None:
+                uow.forget()
+            if self._stats is not None:
+                if ok and deltas is not None:
+                    for section, before, after in deltas:
+                        self._stats.apply(section, before, after)
+                else:
+                    # 시드 전/도중 쓰기 포함: 세대를 올려 진행 중인 시드 결과를 버리고 다음 조회 때 재집계
+                    self._stats.invalidate()
+
+    # ---- 통계 카운터 증분 반영 (백엔드 재조회 없음) ----
+    def _known_row(self, section: str, entity_id) -> Optional[Dict]:
+        """변경 전 행: 이번 요청이 이미 읽은 행(UnitOfWork) 또는 캐시된 행. 없으면 None"""
+        uow = current_uow()
+        if uow is not None:
+            hit, row = uow.peek(section, entity_id)
+            if hit and row:
+                return row
+        hit, row = self._cache.get((section, 'id', entity_id))
+        if hit and row:
+            return row
+        hit, _ = self._cache.get((section, 'all'))
+        if hit:
+            return (self._index(section, ID_FIELDS[section], (section, 'all')) or {}).get(entity_id)
+        return None
+
+    def _stats_deltas(self, name: str, args: Tuple) -> Optional[list]:
+        """
+        쓰기 전 [(섹션, 변경 전 행, 변경 후 행)] 계산 (쓰기 성공 후 반영).
+        통계 필드가 없는 수정은 [] (불변), 계산할 수 없으면 None (쓰기 후 카운터 무효화)
+        """
+        if name in ASSIGNMENT_WRITES:
+            return self._assignment_deltas(name, args)
+        section, ref = STATS_TARGETS[name]
+        data = (args[0] if isinstance(ref, str) else args[1]) or {}
+        fields = STATS_FIELDS[section]
+        if name.startswith('create_'):
+            # 빠진 필드는 백엔드 기본값이 들어가므로 모든 통계 필드가 있을 때만 델타
+            if data.get(ref) and all(f in data for f in fields):
+                return [(section, None, dict(data))]
+            return None
+        if not any(f in data for f in fields):
+            return []
+        before = self._known_row(section, args[ref])
+        return None if before is None else [(section, before, {**before, **data})]
+
+    def _assignment_deltas(self, name: str, args: Tuple) -> Optional[list]:
+        """
+        배정/해제 델타 (두 백엔드의 쓰기 규칙과 동일):
+        - 배정: 현장 배정완료, 새 소장 투입중(담당수 +1), 새 자격증 사용중
+          (배정완료 현장은 라우트가 거부하므로 기존 소장/자격증은 바뀌지 않음)
+        - 해제: 현장 미배정, 기존 소장 담당수 -1 후 RELEASE_AVAILABLE_COUNT 이하이면 투입가능, 기존 자격증 사용가능
+        일괄 배정은 항목 순서대로 작업 사본에 누적. 변경 전 행 하나라도 모르면 None
+        """
+        items = args[0] if name == 'assign_sites_batch' else [args]
+        release_count = getattr(self._backend, 'RELEASE_AVAILABLE_COUNT', 0)
+        before, after = {}, {}
+
+        def row(section, entity_id):
+            key = (section, entity_id)
+            if key not in after:
+                known = self._known_row(section, entity_id)
+                if known is None:
+                    raise LookupError(key)
+                before[key], after[key] = known, dict(known)
+            return after[key]
+
+        try:
+            for item in items:
+                site = row(TABLE_SITES, item[0])
+                if name == 'unassign_site':
+                    manager_id = (site.get('담당소장ID') or '').strip()
+                    cert_id = (site.get('사용자격증ID') or '').strip()
+                    site.update({'배정상태': '미배정', '담당소장ID': '', '사용자격증ID': ''})
+                    if manager_id:
+                        manager = row(TABLE_PERSONNEL, manager_id)
+                        count = max(0, _count(manager.get('현재담당현장수')) - 1)
+                        manager['현재담당현장수'] = str(count)
+                        if count <= release_count:
+                            manager['현재상태'] = '투입가능'
+                    if cert_id:
+                        row(TABLE_CERTIFICATES, cert_id)['사용가능여부'] = '사용가능'
+                    continue
+                site.update({'배정상태': '배정완료', '담당소장ID': item[1], '사용자격증ID': item[2]})
+                manager = row(TABLE_PERSONNEL, item[1])
+                manager['현재담당현장수'] = str(_count(manager.get('현재담당현장수')) + 1)
+                manager['현재상태'] = '투입중'
+                row(TABLE_CERTIFICATES, item[2])['사용가능여부'] = '사용중'
+        except LookupError:
+            return None
+        return [(section, before[(section, entity_id)], row_after)
+                for (section, entity_id), row_after in after.items()]
+
+    def create_site(self, data: Dict[str, Any]):
+        return self._write('create_site', data)
+
+    def update_site(self, site_id: str, data: Dict[str, Any], expected_version: Optional[int] = None):
+        return self._write('update_site', site_id, data, expected_version=expected_version)
+
+    def create_personnel(self, data: Dict[str, Any]):
+        return self._write('create_personnel', data)
+
+    def update_personnel(self, personnel_id: str, data: Dict[str, Any]):
+        return self._write('update_personnel', personnel_id, data)
+
+    def create_certificate(self, data: Dict[str, Any]):
+        return self._write('create_certificate', data)
+
+    def update_certificate(self, cert_id: str, data: Dict[str, Any]):
+        return self._write('update_certificate', cert_id, data)
+
+    def assign_site(self, site_id: str, manager_id: str, certificate_id: str, expected_version: Optional[int] = None):
+        return self._write('assign_site', site_id, manager_id, certificate_id, expected_version=expected_version)
+
+    def unassign_site(self, site_id: str, expected_version: Optional[int] = None):
+        return self._write('unassign_site', site_id, expected_version=expected_version)
+
+    def assign_sites_batch(self, items):
+        return self._write('assign_sites_batch', [tuple(item) for item in items])
+
+    def create_many(self, table: str, records):
+        """일괄 가져오기: 청크마다 해당 테이블 무효화, 통계는 다음 조회 때 1회 재집계"""
+        try:
+            return self._backend.create_many(table, records)
+        finally:
+            self._cache.invalidate(table)
+            if self._stats is not None:
+                self._stats.invalidate()
+
+
+def wrap_with_cache(backend):
+    """DB_CACHE_TTL > 0이면 CachedBackend(+ 통계 증분 카운터)로 감싸서 반환"""
+    if DB_CACHE_TTL <= 0:
+        return backend
+    stats = None
+    if hasattr(backend, 'get_statistics'):
+        stats = StatsCounter(lambda: backend.get_statistics(fresh=True))
+    return CachedBackend(backend, stats=stats)
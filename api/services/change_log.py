@@ -0,0 +1,115 @@
+"""
+변경 로그 (GET /api/changes?since=<cursor> 델타 동기화)
+
+- Sheets 백엔드: 프로세스 내 링 버퍼(ChangeLog). SheetsRepository의 append/update와
+  시트 재로딩 시 이전 인덱스와의 차이(외부 편집)를 기록
+- Supabase 백엔드: change_log 테이블 + 트리거 (migration 009, supabase_service.get_changes)
+- 커서는 클라이언트에 불투명 문자열. 재시작/버퍼 초과 등으로 이어 받을 수 없으면 reset=True
+  (클라이언트는 전체 재조회 후 응답의 cursor부터 다시 동기화)
+
+환경 변수:
+- CHANGE_LOG_SIZE=10000 → 링 버퍼에 보관하는 변경 건수 (Sheets)
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from api.utils.pagination import CursorError
+
+CHANGE_LOG_SIZE = int(os.getenv('CHANGE_LOG_SIZE', '10000') or 10000)
+DEFAULT_CHANGES_LIMIT = 1000
+MAX_CHANGES_LIMIT = 5000
+
+OP_UPSERT = 'upsert'
+OP_DELETE = 'delete'
+
+CHANGE_TABLES = ('sites', 'personnel', 'certificates')
+
+# (seq, 테이블, 키, op)
+Entry = Tuple[int, str, str, str]
+
+
+def clamp_changes_limit(limit: Optional[int]) -> int:
+    if not limit or limit <= 0:
+        return DEFAULT_CHANGES_LIMIT
+    return min(limit, MAX_CHANGES_LIMIT)
+
+
+class ChangeLog:
+    """단조 증가 seq가 붙은 변경 링 버퍼 (스레드 안전). 커서 = "<epoch>.<seq>\""""
+
+    def __init__(self, size: int = CHANGE_LOG_SIZE):
+        # 프로세스마다 다른 epoch → 재시작 전 커서는 reset 처리
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._entries: deque = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+
+    def record(self, table: str, key, op: str = OP_UPSERT) -> None:
+        key = str(key or '').strip()
+        if not key:
+            return
+        with self._lock:
+            self._seq += 1
+            self._entries.append((self._seq, table, key, op))
+
+    def cursor(self) -> str:
+        with self._lock:
+            return f'{self.epoch}.{self._seq}'
+
+    def since(self, cursor: Optional[str], limit: Optional[int] = None) -> Tuple[List[Entry], str, bool, bool]:
+        """(변경 목록, 다음 커서, has_more, reset). 잘못된 형식의 커서는 CursorError"""
+        limit = clamp_changes_limit(limit)
+        with self._lock:
+            current = f'{self.epoch}.{self._seq}'
+            if not cursor:
+                return [], current, False, True
+            epoch, _, seq = cursor.partition('.')
+            try:
+                after = int(seq)
+            except ValueError:
+                raise CursorError('잘못된 변경 커서입니다. 이전 응답의 cursor를 그대로 전달하세요.')
+            oldest = self._entries[0][0] if self._entries else self._seq + 1
+            if epoch != self.epoch or after > self._seq or after + 1 < oldest:
+                return [], current, False, True
+            entries = [e for e in self._entries if e[0] > after]
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        next_cursor = f'{self.epoch}.{entries[-1][0]}' if has_more else current
+        return entries, next_cursor, has_more, False
+
+
+def compact(entries: Iterable[Entry]) -> Dict[str, 'OrderedDict[str, str]']:
+    """같은 행의 변경은 마지막 op만 남김 → {테이블: {키: op}}"""
+    out: Dict[str, OrderedDict] = {}
+    for _, table, key, op in entries:
+        ops = out.setdefault(table, OrderedDict())
+        ops.pop(key, None)
+        ops[key] = op
+    return out
+
+
+def empty_changes() -> Dict[str, Dict[str, list]]:
+    return {t: {'upserted': [], 'deleted': []} for t in CHANGE_TABLES}
+
+
+def build_changes(entries: Iterable[Entry], fetch: Callable[[str, List[str]], Dict[str, Dict]],
+                  deleted_id: Callable[[str, str], str] = lambda table, key: key) -> Dict[str, Dict[str, list]]:
+    """
+    변경 목록 → {테이블: {'upserted': [현재 행], 'deleted': [ID]}}.
+    fetch(table, keys)는 {키: API 형식 행}을 반환. 조회되지 않는 upsert 키(이후 삭제됨)는 deleted로 보냄.
+    """
+    changes = empty_changes()
+    for table, ops in compact(entries).items():
+        bucket = changes.setdefault(table, {'upserted': [], 'deleted': []})
+        upsert_keys = [k for k, op in ops.items() if op == OP_UPSERT]
+        rows = fetch(table, upsert_keys) if upsert_keys else {}
+        for key, op in ops.items():
+            row = rows.get(key) if op == OP_UPSERT else None
+            if row is not None:
+                bucket['upserted'].append(row)
+            else:
+                bucket['deleted'].append(deleted_id(table, key))
+    return changes
@@ -5,12 +5,25 @@
 - DB_BACKEND=supabase  → Supabase 사용 (기본값으로 준비)
 - DB_BACKEND=sheets    → Google Sheets 사용
 - SUPABASE_URL, SUPABASE_KEY  → Supabase 연동 시 필수
+- DB_CACHE_TTL=30             → 읽기 캐시 유효 시간(초), 0이면 비활성화 (cache_service 참고)
+- ID_PREFETCH=1               → Supabase 참조 ID(legacy_id/회사/자격증 종류) 시작 시 미리 적재 (id_resolver 참고)
 """
+import logging
 import os
+import threading
 from typing import List, Dict, Any, Optional
 
+from api.services.sync_manager import check_version, row_version
+
 _BACKEND = (os.getenv("DB_BACKEND") or "supabase").strip().lower()
 _USE_SUPABASE = _BACKEND == "supabase" or (os.getenv("USE_SUPABASE", "").strip().lower() in ("1", "true", "yes"))
+_ID_PREFETCH = (os.getenv("ID_PREFETCH", "1").strip().lower() in ("1", "true", "yes"))
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigRequiredError(ValueError):
+    """백엔드 연동 설정 누락 (SPREADSHEET_ID, SUPABASE_URL/KEY) → 라우트에서 503 CONFIG_REQUIRED"""
 
 
 def _get_backend():
@@ -24,6 +37,10 @@ def _get_backend():
 
 class _SheetsAdapter:
     """SheetsService를 create_site/update_site/assign_site/unassign_site 인터페이스로 감쌈"""
+
+    # 배정 해제 후 담당 현장 수가 이 값 이하이면 소장 현재상태를 투입가능으로 (기존 시트 동작 유지)
+    RELEASE_AVAILABLE_COUNT = 1
+
     def __init__(self, sheets):
         self._s = sheets
         from api.services.sheets_service import SHEET_SITES, SHEET_PERSONNEL, SHEET_CERTIFICATES
@@ -31,8 +48,9 @@ class _SheetsAdapter:
         self._personnel = SHEET_PERSONNEL
         self._certs = SHEET_CERTIFICATES
 
-    def get_all_sites(self, limit=None, offset=0): 
-        return self._s.get_all_sites(limit=limit, offset=offset) if hasattr(self._s, 'get_all_sites') else self._s.get_all_sites()
+    def get_all_sites(self, limit=None, offset=0):
+        sites = self._s.get_all_sites()
+        return sites[offset:offset + limit] if limit else sites
     
     def get_sites_paginated(self, company=None, status=None, state=None, limit=None, offset=0):
         """페이지네이션 지원 현장 조회"""
@@ -51,16 +69,63 @@ class _SheetsAdapter:
             sites = sites[offset:offset + limit]
         return {'data': sites, 'total': total}
     
+    def get_sites_page(self, company=None, status=None, state=None, limit=None, cursor=None):
+        """커서 페이지 조회 (등록일 DESC, 현장ID DESC 키셋)"""
+        from api.utils.pagination import keyset_page, clamp_page_size
+        sites = self._s.get_all_sites()
+        if company:
+            sites = [s for s in sites if s.get('회사구분') == company]
+        if status:
+            sites = [s for s in sites if s.get('배정상태') == status]
+        if state:
+            sites = [s for s in sites if s.get('현장상태') == state]
+        page, next_cursor = keyset_page(
+            sites, lambda s: (s.get('등록일') or '', s.get('현장ID') or ''), cursor, clamp_page_size(limit))
+        return {'data': page, 'next_cursor': next_cursor}
+
+    def iter_sites(self, company=None, status=None, state=None):
+        """현장 스트리밍 (인덱스 행을 필터하며 하나씩 반환)"""
+        from api.utils.filters import site_filter
+        return filter(site_filter(company, status, state), self._s.get_all_sites())
+
+    def iter_personnel(self, status=None, role=None):
+        from api.utils.filters import personnel_filter
+        return filter(personnel_filter(status, role), self._s.get_all_personnel())
+
+    def iter_certificates(self, available=None):
+        from api.utils.filters import certificate_filter
+        return filter(certificate_filter(available), self._s.get_all_certificates())
+
     def get_site_by_id(self, site_id): return self._s.get_site_by_id(site_id)
+    def search_sites(self, query, limit=None): return self._s.search_sites(query, limit=limit)
+    def get_all_tables(self): return self._s.get_all_tables()
+    def get_statistics(self, fresh=False): return self._s.get_statistics(fresh=fresh)
+    def _repo(self): return self._s.repo
+
+    @staticmethod
+    def _retry_moved(write, *args):
+        """시트에서 대상 행이 옮겨져 쓰지 못했으면(RowMovedError, 인덱스는 다시 읽음) 새 행 번호로 1회 재시도"""
+        from api.services.sheets_service import RowMovedError
+        try:
+            return write(*args)
+        except RowMovedError:
+            return write(*args)
     def get_all_personnel(self): return self._s.get_all_personnel()
     def get_personnel_by_id(self, pid): return self._s.get_personnel_by_id(pid)
     def get_all_certificates(self): return self._s.get_all_certificates()
     def get_certificate_by_id(self, cid): return self._s.get_certificate_by_id(cid)
 
     def create_site(self, data: Dict[str, Any]) -> None:
+        row = self._site_row(data)
+        row_num = self._s.append_row(self._sites, row)
+        self._repo().on_append(self._sites, row, row_num)
+
+    @staticmethod
+    def _site_row(data: Dict[str, Any]) -> List[Any]:
+        """현장 dict -> 시트 1행 (A~X, X열은 행 버전 1부터)"""
         from datetime import datetime
         now = datetime.now().strftime("%Y-%m-%d")
-        row = [
+        return [
             data.get("현장ID", ""),
             data.get("현장명", ""),
             data.get("건축주명", ""),
@@ -84,14 +149,26 @@ class _SheetsAdapter:
             data.get("배정상태", "미배정"),
             now,
             now,
+            "1",
         ]
-        self._s.append_row(self._sites, row)
 
-    def update_site(self, site_id: str, data: Dict[str, Any]) -> None:
+    def update_site(self, site_id: str, data: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        """현장 수정. expected_version이 있으면 인덱스의 행 버전과 비교 후 교체. 새 버전 반환
+
+        버전 비교는 이 프로세스의 인덱스 + write_lock 기준 (단일 프로세스 보장).
+        Sheets에는 조건부 쓰기가 없어 다른 프로세스의 쓰기/시트 직접 편집은 인덱스 재로딩 전까지 검출하지 못함
+        """
+        with self._repo().write_lock:
+            return self._retry_moved(self._update_site, site_id, data, expected_version)
+
+    def _update_site(self, site_id: str, data: Dict[str, Any], expected_version: Optional[int]) -> int:
         from datetime import datetime
         row_num = self._s.find_row_by_id(self._sites, site_id)
         if not row_num:
             raise ValueError(f"현장을 찾을 수 없습니다: {site_id}")
+        site = self._repo().get(self._sites, site_id) or {}
+        check_version(site_id, site, expected_version)
+        version = row_version(site) + 1
         column_map = {
             "현장명": "B", "건축주명": "C", "회사구분": "D", "주소": "E", "위도": "F", "경도": "G",
             "건축허가일": "H", "착공예정일": "I", "준공일": "J",
@@ -104,11 +181,41 @@ class _SheetsAdapter:
                 updates.append({"range": f"{self._sites}!{col}{row_num}", "values": [[data[field]]]})
         now = datetime.now().strftime("%Y-%m-%d")
         updates.append({"range": f"{self._sites}!W{row_num}", "values": [[now]]})
-        if updates:
-            self._s.batch_update(updates)
+        updates.append({"range": f"{self._sites}!X{row_num}", "values": [[version]]})
+        self._s.verified_batch_update(updates)
+        fields = {k: v for k, v in data.items() if k in column_map}
+        fields["수정일"] = now
+        fields["버전"] = str(version)
+        if "담당소장ID" in fields or "사용자격증ID" in fields:
+            # VLOOKUP 컬럼(담당소장명 등)은 시트에서 계산되므로 인덱스에서 동일하게 채움
+            fields.update(self._site_links(
+                fields.get("담당소장ID", site.get("담당소장ID")),
+                fields.get("사용자격증ID", site.get("사용자격증ID")),
+            ))
+        self._repo().on_update(self._sites, site_id, fields)
+        return version
+
+    def _site_links(self, manager_id, cert_id) -> Dict[str, Any]:
+        """현장 행의 VLOOKUP 파생 컬럼 값 (인력풀/자격증풀 인덱스 기준)"""
+        manager = self._repo().get(self._personnel, manager_id) if manager_id else None
+        cert = self._repo().get(self._certs, cert_id) if cert_id else None
+        return {
+            "담당소장명": (manager or {}).get("성명", ""),
+            "담당소장연락처": (manager or {}).get("연락처", ""),
+            "자격증명": (cert or {}).get("자격증명", ""),
+            "자격증소유자명": (cert or {}).get("소유자명", ""),
+            "자격증소유자연락처": (cert or {}).get("소유자연락처", ""),
+        }
 
     def create_personnel(self, data: Dict[str, Any]) -> None:
-        row = [
+        row = self._personnel_row(data)
+        row_num = self._s.append_row(self._personnel, row)
+        self._repo().on_append(self._personnel, row, row_num)
+
+    @staticmethod
+    def _personnel_row(data: Dict[str, Any]) -> List[Any]:
+        """인력 dict -> 시트 1행 (A~L)"""
+        return [
             data.get("인력ID", ""),
             data.get("성명", ""),
             data.get("직책", ""),
@@ -122,9 +229,11 @@ class _SheetsAdapter:
             data.get("입사일", ""),
             data.get("등록일", ""),
         ]
-        self._s.append_row(self._personnel, row)
 
     def update_personnel(self, personnel_id: str, data: Dict[str, Any]) -> None:
+        self._retry_moved(self._update_personnel, personnel_id, data)
+
+    def _update_personnel(self, personnel_id: str, data: Dict[str, Any]) -> None:
         row_num = self._s.find_row_by_id(self._personnel, personnel_id)
         if not row_num:
             raise ValueError(f"인력을 찾을 수 없습니다: {personnel_id}")
@@ -136,10 +245,19 @@ class _SheetsAdapter:
         updates = [{"range": f"{self._personnel}!{col}{row_num}", "values": [[data[field]]]}
                    for field, col in column_map.items() if field in data]
         if updates:
-            self._s.batch_update(updates)
+            self._s.verified_batch_update(updates)
+            self._repo().on_update(self._personnel, personnel_id,
+                                   {k: v for k, v in data.items() if k in column_map})
 
     def create_certificate(self, data: Dict[str, Any]) -> None:
-        row = [
+        row = self._certificate_row(data)
+        row_num = self._s.append_row(self._certs, row)
+        self._repo().on_append(self._certs, row, row_num)
+
+    @staticmethod
+    def _certificate_row(data: Dict[str, Any]) -> List[Any]:
+        """자격증 dict -> 시트 1행 (A~M)"""
+        return [
             data.get("자격증ID", ""),
             data.get("자격증명", ""),
             data.get("자격증번호", ""),
@@ -154,9 +272,54 @@ class _SheetsAdapter:
             data.get("비고", ""),
             data.get("등록일", ""),
         ]
-        self._s.append_row(self._certs, row)
+
+    def _table_target(self, table: str):
+        """테이블명(sites/personnel/certificates) -> (시트명, 행 변환 함수)"""
+        targets = {
+            "sites": (self._sites, self._site_row),
+            "personnel": (self._personnel, self._personnel_row),
+            "certificates": (self._certs, self._certificate_row),
+        }
+        if table not in targets:
+            raise ValueError(f"알 수 없는 테이블: {table}")
+        return targets[table]
+
+    def collection_versions(self, tables) -> Dict[str, str]:
+        """테이블별 컬렉션 버전 (시트 내용 해시 + 쓰기 횟수, ETag용)"""
+        return {t: self._repo().version(self._table_target(t)[0]) for t in tables}
+
+    def get_changes(self, since: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """커서 이후 변경된 행 (링 버퍼 + 인덱스의 현재 행). 만료된 시트는 먼저 재로딩해 외부 편집도 포함"""
+        from api.services.change_log import build_changes
+        repo = self._repo()
+        repo.load(self._sites, self._personnel, self._certs)
+        entries, cursor, has_more, reset = repo.changes.since(since, limit)
+
+        def fetch(table, keys):
+            sheet = self._table_target(table)[0]
+            rows = {k: repo.get(sheet, k) for k in keys}
+            return {k: row for k, row in rows.items() if row is not None}
+
+        return {'changes': build_changes(entries, fetch), 'cursor': cursor, 'has_more': has_more, 'reset': reset}
+
+    def existing_ids(self, table: str) -> set:
+        """테이블의 기존 ID 집합 (인덱스 1회 로딩)"""
+        sheet, _ = self._table_target(table)
+        return self._repo().ids(sheet)
+
+    def create_many(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """여러 행을 values.append 1회로 추가 (가져오기용)"""
+        if not records:
+            return
+        sheet, to_row = self._table_target(table)
+        rows = [to_row(r) for r in records]
+        first_row = self._s.append_rows(sheet, rows)
+        self._repo().on_append_many(sheet, rows, first_row)
 
     def update_certificate(self, cert_id: str, data: Dict[str, Any]) -> None:
+        self._retry_moved(self._update_certificate, cert_id, data)
+
+    def _update_certificate(self, cert_id: str, data: Dict[str, Any]) -> None:
         row_num = self._s.find_row_by_id(self._certs, cert_id)
         if not row_num:
             raise ValueError(f"자격증을 찾을 수 없습니다: {cert_id}")
@@ -168,35 +331,87 @@ class _SheetsAdapter:
         updates = [{"range": f"{self._certs}!{col}{row_num}", "values": [[data[field]]]}
                    for field, col in column_map.items() if field in data]
         if updates:
-            self._s.batch_update(updates)
+            self._s.verified_batch_update(updates)
+            self._repo().on_update(self._certs, cert_id, {k: v for k, v in data.items() if k in column_map})
+
+    def assign_site(self, site_id: str, manager_id: str, certificate_id: str,
+                    expected_version: Optional[int] = None) -> int:
+        """배정: 인덱스에서 행 번호/현재값 조회 → batchUpdate 1회. 새 버전 반환"""
+        return self.assign_sites_batch([(site_id, manager_id, certificate_id, expected_version)])[0]
 
-    def assign_site(self, site_id: str, manager_id: str, certificate_id: str) -> None:
+    def assign_sites_batch(self, items) -> List[int]:
+        """여러 현장 일괄 배정: 전체 셀 변경을 batchUpdate 1회로 반영 (같은 소장은 담당수 누적)
+
+        items: (site_id, manager_id, certificate_id[, expected_version]). 버전이 하나라도 다르면
+        아무것도 쓰지 않고 ConflictError. 항목별 새 버전 목록 반환 (버전 비교는 update_site와 같이 단일 프로세스 기준)
+        """
+        with self._repo().write_lock:
+            return self._retry_moved(self._assign_sites_batch, items)
+
+    def _assign_sites_batch(self, items) -> List[int]:
         from datetime import datetime
-        site_row = self._s.find_row_by_id(self._sites, site_id)
-        manager_row = self._s.find_row_by_id(self._personnel, manager_id)
-        cert_row = self._s.find_row_by_id(self._certs, certificate_id)
-        if not site_row or not manager_row or not cert_row:
-            raise ValueError("site/manager/certificate row not found")
-        manager = self._s.get_personnel_by_id(manager_id)
+        repo = self._repo()
+        repo.load(self._sites, self._personnel, self._certs)
         now = datetime.now().strftime("%Y-%m-%d")
-        cur_count = int(manager.get("현재담당현장수") or 0) + 1
-        updates = [
-            {"range": f"{self._sites}!M{site_row}", "values": [[manager_id]]},
-            {"range": f"{self._sites}!P{site_row}", "values": [[certificate_id]]},
-            {"range": f"{self._sites}!U{site_row}", "values": [["배정완료"]]},
-            {"range": f"{self._sites}!W{site_row}", "values": [[now]]},
-            {"range": f"{self._personnel}!I{manager_row}", "values": [[cur_count]]},
-            {"range": f"{self._personnel}!H{manager_row}", "values": [["투입중"]]},
-            {"range": f"{self._certs}!J{cert_row}", "values": [["사용중"]]},
-            {"range": f"{self._certs}!K{cert_row}", "values": [[site_id]]},
-        ]
-        self._s.batch_update(updates)
+        updates, patches, counts, versions, result = [], [], {}, {}, []
+        for item in items:
+            site_id, manager_id, certificate_id = item[:3]
+            site_row = self._s.find_row_by_id(self._sites, site_id)
+            manager_row = self._s.find_row_by_id(self._personnel, manager_id)
+            cert_row = self._s.find_row_by_id(self._certs, certificate_id)
+            if not site_row or not manager_row or not cert_row:
+                raise ValueError(f"site/manager/certificate row not found: {site_id}")
+            if site_id not in versions:
+                site = repo.get(self._sites, site_id)
+                check_version(site_id, site, item[3] if len(item) > 3 else None)
+                versions[site_id] = row_version(site)
+            versions[site_id] += 1
+            result.append(versions[site_id])
+            if manager_id not in counts:
+                counts[manager_id] = int((repo.get(self._personnel, manager_id) or {}).get("현재담당현장수") or 0)
+            counts[manager_id] += 1
+            cur_count = counts[manager_id]
+            updates += [
+                {"range": f"{self._sites}!M{site_row}", "values": [[manager_id]]},
+                {"range": f"{self._sites}!P{site_row}", "values": [[certificate_id]]},
+                {"range": f"{self._sites}!U{site_row}", "values": [["배정완료"]]},
+                {"range": f"{self._sites}!W{site_row}", "values": [[now]]},
+                {"range": f"{self._sites}!X{site_row}", "values": [[versions[site_id]]]},
+                {"range": f"{self._personnel}!I{manager_row}", "values": [[cur_count]]},
+                {"range": f"{self._personnel}!H{manager_row}", "values": [["투입중"]]},
+                {"range": f"{self._certs}!J{cert_row}", "values": [["사용중"]]},
+                {"range": f"{self._certs}!K{cert_row}", "values": [[site_id]]},
+            ]
+            site_fields = {"담당소장ID": manager_id, "사용자격증ID": certificate_id, "배정상태": "배정완료",
+                           "수정일": now, "버전": str(versions[site_id])}
+            patches += [
+                (self._personnel, manager_id, {"현재담당현장수": str(cur_count), "현재상태": "투입중"}),
+                (self._certs, certificate_id, {"사용가능여부": "사용중", "현재사용현장ID": site_id}),
+                (self._sites, site_id, site_fields),
+            ]
+        if not updates:
+            return result
+        self._s.verified_batch_update(updates)
+        for sheet, entity_id, fields in patches:
+            if sheet == self._sites:
+                fields.update(self._site_links(fields["담당소장ID"], fields["사용자격증ID"]))
+            repo.on_update(sheet, entity_id, fields)
+        return result
+
+    def unassign_site(self, site_id: str, expected_version: Optional[int] = None) -> int:
+        """배정 해제: 인덱스에서 행 번호/현재값 조회 → batchUpdate 1회. 새 버전 반환 (버전 비교는 단일 프로세스 기준)"""
+        with self._repo().write_lock:
+            return self._retry_moved(self._unassign_site, site_id, expected_version)
 
-    def unassign_site(self, site_id: str) -> None:
+    def _unassign_site(self, site_id: str, expected_version: Optional[int]) -> int:
         from datetime import datetime
-        site = self._s.get_site_by_id(site_id)
+        repo = self._repo()
+        repo.load(self._sites, self._personnel, self._certs)
+        site = repo.get(self._sites, site_id)
         if not site:
             raise ValueError("site not found")
+        check_version(site_id, site, expected_version)
+        version = row_version(site) + 1
         manager_id = (site.get("담당소장ID") or "").strip()
         cert_id = (site.get("사용자격증ID") or "").strip()
         site_row = self._s.find_row_by_id(self._sites, site_id)
@@ -208,21 +423,35 @@ class _SheetsAdapter:
             {"range": f"{self._sites}!P{site_row}", "values": [[""]]},
             {"range": f"{self._sites}!U{site_row}", "values": [["미배정"]]},
             {"range": f"{self._sites}!W{site_row}", "values": [[now]]},
+            {"range": f"{self._sites}!X{site_row}", "values": [[version]]},
         ]
+        manager_fields = {}
         if manager_id:
             manager_row = self._s.find_row_by_id(self._personnel, manager_id)
             if manager_row:
-                manager = self._s.get_personnel_by_id(manager_id)
+                manager = repo.get(self._personnel, manager_id) or {}
                 cur_count = max(0, int(manager.get("현재담당현장수") or 0) - 1)
                 updates.append({"range": f"{self._personnel}!I{manager_row}", "values": [[cur_count]]})
-                if cur_count <= 1:
+                manager_fields["현재담당현장수"] = str(cur_count)
+                if cur_count <= self.RELEASE_AVAILABLE_COUNT:
                     updates.append({"range": f"{self._personnel}!H{manager_row}", "values": [["투입가능"]]})
+                    manager_fields["현재상태"] = "투입가능"
+        cert_fields = {}
         if cert_id:
             cert_row = self._s.find_row_by_id(self._certs, cert_id)
             if cert_row:
                 updates.append({"range": f"{self._certs}!J{cert_row}", "values": [["사용가능"]]})
                 updates.append({"range": f"{self._certs}!K{cert_row}", "values": [[""]]})
-        self._s.batch_update(updates)
+                cert_fields = {"사용가능여부": "사용가능", "현재사용현장ID": ""}
+        self._s.verified_batch_update(updates)
+        if manager_fields:
+            repo.on_update(self._personnel, manager_id, manager_fields)
+        if cert_fields:
+            repo.on_update(self._certs, cert_id, cert_fields)
+        site_fields = {"담당소장ID": "", "사용자격증ID": "", "배정상태": "미배정", "수정일": now, "버전": str(version)}
+        site_fields.update(self._site_links("", ""))
+        repo.on_update(self._sites, site_id, site_fields)
+        return version
 
 
 # 싱글톤: 라우트에서 db 사용
@@ -230,8 +459,25 @@ _db = None
 
 
 def get_db():
-    """통합 DB 서비스 (Supabase 또는 Sheets)"""
+    """통합 DB 서비스 (Supabase 또는 Sheets, 읽기 캐시 포함)"""
     global _db
     if _db is None:
-        _db = _get_backend()
+        from api.services.cache_service import wrap_with_cache
+        backend = _get_backend()
+        _db = wrap_with_cache(backend)
+        _start_id_prefetch(backend)
     return _db
+
+
+def _start_id_prefetch(backend):
+    """Supabase: 참조 ID 해석 캐시를 백그라운드로 미리 채움 (첫 요청을 막지 않음, 실패해도 조회 시 채워짐)"""
+    if not hasattr(backend, "prefetch_ids") or not _ID_PREFETCH:
+        return
+
+    def _run():
+        try:
+            backend.prefetch_ids()
+        except Exception as e:
+            logger.warning("id prefetch failed: %s", e)
+
+    threading.Thread(target=_run, name="dujon-id-prefetch", daemon=True).start()
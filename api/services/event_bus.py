@@ -0,0 +1,168 @@
+"""
+프로세스 내 이벤트 버스 (GET /api/events SSE 푸시용)
+
+- 쓰기 라우트가 완료 후 publish() → 구독자별 bounded 큐에 넣고 즉시 반환 (요청 스레드를 막지 않음)
+- 구독자가 느려 큐가 가득 차면 쌓인 이벤트를 버리고 resync 이벤트 1건으로 대체
+  (클라이언트는 전체 재조회 또는 GET /api/changes로 따라잡음)
+- 최근 이벤트를 EVENT_HISTORY건 보관해 재연결 시 Last-Event-ID 이후분을 다시 보냄
+- 프로세스 단위 버스: API 프로세스를 여러 개 띄우면 같은 프로세스에서 일어난 쓰기만 전달됨
+
+환경 변수:
+- EVENT_QUEUE_SIZE=100      → 구독자당 대기 이벤트 수
+- EVENT_HISTORY=256         → 재연결 재전송용 보관 건수
+- EVENT_MAX_SUBSCRIBERS=100 → 동시 SSE 연결 상한 (초과 시 503)
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', '100') or 100)
+EVENT_HISTORY = int(os.getenv('EVENT_HISTORY', '256') or 256)
+EVENT_MAX_SUBSCRIBERS = int(os.getenv('EVENT_MAX_SUBSCRIBERS', '100') or 100)
+
+# 이벤트 종류 → 응답 내용이 바뀌는 테이블 (클라이언트가 다시 읽을 대상)
+EVENT_TABLES = {
+    'site.created': ('sites',),
+    'site.updated': ('sites',),
+    'site.assigned': ('sites', 'personnel', 'certificates'),
+    'site.unassigned': ('sites', 'personnel', 'certificates'),
+    'personnel.created': ('personnel',),
+    'personnel.updated': ('personnel', 'sites', 'certificates'),
+    'certificate.created': ('certificates',),
+    'certificate.updated': ('certificates', 'sites'),
+}
+
+RESYNC = 'resync'
+
+
+class TooManySubscribers(RuntimeError):
+    """동시 구독 상한 초과 (503)"""
+
+
+class Subscription:
+    """구독자 1명의 대기 큐. get()은 timeout 동안 이벤트가 없으면 None"""
+
+    def __init__(self, bus: 'EventBus', size: int):
+        self._bus = bus
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, size))
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """발행 스레드에서 호출. 절대 대기하지 않음"""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._overflow(event['id'])
+
+    def _overflow(self, event_id: int) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            self._queue.put_nowait(self._bus.resync_event(event_id))
+        except queue.Full:
+            pass  # 다른 발행 스레드가 먼저 채움 → 다음 overflow에서 resync
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """구독자 큐로 팬아웃하는 pub/sub (스레드 안전)"""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, history: int = EVENT_HISTORY,
+                 max_subscribers: int = EVENT_MAX_SUBSCRIBERS):
+        # 프로세스마다 다른 epoch → 재시작 전 Last-Event-ID는 resync
+        self.epoch = uuid.uuid4().hex[:8]
+        self._queue_size = queue_size
+        self._max_subscribers = max_subscribers
+        self._subscribers: List[Subscription] = []
+        self._history: deque = deque(maxlen=max(1, history))
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _event_id(self, seq: int) -> str:
+        return f'{self.epoch}-{seq}'
+
+    def resync_event(self, seq: int) -> Dict[str, Any]:
+        return {'id': seq, 'event_id': self._event_id(seq), 'type': RESYNC,
+                'tables': ['sites', 'personnel', 'certificates'], 'ts': time.time()}
+
+    def publish(self, event_type: str, entity_id: Any = None, **extra) -> Dict[str, Any]:
+        """이벤트 발행. 구독자 큐에 넣기만 하고 반환"""
+        with self._lock:
+            self._seq += 1
+            event = {
+                'id': self._seq,
+                'event_id': self._event_id(self._seq),
+                'type': event_type,
+                'entity_id': entity_id,
+                'tables': list(EVENT_TABLES.get(event_type, ())),
+                'ts': time.time(),
+                **extra,
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.offer(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> 'tuple[Subscription, List[Dict[str, Any]]]':
+        """(구독, 재전송할 이벤트 목록). Last-Event-ID가 보관 범위 밖이면 resync 1건"""
+        with self._lock:
+            if len(self._subscribers) >= self._max_subscribers:
+                raise TooManySubscribers(f'실시간 연결 수가 상한({self._max_subscribers})에 도달했습니다')
+            sub = Subscription(self, self._queue_size)
+            self._subscribers.append(sub)
+            backlog = self._replay(last_event_id)
+        return sub, backlog
+
+    def _replay(self, last_event_id: Optional[str]) -> List[Dict[str, Any]]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition('-')
+        try:
+            after = int(seq)
+        except ValueError:
+            return [self.resync_event(self._seq)]
+        oldest = self._history[0]['id'] if self._history else self._seq + 1
+        if epoch != self.epoch or after > self._seq or after + 1 < oldest:
+            return [self.resync_event(self._seq)]
+        return [e for e in self._history if e['id'] > after]
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+
+bus = EventBus()
+
+
+def publish(event_type: str, entity_id: Any = None, **extra) -> None:
+    """라우트용: 발행 실패가 쓰기 응답에 영향을 주지 않도록 예외를 삼킴"""
+    try:
+        bus.publish(event_type, entity_id, **extra)
+    except Exception:
+        pass
+
+
+def publish_many(event_type: str, entity_ids: Iterable[Any], **extra) -> None:
+    for entity_id in entity_ids:
+        publish(event_type, entity_id, **extra)
@@ -0,0 +1,88 @@
+"""
+참조 ID 해석 캐시 (Supabase) - 프로세스 공유 LRU
+
+- legacy_id → UUID (sites/personnel/certificates): legacy_id는 바뀌지 않으므로 만료 없이 보관
+- 회사명/약칭 → companies.id, 자격증 종류명 → certificate_types.id, 소유자 성명 → personnel.id
+- 시작 시 prefetch(SupabaseService.prefetch_ids)로 한 번에 채우고, 없는 키만 1회 조회 후 기록
+- 없는 결과(None)는 기록하지 않음 → 새로 생성된 행은 다음 조회에서 바로 찾음
+- create_*/이름 변경 시 해당 키(또는 네임스페이스) 무효화
+
+환경 변수:
+- ID_RESOLVER_MAX_ENTRIES=20000 → 네임스페이스별 최대 항목 수 (LRU 제거)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+ID_RESOLVER_MAX_ENTRIES = int(os.getenv('ID_RESOLVER_MAX_ENTRIES', '20000') or 20000)
+
+# 이름 → id 네임스페이스 (테이블 이름과 구분)
+NS_COMPANY_NAMES = 'company_names'
+NS_CERT_TYPE_NAMES = 'cert_type_names'
+NS_PERSONNEL_NAMES = 'personnel_names'
+
+
+class IdResolver:
+    """네임스페이스별 키 → UUID LRU (스레드 안전)"""
+
+    def __init__(self, max_entries: int = ID_RESOLVER_MAX_ENTRIES):
+        self._max_entries = max(1, max_entries)
+        self._entries: Dict[str, 'OrderedDict[str, str]'] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @staticmethod
+    def _key(key) -> str:
+        return str(key or '').strip()
+
+    def get(self, namespace: str, key) -> Optional[str]:
+        with self._lock:
+            entries = self._entries.get(namespace)
+            key = self._key(key)
+            if entries is None or key not in entries:
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+
+    def put(self, namespace: str, key, value: Optional[str]) -> None:
+        key = self._key(key)
+        if not key or not value:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+
+    def put_many(self, namespace: str, pairs: Iterable[Tuple[str, str]]) -> None:
+        for key, value in pairs:
+            self.put(namespace, key, value)
+
+    def put_uuid(self, table: str, entity_id, row_uuid: Optional[str]) -> None:
+        """legacy_id → UUID 기록. UUID로 받은 요청도 찾을 수 있게 자기 자신도 기록"""
+        if entity_id and row_uuid:
+            self.put(table, entity_id, row_uuid)
+            self.put(table, row_uuid, row_uuid)
+
+    def invalidate(self, namespace: Optional[str] = None, key=None) -> None:
+        """key 1개, 네임스페이스 전체, 또는 (namespace 없으면) 전부 제거"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            elif key is None:
+                self._entries.pop(namespace, None)
+            else:
+                self._entries.get(namespace, {}).pop(self._key(key), None)
+
+    def size(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._entries.get(namespace, ()))
@@ -0,0 +1,230 @@
+"""
+대량 가져오기 (CSV/JSON → 현장/인력/자격증)
+
+- 파일 전체를 메모리에 올리지 않고 행 단위로 읽어 IMPORT_CHUNK_SIZE행씩 처리
+- 행 검증은 validation.py 규칙을 그대로 사용 (현장은 위도/경도 숫자 검사 추가, 가져오기 전용).
+  실패 행은 행 번호/사유를 기록하고 건너뜀
+- 중복 검사는 시작 시 기존 ID 집합을 1회 만들어 사용 (행마다 get_*_by_id 조회 없음)
+- 쓰기는 청크당 1회: Sheets values.append(여러 행) / Supabase insert(행 리스트)
+
+환경 변수:
+- IMPORT_CHUNK_SIZE=500 → 청크당 행 수 (Sheets append/Supabase insert 1회 분량)
+"""
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from api.services.validation import (
+    ValidationError,
+    validate_certificate_data,
+    validate_personnel_data,
+    validate_site_data,
+)
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '500') or 500)
+MAX_CHUNK_SIZE = 5000
+# 응답/출력에 담는 행 오류 최대 개수 (전체 개수는 failed/skipped로 보고)
+MAX_REPORTED_ERRORS = 100
+
+
+def _validate_site_import(data, is_update=False):
+    """현장 행 검증 + 위도/경도 숫자 검사 (파일 값은 그대로 좌표 컬럼에 저장되므로 가져오기에서만 확인)"""
+    errors = []
+    try:
+        validate_site_data(data, is_update=is_update)
+    except ValidationError as e:
+        errors.append(str(e))
+    for field in ('위도', '경도'):
+        if str(data.get(field) or '').strip():
+            try:
+                float(str(data[field]).strip())
+            except ValueError:
+                errors.append(f'{field}는 숫자여야 합니다')
+    if errors:
+        raise ValidationError('; '.join(errors))
+    return True
+
+
+# 종류별 (ID 필드, 검증 함수, 기본값)
+IMPORT_KINDS = {
+    'sites': ('현장ID', _validate_site_import, {'현장상태': '건축허가', '배정상태': '미배정'}),
+    'personnel': ('인력ID', validate_personnel_data, {'현재상태': '투입가능', '현재담당현장수': '0'}),
+    'certificates': ('자격증ID', validate_certificate_data, {'사용가능여부': '사용가능'}),
+}
+
+FORMATS = ('csv', 'json')
+
+
+class ImportRequestError(ValueError):
+    """가져오기 요청 오류 (알 수 없는 종류/형식, 읽을 수 없는 파일)"""
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """파일 확장자 → Content-Type 순으로 형식 판단. 모르면 csv"""
+    ext = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if ext in ('json', 'ndjson', 'jsonl'):
+        return 'json'
+    if ext == 'csv':
+        return 'csv'
+    if 'json' in (content_type or '').lower():
+        return 'json'
+    return 'csv'
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """(행 번호, dict)를 하나씩 반환. CSV는 헤더가 1행, JSON은 배열 또는 줄 단위(NDJSON)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    if fmt != 'json':
+        raise ImportRequestError(f'지원하지 않는 형식입니다: {fmt} (csv, json)')
+    first = ''
+    while True:
+        ch = stream.read(1)
+        if not ch or not ch.isspace():
+            first = ch
+            break
+    if first == '[':
+        # 배열 형식은 파서 특성상 한 번에 읽음 (대용량은 NDJSON 권장)
+        try:
+            items = json.loads(first + stream.read())
+        except ValueError as e:
+            raise ImportRequestError(f'JSON 파싱 실패: {e}')
+        for idx, item in enumerate(items, start=1):
+            yield idx, item
+        return
+    for idx, line in enumerate(_prepend(first, stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield idx, json.loads(line)
+        except ValueError as e:
+            # 줄 단위 형식은 해당 행만 오류 처리
+            yield idx, e
+
+
+def _prepend(first: str, stream: TextIO) -> Iterator[str]:
+    """peek한 첫 글자를 첫 줄에 다시 붙임"""
+    lines = iter(stream)
+    head = next(lines, '')
+    yield first + head
+    yield from lines
+
+
+def _clean(record: Dict) -> Dict:
+    """헤더 공백/문자열 앞뒤 공백 제거, CSV 초과 컬럼(None 키) 제거"""
+    out = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = str(key).strip()
+        if isinstance(value, str):
+            value = value.strip()
+        elif value is None:
+            value = ''
+        out[key] = value
+    return out
+
+
+def _new_result(kind: str, dry_run: bool) -> Dict:
+    return {
+        'kind': kind,
+        'dry_run': dry_run,
+        'total': 0,
+        'inserted': 0,
+        'skipped': 0,
+        'failed': 0,
+        'chunks': 0,
+        'errors': [],
+        'aborted': False,
+        'elapsed_ms': 0,
+    }
+
+
+def _report(result: Dict, row: int, row_id, code: str, message: str) -> None:
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'row': row, 'id': row_id or '', 'code': code, 'message': message})
+
+
+def import_records(db, kind: str, records: Iterable[Tuple[int, Dict]], chunk_size: Optional[int] = None,
+                   dry_run: bool = False, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    (행 번호, dict) 스트림을 검증/중복 제거 후 청크 단위로 db.create_many(kind, rows) 호출.
+    - skipped: 기존 데이터 또는 파일 내 앞선 행과 ID 중복
+    - failed: 검증 실패/쓰기 실패
+    - 쓰기 실패 시 해당 청크 행을 failed로 기록하고 중단 (aborted=True)
+    on_progress(result)는 청크마다 호출.
+    """
+    if kind not in IMPORT_KINDS:
+        raise ImportRequestError(f'알 수 없는 가져오기 종류입니다: {kind} ({", ".join(IMPORT_KINDS)})')
+    id_field, validate, defaults = IMPORT_KINDS[kind]
+    size = max(1, min(chunk_size or IMPORT_CHUNK_SIZE, MAX_CHUNK_SIZE))
+    today = datetime.now().strftime('%Y-%m-%d')
+    started = time.monotonic()
+    result = _new_result(kind, dry_run)
+    seen = set(db.existing_ids(kind))
+    chunk: List[Tuple[int, Dict]] = []
+
+    def flush() -> bool:
+        """청크 1회 저장. 실패하면 False (이후 행은 처리하지 않음)"""
+        if not chunk:
+            return True
+        rows = [record for _, record in chunk]
+        if not dry_run:
+            try:
+                db.create_many(kind, rows)
+            except Exception as e:
+                logger.exception('import %s aborted after %d rows', kind, result['inserted'])
+                result['failed'] += len(chunk)
+                result['aborted'] = True
+                _report(result, chunk[0][0], rows[0].get(id_field), 'WRITE_ERROR',
+                        f'{chunk[0][0]}~{chunk[-1][0]}행 저장 실패: {e}')
+                return False
+        result['inserted'] += len(chunk)
+        result['chunks'] += 1
+        result['elapsed_ms'] = int((time.monotonic() - started) * 1000)
+        chunk.clear()
+        if on_progress:
+            on_progress(result)
+        return True
+
+    for row_num, raw in records:
+        result['total'] += 1
+        if not isinstance(raw, dict):
+            result['failed'] += 1
+            message = f'JSON 파싱 실패: {raw}' if isinstance(raw, Exception) else '행은 객체여야 합니다'
+            _report(result, row_num, '', 'INVALID_ROW', message)
+            continue
+        record = {**defaults, **{k: v for k, v in _clean(raw).items() if v != ''}}
+        record.setdefault('등록일', today)
+        row_id = str(record.get(id_field) or '').strip()
+        try:
+            if not row_id:
+                raise ValidationError(f'{id_field}는 필수 입력 항목입니다')
+            validate(record, is_update=False)
+        except ValidationError as e:
+            result['failed'] += 1
+            _report(result, row_num, row_id, 'VALIDATION_ERROR', str(e))
+            continue
+        if row_id in seen:
+            result['skipped'] += 1
+            _report(result, row_num, row_id, 'DUPLICATE_ID', f'{id_field} {row_id}가 이미 존재합니다')
+            continue
+        seen.add(row_id)
+        record[id_field] = row_id
+        chunk.append((row_num, record))
+        if len(chunk) >= size and not flush():
+            break
+    else:
+        flush()
+
+    result['elapsed_ms'] = int((time.monotonic() - started) * 1000)
+    return result
@@ -0,0 +1,174 @@
+"""
+현장 검색 인덱스 (Sheets 백엔드용 인메모리 n-gram 역색인)
+
+- 현장명/주소를 자모 단위로 분해(평택 → ㅍㅕㅇㅌㅐㄱ)한 뒤 자모 3-gram 역색인 구성
+  → 글자 일부만 입력해도(평ㅌ, 푸르지) 부분 일치, 오타 1~2자는 유사도로 매칭
+- 초성만 입력한 검색(ㅍㅌ → 평택)은 초성 문자열로 매칭
+- upsert/remove로 증분 갱신 (시트 전체 재색인 불필요)
+- 결과는 점수순 정렬: 현장명 일치 > 주소 일치 > 초성 일치 > n-gram 유사도
+"""
+import heapq
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+NGRAM = 3
+MIN_SIMILARITY = 0.5  # n-gram 유사 매칭 최소 비율 (질의 n-gram 중 일치 비율)
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+_JONGSEONG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+              'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+
+
+def _clean(text) -> str:
+    """NFC + 소문자 + 공백 제거 (NFKC는 호환 자모 ㄱ을 조합형으로 바꾸므로 사용 안 함)"""
+    return ''.join(unicodedata.normalize('NFC', str(text or '')).lower().split())
+
+
+def to_jamo(text) -> str:
+    """한글 음절을 호환 자모로 분해. 그 외 문자는 그대로"""
+    out = []
+    for ch in _clean(text):
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            idx = code - _HANGUL_BASE
+            out.append(_CHOSEONG[idx // 588])
+            out.append(_JUNGSEONG[(idx % 588) // 28])
+            out.append(_JONGSEONG[idx % 28])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def to_choseong(text) -> str:
+    """한글 음절은 초성만, 그 외 문자는 그대로"""
+    out = []
+    for ch in _clean(text):
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            out.append(_CHOSEONG[(code - _HANGUL_BASE) // 588])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _is_choseong_query(text: str) -> bool:
+    return bool(text) and all(ch in _CHOSEONG for ch in text)
+
+
+def _ngrams(jamo: str) -> set:
+    if len(jamo) < NGRAM:
+        return set()
+    return {jamo[i:i + NGRAM] for i in range(len(jamo) - NGRAM + 1)}
+
+
+class _Doc:
+    __slots__ = ('site', 'name', 'address', 'choseong', 'grams')
+
+    def __init__(self, site: dict):
+        self.site = site
+        self.name = to_jamo(site.get('현장명'))
+        self.address = to_jamo(site.get('주소'))
+        self.choseong = to_choseong(site.get('현장명'))
+        self.grams = _ngrams(self.name) | _ngrams(self.address)
+
+
+class SiteSearchIndex:
+    """현장ID → 문서, 자모 n-gram → 현장ID 집합 (스레드 안전)"""
+
+    def __init__(self):
+        self._docs: Dict[str, _Doc] = {}
+        self._postings: Dict[str, set] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, sites: List[dict]) -> None:
+        """전체 재색인 (시트 전체 로딩 시)"""
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            for site in sites or []:
+                self._add(site)
+
+    def upsert(self, site: dict) -> None:
+        """현장 1건 추가/갱신 (기존 n-gram은 제거 후 재등록)"""
+        with self._lock:
+            self.remove(site.get('현장ID'))
+            self._add(site)
+
+    def remove(self, site_id) -> None:
+        key = str(site_id or '').strip()
+        with self._lock:
+            doc = self._docs.pop(key, None)
+            if doc is None:
+                return
+            for gram in doc.grams:
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(key)
+                    if not ids:
+                        del self._postings[gram]
+
+    def _add(self, site: dict) -> None:
+        key = str(site.get('현장ID') or '').strip()
+        if not key:
+            return
+        doc = _Doc(site)
+        self._docs[key] = doc
+        for gram in doc.grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[dict]:
+        """점수순 검색 결과 (현장 dict 사본)"""
+        q = to_jamo(query)
+        if not q:
+            return []
+        choseong_q = _clean(query) if _is_choseong_query(_clean(query)) else ''
+        grams = _ngrams(q)
+        with self._lock:
+            docs = self._docs
+            # key -> (-점수, 현장명 길이, 현장ID): 점수 내림차순 → 짧은 현장명 → 현장ID
+            ranks: Dict[str, tuple] = {}
+            if choseong_q or not grams:
+                # 초성/짧은 질의: n-gram이 없으므로 문서 문자열 직접 비교
+                for key, doc in docs.items():
+                    score = self._exact_score(doc, q, choseong_q)
+                    if score:
+                        ranks[key] = (-score, len(doc.name), key)
+            else:
+                # 1) 모든 n-gram을 포함하는 후보(작은 posting부터 교집합) → 부분 문자열 확인
+                postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+                candidates = postings[0].intersection(*postings[1:]) if postings[0] else set()
+                for key in candidates:
+                    doc = docs[key]
+                    score = self._exact_score(doc, q, '')
+                    if score:
+                        ranks[key] = (-score, len(doc.name), key)
+                # 2) 결과가 부족하면 n-gram 유사도 매칭 (오타 허용)
+                if limit is None or len(ranks) < limit:
+                    counts = Counter()
+                    for ids in postings:
+                        counts.update(ids)
+                    min_hits = MIN_SIMILARITY * len(grams)
+                    for key, hit in counts.items():
+                        if hit >= min_hits and key not in ranks:
+                            ranks[key] = (-hit / len(grams), len(docs[key].name), key)
+            # limit이 있으면 상위 k개만 힙으로 선택
+            ranked = heapq.nsmallest(limit, ranks.values()) if limit else sorted(ranks.values())
+            return [dict(docs[key].site) for _, _, key in ranked]
+
+    @staticmethod
+    def _exact_score(doc: _Doc, q: str, choseong_q: str) -> float:
+        if q in doc.name:
+            return 4.0 if doc.name.startswith(q) else 3.0
+        if q in doc.address:
+            return 2.0
+        if choseong_q and choseong_q in doc.choseong:
+            return 1.5
+        return 0.0
@@ -2,13 +2,21 @@
 Google Sheets 연동 서비스
 - 시트1: 현장정보, 시트2: 인력풀, 시트3: 자격증풀
 """
+import hashlib
 import os
 import pickle
+import re
+import threading
+import time
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 
+from api.services.change_log import OP_DELETE, ChangeLog
+from api.services.db_service import ConfigRequiredError
+from api.services.search_index import SiteSearchIndex
+
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 # 프로젝트 루트에서 실행 가정. DB는 아래 스프레드시트 사용 ( .env 에서 덮어쓰기 가능 )
 # https://docs.google.com/spreadsheets/d/15fAEzkC9FCLA6sG1N--f69r-32WHoYLvmXcwED5xWzM/edit
@@ -19,12 +27,162 @@ SHEET_SITES = os.getenv('SHEET_SITES', '시트1').strip() or '시트1'
 SHEET_PERSONNEL = os.getenv('SHEET_PERSONNEL', '시트2').strip() or '시트2'
 SHEET_CERTIFICATES = os.getenv('SHEET_CERTIFICATES', '시트3').strip() or '시트3'
 
+# ID 인덱스 유효 시간(초). 시트를 직접 편집하는 경우를 대비해 만료 후 전체 재로딩
+SHEETS_INDEX_TTL = float(os.getenv('SHEETS_INDEX_TTL', '60') or 0)
+
+# 'B12' → 행 번호 12 (쓰기 범위의 대상 행 추출)
+_CELL_ROW = re.compile(r'^[A-Z]+(\d+)$')
+
+
+class RowMovedError(ValueError):
+    """쓰기 대상 행의 A열 ID가 인덱스와 다름 (시트에서 행 삽입/삭제/정렬). 인덱스는 다시 읽은 상태"""
+
+
+def _pad_row(row, length, fill=''):
+    """row 길이를 length까지 채움"""
+    while len(row) < length:
+        row.append(fill)
+    return row
+
+
+def _parse_site_row(row):
+    """현장정보 시트 1행 -> dict. 17/22/23컬럼(건축주명 포함) 지원, 24번째(X열)는 행 버전"""
+    row = list(row)
+    n = len(row)
+    if n < 17:
+        _pad_row(row, 17)
+    if n == 17:
+        # 기본 17컬럼: VLOOKUP 컬럼 없음
+        site = {
+            '현장ID': row[0],
+            '현장명': row[1],
+            '건축주명': '',
+            '회사구분': row[2],
+            '주소': row[3],
+            '위도': row[4],
+            '경도': row[5],
+            '건축허가일': row[6],
+            '착공예정일': row[7],
+            '준공일': row[8],
+            '현장상태': row[9],
+            '특이사항': row[10],
+            '담당소장ID': row[11],
+            '담당소장명': '',
+            '담당소장연락처': '',
+            '사용자격증ID': row[12],
+            '자격증명': '',
+            '자격증소유자명': '',
+            '자격증소유자연락처': '',
+            '준공필증파일URL': row[13],
+            '배정상태': row[14],
+            '등록일': row[15],
+            '수정일': row[16],
+            '버전': '',
+        }
+    elif n >= 23:
+        _pad_row(row, 24)
+        site = {
+            '현장ID': row[0],
+            '현장명': row[1],
+            '건축주명': row[2],
+            '회사구분': row[3],
+            '주소': row[4],
+            '위도': row[5],
+            '경도': row[6],
+            '건축허가일': row[7],
+            '착공예정일': row[8],
+            '준공일': row[9],
+            '현장상태': row[10],
+            '특이사항': row[11],
+            '담당소장ID': row[12],
+            '담당소장명': row[13],
+            '담당소장연락처': row[14],
+            '사용자격증ID': row[15],
+            '자격증명': row[16],
+            '자격증소유자명': row[17],
+            '자격증소유자연락처': row[18],
+            '준공필증파일URL': row[19],
+            '배정상태': row[20],
+            '등록일': row[21],
+            '수정일': row[22],
+            '버전': row[23],
+        }
+    else:
+        _pad_row(row, 22)
+        site = {
+            '현장ID': row[0],
+            '현장명': row[1],
+            '건축주명': '',
+            '회사구분': row[2],
+            '주소': row[3],
+            '위도': row[4],
+            '경도': row[5],
+            '건축허가일': row[6],
+            '착공예정일': row[7],
+            '준공일': row[8],
+            '현장상태': row[9],
+            '특이사항': row[10],
+            '담당소장ID': row[11],
+            '담당소장명': row[12],
+            '담당소장연락처': row[13],
+            '사용자격증ID': row[14],
+            '자격증명': row[15],
+            '자격증소유자명': row[16],
+            '자격증소유자연락처': row[17],
+            '준공필증파일URL': row[18],
+            '배정상태': row[19],
+            '등록일': row[20],
+            '수정일': row[21],
+            '버전': '',
+        }
+    return site
+
+
+def _parse_personnel_row(row):
+    """인력풀 시트 1행 -> dict"""
+    row = _pad_row(list(row), 12)
+    return {
+        '인력ID': row[0],
+        '성명': row[1],
+        '직책': row[2],
+        '소속': row[3],
+        '연락처': row[4],
+        '이메일': row[5],
+        '보유자격증': row[6],
+        '현재상태': row[7],
+        '현재담당현장수': row[8],
+        '비고': row[9],
+        '입사일': row[10],
+        '등록일': row[11],
+    }
+
+
+def _parse_certificate_row(row):
+    """자격증풀 시트 1행 -> dict"""
+    row = _pad_row(list(row), 13)
+    return {
+        '자격증ID': row[0],
+        '자격증명': row[1],
+        '자격증번호': row[2],
+        '소유자ID': row[3],
+        '소유자명': row[4],
+        '소유자연락처': row[5],
+        '발급기관': row[6],
+        '취득일': row[7],
+        '유효기간': row[8],
+        '사용가능여부': row[9],
+        '현재사용현장ID': row[10],
+        '비고': row[11],
+        '등록일': row[12],
+    }
+
 
 class SheetsService:
     """Google Sheets API 래퍼"""
 
     def __init__(self):
         self._service = None
+        self.repo = SheetsRepository(self)
 
     def _get_service(self):
         """Google Sheets API 서비스 생성 (인증 포함)"""
@@ -72,186 +230,82 @@ class SheetsService:
         ).execute()
         return result.get('values', [])
 
+    def read_sheets(self, range_names):
+        """여러 범위를 batchGet 1회로 읽기. range_names 순서대로 values 목록 반환"""
+        if not SPREADSHEET_ID:
+            return [[] for _ in range_names]
+        service = self._get_service()
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=SPREADSHEET_ID,
+            ranges=list(range_names),
+        ).execute()
+        value_ranges = result.get('valueRanges', [])
+        return [
+            (value_ranges[i].get('values', []) if i < len(value_ranges) else [])
+            for i in range(len(range_names))
+        ]
+
+    def get_all_tables(self):
+        """현장/인력/자격증 시트를 HTTP 1회(batchGet)로 읽어 파싱한 결과 반환"""
+        self.repo.load(SHEET_SITES, SHEET_PERSONNEL, SHEET_CERTIFICATES, force=True)
+        return {
+            'sites': self.repo.all(SHEET_SITES),
+            'personnel': self.repo.all(SHEET_PERSONNEL),
+            'certificates': self.repo.all(SHEET_CERTIFICATES),
+        }
+
+    def get_statistics(self, fresh=False):
+        """통계 집계: 인덱스 스냅샷(만료 또는 fresh=True 시 batchGet 1회)을 테이블당 1회 순회"""
+        from api.services.stats_service import compute_stats
+        self.repo.load(SHEET_SITES, SHEET_PERSONNEL, SHEET_CERTIFICATES, force=fresh)
+        return compute_stats(
+            self.repo.all(SHEET_SITES),
+            self.repo.all(SHEET_PERSONNEL),
+            self.repo.all(SHEET_CERTIFICATES),
+        )
+
     def _pad_row(self, row, length, fill=''):
         """row 길이를 length까지 채움"""
-        while len(row) < length:
-            row.append(fill)
-        return row
+        return _pad_row(row, length, fill)
 
     def get_all_sites(self):
-        """현장 정보 전체 조회 (현장정보 시트). 17/22/23컬럼(건축주명 포함) 지원"""
-        values = self.read_sheet(f'{SHEET_SITES}!A2:W')
-        if not values:
-            return []
-
-        sites = []
-        for row in values:
-            row = list(row)
-            n = len(row)
-            if n < 17:
-                self._pad_row(row, 17)
-            if n == 17:
-                # 기본 17컬럼: VLOOKUP 컬럼 없음
-                site = {
-                    '현장ID': row[0],
-                    '현장명': row[1],
-                    '건축주명': '',
-                    '회사구분': row[2],
-                    '주소': row[3],
-                    '위도': row[4],
-                    '경도': row[5],
-                    '건축허가일': row[6],
-                    '착공예정일': row[7],
-                    '준공일': row[8],
-                    '현장상태': row[9],
-                    '특이사항': row[10],
-                    '담당소장ID': row[11],
-                    '담당소장명': '',
-                    '담당소장연락처': '',
-                    '사용자격증ID': row[12],
-                    '자격증명': '',
-                    '자격증소유자명': '',
-                    '자격증소유자연락처': '',
-                    '준공필증파일URL': row[13],
-                    '배정상태': row[14],
-                    '등록일': row[15],
-                    '수정일': row[16],
-                }
-            elif n >= 23:
-                self._pad_row(row, 23)
-                site = {
-                    '현장ID': row[0],
-                    '현장명': row[1],
-                    '건축주명': row[2],
-                    '회사구분': row[3],
-                    '주소': row[4],
-                    '위도': row[5],
-                    '경도': row[6],
-                    '건축허가일': row[7],
-                    '착공예정일': row[8],
-                    '준공일': row[9],
-                    '현장상태': row[10],
-                    '특이사항': row[11],
-                    '담당소장ID': row[12],
-                    '담당소장명': row[13],
-                    '담당소장연락처': row[14],
-                    '사용자격증ID': row[15],
-                    '자격증명': row[16],
-                    '자격증소유자명': row[17],
-                    '자격증소유자연락처': row[18],
-                    '준공필증파일URL': row[19],
-                    '배정상태': row[20],
-                    '등록일': row[21],
-                    '수정일': row[22],
-                }
-            else:
-                self._pad_row(row, 22)
-                site = {
-                    '현장ID': row[0],
-                    '현장명': row[1],
-                    '건축주명': '',
-                    '회사구분': row[2],
-                    '주소': row[3],
-                    '위도': row[4],
-                    '경도': row[5],
-                    '건축허가일': row[6],
-                    '착공예정일': row[7],
-                    '준공일': row[8],
-                    '현장상태': row[9],
-                    '특이사항': row[10],
-                    '담당소장ID': row[11],
-                    '담당소장명': row[12],
-                    '담당소장연락처': row[13],
-                    '사용자격증ID': row[14],
-                    '자격증명': row[15],
-                    '자격증소유자명': row[16],
-                    '자격증소유자연락처': row[17],
-                    '준공필증파일URL': row[18],
-                    '배정상태': row[19],
-                    '등록일': row[20],
-                    '수정일': row[21],
-                }
-            sites.append(site)
-        return sites
+        """현장 정보 전체 조회 (현장정보 시트). 17/22/23컬럼(건축주명 포함) 지원. 인덱스가 유효하면 재조회 없음"""
+        self.repo.load(SHEET_SITES)
+        return self.repo.all(SHEET_SITES)
 
     def get_site_by_id(self, site_id):
-        """현장ID로 현장 정보 조회"""
-        for site in self.get_all_sites():
-            if site['현장ID'] == site_id:
-                return site
-        return None
+        """현장ID로 현장 정보 조회 (인덱스 O(1))"""
+        return self.repo.get(SHEET_SITES, site_id)
 
-    def get_all_personnel(self):
-        """인력 정보 전체 조회 (인력풀 시트)"""
-        values = self.read_sheet(f'{SHEET_PERSONNEL}!A2:L')
-        if not values:
-            return []
+    def search_sites(self, query, limit=None):
+        """현장명/주소 검색 (자모 n-gram 역색인, 점수순)"""
+        self.repo.load(SHEET_SITES)
+        return self.repo.site_search.search(query, limit=limit)
 
-        personnel_list = []
-        for row in values:
-            self._pad_row(row, 12)
-            personnel_list.append({
-                '인력ID': row[0],
-                '성명': row[1],
-                '직책': row[2],
-                '소속': row[3],
-                '연락처': row[4],
-                '이메일': row[5],
-                '보유자격증': row[6],
-                '현재상태': row[7],
-                '현재담당현장수': row[8],
-                '비고': row[9],
-                '입사일': row[10],
-                '등록일': row[11],
-            })
-        return personnel_list
+    def get_all_personnel(self):
+        """인력 정보 전체 조회 (인력풀 시트). 인덱스가 유효하면 재조회 없음"""
+        self.repo.load(SHEET_PERSONNEL)
+        return self.repo.all(SHEET_PERSONNEL)
 
     def get_personnel_by_id(self, personnel_id):
-        """인력ID로 인력 정보 조회"""
-        for person in self.get_all_personnel():
-            if person['인력ID'] == personnel_id:
-                return person
-        return None
+        """인력ID로 인력 정보 조회 (인덱스 O(1))"""
+        return self.repo.get(SHEET_PERSONNEL, personnel_id)
 
     def get_all_certificates(self):
-        """자격증 정보 전체 조회 (자격증풀 시트)"""
-        values = self.read_sheet(f'{SHEET_CERTIFICATES}!A2:M')
-        if not values:
-            return []
-
-        certificates = []
-        for row in values:
-            self._pad_row(row, 13)
-            certificates.append({
-                '자격증ID': row[0],
-                '자격증명': row[1],
-                '자격증번호': row[2],
-                '소유자ID': row[3],
-                '소유자명': row[4],
-                '소유자연락처': row[5],
-                '발급기관': row[6],
-                '취득일': row[7],
-                '유효기간': row[8],
-                '사용가능여부': row[9],
-                '현재사용현장ID': row[10],
-                '비고': row[11],
-                '등록일': row[12],
-            })
-        return certificates
+        """자격증 정보 전체 조회 (자격증풀 시트). 인덱스가 유효하면 재조회 없음"""
+        self.repo.load(SHEET_CERTIFICATES)
+        return self.repo.all(SHEET_CERTIFICATES)
 
     def get_certificate_by_id(self, cert_id):
-        """자격증ID로 자격증 정보 조회"""
-        for cert in self.get_all_certificates():
-            if cert['자격증ID'] == cert_id:
-                return cert
-        return None
+        """자격증ID로 자격증 정보 조회 (인덱스 O(1))"""
+        return self.repo.get(SHEET_CERTIFICATES, cert_id)
 
     # ---------- 2-2 데이터 수정 API용 ----------
 
     def _require_spreadsheet(self):
         """쓰기 작업 시 SPREADSHEET_ID 필요"""
         if not SPREADSHEET_ID:
-            raise ValueError(
+            raise ConfigRequiredError(
                 'SPREADSHEET_ID가 설정되지 않았습니다. .env에 SPREADSHEET_ID를 추가한 뒤 Google 시트 연동을 설정하세요.'
             )
 
@@ -292,28 +346,256 @@ class SheetsService:
             body=body,
         ).execute()
 
+    def verified_batch_update(self, updates):
+        """batch_update 전에 대상 행들의 A열(ID)을 batchGet 1회로 확인
+
+        행 번호는 인덱스(최대 SHEETS_INDEX_TTL초 전)에서 오므로 그 사이 시트에서 행이 삽입/삭제/정렬되면
+        다른 행을 덮어쓰게 됨 → ID가 다르면 해당 시트 인덱스를 다시 읽고 쓰지 않은 채 RowMovedError
+        """
+        if not updates:
+            return
+        targets = {}
+        for u in updates:
+            sheet, _, cell = u['range'].partition('!')
+            match = _CELL_ROW.match(cell)
+            if match:
+                row_num = int(match.group(1))
+                targets.setdefault((sheet, row_num), self.repo.id_at(sheet, row_num) or '')
+        keys = list(targets)
+        cells = self.read_sheets([f'{sheet}!A{row_num}' for sheet, row_num in keys])
+        moved = {sheet for (sheet, row_num), cell in zip(keys, cells)
+                 if str(cell[0][0] if cell and cell[0] else '').strip() != targets[(sheet, row_num)]}
+        if moved:
+            self.repo.load(*moved, force=True)
+            raise RowMovedError('시트의 행 위치가 바뀌었습니다 (행 삽입/삭제/정렬). 다시 읽은 인덱스로 재시도하세요.')
+        self.batch_update(updates)
+
     def find_row_by_id(self, sheet_name, id_value):
-        """ID 컬럼(A열)으로 행 번호 반환. 1-based, 헤더 다음이 2행."""
+        """ID 컬럼(A열)으로 행 번호 반환. 1-based, 헤더 다음이 2행. (인덱스 O(1))"""
         if not SPREADSHEET_ID:
             return None
-        values = self.read_sheet(f"{sheet_name}!A2:A")
-        for idx, row in enumerate(values):
-            if row and str(row[0]).strip() == str(id_value).strip():
-                return idx + 2
-        return None
+        return self.repo.row_number(sheet_name, id_value)
 
     def append_row(self, sheet_name, values):
-        """시트 마지막에 행 추가"""
+        """시트 마지막에 행 추가. 추가된 행 번호 반환 (알 수 없으면 None)"""
         self._require_spreadsheet()
         service = self._get_service()
         body = {'values': [values]}
-        service.spreadsheets().values().append(
+        result = service.spreadsheets().values().append(
             spreadsheetId=SPREADSHEET_ID,
             range=f'{sheet_name}!A:A',
             valueInputOption='USER_ENTERED',
             insertDataOption='INSERT_ROWS',
             body=body,
         ).execute()
+        return _first_row_of_range(((result or {}).get('updates') or {}).get('updatedRange'))
+
+    def append_rows(self, sheet_name, rows):
+        """여러 행을 values.append 1회로 추가. 첫 행 번호 반환 (알 수 없으면 None)"""
+        if not rows:
+            return None
+        self._require_spreadsheet()
+        service = self._get_service()
+        result = service.spreadsheets().values().append(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f'{sheet_name}!A:A',
+            valueInputOption='USER_ENTERED',
+            insertDataOption='INSERT_ROWS',
+            body={'values': [list(r) for r in rows]},
+        ).execute()
+        return _first_row_of_range(((result or {}).get('updates') or {}).get('updatedRange'))
+
+
+def _first_row_of_range(range_name):
+    """'시트1!A25:W25' -> 25"""
+    m = re.search(r'![A-Z]+(\d+)', range_name or '')
+    return int(m.group(1)) if m else None
+
+
+class _TableIndex:
+    """시트 1개의 인메모리 인덱스: 전체 행 + ID → 행 dict + ID → 시트 행 번호"""
+
+    def __init__(self, records, by_id, row_nums, next_row, fingerprint=''):
+        self.records = records
+        self.by_id = by_id
+        self.row_nums = row_nums
+        self.next_row = next_row
+        self.loaded_at = time.monotonic()
+        # 컬렉션 버전 = 읽어 온 시트 내용 해시 + 이후 이 프로세스의 쓰기 횟수 (ETag용)
+        self.fingerprint = fingerprint
+        self.mutations = 0
+
+
+class SheetsRepository:
+    """
+    시트를 1회 일괄 읽기해 ID 해시 인덱스(ID → 행 dict, ID → 행 번호)를 만들고
+    이 프로세스의 append/batchUpdate 결과로 증분 갱신.
+    변경된 행 ID는 changes(링 버퍼)에 기록 (GET /api/changes).
+    """
+
+    def __init__(self, sheets):
+        self._sheets = sheets
+        self._tables = {}
+        self._lock = threading.RLock()
+        # 현장 시트 검색 역색인 (현장 인덱스와 함께 재구성/증분 갱신)
+        self.site_search = SiteSearchIndex()
+        self.changes = ChangeLog()
+        # 현장 버전 비교~batchUpdate~인덱스 반영을 직렬화 (Sheets API에는 조건부 쓰기가 없음)
+        self.write_lock = threading.Lock()
+
+    @staticmethod
+    def spec(sheet_name):
+        """시트별 (읽기 범위, 행 파서, ID 필드)"""
+        if sheet_name == SHEET_SITES:
+            return f'{SHEET_SITES}!A2:X', _parse_site_row, '현장ID'
+        if sheet_name == SHEET_PERSONNEL:
+            return f'{SHEET_PERSONNEL}!A2:L', _parse_personnel_row, '인력ID'
+        if sheet_name == SHEET_CERTIFICATES:
+            return f'{SHEET_CERTIFICATES}!A2:M', _parse_certificate_row, '자격증ID'
+        raise ValueError(f'알 수 없는 시트: {sheet_name}')
+
+    @staticmethod
+    def table_name(sheet_name):
+        """시트명 → 변경 로그 테이블명 (sites/personnel/certificates)"""
+        return {SHEET_SITES: 'sites', SHEET_PERSONNEL: 'personnel', SHEET_CERTIFICATES: 'certificates'}[sheet_name]
+
+    def _is_fresh(self, table):
+        return table is not None and (SHEETS_INDEX_TTL <= 0 or time.monotonic() - table.loaded_at < SHEETS_INDEX_TTL)
+
+    def set_values(self, sheet_name, values):
+        """시트 원본 values(2행부터)로 인덱스 재구성 후 전체 행 목록 반환"""
+        _, parse, id_field = self.spec(sheet_name)
+        records, by_id, row_nums = [], {}, {}
+        for idx, row in enumerate(values or []):
+            record = parse(row)
+            records.append(record)
+            key = str(record.get(id_field) or '').strip()
+            if key:
+                by_id[key] = record
+                row_nums[key] = idx + 2
+        fingerprint = hashlib.sha1(repr(values or []).encode('utf-8')).hexdigest()[:16]
+        with self._lock:
+            previous = self._tables.get(sheet_name)
+            if previous is not None and previous.fingerprint != fingerprint:
+                self._record_diff(sheet_name, previous.by_id, by_id)
+            self._tables[sheet_name] = _TableIndex(records, by_id, row_nums, len(values or []) + 2, fingerprint)
+            if sheet_name == SHEET_SITES:
+                self.site_search.build(records)
+        return list(records)
+
+    def _record_diff(self, sheet_name, old_by_id, new_by_id):
+        """재로딩 전후 인덱스 비교 → 시트 직접 편집으로 추가/수정/삭제된 행을 변경 로그에 기록"""
+        table = self.table_name(sheet_name)
+        for key, record in new_by_id.items():
+            if old_by_id.get(key) != record:
+                self.changes.record(table, key)
+        for key in old_by_id.keys() - new_by_id.keys():
+            self.changes.record(table, key, OP_DELETE)
+
+    def refresh(self, sheet_name):
+        """시트 전체를 다시 읽어 인덱스 갱신"""
+        range_name, _, _ = self.spec(sheet_name)
+        return self.set_values(sheet_name, self._sheets.read_sheet(range_name))
+
+    def load(self, *sheet_names, force=False):
+        """인덱스가 없거나 만료된 시트만 읽기. 2개 이상이면 batchGet 1회로 묶음"""
+        stale = [n for n in sheet_names if force or not self._is_fresh(self._tables.get(n))]
+        if len(stale) == 1:
+            self.refresh(stale[0])
+        elif stale:
+            ranges = [self.spec(n)[0] for n in stale]
+            for name, values in zip(stale, self._sheets.read_sheets(ranges)):
+                self.set_values(name, values)
+
+    def _table(self, sheet_name):
+        self.load(sheet_name)
+        return self._tables[sheet_name]
+
+    def all(self, sheet_name):
+        """전체 행 (사본 목록)"""
+        return [dict(r) for r in self._table(sheet_name).records]
+
+    def id_at(self, sheet_name, row_num):
+        """인덱스 기준 시트 행 번호 → ID (인덱스에 없으면 None)"""
+        table = self._tables.get(sheet_name)
+        if table is None:
+            return None
+        return next((key for key, row in table.row_nums.items() if row == row_num), None)
+
+    def get(self, sheet_name, id_value):
+        """ID로 행 dict 조회 (사본 반환)"""
+        record = self._table(sheet_name).by_id.get(str(id_value or '').strip())
+        return dict(record) if record else None
+
+    def row_number(self, sheet_name, id_value):
+        """ID로 시트 행 번호 조회. 인덱스에 없으면 외부 추가 가능성 때문에 1회 재로딩"""
+        key = str(id_value or '').strip()
+        row = self._table(sheet_name).row_nums.get(key)
+        if row is None:
+            row = self._table_reloaded(sheet_name).row_nums.get(key)
+        return row
+
+    def _table_reloaded(self, sheet_name):
+        self.load(sheet_name, force=True)
+        return self._tables[sheet_name]
+
+    def on_append(self, sheet_name, values, row_num=None):
+        """append_row 후 인덱스에 새 행 반영"""
+        _, parse, id_field = self.spec(sheet_name)
+        with self._lock:
+            table = self._tables.get(sheet_name)
+            if table is None:
+                return
+            record = parse(values)
+            row_num = row_num or table.next_row
+            table.mutations += 1
+            table.records.append(record)
+            table.next_row = max(table.next_row, row_num + 1)
+            key = str(record.get(id_field) or '').strip()
+            if key:
+                table.by_id[key] = record
+                table.row_nums[key] = row_num
+                self.changes.record(self.table_name(sheet_name), key)
+                if sheet_name == SHEET_SITES:
+                    self.site_search.upsert(record)
+
+    def on_append_many(self, sheet_name, rows, first_row=None):
+        """append_rows 후 인덱스에 연속된 새 행들 반영"""
+        with self._lock:
+            table = self._tables.get(sheet_name)
+            if table is None:
+                return
+            start = first_row or table.next_row
+            for offset, values in enumerate(rows):
+                self.on_append(sheet_name, values, start + offset)
+
+    def version(self, sheet_name):
+        """시트 컬렉션 버전 문자열 (내용이 바뀌면 달라짐)"""
+        table = self._table(sheet_name)
+        return f'{table.fingerprint}.{table.mutations}'
+
+    def ids(self, sheet_name):
+        """시트의 ID 집합 (가져오기 중복 검사용)"""
+        return set(self._table(sheet_name).by_id)
+
+    def on_update(self, sheet_name, id_value, fields):
+        """batch_update 후 인덱스의 해당 행 필드 갱신"""
+        with self._lock:
+            table = self._tables.get(sheet_name)
+            record = table.by_id.get(str(id_value or '').strip()) if table else None
+            if record is not None:
+                table.mutations += 1
+                record.update(fields)
+                self.changes.record(self.table_name(sheet_name), id_value)
+                if sheet_name == SHEET_SITES:
+                    self.site_search.upsert(record)
+
+    def invalidate(self, sheet_name=None):
+        with self._lock:
+            if sheet_name is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(sheet_name, None)
 
 
 # 싱글톤 인스턴스 (지연 초기화는 첫 요청 시 _get_service에서)
@@ -0,0 +1,248 @@
+"""
+통계 집계 (GET /api/stats)
+
+- Supabase: dashboard_stats() RPC (마이그레이션 005)가 DB에서 GROUP BY/FILTER로 집계해 JSON 1건 반환
+- Sheets/폴백: 스냅샷 행 목록을 테이블당 1회 순회해 집계 (compute_stats)
+- StatsCounter: 최초 1회 전체 집계로 시드한 뒤 쓰기마다 델타만 반영 → /api/stats는 O(1) 읽기
+  주기적으로 전체 재집계와 비교해 어긋나면(외부에서 시트/DB 직접 수정 등) 교체
+응답 형식은 기존 /api/stats 와 동일.
+
+환경 변수:
+- STATS_RECONCILE_INTERVAL=300 → 증분 카운터 재검증 주기(초). 0이면 비활성화
+"""
+import copy
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 증분 카운터 재검증 주기(초). 0이면 재검증 스레드 없음
+STATS_RECONCILE_INTERVAL = float(os.getenv('STATS_RECONCILE_INTERVAL', '300') or 0)
+# 시드 집계 도중 쓰기가 끼어들면 다시 집계하는 최대 횟수
+STATS_SEED_RETRIES = 3
+
+# by_company는 두 회사를 항상 포함 (0건이어도 키 유지)
+COMPANIES = ('더존종합건설', '더존하우징')
+
+
+def empty_stats() -> Dict:
+    return {
+        'sites': {
+            'total': 0,
+            'assigned': 0,
+            'unassigned': 0,
+            'by_company': {c: 0 for c in COMPANIES},
+            'by_state': {},
+        },
+        'personnel': {
+            'total': 0,
+            'available': 0,
+            'deployed': 0,
+            'by_role': {},
+        },
+        'certificates': {
+            'total': 0,
+            'available': 0,
+            'in_use': 0,
+            'expired': 0,
+        },
+    }
+
+
+def _site_keys(s: Dict):
+    yield ('total',)
+    assign = s.get('배정상태')
+    if assign == '배정완료':
+        yield ('assigned',)
+    elif assign == '미배정':
+        yield ('unassigned',)
+    if s.get('회사구분') in COMPANIES:
+        yield ('by_company', s.get('회사구분'))
+    yield ('by_state', s.get('현장상태') or '')
+
+
+def _personnel_keys(p: Dict):
+    yield ('total',)
+    status = p.get('현재상태')
+    if status == '투입가능':
+        yield ('available',)
+    elif status == '투입중':
+        yield ('deployed',)
+    yield ('by_role', p.get('직책') or '')
+
+
+def _certificate_keys(c: Dict):
+    yield ('total',)
+    usable = c.get('사용가능여부')
+    if usable == '사용가능':
+        yield ('available',)
+    elif usable == '사용중':
+        yield ('in_use',)
+    elif usable == '만료':
+        yield ('expired',)
+
+
+# 섹션별 "행 1건이 올리는 카운터 키" (전체 집계와 증분 반영이 같은 규칙을 사용)
+SECTION_KEYS = {
+    'sites': _site_keys,
+    'personnel': _personnel_keys,
+    'certificates': _certificate_keys,
+}
+
+# 섹션별 카운터에 영향을 주는 행 필드 (이 필드가 없는 수정은 통계 불변)
+STATS_FIELDS = {
+    'sites': ('배정상태', '회사구분', '현장상태'),
+    'personnel': ('현재상태', '직책'),
+    'certificates': ('사용가능여부',),
+}
+
+
+def _add(stats: Dict, section: str, row: Dict, delta: int) -> None:
+    target = stats[section]
+    for key in SECTION_KEYS[section](row):
+        if len(key) == 1:
+            target[key[0]] += delta
+            continue
+        bucket = target[key[0]]
+        value = bucket.get(key[1], 0) + delta
+        # by_state/by_role은 0건이 된 키를 제거 (전체 재집계 결과와 동일하게)
+        if value or key[0] == 'by_company':
+            bucket[key[1]] = value
+        else:
+            bucket.pop(key[1], None)
+
+
+def compute_stats(sites: Iterable[Dict], personnel: Iterable[Dict], certificates: Iterable[Dict]) -> Dict:
+    """테이블당 1회 순회로 전체 통계 계산"""
+    stats = empty_stats()
+    for section, rows in (('sites', sites), ('personnel', personnel), ('certificates', certificates)):
+        for row in rows:
+            _add(stats, section, row, 1)
+    return stats
+
+
+def normalize_stats(raw: Dict) -> Dict:
+    """RPC 결과를 기본 형식에 병합 (누락 키는 0/빈 dict)"""
+    stats = empty_stats()
+    for section, values in (raw or {}).items():
+        if section not in stats or not isinstance(values, dict):
+            continue
+        for key, value in values.items():
+            if isinstance(value, dict):
+                stats[section][key] = {**stats[section].get(key, {}), **{k: int(v or 0) for k, v in value.items()}}
+            else:
+                stats[section][key] = int(value or 0)
+    return stats
+
+
+class StatsCounter:
+    """
+    프로세스 내 KPI 카운터.
+    - snapshot(): 시드 이후에는 카운터 사본만 반환 (O(1))
+    - apply(section, before, after): 행 1건의 변경 전/후 기여분 차이만 반영
+    - reconcile(): 전체 재집계와 비교해 어긋난 경우 교체 (재검증 스레드에서 주기 실행)
+    """
+
+    def __init__(self, loader: Callable[[], Dict], reconcile_interval: float = STATS_RECONCILE_INTERVAL):
+        self._loader = loader
+        self._interval = reconcile_interval
+        self._stats: Optional[Dict] = None
+        self._generation = 0  # 델타/무효화마다 증가 (재집계 중 쓰기 감지용)
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.drift_count = 0
+
+    @property
+    def seeded(self) -> bool:
+        return self._stats is not None
+
+    def snapshot(self, fresh: bool = False) -> Dict:
+        """현재 카운터 사본. 시드 전이거나 fresh=True면 전체 재집계
+
+        집계 도중 쓰기가 있었으면 다시 집계 (STATS_SEED_RETRIES회). 계속 겹치면 이번 응답만
+        마지막 집계값으로 하고 카운터는 비워 둠 (다음 조회 때 재시도)
+        """
+        if fresh or self._stats is None:
+            for _ in range(STATS_SEED_RETRIES):
+                stats, replaced = self._reseed()
+                if replaced:
+                    break
+            else:
+                self._ensure_reconciler()
+                return copy.deepcopy(stats)
+        self._ensure_reconciler()
+        with self._lock:
+            return copy.deepcopy(self._stats)
+
+    def apply(self, section: str, before: Optional[Dict], after: Optional[Dict]) -> None:
+        """행 변경 델타 반영 (생성: before=None, 삭제: after=None)"""
+        with self._lock:
+            self._generation += 1
+            if self._stats is None:
+                return
+            if before:
+                _add(self._stats, section, before, -1)
+            if after:
+                _add(self._stats, section, after, 1)
+
+    def invalidate(self) -> None:
+        """델타를 계산할 수 없는 쓰기 후 호출. 다음 조회 때 전체 재집계"""
+        with self._lock:
+            self._stats = None
+            self._generation += 1
+
+    def _reseed(self) -> Tuple[Dict, bool]:
+        """전체 재집계. 집계 도중 쓰기(apply/invalidate)가 없었을 때만 카운터 교체"""
+        with self._lock:
+            generation = self._generation
+        fresh = self._loader()
+        with self._lock:
+            replaced = generation == self._generation
+            if replaced:
+                self._stats = copy.deepcopy(fresh)
+            return fresh, replaced
+
+    def reconcile(self) -> bool:
+        """전체 재집계와 비교. 어긋나 있었으면 True (카운터는 재집계 값으로 교체)"""
+        with self._lock:
+            current = copy.deepcopy(self._stats)
+        fresh, replaced = self._reseed()
+        drifted = current is not None and replaced and current != fresh
+        if drifted:
+            self.drift_count += 1
+            logger.warning('stats counter drift corrected: %s', _diff(current, fresh))
+        return drifted
+
+    def _ensure_reconciler(self) -> None:
+        if self._interval <= 0 or self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stats-reconciler', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """재검증 스레드 종료 (다음 대기에서 빠져나옴)"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception('stats reconcile failed')
+
+
+def _diff(old: Dict, new: Dict, prefix: str = '') -> List[str]:
+    """어긋난 카운터 경로 목록 (로그용)"""
+    out = []
+    for key in sorted(set(old) | set(new), key=str):
+        a, b = old.get(key), new.get(key)
+        if isinstance(a, dict) or isinstance(b, dict):
+            out.extend(_diff(a or {}, b or {}, f'{prefix}{key}.'))
+        elif a != b:
+            out.append(f'{prefix}{key}: {a} -> {b}')
+    return out
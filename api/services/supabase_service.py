@@ -7,6 +7,11 @@ import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from api.services.db_service import ConfigRequiredError
+from api.services.id_resolver import IdResolver, NS_CERT_TYPE_NAMES, NS_COMPANY_NAMES, NS_PERSONNEL_NAMES
+from api.services.sync_manager import ConflictError, check_version, version_conflict
+from api.services.unit_of_work import current_uow
+
 # 환경 변수: SUPABASE_URL, SUPABASE_KEY (또는 SUPABASE_ANON_KEY)
 SUPABASE_URL = (os.getenv("SUPABASE_URL") or "").strip()
 SUPABASE_KEY = (os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_ANON_KEY") or "").strip()
@@ -19,12 +24,73 @@ TABLE_COMPANIES = "companies"
 TABLE_CERTIFICATE_TYPES = "certificate_types"
 TABLE_SITE_ASSIGNMENTS = "site_assignments"
 TABLE_CERTIFICATE_ASSIGNMENTS = "certificate_assignments"
+TABLE_CHANGE_LOG = "change_log"
+
+# 쓰기 RPC 오류 중 ValueError(입력 문제)로 바꾸는 SQLSTATE. 그 외(연결/권한/서버 오류)는 그대로 전달
+# P0001: RAISE EXCEPTION 기본, P0002: 현장/인력/자격증 없음 (마이그레이션 006/010),
+# 22P02: 잘못된 UUID/숫자 형식, 23502/23503/23514: NOT NULL/외래키/CHECK 제약 위반
+RPC_VALUE_ERROR_CODES = ("P0001", "P0002", "22P02", "23502", "23503", "23514")
+
+# existing_ids 페이지 크기 (PostgREST 기본 max-rows)
+ID_PAGE_SIZE = 1000
+
+# 현장 조회 SELECT (회사 + 활성 배정 소장/자격증 JOIN)
+SITE_SELECT = """
+    *,
+    company:companies(id, name, short_name),
+    assignments:site_assignments(
+        id, role, status,
+        personnel:personnel(id, legacy_id, name, phone)
+    ),
+    cert_assignments:certificate_assignments(
+        id, status,
+        certificate:certificates(
+            id, legacy_id,
+            cert_type:certificate_types(name),
+            personnel:personnel(id, legacy_id, name, phone)
+        )
+    )
+"""
+
+PERSONNEL_SELECT = """
+    *,
+    company:companies(id, name, short_name)
+"""
+
+CERTIFICATE_SELECT = """
+    *,
+    cert_type:certificate_types(id, name),
+    personnel:personnel(id, legacy_id, name, phone)
+"""
+
+
+def _site_from_row(site_row: Dict) -> Dict:
+    return _transform_site(
+        site_row,
+        assignments=site_row.get("assignments", []),
+        cert_assignments=site_row.get("cert_assignments", []),
+        company=site_row.get("company")
+    )
+
+
+def _personnel_from_row(p_row: Dict) -> Dict:
+    return _transform_personnel(p_row, company=p_row.get("company"))
+
+
+def _certificate_from_row(c_row: Dict) -> Dict:
+    return _transform_certificate(c_row, cert_type=c_row.get("cert_type"), personnel=c_row.get("personnel"))
+
+
+def _ilike_pattern(query: str) -> str:
+    """검색어 → ILIKE 부분 일치 패턴. LIKE 와일드카드(%, _, \\)와 PostgREST 별칭(*)은 이스케이프해 문자 그대로 검색"""
+    escaped = "".join("\\" + ch if ch in "\\%_*" else ch for ch in query)
+    return f"%{escaped}%"
 
 
 def _client():
     """Supabase 클라이언트 (지연 생성)"""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError(
+        raise ConfigRequiredError(
             "SUPABASE_URL, SUPABASE_KEY를 설정해 주세요. .env에 추가하세요."
         )
     try:
@@ -80,6 +146,7 @@ def _transform_site(site_row: Dict, assignments: List[Dict] = None, cert_assignm
         "배정상태": site_row.get("assignment_status") or "미배정",
         "등록일": _format_date(site_row.get("created_at")),
         "수정일": _format_date(site_row.get("updated_at")),
+        "버전": str(site_row["version"]) if site_row.get("version") is not None else "",
     }
 
 
@@ -143,41 +210,144 @@ def _transform_certificate(cert_row: Dict, cert_type: Dict = None, personnel: Di
     }
 
 
+def _certificate_payload(data: Dict[str, Any], cert_type_id: Optional[str], personnel_id: Optional[str]) -> Dict[str, Any]:
+    """자격증 dict -> certificates 행"""
+    return {
+        "legacy_id": data.get("자격증ID"),
+        "cert_type_id": cert_type_id,
+        "personnel_id": personnel_id,
+        "cert_number": data.get("자격증번호", ""),
+        "issued_date": data.get("취득일") or None,
+        "expiry_date": data.get("유효기간") or None,
+        "status": data.get("사용가능여부", "사용가능"),
+        "notes": data.get("비고", ""),
+    }
+
+
 class SupabaseService:
     """정규화된 스키마(v2)를 사용하는 Supabase 백엔드"""
 
+    # 배정 해제 후 담당 현장 수가 이 값 이하이면 투입가능 (마이그레이션 010 unassign_site와 동일)
+    RELEASE_AVAILABLE_COUNT = 0
+
     def __init__(self):
         self._client = None
+        # legacy_id/회사명/자격증 종류명/소유자명 -> UUID (프로세스 공유 LRU, id_resolver 참고)
+        self._ids = IdResolver()
+        # 호출 시 "함수 없음"이 확인된 (RPC, 인자 이름) (이후 기존 방식으로 바로 처리)
+        self._missing_rpcs = set()
 
     def _get_client(self):
         if self._client is None:
             self._client = _client()
         return self._client
 
+    def _load_company_ids(self) -> Dict[str, str]:
+        """companies 전체를 1회 조회해 이름/약칭 -> id 맵 구성 (해석 캐시에 기록)"""
+        r = self._get_client().table(TABLE_COMPANIES).select("id, name, short_name").execute()
+        ids = {}
+        for row in (r.data or []):
+            for key in (row.get("short_name"), row.get("name")):
+                if key:
+                    ids[key] = row["id"]
+        self._ids.put_many(NS_COMPANY_NAMES, ids.items())
+        return ids
+
+    def _company_id(self, name: Optional[str]) -> Optional[str]:
+        """회사명(또는 약칭) -> company_id. 캐시에 없으면 1회 다시 읽어 신규 회사 반영"""
+        if not name:
+            return None
+        return self._ids.get(NS_COMPANY_NAMES, name) or self._load_company_ids().get(name)
+
+    def _name_id(self, namespace: str, table: str, name: Optional[str]) -> Optional[str]:
+        """이름 -> id (자격증 종류/소유자). 캐시에 없을 때만 조회"""
+        if not name:
+            return None
+        row_id = self._ids.get(namespace, name)
+        if row_id is None:
+            r = self._get_client().table(table).select("id").eq("name", name).limit(1).execute()
+            row_id = r.data[0]["id"] if r.data else None
+            self._ids.put(namespace, name, row_id)
+        return row_id
+
+    def _cert_type_id(self, name: Optional[str]) -> Optional[str]:
+        return self._name_id(NS_CERT_TYPE_NAMES, TABLE_CERTIFICATE_TYPES, name)
+
+    def _owner_id(self, name: Optional[str]) -> Optional[str]:
+        return self._name_id(NS_PERSONNEL_NAMES, TABLE_PERSONNEL, name)
+
+    def prefetch_ids(self) -> Dict[str, int]:
+        """시작 시 참조 ID를 한 번에 적재 (회사/자격증 종류 전체 + 테이블별 legacy_id → UUID, 캐시 크기까지)"""
+        client = self._get_client()
+        self._load_company_ids()
+        r = client.table(TABLE_CERTIFICATE_TYPES).select("id, name").execute()
+        self._ids.put_many(NS_CERT_TYPE_NAMES, ((row.get("name"), row["id"]) for row in (r.data or [])))
+        for table in (TABLE_SITES, TABLE_PERSONNEL, TABLE_CERTIFICATES):
+            columns = "id, legacy_id, name" if table == TABLE_PERSONNEL else "id, legacy_id"
+            start = 0
+            while start < self._ids.max_entries:
+                r = (client.table(table).select(columns).order("legacy_id")
+                     .range(start, start + ID_PAGE_SIZE - 1).execute())
+                rows = r.data or []
+                for row in rows:
+                    self._ids.put_uuid(table, row.get("legacy_id"), row["id"])
+                    if table == TABLE_PERSONNEL and not self._ids.get(NS_PERSONNEL_NAMES, row.get("name")):
+                        self._ids.put(NS_PERSONNEL_NAMES, row.get("name"), row["id"])
+                if len(rows) < ID_PAGE_SIZE:
+                    break
+                start += ID_PAGE_SIZE
+        return {ns: self._ids.size(ns) for ns in (
+            NS_COMPANY_NAMES, NS_CERT_TYPE_NAMES, TABLE_SITES, TABLE_PERSONNEL, TABLE_CERTIFICATES)}
+
+    def _forget_created(self, table: str, records: List[Dict[str, Any]], id_key: str) -> None:
+        """생성 후 해석 캐시 무효화 (같은 legacy_id/성명으로 기록된 항목 제거)"""
+        for record in records:
+            self._ids.invalidate(table, record.get(id_key))
+            if table == TABLE_PERSONNEL:
+                self._ids.invalidate(NS_PERSONNEL_NAMES, record.get("성명"))
+
+    # ---- legacy_id → UUID (요청 단위 unit_of_work + 프로세스 공유 해석 캐시) ----
+    def _remember_uuid(self, table: str, entity_id: str, row: Optional[Dict]) -> None:
+        if not row:
+            return
+        self._ids.put_uuid(table, entity_id, row.get("id"))
+        uow = current_uow()
+        if uow is not None:
+            uow.remember_uuid(table, entity_id, row.get("id"))
+
+    def _known_uuid(self, table: str, entity_id: str) -> Optional[str]:
+        uow = current_uow()
+        return (uow.uuid(table, entity_id) if uow is not None else None) or self._ids.get(table, entity_id)
+
+    def _match(self, query, table: str, entity_id: str):
+        """legacy_id 또는 id 조건. UUID를 이미 알면 PK 조건"""
+        row_uuid = self._known_uuid(table, entity_id)
+        if row_uuid:
+            return query.eq("id", row_uuid)
+        return query.or_(f"legacy_id.eq.{entity_id},id.eq.{entity_id}")
+
+    def _ref(self, table: str, entity_id: str) -> str:
+        """RPC 인자: 알고 있으면 UUID, 아니면 받은 ID 그대로 (함수 안에서 legacy_id/id 모두 비교)"""
+        return self._known_uuid(table, entity_id) or entity_id
+
+    def _resolve_uuid(self, table: str, entity_id: str) -> Optional[str]:
+        """legacy_id/UUID → UUID. 해석 캐시에 없을 때만 1회 조회"""
+        row_uuid = self._known_uuid(table, entity_id)
+        if row_uuid:
+            return row_uuid
+        r = self._get_client().table(table).select("id").or_(
+            f"legacy_id.eq.{entity_id},id.eq.{entity_id}").limit(1).execute()
+        row = (r.data or [None])[0]
+        self._remember_uuid(table, entity_id, row)
+        return row["id"] if row else None
+
     # ---- 읽기 (정규화된 스키마 사용, JOIN 포함) ----
     def get_all_sites(self, limit=None, offset=0) -> List[Dict]:
         """모든 현장 조회 (JOIN을 통한 관계 데이터 포함, 페이지네이션 지원)"""
         client = self._get_client()
         try:
             # JOIN을 통한 관계 데이터 조회
-            query = client.table(TABLE_SITES).select(
-                """
-                *,
-                company:companies(id, name, short_name),
-                assignments:site_assignments(
-                    id, role, status,
-                    personnel:personnel(id, legacy_id, name, phone)
-                ),
-                cert_assignments:certificate_assignments(
-                    id, status,
-                    certificate:certificates(
-                        id, legacy_id,
-                        cert_type:certificate_types(name),
-                        personnel:personnel(id, legacy_id, name, phone)
-                    )
-                )
-                """
-            ).order("created_at", desc=True)
+            query = client.table(TABLE_SITES).select(SITE_SELECT).order("created_at", desc=True)
             
             # 페이지네이션 적용
             if limit:
@@ -207,122 +377,286 @@ class SupabaseService:
                 raise e
 
     def get_sites_paginated(self, company=None, status=None, state=None, limit=None, offset=0) -> Dict:
-        """페이지네이션 지원 현장 조회 (필터 + 페이지네이션)"""
+        """페이지네이션 지원 현장 조회 (필터/정렬/범위/전체 개수를 모두 서버에서 처리, 1회 요청)"""
         client = self._get_client()
         try:
-            # 기본 쿼리 구성
-            query = client.table(TABLE_SITES).select(
-                """
-                *,
-                company:companies(id, name, short_name),
-                assignments:site_assignments(
-                    id, role, status,
-                    personnel:personnel(id, legacy_id, name, phone)
-                ),
-                cert_assignments:certificate_assignments(
-                    id, status,
-                    certificate:certificates(
-                        id, legacy_id,
-                        cert_type:certificate_types(name),
-                        personnel:personnel(id, legacy_id, name, phone)
-                    )
-                )
-                """
-            )
-            
-            # 필터 적용
+            query = client.table(TABLE_SITES).select(SITE_SELECT, count="exact")
+
+            # 필터 적용 (모두 서버 사이드)
             if company:
-                # 회사 ID로 필터링 (회사명으로 조회)
-                company_query = client.table("companies").select("id").or_(f"name.eq.{company},short_name.eq.{company}").limit(1).execute()
-                if company_query.data:
-                    query = query.eq("company_id", company_query.data[0]["id"])
-            
-            # 정렬
+                company_id = self._company_id(company)
+                if company_id is None:
+                    return {'data': [], 'total': 0}
+                query = query.eq("company_id", company_id)
+            if status:
+                query = query.eq("assignment_status", status)
+            if state:
+                query = query.eq("status", state)
+
             query = query.order("created_at", desc=True)
-            
-            # 페이지네이션 적용
             if limit:
                 query = query.range(offset, offset + limit - 1)
-            
+
             r = query.execute()
-            
-            sites = []
-            for site_row in (r.data or []):
-                site = _transform_site(
+            sites = [
+                _transform_site(
                     site_row,
                     assignments=site_row.get("assignments", []),
                     cert_assignments=site_row.get("cert_assignments", []),
                     company=site_row.get("company")
                 )
-                
-                # 배정상태 필터 (클라이언트 사이드)
-                if status and site.get('배정상태') != status:
-                    continue
-                
-                # 현장상태 필터 (클라이언트 사이드)
-                if state and site.get('현장상태') != state:
-                    continue
-                
-                sites.append(site)
-            
-            # 전체 개수 조회 (필터 적용 전, 서버 사이드 필터만 적용)
-            # 클라이언트 사이드 필터(status, state)는 정확한 total 계산이 어려우므로
-            # 서버 사이드 필터(company)만 적용한 total 반환
-            count_query = client.table(TABLE_SITES).select("id", count="exact")
-            if company:
-                company_query = client.table("companies").select("id").or_(f"name.eq.{company},short_name.eq.{company}").limit(1).execute()
-                if company_query.data:
-                    count_query = count_query.eq("company_id", company_query.data[0]["id"])
-            count_result = count_query.execute()
-            total_count = count_result.count if hasattr(count_result, 'count') else len(count_result.data or [])
-            
+                for site_row in (r.data or [])
+            ]
+            total_count = r.count if getattr(r, 'count', None) is not None else offset + len(sites)
             return {
                 'data': sites,
-                'total': total_count,  # 주의: 클라이언트 사이드 필터(status, state)는 total에 반영되지 않음
+                'total': total_count,
             }
-        except Exception as e:
-            # 폴백: 기존 방식
-            all_sites = self.get_all_sites(limit=limit, offset=offset)
-            filtered = all_sites
+        except Exception:
+            # 폴백: 전체 조회 후 필터 → 페이지 슬라이스 (필터 후에 잘라야 페이지/total이 정확함)
+            filtered = self.get_all_sites()
             if company:
                 filtered = [s for s in filtered if s.get('회사구분') == company]
             if status:
                 filtered = [s for s in filtered if s.get('배정상태') == status]
             if state:
                 filtered = [s for s in filtered if s.get('현장상태') == state]
+            page = filtered[offset:offset + limit] if limit else filtered[offset:]
             return {
-                'data': filtered,
+                'data': page,
                 'total': len(filtered),
             }
 
+    def get_sites_page(self, company=None, status=None, state=None, limit=None, cursor=None) -> Dict:
+        """커서(키셋) 페이지 조회: (created_at, id) DESC. OFFSET 없이 인덱스 범위 탐색"""
+        from api.utils.pagination import check_timestamp_uuid, clamp_page_size, decode_cursor, encode_cursor
+        # 커서 값은 or_ 필터 문자열에 들어가므로 형식 검사 (아니면 400 INVALID_CURSOR)
+        after = decode_cursor(cursor, check=check_timestamp_uuid)
+        limit = clamp_page_size(limit)
+        client = self._get_client()
+
+        query = client.table(TABLE_SITES).select(SITE_SELECT)
+        if company:
+            company_id = self._company_id(company)
+            if company_id is None:
+                return {'data': [], 'next_cursor': None}
+            query = query.eq("company_id", company_id)
+        if status:
+            query = query.eq("assignment_status", status)
+        if state:
+            query = query.eq("status", state)
+        if after is not None:
+            created_at, row_id = after
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+            )
+        # 다음 페이지 존재 여부 확인용으로 1건 더 조회
+        r = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+        rows = r.data or []
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].get("created_at"), rows[-1].get("id"))
+        sites = [
+            _transform_site(
+                site_row,
+                assignments=site_row.get("assignments", []),
+                cert_assignments=site_row.get("cert_assignments", []),
+                company=site_row.get("company")
+            )
+            for site_row in rows
+        ]
+        return {'data': sites, 'next_cursor': next_cursor}
+
+    def collection_versions(self, tables) -> Dict[str, str]:
+        """테이블별 컬렉션 버전 "행 수:max(updated_at)" (collection_versions RPC 1회, ETag용)"""
+        tables = list(tables)
+        client = self._get_client()
+        try:
+            data = client.rpc("collection_versions", {"p_tables": tables}).execute().data or {}
+            if all(t in data for t in tables):
+                return {t: str(data[t]) for t in tables}
+        except Exception:
+            pass
+        # 폴백: 마이그레이션 008 미적용 시 테이블당 updated_at 1건 + 개수 조회
+        versions = {}
+        for table in tables:
+            r = (client.table(table).select("updated_at", count="exact")
+                 .order("updated_at", desc=True).limit(1).execute())
+            rows = r.data or []
+            versions[table] = f"{r.count}:{rows[0].get('updated_at') if rows else ''}"
+        return versions
+
+    # ---- 변경 피드 (GET /api/changes, change_log 테이블은 migration 009 트리거가 기록) ----
+    def get_changes(self, since: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """커서(change_log.seq) 이후 변경된 행. upsert 행은 테이블당 in_ 조회 1회로 현재 값을 읽음"""
+        from api.services.change_log import build_changes, clamp_changes_limit, empty_changes
+        from api.utils.pagination import CursorError
+        client = self._get_client()
+        limit = clamp_changes_limit(limit)
+        if not since:
+            r = client.table(TABLE_CHANGE_LOG).select("seq").order("seq", desc=True).limit(1).execute()
+            rows = r.data or []
+            return {'changes': empty_changes(), 'cursor': str(rows[0]["seq"] if rows else 0),
+                    'has_more': False, 'reset': True}
+        try:
+            after = int(since)
+        except ValueError:
+            raise CursorError('잘못된 변경 커서입니다. 이전 응답의 cursor를 그대로 전달하세요.')
+        if after > 0:
+            # 커서 행이 정리(prune_change_log)되었으면 중간 변경을 알 수 없음 → 전체 재조회
+            r = client.table(TABLE_CHANGE_LOG).select("seq").eq("seq", after).limit(1).execute()
+            if not r.data:
+                return self.get_changes(None)
+        r = (client.table(TABLE_CHANGE_LOG).select("seq, table_name, row_id, legacy_id, op")
+             .gt("seq", after).order("seq").limit(limit + 1).execute())
+        rows = r.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        legacy_ids = {(row["table_name"], row["row_id"]): row.get("legacy_id") or row["row_id"] for row in rows}
+        entries = [(row["seq"], row["table_name"], row["row_id"], row["op"]) for row in rows]
+        return {
+            'changes': build_changes(entries, self._rows_by_uuid,
+                                     deleted_id=lambda table, key: legacy_ids[(table, key)]),
+            'cursor': str(rows[-1]["seq"]) if rows else str(after),
+            'has_more': has_more,
+            'reset': False,
+        }
+
+    def _rows_by_uuid(self, table: str, row_ids: List[str]) -> Dict[str, Dict]:
+        """UUID 목록 → {UUID: API 형식 행} (JOIN select 실패 시 select("*"))"""
+        select, transform = {
+            TABLE_SITES: (SITE_SELECT, _site_from_row),
+            TABLE_PERSONNEL: (PERSONNEL_SELECT, _personnel_from_row),
+            TABLE_CERTIFICATES: (CERTIFICATE_SELECT, _certificate_from_row),
+        }[table]
+        client = self._get_client()
+        try:
+            rows = client.table(table).select(select).in_("id", row_ids).execute().data or []
+        except Exception:
+            rows = client.table(table).select("*").in_("id", row_ids).execute().data or []
+        return {row["id"]: transform(row) for row in rows}
+
+    # ---- 스트리밍 조회 (NDJSON 응답용, 메모리에는 페이지 1개만 유지) ----
+    def _iter_keyset(self, table: str, select: str, transform, apply_filters=None, page_size=None):
+        """(created_at, id) DESC 키셋으로 페이지를 이어 읽으며 행을 하나씩 변환해 반환.
+        JOIN select가 실패하면(정규화 전 스키마) select("*")로 재시도"""
+        from api.utils.pagination import STREAM_PAGE_SIZE
+        size = page_size or STREAM_PAGE_SIZE
+        client = self._get_client()
+        after = None
+        while True:
+            query = client.table(table).select(select)
+            if apply_filters is not None:
+                query = apply_filters(query)
+            if after is not None:
+                created_at, row_id = after
+                query = query.or_(
+                    f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+                )
+            try:
+                r = query.order("created_at", desc=True).order("id", desc=True).limit(size).execute()
+            except Exception:
+                if select == "*":
+                    raise
+                select = "*"
+                continue
+            rows = r.data or []
+            for row in rows:
+                yield transform(row)
+            if len(rows) < size:
+                return
+            after = (rows[-1].get("created_at"), rows[-1].get("id"))
+
+    def iter_sites(self, company=None, status=None, state=None):
+        """현장 목록 스트리밍 (필터는 서버에서 적용)"""
+        company_id = self._company_id(company) if company else None
+        if company and company_id is None:
+            return iter(())
+
+        def apply_filters(query):
+            if company_id:
+                query = query.eq("company_id", company_id)
+            if status:
+                query = query.eq("assignment_status", status)
+            if state:
+                query = query.eq("status", state)
+            return query
+        return self._iter_keyset(TABLE_SITES, SITE_SELECT, _site_from_row, apply_filters)
+
+    def iter_personnel(self, status=None, role=None):
+        """인력 목록 스트리밍 (필터는 서버에서 적용)"""
+        def apply_filters(query):
+            if status:
+                query = query.eq("status", status)
+            if role:
+                query = query.eq("position", role)
+            return query
+        return self._iter_keyset(TABLE_PERSONNEL, PERSONNEL_SELECT, _personnel_from_row, apply_filters)
+
+    def iter_certificates(self, available=None):
+        """자격증 목록 스트리밍. available=true/false → 사용가능 여부 서버 필터"""
+        def apply_filters(query):
+            if available == 'true':
+                query = query.eq("status", "사용가능")
+            elif available == 'false':
+                query = query.neq("status", "사용가능")
+            return query
+        return self._iter_keyset(TABLE_CERTIFICATES, CERTIFICATE_SELECT, _certificate_from_row, apply_filters)
+
+    def search_sites(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """현장명/주소 검색 (search_sites RPC: pg_trgm/tsvector 인덱스, 점수순)"""
+        from api.utils.pagination import clamp_page_size
+        limit = clamp_page_size(limit)
+        client = self._get_client()
+        try:
+            ranked = client.rpc("search_sites", {"q": query, "max_results": limit}).execute().data or []
+            ids = [row["id"] for row in ranked]
+            if not ids:
+                return []
+            r = client.table(TABLE_SITES).select(SITE_SELECT).in_("id", ids).execute()
+            by_id = {row["id"]: row for row in (r.data or [])}
+            rows = [by_id[i] for i in ids if i in by_id]
+        except Exception:
+            # 폴백: 마이그레이션 004 미적용 시 ILIKE (트라이그램 인덱스 없으면 순차 스캔)
+            # 검색어를 or_ 필터 문법에 넣지 않도록 컬럼별 .ilike() 2회 후 병합 (최신순, limit건)
+            pattern = _ilike_pattern(query)
+            seen, rows = set(), []
+            for column in ("name", "address"):
+                r = (
+                    client.table(TABLE_SITES).select(SITE_SELECT)
+                    .ilike(column, pattern)
+                    .order("created_at", desc=True).limit(limit).execute()
+                )
+                for row in r.data or []:
+                    if row.get("id") not in seen:
+                        seen.add(row.get("id"))
+                        rows.append(row)
+            rows.sort(key=lambda row: row.get("created_at") or "", reverse=True)
+            rows = rows[:limit]
+        return [
+            _transform_site(
+                site_row,
+                assignments=site_row.get("assignments", []),
+                cert_assignments=site_row.get("cert_assignments", []),
+                company=site_row.get("company")
+            )
+            for site_row in rows
+        ]
+
     def get_site_by_id(self, site_id: str) -> Optional[Dict]:
         """현장 상세 조회 (legacy_id 또는 id로 조회)"""
         client = self._get_client()
         try:
-            r = client.table(TABLE_SITES).select(
-                """
-                *,
-                company:companies(id, name, short_name),
-                assignments:site_assignments(
-                    id, role, status,
-                    personnel:personnel(id, legacy_id, name, phone)
-                ),
-                cert_assignments:certificate_assignments(
-                    id, status,
-                    certificate:certificates(
-                        id, legacy_id,
-                        cert_type:certificate_types(name),
-                        personnel:personnel(id, legacy_id, name, phone)
-                    )
-                )
-                """
-            ).or_(f"legacy_id.eq.{site_id},id.eq.{site_id}").limit(1).execute()
+            r = self._match(client.table(TABLE_SITES).select(SITE_SELECT), TABLE_SITES, site_id).limit(1).execute()
             
             rows = r.data or []
             if not rows:
                 return None
             
             site_row = rows[0]
+            self._remember_uuid(TABLE_SITES, site_id, site_row)
             return _transform_site(
                 site_row,
                 assignments=site_row.get("assignments", []),
@@ -332,8 +666,9 @@ class SupabaseService:
         except Exception as e:
             # 폴백: 단순 조회
             try:
-                r = client.table(TABLE_SITES).select("*").or_(f"legacy_id.eq.{site_id},id.eq.{site_id}").limit(1).execute()
+                r = self._match(client.table(TABLE_SITES).select("*"), TABLE_SITES, site_id).limit(1).execute()
                 rows = r.data or []
+                self._remember_uuid(TABLE_SITES, site_id, rows[0] if rows else None)
                 return _transform_site(rows[0]) if rows else None
             except Exception:
                 raise e
@@ -342,12 +677,7 @@ class SupabaseService:
         """모든 인력 조회"""
         client = self._get_client()
         try:
-            r = client.table(TABLE_PERSONNEL).select(
-                """
-                *,
-                company:companies(id, name, short_name)
-                """
-            ).order("created_at", desc=True).execute()
+            r = client.table(TABLE_PERSONNEL).select(PERSONNEL_SELECT).order("created_at", desc=True).execute()
             
             personnel_list = []
             for p_row in (r.data or []):
@@ -362,28 +692,53 @@ class SupabaseService:
             except Exception:
                 raise e
 
+    def get_statistics(self, fresh: bool = False) -> Dict:
+        """통계 집계 (dashboard_stats RPC 1회, 응답 크기는 테이블 크기와 무관). 항상 DB 최신값"""
+        from api.services.stats_service import compute_stats, normalize_stats
+        client = self._get_client()
+        try:
+            return normalize_stats(client.rpc("dashboard_stats").execute().data)
+        except Exception:
+            # 폴백: 마이그레이션 005 미적용 시 집계에 필요한 컬럼만 조회 (JOIN 없음)
+            sites = client.table(TABLE_SITES).select(
+                "status, assignment_status, company:companies(name, short_name)"
+            ).execute().data or []
+            personnel = client.table(TABLE_PERSONNEL).select("status, position").execute().data or []
+            certs = client.table(TABLE_CERTIFICATES).select("status").execute().data or []
+            return compute_stats(
+                (
+                    {
+                        '배정상태': s.get("assignment_status") or "미배정",
+                        '현장상태': s.get("status") or "건축허가",
+                        '회사구분': (s.get("company") or {}).get("name") or (s.get("company") or {}).get("short_name") or "",
+                    }
+                    for s in sites
+                ),
+                ({'현재상태': p.get("status") or "투입가능", '직책': p.get("position") or ""} for p in personnel),
+                ({'사용가능여부': c.get("status") or "사용가능"} for c in certs),
+            )
+
     def get_personnel_by_id(self, personnel_id: str) -> Optional[Dict]:
         """인력 상세 조회 (legacy_id 또는 id로 조회)"""
         client = self._get_client()
         try:
-            r = client.table(TABLE_PERSONNEL).select(
-                """
-                *,
-                company:companies(id, name, short_name)
-                """
-            ).or_(f"legacy_id.eq.{personnel_id},id.eq.{personnel_id}").limit(1).execute()
+            r = self._match(
+                client.table(TABLE_PERSONNEL).select(PERSONNEL_SELECT), TABLE_PERSONNEL, personnel_id
+            ).limit(1).execute()
             
             rows = r.data or []
             if not rows:
                 return None
             
             p_row = rows[0]
+            self._remember_uuid(TABLE_PERSONNEL, personnel_id, p_row)
             return _transform_personnel(p_row, company=p_row.get("company"))
         except Exception as e:
             # 폴백
             try:
-                r = client.table(TABLE_PERSONNEL).select("*").or_(f"legacy_id.eq.{personnel_id},id.eq.{personnel_id}").limit(1).execute()
+                r = self._match(client.table(TABLE_PERSONNEL).select("*"), TABLE_PERSONNEL, personnel_id).limit(1).execute()
                 rows = r.data or []
+                self._remember_uuid(TABLE_PERSONNEL, personnel_id, rows[0] if rows else None)
                 return _transform_personnel(rows[0]) if rows else None
             except Exception:
                 raise e
@@ -392,13 +747,7 @@ class SupabaseService:
         """모든 자격증 조회"""
         client = self._get_client()
         try:
-            r = client.table(TABLE_CERTIFICATES).select(
-                """
-                *,
-                cert_type:certificate_types(id, name),
-                personnel:personnel(id, legacy_id, name, phone)
-                """
-            ).order("created_at", desc=True).execute()
+            r = client.table(TABLE_CERTIFICATES).select(CERTIFICATE_SELECT).order("created_at", desc=True).execute()
             
             cert_list = []
             for c_row in (r.data or []):
@@ -421,19 +770,16 @@ class SupabaseService:
         """자격증 상세 조회 (legacy_id 또는 id로 조회)"""
         client = self._get_client()
         try:
-            r = client.table(TABLE_CERTIFICATES).select(
-                """
-                *,
-                cert_type:certificate_types(id, name),
-                personnel:personnel(id, legacy_id, name, phone)
-                """
-            ).or_(f"legacy_id.eq.{cert_id},id.eq.{cert_id}").limit(1).execute()
+            r = self._match(
+                client.table(TABLE_CERTIFICATES).select(CERTIFICATE_SELECT), TABLE_CERTIFICATES, cert_id
+            ).limit(1).execute()
             
             rows = r.data or []
             if not rows:
                 return None
             
             c_row = rows[0]
+            self._remember_uuid(TABLE_CERTIFICATES, cert_id, c_row)
             return _transform_certificate(
                 c_row,
                 cert_type=c_row.get("cert_type"),
@@ -442,8 +788,9 @@ class SupabaseService:
         except Exception as e:
             # 폴백
             try:
-                r = client.table(TABLE_CERTIFICATES).select("*").or_(f"legacy_id.eq.{cert_id},id.eq.{cert_id}").limit(1).execute()
+                r = self._match(client.table(TABLE_CERTIFICATES).select("*"), TABLE_CERTIFICATES, cert_id).limit(1).execute()
                 rows = r.data or []
+                self._remember_uuid(TABLE_CERTIFICATES, cert_id, rows[0] if rows else None)
                 return _transform_certificate(rows[0]) if rows else None
             except Exception:
                 raise e
@@ -451,21 +798,20 @@ class SupabaseService:
     # ---- 쓰기: 정규화된 스키마 사용 ----
     def create_site(self, data: Dict[str, Any]) -> None:
         """현장 생성 (정규화된 스키마)"""
-        client = self._get_client()
-        
-        # 회사 ID 조회
+        self._get_client().table(TABLE_SITES).insert(self._site_payload(data)).execute()
+        self._forget_created(TABLE_SITES, [data], "현장ID")
+
+    def _site_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """현장 dict -> sites 행 (회사 ID는 캐시된 회사 맵)"""
         company_id = None
         if data.get("회사구분"):
-            company_name = data["회사구분"]
             try:
-                company_r = client.table(TABLE_COMPANIES).select("id").or_(f"name.eq.{company_name},short_name.eq.{company_name}").limit(1).execute()
-                if company_r.data:
-                    company_id = company_r.data[0]["id"]
+                company_id = self._company_id(data["회사구분"])
             except Exception:
                 pass
         
         # 정규화된 스키마 형식으로 변환
-        payload = {
+        return {
             "legacy_id": data.get("현장ID"),
             "company_id": company_id,
             "name": data.get("현장명", ""),
@@ -481,23 +827,24 @@ class SupabaseService:
             "notes": data.get("특이사항", ""),
             "completion_doc_url": data.get("준공필증파일URL", ""),
         }
-        client.table(TABLE_SITES).insert(payload).execute()
 
-    def update_site(self, site_id: str, data: Dict[str, Any]) -> None:
-        """현장 수정 (정규화된 스키마)"""
+    def update_site(self, site_id: str, data: Dict[str, Any], expected_version: Optional[int] = None) -> Optional[int]:
+        """현장 수정 (정규화된 스키마). expected_version이 있으면 UPDATE ... WHERE version = ? (조건부 갱신 1회)
+
+        버전은 BEFORE UPDATE 트리거가 증가시킴 (마이그레이션 010). 새 버전 반환
+        """
         if not data:
-            return
+            return None
         
         client = self._get_client()
         payload = {}
         
-        # 회사 ID 조회 (회사구분 변경 시)
+        # 회사 ID 조회 (회사구분 변경 시) (캐시된 회사 맵)
         if "회사구분" in data:
-            company_name = data["회사구분"]
             try:
-                company_r = client.table(TABLE_COMPANIES).select("id").or_(f"name.eq.{company_name},short_name.eq.{company_name}").limit(1).execute()
-                if company_r.data:
-                    payload["company_id"] = company_r.data[0]["id"]
+                company_id = self._company_id(data["회사구분"])
+                if company_id:
+                    payload["company_id"] = company_id
             except Exception:
                 pass
         
@@ -526,25 +873,39 @@ class SupabaseService:
                     payload[db_key] = value if value else None
         
         payload["updated_at"] = datetime.now().isoformat()
-        
-        client.table(TABLE_SITES).update(payload).or_(f"legacy_id.eq.{site_id},id.eq.{site_id}").execute()
+
+        query = self._match(client.table(TABLE_SITES).update(payload), TABLE_SITES, site_id)
+        if expected_version is not None:
+            query = query.eq("version", expected_version)
+        rows = query.execute().data or []
+        if not rows:
+            if expected_version is not None:
+                raise self._version_conflict(site_id, expected_version)
+            return None
+        return rows[0].get("version")
+
+    def _version_conflict(self, site_id: str, expected_version: int) -> ConflictError:
+        """조건부 갱신 0건 → 현재 버전을 읽어 충돌 오류 생성 (충돌 시에만 조회)"""
+        r = self._match(self._get_client().table(TABLE_SITES).select("version"), TABLE_SITES, site_id).limit(1).execute()
+        if not r.data:
+            raise ValueError(f"현장을 찾을 수 없습니다: {site_id}")
+        return version_conflict(site_id, r.data[0].get("version"), expected_version)
 
     def create_personnel(self, data: Dict[str, Any]) -> None:
         """인력 생성 (정규화된 스키마)"""
-        client = self._get_client()
-        
-        # 회사 ID 조회
+        self._get_client().table(TABLE_PERSONNEL).insert(self._personnel_payload(data)).execute()
+        self._forget_created(TABLE_PERSONNEL, [data], "인력ID")
+
+    def _personnel_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """인력 dict -> personnel 행 (회사 ID는 캐시된 회사 맵)"""
         company_id = None
         if data.get("소속"):
-            company_name = data["소속"]
             try:
-                company_r = client.table(TABLE_COMPANIES).select("id").or_(f"name.eq.{company_name},short_name.eq.{company_name}").limit(1).execute()
-                if company_r.data:
-                    company_id = company_r.data[0]["id"]
+                company_id = self._company_id(data["소속"])
             except Exception:
                 pass
         
-        payload = {
+        return {
             "legacy_id": data.get("인력ID"),
             "company_id": company_id,
             "name": data.get("성명", ""),
@@ -556,7 +917,6 @@ class SupabaseService:
             "join_date": data.get("입사일") or None,
             "notes": data.get("비고", ""),
         }
-        client.table(TABLE_PERSONNEL).insert(payload).execute()
 
     def update_personnel(self, personnel_id: str, data: Dict[str, Any]) -> None:
         """인력 수정 (정규화된 스키마)"""
@@ -566,13 +926,12 @@ class SupabaseService:
         client = self._get_client()
         payload = {}
         
-        # 회사 ID 조회
+        # 회사 ID 조회 (캐시된 회사 맵)
         if "소속" in data:
-            company_name = data["소속"]
             try:
-                company_r = client.table(TABLE_COMPANIES).select("id").or_(f"name.eq.{company_name},short_name.eq.{company_name}").limit(1).execute()
-                if company_r.data:
-                    payload["company_id"] = company_r.data[0]["id"]
+                company_id = self._company_id(data["소속"])
+                if company_id:
+                    payload["company_id"] = company_id
             except Exception:
                 pass
         
@@ -596,45 +955,27 @@ class SupabaseService:
                     payload[db_key] = value if value else None
         
         payload["updated_at"] = datetime.now().isoformat()
-        client.table(TABLE_PERSONNEL).update(payload).or_(f"legacy_id.eq.{personnel_id},id.eq.{personnel_id}").execute()
+        self._match(client.table(TABLE_PERSONNEL).update(payload), TABLE_PERSONNEL, personnel_id).execute()
+        if "성명" in data:
+            # 이전 성명 → id 항목을 알 수 없으므로 소유자명 캐시 전체 제거
+            self._ids.invalidate(NS_PERSONNEL_NAMES)
 
     def create_certificate(self, data: Dict[str, Any]) -> None:
         """자격증 생성 (정규화된 스키마)"""
         client = self._get_client()
         
-        # 자격증 종류 ID 조회
+        # 자격증 종류/소유자 ID (해석 캐시에 없을 때만 조회)
         cert_type_id = None
-        if data.get("자격증명"):
-            cert_type_name = data["자격증명"]
-            try:
-                cert_type_r = client.table(TABLE_CERTIFICATE_TYPES).select("id").eq("name", cert_type_name).limit(1).execute()
-                if cert_type_r.data:
-                    cert_type_id = cert_type_r.data[0]["id"]
-            except Exception:
-                pass
-        
-        # 소유자 ID 조회
         personnel_id = None
-        if data.get("소유자명"):
-            owner_name = data["소유자명"]
-            try:
-                personnel_r = client.table(TABLE_PERSONNEL).select("id").eq("name", owner_name).limit(1).execute()
-                if personnel_r.data:
-                    personnel_id = personnel_r.data[0]["id"]
-            except Exception:
-                pass
+        try:
+            cert_type_id = self._cert_type_id(data.get("자격증명"))
+            personnel_id = self._owner_id(data.get("소유자명"))
+        except Exception:
+            pass
         
-        payload = {
-            "legacy_id": data.get("자격증ID"),
-            "cert_type_id": cert_type_id,
-            "personnel_id": personnel_id,
-            "cert_number": data.get("자격증번호", ""),
-            "issued_date": data.get("취득일") or None,
-            "expiry_date": data.get("유효기간") or None,
-            "status": data.get("사용가능여부", "사용가능"),
-            "notes": data.get("비고", ""),
-        }
+        payload = _certificate_payload(data, cert_type_id, personnel_id)
         client.table(TABLE_CERTIFICATES).insert(payload).execute()
+        self._forget_created(TABLE_CERTIFICATES, [data], "자격증ID")
 
     def update_certificate(self, cert_id: str, data: Dict[str, Any]) -> None:
         """자격증 수정 (정규화된 스키마)"""
@@ -644,25 +985,18 @@ class SupabaseService:
         client = self._get_client()
         payload = {}
         
-        # 자격증 종류 ID 조회
-        if "자격증명" in data:
-            cert_type_name = data["자격증명"]
-            try:
-                cert_type_r = client.table(TABLE_CERTIFICATE_TYPES).select("id").eq("name", cert_type_name).limit(1).execute()
-                if cert_type_r.data:
-                    payload["cert_type_id"] = cert_type_r.data[0]["id"]
-            except Exception:
-                pass
-        
-        # 소유자 ID 조회
-        if "소유자명" in data:
-            owner_name = data["소유자명"]
-            try:
-                personnel_r = client.table(TABLE_PERSONNEL).select("id").eq("name", owner_name).limit(1).execute()
-                if personnel_r.data:
-                    payload["personnel_id"] = personnel_r.data[0]["id"]
-            except Exception:
-                pass
+        # 자격증 종류/소유자 ID (해석 캐시에 없을 때만 조회)
+        try:
+            if "자격증명" in data:
+                cert_type_id = self._cert_type_id(data["자격증명"])
+                if cert_type_id:
+                    payload["cert_type_id"] = cert_type_id
+            if "소유자명" in data:
+                owner_id = self._owner_id(data["소유자명"])
+                if owner_id:
+                    payload["personnel_id"] = owner_id
+        except Exception:
+            pass
         
         field_map = {
             "자격증번호": "cert_number",
@@ -677,28 +1011,160 @@ class SupabaseService:
                 payload[db_key] = data[korean_key] if data[korean_key] else None
         
         payload["updated_at"] = datetime.now().isoformat()
-        client.table(TABLE_CERTIFICATES).update(payload).or_(f"legacy_id.eq.{cert_id},id.eq.{cert_id}").execute()
+        self._match(client.table(TABLE_CERTIFICATES).update(payload), TABLE_CERTIFICATES, cert_id).execute()
 
-    def assign_site(self, site_id: str, manager_id: str, certificate_id: str) -> None:
-        """소장·자격증 배정 (정규화된 스키마: 배정 관계 테이블 사용)"""
+    # ---- 일괄 가져오기 (import_service) ----
+    def existing_ids(self, table: str) -> set:
+        """테이블의 legacy_id 집합. legacy_id 컬럼만 1,000행 단위로 읽음"""
         client = self._get_client()
-        now = datetime.now().isoformat()
+        ids, start = set(), 0
+        while True:
+            r = (client.table(table).select("legacy_id").order("legacy_id")
+                 .range(start, start + ID_PAGE_SIZE - 1).execute())
+            rows = r.data or []
+            ids.update(str(row["legacy_id"]) for row in rows if row.get("legacy_id"))
+            if len(rows) < ID_PAGE_SIZE:
+                return ids
+            start += ID_PAGE_SIZE
 
-        # UUID 조회 (legacy_id 또는 id로)
-        site_r = client.table(TABLE_SITES).select("id").or_(f"legacy_id.eq.{site_id},id.eq.{site_id}").limit(1).execute()
+    def create_many(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """여러 행을 insert 1회로 추가 (가져오기용)"""
+        if not records:
+            return
+        if table == TABLE_SITES:
+            payload = [self._site_payload(r) for r in records]
+        elif table == TABLE_PERSONNEL:
+            payload = [self._personnel_payload(r) for r in records]
+        elif table == TABLE_CERTIFICATES:
+            payload = self._certificate_payloads(records)
+        else:
+            raise ValueError(f"알 수 없는 테이블: {table}")
+        self._get_client().table(table).insert(payload).execute()
+        id_key = {TABLE_SITES: "현장ID", TABLE_PERSONNEL: "인력ID", TABLE_CERTIFICATES: "자격증ID"}[table]
+        self._forget_created(table, records, id_key)
+
+    def _names_to_ids(self, namespace: str, table: str, names) -> Dict[str, str]:
+        """이름 집합 -> {이름: id}. 캐시 미스만 in_ 조회 1회 (동명이인은 먼저 읽힌 행)"""
+        ids = {name: self._ids.get(namespace, name) for name in names}
+        missing = sorted(name for name, row_id in ids.items() if not row_id)
+        if missing:
+            r = self._get_client().table(table).select("id, name").in_("name", missing).execute()
+            for row in (r.data or []):
+                if not ids.get(row["name"]):
+                    ids[row["name"]] = row["id"]
+                    self._ids.put(namespace, row["name"], row["id"])
+        return {name: row_id for name, row_id in ids.items() if row_id}
+
+    def _certificate_payloads(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """자격증 종류/소유자 ID: 해석 캐시에 없는 이름만 청크당 in_ 조회 (최대 2회, 행마다 조회하지 않음)"""
+        type_ids = self._names_to_ids(NS_CERT_TYPE_NAMES, TABLE_CERTIFICATE_TYPES,
+                                      {r["자격증명"] for r in records if r.get("자격증명")})
+        owner_ids = self._names_to_ids(NS_PERSONNEL_NAMES, TABLE_PERSONNEL,
+                                       {r["소유자명"] for r in records if r.get("소유자명")})
+        return [
+            _certificate_payload(r, type_ids.get(r.get("자격증명")), owner_ids.get(r.get("소유자명")))
+            for r in records
+        ]
+
+    def _call_write_rpc(self, name: str, params: Dict[str, Any]):
+        """쓰기 RPC 호출 → (호출 여부, 결과). 함수가 없으면(마이그레이션 006/010 미적용) (False, None)
+        → 호출자가 기존 방식으로 처리. 버전 불일치(PT409)는 ConflictError,
+        찾을 수 없음/입력 오류(RPC_VALUE_ERROR_CODES)는 ValueError, 나머지 예외는 그대로 전달"""
+        key = (name, tuple(sorted(params)))
+        if key in self._missing_rpcs:
+            return False, None
+        try:
+            return True, self._get_client().rpc(name, params).execute().data
+        except Exception as e:
+            code = str(getattr(e, "code", "") or "")
+            if code in ("PGRST202", "42883"):
+                self._missing_rpcs.add(key)
+                return False, None
+            message = getattr(e, "message", None) or str(e)
+            if code == "PT409":
+                raise ConflictError(message) from e
+            if code in RPC_VALUE_ERROR_CODES:
+                # RAISE EXCEPTION 메시지 (현장/인력/자격증을 찾을 수 없습니다 등)
+                raise ValueError(message) from e
+            raise
+
+    def assign_site(self, site_id: str, manager_id: str, certificate_id: str,
+                    expected_version: Optional[int] = None) -> Optional[int]:
+        """소장·자격증 배정 (assign_site RPC 1회 = 단일 트랜잭션, current_site_count 원자적 증가)
+
+        expected_version이 있으면 RPC 안에서 현장 행을 잠근 뒤 버전 비교. 새 버전 반환
+        """
+        params = {
+            "p_site_id": self._ref(TABLE_SITES, site_id),
+            "p_manager_id": self._ref(TABLE_PERSONNEL, manager_id),
+            "p_certificate_id": self._ref(TABLE_CERTIFICATES, certificate_id),
+        }
+        if expected_version is not None:
+            params["p_expected_version"] = expected_version
+        called, data = self._call_write_rpc("assign_site", params)
+        if called:
+            return (data or {}).get("version")
+        return self._assign_site_legacy(site_id, manager_id, certificate_id, expected_version)
+
+    def assign_sites_batch(self, items) -> List[Optional[int]]:
+        """여러 현장 일괄 배정 (assign_sites_batch RPC 1회, 전체가 하나의 트랜잭션)
+
+        items: (site_id, manager_id, certificate_id[, expected_version]). 항목별 새 버전 목록 반환
+        """
+        items = [tuple(item) + (None,) * (4 - len(item)) for item in items]
+        if not items:
+            return []
+        called, data = self._call_write_rpc("assign_sites_batch", {"p_items": [
+            {"site_id": self._ref(TABLE_SITES, site_id), "manager_id": self._ref(TABLE_PERSONNEL, manager_id),
+             "certificate_id": self._ref(TABLE_CERTIFICATES, certificate_id), "version": version}
+            for site_id, manager_id, certificate_id, version in items
+        ]})
+        if called:
+            return [(row or {}).get("version") for row in (data or [])]
+        return [self.assign_site(*item) for item in items]
+
+    def unassign_site(self, site_id: str, expected_version: Optional[int] = None) -> Optional[int]:
+        """소장 배정 해제 (unassign_site RPC 1회 = 단일 트랜잭션). 새 버전 반환"""
+        params = {"p_site_id": self._ref(TABLE_SITES, site_id)}
+        if expected_version is not None:
+            params["p_expected_version"] = expected_version
+        called, data = self._call_write_rpc("unassign_site", params)
+        if called:
+            return (data or {}).get("version")
+        return self._unassign_site_legacy(site_id, expected_version)
+
+    def _claim_site_legacy(self, site_id: str, expected_version: Optional[int]) -> str:
+        """RPC 미설치 환경: 현장 UUID 조회 (요청 안에서 1회). expected_version이 있으면 버전 비교 (version 컬럼이 있을 때만)"""
+        if expected_version is None:
+            site_uuid = self._resolve_uuid(TABLE_SITES, site_id)
+            if not site_uuid:
+                raise ValueError(f"현장을 찾을 수 없습니다: {site_id}")
+            return site_uuid
+        site_r = self._match(self._get_client().table(TABLE_SITES).select("*"), TABLE_SITES, site_id).limit(1).execute()
         if not site_r.data:
             raise ValueError(f"현장을 찾을 수 없습니다: {site_id}")
-        site_uuid = site_r.data[0]["id"]
+        row = site_r.data[0]
+        self._remember_uuid(TABLE_SITES, site_id, row)
+        if "version" in row:
+            check_version(site_id, {"버전": row.get("version")}, expected_version)
+        return row["id"]
+
+    def _assign_site_legacy(self, site_id: str, manager_id: str, certificate_id: str,
+                            expected_version: Optional[int] = None) -> Optional[int]:
+        """소장·자격증 배정 - RPC 미설치 환경용 (정규화된 스키마: 배정 관계 테이블 사용)"""
+        client = self._get_client()
+        now = datetime.now().isoformat()
+
+        # UUID 조회 (legacy_id 또는 id로)
+        site_uuid = self._claim_site_legacy(site_id, expected_version)
 
-        manager_r = client.table(TABLE_PERSONNEL).select("id").or_(f"legacy_id.eq.{manager_id},id.eq.{manager_id}").limit(1).execute()
-        if not manager_r.data:
+        manager_uuid = self._resolve_uuid(TABLE_PERSONNEL, manager_id)
+        if not manager_uuid:
             raise ValueError(f"인력을 찾을 수 없습니다: {manager_id}")
-        manager_uuid = manager_r.data[0]["id"]
 
-        cert_r = client.table(TABLE_CERTIFICATES).select("id").or_(f"legacy_id.eq.{certificate_id},id.eq.{certificate_id}").limit(1).execute()
-        if not cert_r.data:
+        cert_uuid = self._resolve_uuid(TABLE_CERTIFICATES, certificate_id)
+        if not cert_uuid:
             raise ValueError(f"자격증을 찾을 수 없습니다: {certificate_id}")
-        cert_uuid = cert_r.data[0]["id"]
 
         # 기존 배정 해제 (있는 경우)
         client.table(TABLE_SITE_ASSIGNMENTS).update({"status": "해제", "released_at": now}).eq("site_id", site_uuid).eq("status", "배정중").execute()
@@ -718,11 +1184,11 @@ class SupabaseService:
             "status": "배정중",
         }).execute()
 
-        # 현장 배정상태 업데이트
-        client.table(TABLE_SITES).update({
+        # 현장 배정상태 업데이트 (갱신된 행에서 새 버전)
+        site_rows = client.table(TABLE_SITES).update({
             "assignment_status": "배정완료",
             "updated_at": now,
-        }).eq("id", site_uuid).execute()
+        }).eq("id", site_uuid).execute().data or [{}]
 
         # 인력 상태 업데이트
         manager_data = client.table(TABLE_PERSONNEL).select("current_site_count").eq("id", manager_uuid).single().execute()
@@ -738,17 +1204,15 @@ class SupabaseService:
             "status": "사용중",
             "updated_at": now,
         }).eq("id", cert_uuid).execute()
+        return site_rows[0].get("version")
 
-    def unassign_site(self, site_id: str) -> None:
-        """소장 배정 해제 (정규화된 스키마)"""
+    def _unassign_site_legacy(self, site_id: str, expected_version: Optional[int] = None) -> Optional[int]:
+        """소장 배정 해제 - RPC 미설치 환경용 (정규화된 스키마)"""
         client = self._get_client()
         now = datetime.now().isoformat()
 
         # 현장 UUID 조회
-        site_r = client.table(TABLE_SITES).select("id").or_(f"legacy_id.eq.{site_id},id.eq.{site_id}").limit(1).execute()
-        if not site_r.data:
-            raise ValueError(f"현장을 찾을 수 없습니다: {site_id}")
-        site_uuid = site_r.data[0]["id"]
+        site_uuid = self._claim_site_legacy(site_id, expected_version)
 
         # 배정 정보 조회
         assignment_r = client.table(TABLE_SITE_ASSIGNMENTS).select("personnel_id").eq("site_id", site_uuid).eq("status", "배정중").limit(1).execute()
@@ -768,11 +1232,11 @@ class SupabaseService:
             "released_at": now,
         }).eq("site_id", site_uuid).eq("status", "배정중").execute()
 
-        # 현장 상태 업데이트
-        client.table(TABLE_SITES).update({
+        # 현장 상태 업데이트 (갱신된 행에서 새 버전)
+        site_rows = client.table(TABLE_SITES).update({
             "assignment_status": "미배정",
             "updated_at": now,
-        }).eq("id", site_uuid).execute()
+        }).eq("id", site_uuid).execute().data or [{}]
 
         # 인력 상태 업데이트
         if manager_uuid:
@@ -789,6 +1253,7 @@ class SupabaseService:
                 "status": "사용가능",
                 "updated_at": now,
             }).eq("id", cert_uuid).execute()
+        return site_rows[0].get("version")
 
 
 supabase_service = SupabaseService()
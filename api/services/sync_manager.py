@@ -1,57 +1,111 @@
 """
 2-3 실시간 동기화 - 낙관적 잠금 (Optimistic Locking)
 
-- 현장(시트1) 수정일(수정일)을 버전으로 사용
-- 수정/배정/배정해제 시 클라이언트가 보낸 버전과 일치할 때만 적용
-- 불일치 시 409 Conflict 반환 (다른 사용자가 먼저 수정함)
+- 현장 행의 정수 버전(버전 컬럼)을 사용. 현장 행이 바뀌는 쓰기마다 1씩 증가
+  (Sheets: 현장 시트 X열 / Supabase: sites.version, BEFORE UPDATE 트리거)
+- 수정/배정/배정해제 시 클라이언트가 보낸 버전(If-Match 또는 body.version)을 쓰기 함수에 넘기고,
+  백엔드가 쓰기 안에서 비교 후 교체(compare-and-swap) → 별도 조회 없이 1회 왕복
+  (Supabase: 행 잠금 + 버전 비교 / Sheets: 프로세스 쓰기 잠금 + 인덱스 버전 비교)
+- 불일치 시 ConflictError → 409 Conflict 반환 (다른 사용자가 먼저 수정함)
 """
 
 
 class ConflictError(Exception):
     """버전 충돌 - 다른 사용자가 데이터를 수정한 상태"""
-    pass
+
+    def __init__(self, message, current=None, expected=None):
+        super().__init__(message)
+        self.current = current
+        self.expected = expected
+
+
+def parse_version(value):
+    """요청 버전(If-Match 헤더/body.version) → int. 없으면 None (검사 생략)
+
+    ETag 형식("3", W/"3")도 허용. 정수가 아니면(이전 날짜 버전 등) 최신 데이터를 다시 받도록 ConflictError
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text.startswith('W/'):
+        text = text[2:]
+    text = text.strip('"').strip()
+    if not text or text == '*':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        raise ConflictError(
+            f'알 수 없는 버전 형식입니다: {value}. 최신 데이터를 다시 조회한 뒤 시도하세요.',
+            expected=value,
+        )
+
+
+def row_version(record):
+    """현장 행 dict의 현재 버전 (버전 컬럼이 비어 있는 기존 행은 0)"""
+    try:
+        return int(str((record or {}).get('버전') or 0).strip() or 0)
+    except ValueError:
+        return 0
+
+
+def version_conflict(site_id, current, expected):
+    return ConflictError(
+        f'데이터가 다른 사용자에 의해 수정되었습니다. '
+        f'현재 버전: {current}, 요청 버전: {expected}. 최신 데이터를 다시 조회한 뒤 시도하세요.',
+        current=current,
+        expected=expected,
+    )
+
+
+def check_version(site_id, record, expected):
+    """expected가 None이면 통과. 행 버전과 다르면 ConflictError (쓰기 직전 잠금 안에서 호출)"""
+    if expected is None:
+        return
+    current = row_version(record)
+    if current != expected:
+        raise version_conflict(site_id, current, expected)
 
 
 class SyncManager:
-    """낙관적 잠금: 버전 확인 후 수정 허용"""
+    """낙관적 잠금: 버전 조회/비교 (실제 쓰기 시 비교는 백엔드 쓰기 함수가 수행)"""
 
     def __init__(self, sheets_service):
         self._sheets = sheets_service
 
     def get_site_version(self, site_id):
         """
-        현장의 현재 버전(수정일) 반환.
+        현장의 현재 버전(정수) 반환.
         GET 응답에 포함하여 클라이언트가 수정 시 If-Match로 보내도록 함.
         """
         site = self._sheets.get_site_by_id(site_id)
         if not site:
             return None
-        return (site.get('수정일') or '').strip()
+        return row_version(site)
 
     def check_site_version(self, site_id, expected_version):
         """
         expected_version이 None/빈 문자열이면 검사 생략(옵션).
         일치하면 True, 불일치하면 False.
         """
-        if expected_version is None or str(expected_version).strip() == '':
+        try:
+            expected = parse_version(expected_version)
+        except ConflictError:
+            return False
+        if expected is None:
             return True
-        current = self.get_site_version(site_id)
-        return current == str(expected_version).strip()
+        return self.get_site_version(site_id) == expected
 
     def require_site_version(self, site_id, expected_version):
         """
         버전이 일치하지 않으면 ConflictError 발생.
-        수정/배정/배정해제 전에 호출.
+        조회 1회가 추가되므로 라우트는 쓰기 함수에 expected_version을 넘기는 방식을 사용.
         """
         if not self.check_site_version(site_id, expected_version):
-            current = self.get_site_version(site_id)
-            raise ConflictError(
-                f'데이터가 다른 사용자에 의해 수정되었습니다. '
-                f'현재 버전: {current}, 요청 버전: {expected_version}. 최신 데이터를 다시 조회한 뒤 시도하세요.'
-            )
+            raise version_conflict(site_id, self.get_site_version(site_id), expected_version)
 
 
 def get_sync_manager():
-    """DB 서비스(Supabase/Sheets) 인스턴스로 SyncManager 생성 (api 라우트에서 사용)"""
+    """DB 서비스(Supabase/Sheets) 인스턴스로 SyncManager 생성"""
     from api.services.db_service import get_db
     return SyncManager(get_db())
@@ -0,0 +1,69 @@
+"""
+요청 단위 Unit of Work (identity map) - flask.g에 보관
+
+- 같은 요청 안에서 현장/인력/자격증 단건 조회와 legacy_id → UUID 매핑을 1회만 수행
+  (라우트 검증용 조회 → 백엔드 쓰기의 ID 해석이 같은 결과를 재사용)
+- 쓰기가 끝나면(CachedBackend 쓰기) 엔티티는 비움 (이후 조회는 최신값). UUID 매핑은 바뀌지 않으므로 유지
+- 요청 컨텍스트 밖(Streamlit Supabase 직접 모드, 스크립트)에서는 current_uow()가 None → 기존대로 조회
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class UnitOfWork:
+    """요청 1건 동안의 엔티티/UUID identity map"""
+
+    def __init__(self):
+        self._entities: Dict[Tuple[str, str], Any] = {}
+        self._uuids: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def _key(table: str, entity_id) -> Tuple[str, str]:
+        return table, str(entity_id or '').strip()
+
+    def load(self, table: str, entity_id, loader: Callable[[Any], Any]):
+        """엔티티 조회 (요청 안에서 같은 ID는 loader 1회). 없는 엔티티(None)도 기억"""
+        key = self._key(table, entity_id)
+        if key not in self._entities:
+            self._entities[key] = loader(entity_id)
+        return self._entities[key]
+
+    def peek(self, table: str, entity_id) -> Tuple[bool, Any]:
+        """(조회한 적 있는지, 엔티티). loader는 호출하지 않음"""
+        key = self._key(table, entity_id)
+        return key in self._entities, self._entities.get(key)
+
+    def forget(self, table: Optional[str] = None, entity_id=None) -> None:
+        """쓰기 후 엔티티 제거 (table 없으면 전체)"""
+        if table is None:
+            self._entities.clear()
+        else:
+            self._entities.pop(self._key(table, entity_id), None)
+
+    def uuid(self, table: str, entity_id) -> Optional[str]:
+        return self._uuids.get(self._key(table, entity_id))
+
+    def remember_uuid(self, table: str, entity_id, row_uuid: Optional[str]) -> None:
+        """legacy_id(또는 UUID) → UUID 기록. UUID 자신으로도 찾을 수 있게 함께 기록"""
+        if entity_id and row_uuid:
+            self._uuids[self._key(table, entity_id)] = row_uuid
+            self._uuids[self._key(table, row_uuid)] = row_uuid
+
+
+def current_uow() -> Optional[UnitOfWork]:
+    """현재 요청의 UnitOfWork (flask.g, 첫 사용 시 생성). 요청 밖이거나 Flask 미설치면 None"""
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    uow = g.get('uow')
+    if uow is None:
+        uow = g.uow = UnitOfWork()
+    return uow
+
+
+def load(table: str, entity_id, loader: Callable[[Any], Any]):
+    """요청 안이면 identity map 경유, 밖이면 loader 직접 호출"""
+    uow = current_uow()
+    return uow.load(table, entity_id, loader) if uow is not None else loader(entity_id)
@@ -70,6 +70,36 @@ def validate_certificate_data(data, is_update=False):
     return True
 
 
+def validate_personnel_data(data, is_update=False):
+    """인력 데이터 검증 (인력풀 저장용)"""
+    errors = []
+
+    if not is_update:
+        if not str(data.get('성명', '') or '').strip():
+            errors.append('성명은 필수 입력 항목입니다')
+
+    if '현재상태' in data and data['현재상태']:
+        valid = ('투입가능', '투입중', '휴가', '퇴사')
+        if data['현재상태'] not in valid:
+            errors.append(f'현재상태는 {", ".join(valid)} 중 하나여야 합니다')
+
+    if '현재담당현장수' in data and str(data.get('현재담당현장수') or '').strip():
+        try:
+            int(str(data['현재담당현장수']).strip())
+        except ValueError:
+            errors.append('현재담당현장수는 숫자여야 합니다')
+
+    if '입사일' in data and data.get('입사일'):
+        try:
+            datetime.strptime(str(data['입사일']).strip()[:10], '%Y-%m-%d')
+        except ValueError:
+            errors.append('입사일은 YYYY-MM-DD 형식이어야 합니다')
+
+    if errors:
+        raise ValidationError('; '.join(errors))
+    return True
+
+
 def validate_assignment(site, manager, certificate):
     """배정 가능 여부 검증"""
     errors = []
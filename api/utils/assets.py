@@ -0,0 +1,169 @@
+"""
+정적 파일(css/js/ui) 파이프라인 - 내용 해시 URL + 사전 압축
+- 시작 시 1회: 파일별 내용 해시(12자리) → 지문 URL (css/style.css → /css/style.<해시>.css)
+- 텍스트 파일은 gzip(+ brotli 패키지가 있으면 br)으로 미리 압축해 메모리에 보관, Accept-Encoding으로 선택
+- 지문 URL: Cache-Control immutable (1년) → 재방문 시 자산 요청 0회
+- 원래 URL: no-cache + ETag(내용 해시) → 바뀌지 않았으면 304
+- site-management.html의 css/js 참조를 지문 URL로 바꿔 제공 (HTML 자체는 no-cache + ETag)
+
+환경 변수:
+- ASSET_CHECK_INTERVAL=0 → 원본 파일 변경 확인 간격(초). 0이면 시작 시 1회만 (개발 중에는 2 등)
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from api.utils.compression import available_encodings, choose_encoding, compress
+
+ASSET_CHECK_INTERVAL = float(os.getenv('ASSET_CHECK_INTERVAL', '0') or 0)
+ASSET_DIRS = ('css', 'js', 'ui')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# 미리 압축할 텍스트 형식 (이미지 등은 원본만)
+COMPRESSIBLE = {'.css', '.js', '.html', '.htm', '.svg', '.json', '.md', '.txt', '.sql', '.map'}
+MIN_COMPRESS_SIZE = 256
+
+# href="css/a.css", src="/js/b.js" (외부 URL/쿼리 붙은 참조는 그대로)
+_REF_PATTERN = re.compile(r'''((?:href|src)=["'])/?((?:css|js|ui)/[^"'?#]+)(["'])''')
+
+
+class Asset:
+    """파일 1개: 원본 + 미리 압축한 본문, 해시, 형식"""
+    __slots__ = ('path', 'url', 'etag', 'mimetype', 'bodies')
+
+    def __init__(self, path: str, data: bytes):
+        self.path = path
+        digest = hashlib.sha256(data).hexdigest()
+        self.etag = digest[:24]
+        stem, ext = os.path.splitext(path)
+        self.url = f'/{stem}.{digest[:12]}{ext}'
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.mimetype.startswith('text/') or self.mimetype in ('application/javascript', 'image/svg+xml'):
+            self.mimetype += '; charset=utf-8'
+        self.bodies = compress_variants(data, ext.lower() in COMPRESSIBLE)
+
+    def body(self, accept_encoding: str):
+        """(본문, Content-Encoding 또는 None). br > gzip > 원본"""
+        encoding = choose_encoding(accept_encoding, [e for e in ('br', 'gzip') if e in self.bodies])
+        return self.bodies[encoding or 'identity'], encoding
+
+
+def compress_variants(data: bytes, compressible: bool = True) -> Dict[str, bytes]:
+    """{'identity', 'gzip', 'br'} 본문. 원본보다 작을 때만 압축본 보관"""
+    bodies = {'identity': data}
+    if not compressible or len(data) < MIN_COMPRESS_SIZE:
+        return bodies
+    # 시작 시 1회이므로 최고 압축률
+    for encoding in available_encodings():
+        body = compress(data, encoding, level=9, quality=11)
+        if len(body) < len(data):
+            bodies[encoding] = body
+    return bodies
+
+
+class AssetManifest:
+    """프로젝트 정적 파일 목록. 원래 경로/지문 경로 → Asset"""
+
+    def __init__(self, root: str, dirs=ASSET_DIRS):
+        self.root = root
+        self.dirs = dirs
+        self._by_path: Dict[str, Asset] = {}
+        self._by_url: Dict[str, Asset] = {}
+        self._html: Dict[str, Asset] = {}
+        self._mtimes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.checked_at = 0.0
+        self.build()
+
+    def _scan(self) -> Dict[str, tuple]:
+        """경로 → (mtime, 크기)"""
+        mtimes = {}
+        for folder in self.dirs:
+            base = os.path.join(self.root, folder)
+            for dirpath, _, filenames in os.walk(base):
+                for filename in filenames:
+                    full = os.path.join(dirpath, filename)
+                    rel = os.path.relpath(full, self.root).replace(os.sep, '/')
+                    try:
+                        st = os.stat(full)
+                        mtimes[rel] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        pass
+        return mtimes
+
+    def build(self) -> None:
+        """전체 파일 해시/압축 (시작 시, 또는 변경 감지 시)"""
+        mtimes = self._scan()
+        by_path, by_url = {}, {}
+        for rel in sorted(mtimes):
+            with open(os.path.join(self.root, rel), 'rb') as f:
+                asset = Asset(rel, f.read())
+            by_path[rel] = asset
+            by_url[asset.url.lstrip('/')] = asset
+        with self._lock:
+            self._by_path, self._by_url, self._mtimes = by_path, by_url, mtimes
+            self._html.clear()
+            self.checked_at = time.monotonic()
+
+    def refresh(self, interval: float = ASSET_CHECK_INTERVAL) -> None:
+        """interval > 0이면 그 간격마다 mtime 비교 후 바뀌었으면 다시 빌드"""
+        if interval <= 0 or time.monotonic() - self.checked_at < interval:
+            return
+        if self._scan() != self._mtimes:
+            self.build()
+        else:
+            self.checked_at = time.monotonic()
+
+    def lookup(self, path: str):
+        """요청 경로(css/style.<해시>.css 또는 css/style.css) → (Asset, 지문 URL 여부). 없으면 (None, False)"""
+        path = path.lstrip('/')
+        asset = self._by_url.get(path)
+        if asset is not None:
+            return asset, True
+        return self._by_path.get(path), False
+
+    def url(self, path: str) -> str:
+        """원래 경로 → 지문 URL (목록에 없으면 원래 경로)"""
+        asset = self._by_path.get(path.lstrip('/'))
+        return asset.url if asset else '/' + path.lstrip('/')
+
+    def rewrite_html(self, html: str) -> str:
+        """HTML의 css/js/ui 참조를 지문 URL로 교체"""
+        def _replace(match):
+            asset = self._by_path.get(match.group(2))
+            return f'{match.group(1)}{asset.url}{match.group(3)}' if asset else match.group(0)
+        return _REF_PATTERN.sub(_replace, html)
+
+    def html_page(self, filename: str) -> Optional[Asset]:
+        """참조를 지문 URL로 바꾼 HTML (압축본 포함, 자산 목록을 다시 빌드할 때까지 보관)"""
+        with self._lock:
+            page = self._html.get(filename)
+        if page is not None:
+            return page
+        full = os.path.join(self.root, filename)
+        if not os.path.isfile(full):
+            return None
+        with open(full, 'r', encoding='utf-8') as f:
+            html = self.rewrite_html(f.read())
+        page = Asset(filename, html.encode('utf-8'))
+        with self._lock:
+            self._html[filename] = page
+        return page
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest(root: str) -> AssetManifest:
+    """프로세스 공유 목록 (첫 호출 시 빌드, ASSET_CHECK_INTERVAL마다 변경 확인)"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None or _manifest.root != root:
+            _manifest = AssetManifest(root)
+            return _manifest
+    _manifest.refresh()
+    return _manifest
@@ -0,0 +1,92 @@
+"""
+목록 API 열 기반(columnar) 응답 (?format=columnar, 선택: Accept: application/x-msgpack)
+- 행마다 반복되는 한글 키 대신 열 이름 1회 + 열별 값 배열
+- 값 종류가 적은 문자열 열(회사구분, 현장상태, 배정상태 등)은 사전 인코딩: 고유값 목록 + 정수 코드 (None은 -1)
+- msgpack 패키지가 있고 Accept에 application/x-msgpack이 있으면 같은 구조를 MessagePack으로 전송
+  (Accept만 보내도 columnar로 응답. msgpack이 없으면 columnar JSON)
+
+data 구조:
+    {"columns": [열 이름...], "length": 행 수,
+     "values": [[열0 값...], [열1 값...], ...],
+     "dictionaries": {"회사구분": ["더존종합건설", ...]}}   # 이 열의 values는 코드
+"""
+from typing import Dict, List
+
+from flask import Response, jsonify, request
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 columnar JSON만
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+COLUMNAR_FORMAT = 'columnar'
+# 사전 인코딩 조건: 고유값 수가 이 값 이하이고 행 수의 절반 이하
+DICT_MAX_CARDINALITY = 256
+
+
+def wants_msgpack() -> bool:
+    return msgpack is not None and MSGPACK_MIMETYPE in (request.headers.get('Accept') or '')
+
+
+def wants_columnar() -> bool:
+    """?format=columnar 또는 (msgpack 사용 가능 시) Accept: application/x-msgpack"""
+    return (request.args.get('format') or '').lower() == COLUMNAR_FORMAT or wants_msgpack()
+
+
+def wire_format() -> str:
+    """응답 표현 이름 (ETag 변형 구분용): msgpack / columnar / json"""
+    if wants_msgpack():
+        return 'msgpack'
+    return COLUMNAR_FORMAT if wants_columnar() else 'json'
+
+
+def _dictionary(values: List) -> List:
+    """사전 인코딩할 열이면 고유값 목록(등장 순), 아니면 None"""
+    seen = {}
+    for value in values:
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            return None
+        if value not in seen:
+            if len(seen) >= DICT_MAX_CARDINALITY:
+                return None
+            seen[value] = len(seen)
+    if not seen or len(seen) * 2 > len(values):
+        return None
+    return list(seen)
+
+
+def encode_columns(rows: List[Dict]) -> Dict:
+    """행 dict 목록 → 열 기반 구조. 열 순서는 처음 등장한 순서, 없는 키는 None"""
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    columns = list(columns)
+    values, dictionaries = [], {}
+    for column in columns:
+        col = [row.get(column) for row in rows]
+        dictionary = _dictionary(col)
+        if dictionary is not None:
+            codes = {value: i for i, value in enumerate(dictionary)}
+            col = [-1 if value is None else codes[value] for value in col]
+            dictionaries[column] = dictionary
+        values.append(col)
+    return {'columns': columns, 'length': len(rows), 'values': values, 'dictionaries': dictionaries}
+
+
+def list_response(body: Dict):
+    """목록 응답. 요청이 columnar/msgpack이면 body['data'](행 목록)를 열 기반으로 바꿔 전송"""
+    if not wants_columnar():
+        response = jsonify(body)
+    else:
+        body = dict(body, data=encode_columns(body.get('data') or []), format=COLUMNAR_FORMAT)
+        if wants_msgpack():
+            response = Response(msgpack.packb(body, use_bin_type=True, default=str), mimetype=MSGPACK_MIMETYPE)
+        else:
+            response = jsonify(body)
+    # 같은 URL이라도 Accept에 따라 표현이 달라짐
+    response.vary.add('Accept')
+    return response
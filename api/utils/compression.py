@@ -0,0 +1,91 @@
+"""
+응답 압축 (Accept-Encoding 협상) - /api JSON 응답, 정적 파일 공용
+- /api/* JSON(열 기반 msgpack 포함) 응답이 COMPRESS_MIN_SIZE 이상이면 br(brotli 설치 시) > gzip 순으로 압축
+- 작은 응답, 스트리밍(NDJSON/SSE), 이미 인코딩된 응답, 304/HEAD는 그대로
+- 압축 시 Vary: Accept-Encoding, 강한 ETag는 약한 ETag(W/)로 전환
+  (압축본/원본은 의미상 같은 표현 → If-None-Match 약한 비교로 304 유지)
+- 클라이언트: requests(Streamlit)/httpx(agent)는 Accept-Encoding 전송과 해제를 기본으로 처리
+
+환경 변수:
+- COMPRESS_MIN_SIZE=1024 → 이 크기(바이트) 미만 응답은 압축 안 함
+- COMPRESS_LEVEL=6       → gzip 압축 수준 (1~9, 0이면 API 응답 압축 끔)
+- BROTLI_QUALITY=4       → brotli 품질 (0~11, 동적 응답은 낮은 값이 CPU 대비 유리)
+"""
+import gzip
+import os
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024') or 0)
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6') or 0)
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4') or 0)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-msgpack')
+
+
+def available_encodings() -> tuple:
+    """서버가 만들 수 있는 인코딩 (선호 순)"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encodings(header: str) -> set:
+    """Accept-Encoding → q>0인 인코딩 집합"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+    return accepted
+
+
+def choose_encoding(header: str, available: Iterable[str]) -> Optional[str]:
+    """available(선호 순) 중 클라이언트가 받는 첫 인코딩. 없으면 None(원본)"""
+    accepted = accepted_encodings(header)
+    for encoding in available:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: int = COMPRESS_LEVEL, quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_response(response, request):
+    """/api JSON 응답 압축 (after_request). 조건에 맞지 않으면 그대로 반환"""
+    if (COMPRESS_LEVEL <= 0 or request.method == 'HEAD' or response.status_code < 200
+            or response.status_code in (204, 304) or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    # 압축 여부와 무관하게 표현이 Accept-Encoding에 따라 달라짐 (공유 캐시 구분)
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), available_encodings())
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    body = compress(data, encoding)
+    if len(body) >= len(data):
+        return response
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,33 @@
+"""
+조건부 GET (ETag / If-None-Match → 304 Not Modified)
+- ETag = 요청 URL(경로+쿼리) + 응답 형식 + 관련 테이블 컬렉션 버전의 해시
+- 컬렉션 버전은 db.collection_versions() (Supabase: 행 수 + max(updated_at), Sheets: 시트 내용 해시 + 쓰기 횟수)
+- 버전이 그대로면 뷰를 실행하지 않고 헤더만 응답
+"""
+import hashlib
+from typing import Dict, Optional, Tuple
+
+ALL_TABLES = ('sites', 'personnel', 'certificates')
+
+# 경로 접두사 → 응답 내용이 의존하는 테이블
+# (현장 응답에는 소장/자격증 정보가, 자격증 응답에는 소유자 정보가 포함됨)
+ETAG_RESOURCES = (
+    ('/api/sites', ALL_TABLES),
+    ('/api/personnel', ('personnel',)),
+    ('/api/certificates', ('certificates', 'personnel')),
+    ('/api/stats', ALL_TABLES),
+)
+
+
+def resource_tables(path: str) -> Optional[Tuple[str, ...]]:
+    """ETag 대상 경로면 의존 테이블, 아니면 None"""
+    for prefix, tables in ETAG_RESOURCES:
+        if path == prefix or path.startswith(prefix + '/'):
+            return tables
+    return None
+
+
+def make_etag(full_path: str, variant: str, versions: Dict[str, str]) -> str:
+    """강한 ETag 값 (따옴표 제외)"""
+    raw = '|'.join([full_path, variant] + [f'{t}={versions[t]}' for t in sorted(versions)])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
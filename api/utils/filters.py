@@ -0,0 +1,30 @@
+"""
+목록 API 쿼리 필터 → 행 판별 함수
+(Sheets/캐시 경로에서 Python으로 적용. Supabase는 같은 조건을 서버 필터로 변환)
+"""
+from typing import Callable, Dict, Optional
+
+
+def site_filter(company: Optional[str] = None, status: Optional[str] = None,
+                state: Optional[str] = None) -> Callable[[Dict], bool]:
+    def match(s: Dict) -> bool:
+        return ((not company or s.get('회사구분') == company)
+                and (not status or s.get('배정상태') == status)
+                and (not state or s.get('현장상태') == state))
+    return match
+
+
+def personnel_filter(status: Optional[str] = None, role: Optional[str] = None) -> Callable[[Dict], bool]:
+    def match(p: Dict) -> bool:
+        return (not status or p.get('현재상태') == status) and (not role or p.get('직책') == role)
+    return match
+
+
+def certificate_filter(available: Optional[str] = None) -> Callable[[Dict], bool]:
+    def match(c: Dict) -> bool:
+        if available == 'true':
+            return c.get('사용가능여부') == '사용가능'
+        if available == 'false':
+            return c.get('사용가능여부') != '사용가능'
+        return True
+    return match
@@ -0,0 +1,84 @@
+"""
+커서(키셋) 페이지네이션 유틸
+- 커서 = (정렬키, ID) 쌍을 JSON → base64url로 감싼 불투명 문자열
+- 정렬은 (정렬키 DESC, ID DESC). 다음 페이지는 "마지막 행보다 작은 키"부터 조회
+- Supabase 커서 값은 PostgREST 필터 문자열에 들어가므로 형식(ISO 시각, UUID)을 검사 (check_timestamp_uuid)
+"""
+import base64
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+_UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# 스트리밍 조회(iter_*) 시 백엔드에서 한 번에 읽는 행 수
+STREAM_PAGE_SIZE = int(os.getenv('STREAM_PAGE_SIZE', '500') or 500)
+
+
+class CursorError(ValueError):
+    """잘못된 커서 (400 INVALID_CURSOR)"""
+
+
+def encode_cursor(sort_key: Any, row_id: Any) -> str:
+    raw = json.dumps([str(sort_key or ''), str(row_id or '')], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def check_timestamp_uuid(sort_key: str, row_id: str) -> None:
+    """(created_at, id) 커서 값 검사: ISO 8601 시각 + UUID. 아니면 ValueError"""
+    datetime.fromisoformat(sort_key.replace('Z', '+00:00'))
+    if not _UUID_PATTERN.match(row_id):
+        raise ValueError(f'UUID 형식 아님: {row_id!r}')
+
+
+def decode_cursor(cursor: Optional[str],
+                  check: Optional[Callable[[str, str], None]] = None) -> Optional[Tuple[str, str]]:
+    """빈 커서는 None(첫 페이지). 형식이 잘못되었거나 check(정렬키, ID)가 실패하면 CursorError"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        sort_key, row_id = str(sort_key), str(row_id)
+        if check is not None:
+            check(sort_key, row_id)
+        return sort_key, row_id
+    except Exception:
+        raise CursorError('잘못된 커서입니다. 이전 응답의 next_cursor를 그대로 전달하세요.')
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit <= 0:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(rows: List[dict], key: Callable[[dict], Tuple[str, str]],
+                cursor: Optional[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """
+    인메모리 행 목록용 키셋 페이지 (Sheets 백엔드).
+    rows를 key 내림차순으로 정렬한 뒤 커서 위치를 이진 탐색.
+    반환: (페이지 행, next_cursor 또는 None)
+    """
+    after = decode_cursor(cursor)
+    ordered = sorted(rows, key=key, reverse=True)
+    start = 0
+    if after is not None:
+        # 내림차순 목록에서 key < after 인 첫 위치
+        lo, hi = 0, len(ordered)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(ordered[mid]) < after:
+                hi = mid
+            else:
+                lo = mid + 1
+        start = lo
+    page = ordered[start:start + limit]
+    next_cursor = None
+    if start + limit < len(ordered) and page:
+        next_cursor = encode_cursor(*key(page[-1]))
+    return page, next_cursor
@@ -0,0 +1,55 @@
+"""
+NDJSON 스트리밍 응답 유틸 (목록 API의 ?stream=1 / Accept: application/x-ndjson)
+- 한 줄에 행 1개(JSON). 백엔드 iter_* 제너레이터를 그대로 흘려보내 메모리 사용량이 테이블 크기와 무관
+- 첫 행은 응답 시작 전에 미리 읽어, 조회 자체가 실패하면 일반 JSON 오류(5xx)로 응답
+- 스트림 도중 오류는 마지막 줄에 {"success": false, "error": {...}} 로 전달
+"""
+import json
+from typing import Dict, Iterable, Iterator
+
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# 이 크기만큼 모아서 전송 (행마다 write하지 않음). 첫 행은 즉시 전송
+STREAM_FLUSH_BYTES = 32 * 1024
+
+_END = object()
+
+
+def wants_stream() -> bool:
+    """?stream=1 또는 Accept 헤더에 application/x-ndjson"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return NDJSON_MIMETYPE in (request.headers.get('Accept') or '')
+
+
+def _line(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def ndjson_response(rows: Iterable[Dict]) -> Response:
+    """행 이터러블 → NDJSON 스트리밍 응답. 첫 행 조회 오류는 호출자에게 그대로 전파"""
+    it = iter(rows)
+    first = next(it, _END)
+
+    def generate() -> Iterator[str]:
+        if first is _END:
+            return
+        yield _line(first)
+        buf, size = [], 0
+        try:
+            for row in it:
+                line = _line(row)
+                buf.append(line)
+                size += len(line)
+                if size >= STREAM_FLUSH_BYTES:
+                    yield ''.join(buf)
+                    buf, size = [], 0
+        except Exception as e:
+            buf.append(_line({'success': False, 'error': {'code': 'STREAM_ERROR', 'message': str(e)}}))
+        if buf:
+            yield ''.join(buf)
+
+    response = Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+    response.headers['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 해제 (첫 바이트 즉시 전달)
+    return response
@@ -0,0 +1,70 @@
+"""
+CSV/JSON 대량 가져오기 (현장/인력/자격증)
+프로젝트 루트에서 실행:
+  python import_data.py sites 현장정보_샘플데이터.csv
+  python import_data.py personnel 인력풀_샘플데이터.csv --dry-run
+  python import_data.py certificates certs.ndjson --chunk-size 1000
+
+.env의 DB_BACKEND(supabase/sheets) 설정을 그대로 사용. 기존 ID와 중복된 행은 건너뜀.
+"""
+import argparse
+import os
+import sys
+
+root = os.path.dirname(os.path.abspath(__file__))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from api.services.db_service import get_db
+from api.services.import_service import (
+    FORMATS,
+    IMPORT_KINDS,
+    ImportRequestError,
+    detect_format,
+    import_records,
+    read_records,
+)
+
+
+def _progress(result):
+    print(f"  청크 {result['chunks']}: {result['inserted']}행 저장 "
+          f"(읽음 {result['total']}, 중복 {result['skipped']}, 오류 {result['failed']}, {result['elapsed_ms']}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV/JSON 대량 가져오기')
+    parser.add_argument('kind', choices=list(IMPORT_KINDS), help='가져올 데이터 종류')
+    parser.add_argument('path', help='CSV 또는 JSON/NDJSON 파일 경로')
+    parser.add_argument('--format', choices=FORMATS, help='파일 형식 (기본: 확장자로 판단)')
+    parser.add_argument('--chunk-size', type=int, help='청크당 행 수 (기본: IMPORT_CHUNK_SIZE)')
+    parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 검증/중복 검사만')
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    print(f"가져오기: {args.kind} ← {args.path} ({fmt}{', dry-run' if args.dry_run else ''})")
+    try:
+        with open(args.path, encoding='utf-8-sig', newline='') as f:
+            result = import_records(get_db(), args.kind, read_records(f, fmt), chunk_size=args.chunk_size,
+                                    dry_run=args.dry_run, on_progress=_progress)
+    except (OSError, ImportRequestError, ValueError) as e:
+        print(f"오류: {e}")
+        sys.exit(1)
+
+    print()
+    print(f"완료: 읽음 {result['total']}, 저장 {result['inserted']}, 중복 {result['skipped']}, "
+          f"오류 {result['failed']} ({result['elapsed_ms']}ms)")
+    for err in result['errors']:
+        print(f"  {err['row']}행 [{err['code']}] {err['id']}: {err['message']}")
+    hidden = result['skipped'] + result['failed'] - len(result['errors'])
+    if hidden > 0:
+        print(f"  ... 외 {hidden}건")
+    if result['aborted']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -45,6 +45,8 @@ const API = {
         UI.showLoading();
         try {
             const res = await fetch(url, {
+                // GET은 브라우저 캐시에 저장하되 매번 ETag로 재검증 (변경 없으면 304, 본문 전송 없음)
+                ...(method === 'GET' ? { cache: 'no-cache' } : {}),
                 ...options,
                 headers: {
                     'Content-Type': 'application/json',
@@ -116,8 +118,8 @@ const API = {
 
     async updateSite(siteId, updateData) {
         const headers = {};
-        if (updateData.version) {
-            headers['If-Match'] = updateData.version;
+        if (updateData.version != null) {
+            headers['If-Match'] = String(updateData.version);
         }
         return await this.request(`/sites/${encodeURIComponent(siteId)}`, {
             method: 'PUT',
@@ -130,9 +132,11 @@ const API = {
         const body = {};
         if (assignData.담당소장ID) body.manager_id = assignData.담당소장ID;
         if (assignData.사용자격증ID) body.certificate_id = assignData.사용자격증ID;
-        if (assignData.version) body.version = assignData.version;
         const headers = {};
-        if (assignData.version) headers['If-Match'] = assignData.version;
+        if (assignData.version != null) {
+            body.version = assignData.version;
+            headers['If-Match'] = String(assignData.version);
+        }
         return await this.request(`/sites/${encodeURIComponent(siteId)}/assign`, {
             method: 'POST',
             headers,
@@ -141,8 +145,8 @@ const API = {
     },
 
     async unassignManager(siteId, version) {
-        const body = version ? { version } : {};
-        const headers = version ? { 'If-Match': version } : {};
+        const body = version != null ? { version } : {};
+        const headers = version != null ? { 'If-Match': String(version) } : {};
         return await this.request(`/sites/${encodeURIComponent(siteId)}/unassign`, {
             method: 'POST',
             headers,
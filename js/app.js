@@ -123,7 +123,11 @@ const App = {
         this.bindEvents();
         renderSkeletonList();
         await this.loadAll();
-        if (CONFIG.AUTO_REFRESH_INTERVAL > 0) {
+        // 실시간 이벤트 우선, 사용 불가(Supabase 직접 모드 등) 시에만 주기 새로고침
+        if (typeof LiveEvents !== 'undefined' && LiveEvents.start()) {
+            LiveEvents.on((event) => this.onLiveEvent(event));
+            LiveEvents.on((event) => Dashboard.onLiveEvent(event));
+        } else if (CONFIG.AUTO_REFRESH_INTERVAL > 0) {
             setInterval(() => this.loadAll(), CONFIG.AUTO_REFRESH_INTERVAL);
         }
         const lastEl = document.getElementById('lastUpdated');
@@ -137,6 +141,27 @@ const App = {
         if (lastEl) lastEl.textContent = new Date().toLocaleTimeString('ko-KR');
     },
 
+    /** 실시간 이벤트: 현장 목록/열린 상세 패널만 다시 조회 (연속 이벤트는 묶어서 1회) */
+    onLiveEvent(event) {
+        const tables = event.tables || [];
+        if (!tables.includes('sites')) return;
+        if (!this._reloadLive) {
+            this._reloadLive = LiveEvents.debounce(async (siteIds) => {
+                await this.loadSites();
+                const current = SiteDetail.currentSite;
+                const currentId = current ? (current['현장ID'] || current.id) : null;
+                if (currentId && (siteIds.has(currentId) || siteIds.has(null))) await SiteDetail.open(currentId);
+                this._liveSiteIds = new Set();
+                const lastEl = document.getElementById('lastUpdated');
+                if (lastEl) lastEl.textContent = new Date().toLocaleTimeString('ko-KR');
+            });
+            this._liveSiteIds = new Set();
+        }
+        // 현장 이벤트가 아니면(인력 수정 등) 열린 상세도 갱신 대상
+        this._liveSiteIds.add(event.type.startsWith('site.') ? event.entity_id : null);
+        this._reloadLive(this._liveSiteIds);
+    },
+
     async loadSites() {
         const filters = Filter.currentFilters;
         const apiCompany = DISPLAY_MAP.companyReverse[filters.company] || '';
@@ -260,7 +285,7 @@ const App = {
             현장상태: document.getElementById('editState')?.value || '건축허가',
             특이사항: document.getElementById('editNotes')?.value?.trim() || '',
         };
-        if (SiteDetail.currentSite && SiteDetail.currentSite.version) {
+        if (SiteDetail.currentSite && SiteDetail.currentSite.version != null) {
             updateData.version = SiteDetail.currentSite.version;
         }
         const res = await DataAPI.updateSite(siteId, updateData);
@@ -124,8 +124,8 @@ const Assign = {
             담당소장ID: this.selectedManagerId,
             사용자격증ID: this.selectedCertId,
         };
-        const version = (SiteDetail.currentSite && SiteDetail.currentSite['현장ID'] === this.targetSiteId) ? SiteDetail.currentSite.version : (this.siteDetail?.version || null);
-        if (version) assignData.version = version;
+        const version = (SiteDetail.currentSite && SiteDetail.currentSite['현장ID'] === this.targetSiteId) ? SiteDetail.currentSite.version : (this.siteDetail?.version ?? null);
+        if (version != null) assignData.version = version;
         try {
             const res = await DataAPI.assignManager(this.targetSiteId, assignData);
             if (res) {
@@ -147,7 +147,7 @@ const Assign = {
             btnUnassign.textContent = '처리 중...';
         }
         let version = (SiteDetail.currentSite && SiteDetail.currentSite['현장ID'] === siteId) ? SiteDetail.currentSite.version : null;
-        if (!version && this.siteDetail && this.siteDetail['현장ID'] === siteId) version = this.siteDetail.version;
+        if (version == null && this.siteDetail && this.siteDetail['현장ID'] === siteId) version = this.siteDetail.version;
         try {
             const res = await DataAPI.unassignManager(siteId, version);
             if (res) {
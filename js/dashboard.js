@@ -5,10 +5,11 @@
 const Dashboard = {
     activeTabId: null,
 
-    async load() {
-        this.showSkeleton();
+    /** options.silent: 실시간 갱신 시 스켈레톤 없이 값만 교체 */
+    async load(options = {}) {
+        if (!options.silent) this.showSkeleton();
         const data = await DataAPI.getStats();
-        this.hideSkeleton();
+        if (!options.silent) this.hideSkeleton();
         if (!data) return;
         const sites = data.sites || {};
         const personnel = data.personnel || {};
@@ -46,6 +47,13 @@ const Dashboard = {
         this.initTabs();
     },
 
+    /** 실시간 이벤트: 통계가 바뀌는 이벤트면 조용히 다시 조회 (연속 이벤트는 묶어서 1회) */
+    onLiveEvent(event) {
+        if (!(event.tables || []).length) return;
+        if (!this._reloadLive) this._reloadLive = LiveEvents.debounce(() => this.load({ silent: true }), 500);
+        this._reloadLive();
+    },
+
     /** 회사별·현장상태별 요약 스트립 (전체 현황 한눈에) */
     renderSummaryStrip(byCompany, byState) {
         const el = document.getElementById('summaryStrip');
@@ -84,6 +92,9 @@ const Dashboard = {
     },
 
     initTabs() {
+        // load()마다 호출되므로 리스너는 1회만 등록 (실시간 갱신 시 중복 방지)
+        if (this._tabsBound) return;
+        this._tabsBound = true;
         const tabs = document.querySelectorAll('.stat-card.stat-tab');
         tabs.forEach((tab) => {
             // 클릭 이벤트
@@ -0,0 +1,72 @@
+/**
+ * 실시간 이벤트 모듈 - GET /api/events (Server-Sent Events)
+ * 배정/해제/수정 완료 시 서버가 보내는 이벤트를 등록된 핸들러에 전달
+ * 끊기면 EventSource가 자동 재연결하고, 서버가 Last-Event-ID 이후 이벤트를 재전송
+ * CONFIG, 전역 객체 사용 (config.js 로드 후)
+ */
+const LiveEvents = {
+    TYPES: [
+        'site.created', 'site.updated', 'site.assigned', 'site.unassigned',
+        'personnel.created', 'personnel.updated',
+        'certificate.created', 'certificate.updated',
+        'import.completed', 'resync',
+    ],
+    source: null,
+    handlers: [],
+    connected: false,
+
+    /** 이벤트 핸들러 등록. handler(event) - event: {type, entity_id, tables, ts, ...} */
+    on(handler) {
+        this.handlers.push(handler);
+    },
+
+    /** 연결 시작. Flask 모드 + EventSource 지원 시 true (false면 호출 측에서 주기 새로고침 사용) */
+    start() {
+        if (this.source) return true;
+        if (!CONFIG.LIVE_UPDATES || CONFIG.API_MODE !== 'flask' || typeof EventSource === 'undefined') {
+            return false;
+        }
+        const source = new EventSource(`${CONFIG.API_BASE_URL}/events`);
+        const dispatch = (e) => {
+            let event;
+            try {
+                event = JSON.parse(e.data);
+            } catch {
+                return;
+            }
+            this.handlers.forEach((handler) => {
+                try {
+                    handler(event);
+                } catch (err) {
+                    if (CONFIG.DEBUG) console.warn('[LiveEvents] 핸들러 오류', err);
+                }
+            });
+        };
+        this.TYPES.forEach((type) => source.addEventListener(type, dispatch));
+        source.onopen = () => {
+            this.connected = true;
+            if (CONFIG.DEBUG) console.log('📡 실시간 이벤트 연결됨');
+        };
+        source.onerror = () => {
+            // 재연결은 EventSource가 retry 간격으로 자동 처리
+            this.connected = false;
+        };
+        this.source = source;
+        return true;
+    },
+
+    stop() {
+        if (this.source) this.source.close();
+        this.source = null;
+        this.connected = false;
+    },
+
+    /** 연속 이벤트를 delay(ms) 동안 모아 fn 1회 실행하는 함수 반환 */
+    debounce(fn, delay = 300) {
+        let timer = null;
+        return (...args) => {
+            clearTimeout(timer);
+            timer = setTimeout(() => fn(...args), delay);
+        };
+    },
+};
@@ -109,6 +109,9 @@ const SupabaseAPI = {
             '배정상태': site.assignment_status || '미배정',
             '등록일': site.created_at?.split('T')[0] || '',
             '수정일': site.updated_at?.split('T')[0] || '',
+            '버전': site.version != null ? String(site.version) : '',
+            // 낙관적 잠금용 행 버전 (마이그레이션 010)
+            version: site.version ?? null,
             // 원본 데이터
             _raw: site
         };
@@ -247,19 +250,21 @@ const SupabaseAPI = {
             if (updateData['현장상태']) updateObj.status = updateData['현장상태'];
             if (updateData['특이사항'] !== undefined) updateObj.notes = updateData['특이사항'];
 
-            const { data, error } = await client
+            let query = client
                 .from('sites')
                 .update(updateObj)
-                .or(`id.eq.${siteId},legacy_id.eq.${siteId}`)
-                .select()
-                .single();
+                .or(`id.eq.${siteId},legacy_id.eq.${siteId}`);
+            // 버전이 있으면 조건부 갱신 (다른 사용자가 먼저 수정했으면 0건)
+            if (updateData.version != null) query = query.eq('version', updateData.version);
+            const { data, error } = await query.select().single();
             
             UI.hideLoading();
             if (error) {
-                UI.showToast(error.message, 'error');
+                const conflict = updateData.version != null && error.code === 'PGRST116';
+                UI.showToast(conflict ? '다른 사용자가 먼저 수정했습니다. 최신 데이터를 다시 조회한 뒤 시도하세요.' : error.message, 'error');
                 return null;
             }
-            return { success: true, data };
+            return { success: true, data: { ...data, version: data?.version ?? null } };
         } catch (err) {
             UI.hideLoading();
             UI.showToast(err.message || '네트워크 오류', 'error');
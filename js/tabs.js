@@ -131,7 +131,7 @@ const Tabs = {
         document.getElementById('editTabCompletionDate').value = detail['준공일'] || '';
         document.getElementById('editTabState').value = detail['현장상태'] || '건축허가';
         document.getElementById('editTabNotes').value = detail['특이사항'] || '';
-        this._editTabSiteVersion = detail.version || '';
+        this._editTabSiteVersion = detail.version ?? null;
         if (form) form.style.display = 'block';
     },
 
@@ -139,7 +139,7 @@ const Tabs = {
         document.getElementById('editTabSiteSelect').value = '';
         document.getElementById('formSiteEdit').style.display = 'none';
         document.getElementById('formSiteEdit')?.reset();
-        this._editTabSiteVersion = '';
+        this._editTabSiteVersion = null;
     },
 
     async submitSiteEdit() {
@@ -156,11 +156,11 @@ const Tabs = {
             현장상태: document.getElementById('editTabState')?.value || '건축허가',
             특이사항: document.getElementById('editTabNotes')?.value?.trim() || '',
         };
-        if (this._editTabSiteVersion) updateData.version = this._editTabSiteVersion;
+        if (this._editTabSiteVersion != null) updateData.version = this._editTabSiteVersion;
         const res = await DataAPI.updateSite(siteId, updateData);
         if (res) {
             UI.showToast('현장 정보가 수정되었습니다.', 'success');
-            this._editTabSiteVersion = res.data?.version || this._editTabSiteVersion;
+            this._editTabSiteVersion = res.data?.version ?? this._editTabSiteVersion;
             if (typeof App !== 'undefined' && App.loadAll) await App.loadAll();
         }
     },
@@ -10,6 +10,7 @@ from streamlit_utils.cached_api import (
     get_personnel_cached,
 )
 
+from streamlit_utils.live_updates import render_live_updates
 from streamlit_utils.theme import apply_localhost_theme
 from streamlit_utils.components import (
     render_kpi_card,
@@ -87,6 +88,9 @@ if not is_connected and api_mode != 'supabase':
     아래 대시보드는 데이터 없음(0)으로 표시됩니다.
     """
     )
+elif is_connected:
+    # 다른 사용자의 배정/수정이 반영되면 자동으로 다시 그림 (SSE)
+    render_live_updates()
 
 # 통계 조회
 raw_stats, stats_err = get_stats_cached()
@@ -2,6 +2,7 @@
 현장 목록 - 고급 필터, 검색, 페이지네이션, 정렬, 인라인 액션
 200개 현장 대응: 페이지네이션, 정렬, 실시간 검색, 상태 시각화
 """
+import string
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
@@ -9,15 +10,17 @@ from streamlit_utils.cached_api import (
     get_sites_cached,
     search_sites_cached,
     get_site_cached,
-    get_personnel_cached,
-    get_certificates_cached,
+    get_data_model_cached,
     check_api_connection_cached,
     clear_sites_cache,
+    sync_changes,
 )
+from streamlit_utils.data_model import filter_sites
 from streamlit_utils.api_client import (
     assign_site,
     unassign_site,
 )
+from streamlit_utils.live_updates import render_live_updates
 from streamlit_utils.theme import apply_localhost_theme
 from streamlit_utils.components import render_status_badge
 from streamlit_utils.export import render_quick_export_buttons, prepare_sites_export
@@ -105,6 +108,10 @@ st.markdown("""
 # 세션 상태 초기화
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 1
+if 'page_cursors' not in st.session_state:
+    # page_cursors[i] = (i+1)페이지 시작 커서 ('' = 첫 페이지)
+    st.session_state.page_cursors = ['']
+    st.session_state.page_cursors_key = None
 if 'page_size' not in st.session_state:
     st.session_state.page_size = 20
 if 'sort_column' not in st.session_state:
@@ -131,6 +138,11 @@ if api_mode != 'supabase':
         st.error(f'API 연결 실패: {error_msg}')
         st.info('Flask 서버를 먼저 실행하세요: `python run_api.py`')
         st.stop()
+    # 다른 사용자의 배정/해제가 반영되면 자동으로 다시 그림 (SSE)
+    render_live_updates()
+
+# 현장/인력/자격증 목록을 첫 로드 때 동시에 받아 DataFrame 모델로 공유 (이후 필터·페이지 조회는 메모리에서)
+model, _ = get_data_model_cached()
 
 # ========== 쿼리 파라미터에서 필터 읽기 ==========
 query_params = st.query_params
@@ -212,8 +224,11 @@ with st.expander('고급 필터 (날짜 범위, 담당소장)', expanded=False):
     
     with adv_col1:
         # 담당소장명 필터를 위해 인력 목록 가져오기
-        personnel_list, _ = get_personnel_cached(role='소장')
-        manager_names = [''] + sorted(list(set([p.get('성명', '') for p in (personnel_list or []) if p.get('성명')])))
+        managers = model.filter_personnel(role='소장') if model is not None else None
+        manager_names = [''] + (
+            sorted(n for n in managers['성명'].dropna().unique() if n)
+            if managers is not None and '성명' in managers.columns else []
+        )
         selected_manager = st.selectbox(
             '담당소장명',
             manager_names,
@@ -260,27 +275,40 @@ if company == '' and status == '' and state == '' and selected_manager == '':
 # 페이지네이션 파라미터 계산
 page_size = st.session_state.page_size
 current_page = st.session_state.current_page
-offset = (current_page - 1) * page_size
 
 if st.session_state.search_query and st.session_state.search_query.strip():
     # 검색은 클라이언트 사이드 (검색 결과가 적을 것으로 예상)
     sites, err = search_sites_cached(st.session_state.search_query.strip())
     total_count = len(sites) if sites else 0
+    has_next_page = False
 else:
-    # 서버 사이드 페이지네이션 사용
+    # 커서(키셋) 페이지네이션: 페이지 위치와 무관하게 요청 비용 일정
+    # 필터/페이지 크기가 바뀌면 커서 스택 초기화
+    cursors_key = (company, status, state, page_size)
+    if st.session_state.page_cursors_key != cursors_key or current_page == 1:
+        st.session_state.page_cursors = ['']
+        st.session_state.page_cursors_key = cursors_key
+    if current_page > len(st.session_state.page_cursors):
+        current_page = st.session_state.current_page = len(st.session_state.page_cursors)
     result, err = get_sites_cached(
         company=company or None,
         status=status or None,
         state=state or None,
         limit=page_size,
-        offset=offset,
+        cursor=st.session_state.page_cursors[current_page - 1],
     )
     if not err and result:
         sites = result.get('data', [])
-        total_count = result.get('total', len(sites))
+        next_cursor = result.get('next_cursor')
+        # 다음 페이지 커서 기록 (이전 페이지로 돌아갔다 오면 뒤쪽 스택은 다시 계산)
+        del st.session_state.page_cursors[current_page:]
+        if next_cursor:
+            st.session_state.page_cursors.append(next_cursor)
+        has_next_page = bool(next_cursor)
     else:
         sites = []
-        total_count = 0
+        has_next_page = False
+    total_count = None
 
 if err:
     if render_error_fallback(
@@ -297,40 +325,19 @@ if not sites:
     st.stop()
 
 # ========== 추가 필터링 (담당소장명, 날짜 범위) ==========
-filtered_sites = sites.copy()
-
-# 담당소장명 필터
-if selected_manager and selected_manager.strip():
-    filtered_sites = [
-        s for s in filtered_sites
-        if s.get('담당소장명', '').strip() == selected_manager.strip()
-    ]
-
-# 날짜 범위 필터
-if date_start:
-    filtered_sites = [
-        s for s in filtered_sites
-        if s.get('착공예정일') and s.get('착공예정일') >= date_start.strftime('%Y-%m-%d')
-    ]
-if date_end:
-    filtered_sites = [
-        s for s in filtered_sites
-        if s.get('착공예정일') and s.get('착공예정일') <= date_end.strftime('%Y-%m-%d')
-    ]
+filtered_df = filter_sites(
+    pd.DataFrame(sites),
+    manager=selected_manager,
+    date_start=date_start.strftime('%Y-%m-%d') if date_start else None,
+    date_end=date_end.strftime('%Y-%m-%d') if date_end else None,
+)
 
 # ========== 데이터프레임 생성 및 정렬 ==========
 display_cols = ['현장명', '회사구분', '배정상태', '현장상태', '담당소장명', '착공예정일', '등록일', '현장ID']
-rows = []
-for s in filtered_sites:
-    row = {k: s.get(k, '') for k in display_cols}
-    # 회사구분 표시 정규화
-    if row.get('회사구분') == '더존종합건설':
-        row['회사구분'] = '종합건설'
-    elif row.get('회사구분') == '더존하우징':
-        row['회사구분'] = '하우징'
-    rows.append(row)
-
-df = pd.DataFrame(rows)
+df = filtered_df.reindex(columns=display_cols).astype(object)
+df = df.where(df.notna(), '')
+# 회사구분 표시 정규화
+df['회사구분'] = df['회사구분'].replace({'더존종합건설': '종합건설', '더존하우징': '하우징'})
 
 # 정렬 적용
 if st.session_state.sort_column in df.columns:
@@ -341,7 +348,10 @@ if st.session_state.sort_column in df.columns:
     )
 
 # ========== 페이지네이션 계산 ==========
-total_pages = max(1, (total_count + st.session_state.page_size - 1) // st.session_state.page_size)
+if total_count is None:
+    page_caption = f'{len(sites)}개 현장 표시 | 페이지 {st.session_state.current_page}'
+else:
+    page_caption = f'총 {total_count}개 현장'
 
 
 def _render_pagination(key_suffix='', bottom_only=False):
@@ -351,7 +361,7 @@ def _render_pagination(key_suffix='', bottom_only=False):
         with c1:
             st.write('')
         with c2:
-            st.caption(f'총 {total_count}개 현장 | 페이지 {st.session_state.current_page}/{total_pages}')
+            st.caption(page_caption)
         with c3:
             prev_col, next_col = st.columns(2)
             with prev_col:
@@ -359,7 +369,7 @@ def _render_pagination(key_suffix='', bottom_only=False):
                     st.session_state.current_page -= 1
                     st.rerun()
             with next_col:
-                if st.button('다음', disabled=st.session_state.current_page >= total_pages, use_container_width=True, key=f'next{key_suffix}'):
+                if st.button('다음', disabled=not has_next_page, use_container_width=True, key=f'next{key_suffix}'):
                     st.session_state.current_page += 1
                     st.rerun()
         return
@@ -377,7 +387,7 @@ def _render_pagination(key_suffix='', bottom_only=False):
             st.session_state.current_page = 1
             st.rerun()
     with c2:
-        st.caption(f'총 {total_count}개 현장 | 페이지 {st.session_state.current_page}/{total_pages}')
+        st.caption(page_caption)
     with c3:
         prev_col, next_col = st.columns(2)
         with prev_col:
@@ -385,11 +395,20 @@ def _render_pagination(key_suffix='', bottom_only=False):
                 st.session_state.current_page -= 1
                 st.rerun()
         with next_col:
-            if st.button('다음', disabled=st.session_state.current_page >= total_pages, use_container_width=True, key=f'next{key_suffix}'):
+            if st.button('다음', disabled=not has_next_page, use_container_width=True, key=f'next{key_suffix}'):
                 st.session_state.current_page += 1
                 st.rerun()
 
 
+def _options(frame, label_format, id_column):
+    """선택 목록 {표시 문자열: ID}. label_format의 자리표시자는 열 이름 (예: '{성명} ({인력ID})')"""
+    fields = [field for _, field, _, _ in string.Formatter().parse(label_format) if field]
+    cols = frame.reindex(columns=fields).astype(object)
+    cols = cols.where(cols.notna(), '')
+    labels = [label_format.format(**dict(zip(fields, row))) for row in cols.itertuples(index=False, name=None)]
+    return dict(zip(labels, frame[id_column]))
+
+
 # ========== 소장 배정 패널 (필터 바로 아래, 목록 위 · 항상 눈에 띄게) ==========
 if st.session_state.show_assign_modal and st.session_state.selected_site_id:
     with st.expander('소장 배정', expanded=True):
@@ -400,22 +419,16 @@ if st.session_state.show_assign_modal and st.session_state.selected_site_id:
             st.error(err)
         elif detail:
             st.info(f"**{detail.get('현장명', '')}** · 현장ID: `{site_id}`")
-            version = detail.get('version', '')
-            personnel_list, _ = get_personnel_cached(status='투입가능')
-            cert_list, _ = get_certificates_cached(available=True)
-            if not personnel_list:
+            version = detail.get('version')
+            personnel_df = model.filter_personnel(status='투입가능') if model is not None else None
+            cert_df = model.filter_certificates(True) if model is not None else None
+            if personnel_df is None or personnel_df.empty:
                 st.warning('투입가능 인력이 없습니다.')
-            elif not cert_list:
+            elif cert_df is None or cert_df.empty:
                 st.warning('사용가능 자격증이 없습니다.')
             else:
-                manager_options = {
-                    f"{p.get('성명', '')} ({p.get('인력ID', '')})": p.get('인력ID')
-                    for p in personnel_list
-                }
-                cert_options = {
-                    f"{c.get('자격증명', '')} / {c.get('소유자명', '')} ({c.get('자격증ID', '')})": c.get('자격증ID')
-                    for c in cert_list
-                }
+                manager_options = _options(personnel_df, '{성명} ({인력ID})', '인력ID')
+                cert_options = _options(cert_df, '{자격증명} / {소유자명} ({자격증ID})', '자격증ID')
                 c1, c2, c3 = st.columns([2, 2, 1])
                 with c1:
                     sel_manager = st.selectbox('담당 소장', list(manager_options.keys()), key='assign_manager')
@@ -430,12 +443,12 @@ if st.session_state.show_assign_modal and st.session_state.selected_site_id:
                             mid = manager_options.get(sel_manager)
                             cid = cert_options.get(sel_cert)
                             if mid and cid:
-                                result, err = assign_site(site_id, mid, cid, version=version or None)
+                                result, err = assign_site(site_id, mid, cid, version=version)
                                 if err:
                                     st.error(err)
                                 else:
                                     st.success('배정되었습니다.')
-                                    clear_sites_cache()  # 캐시 초기화
+                                    sync_changes(force=True)  # 바뀐 행만 반영
                                     st.session_state.show_assign_modal = False
                                     st.session_state.selected_site_id = None
                                     st.rerun()
@@ -517,13 +530,13 @@ with st.expander('빠른 액션 (행별 배정·해제·상세)', expanded=False
             if row['배정상태'] == '배정완료':
                 if st.button('해제', key=f'unassign_{site_id}', use_container_width=True):
                     detail, _ = get_site_cached(site_id)
-                    version = detail.get('version', '') if detail else ''
-                    _, err = unassign_site(site_id, version=version or None)
+                    version = detail.get('version') if detail else None
+                    _, err = unassign_site(site_id, version=version)
                     if err:
                         st.error(err)
                     else:
                         st.success('배정 해제됨')
-                        clear_sites_cache()  # 캐시 초기화
+                        sync_changes(force=True)  # 바뀐 행만 반영
                         st.rerun()
             else:
                 if st.button('배정', key=f'assign_{site_id}', use_container_width=True):
@@ -86,6 +86,46 @@ def collect_step2():
     return results
 
 
+def collect_services():
+    """API 서비스 계층(캐시/인덱스 등) 테스트 수집"""
+    results = []
+    try:
+        import test_api_services as t3
+    except Exception as e:
+        results.append({"suite": "서비스", "name": "모듈 로드", "passed": False, "detail": str(e)})
+        return results
+
+    for label, func in [
+        ("읽기 캐시 (스냅샷/TTL/LRU/무효화)", t3.test_cache_service),
+        ("Sheets ID 인덱스 (O(1) 조회/증분 갱신)", t3.test_sheets_repository),
+        ("Supabase 페이지 조회 (서버 사이드 필터/개수)", t3.test_supabase_pagination),
+        ("커서 페이지네이션 (키셋)", t3.test_keyset_pagination),
+        ("현장 검색 역색인 (자모 n-gram)", t3.test_search_index),
+        ("통계 집계 (DB 집계/1회 순회)", t3.test_stats_service),
+        ("통계 증분 카운터 (델타/재검증)", t3.test_stats_counter),
+        ("배정/해제 RPC (왕복 1회)", t3.test_assign_rpc),
+        ("일괄 배정 (스냅샷 검증/batchUpdate 1회)", t3.test_assign_batch),
+        ("대량 가져오기 (청크 append/중복 제거)", t3.test_bulk_import),
+        ("목록 NDJSON 스트리밍", t3.test_ndjson_streaming),
+        ("조건부 GET (ETag/304)", t3.test_conditional_get),
+        ("변경 피드 (델타 동기화)", t3.test_change_feed),
+        ("실시간 이벤트 (SSE 푸시)", t3.test_event_bus),
+        ("행 버전 (compare-and-swap)", t3.test_row_version),
+        ("요청 단위 identity map (중복 조회 제거)", t3.test_unit_of_work),
+        ("참조 ID 해석 캐시 (LRU/prefetch)", t3.test_id_resolver),
+        ("API 클라이언트 연결 풀 (keep-alive/재시도)", t3.test_http_session),
+        ("목록 동시 조회 (fetch_many)", t3.test_fetch_many),
+        ("HTML 번들 캐시 (render_html_app)", t3.test_html_bundle),
+        ("정적 파일 해시 URL/사전 압축", t3.test_static_assets),
+        ("API 응답 압축 (gzip/br)", t3.test_response_compression),
+        ("열 기반 목록 응답 (columnar)", t3.test_columnar_format),
+        ("DataFrame 모델 (필터/집계/자격증 인덱스)", t3.test_data_model),
+    ]:
+        passed, detail = run_with_capture(func)
+        results.append({"suite": "서비스", "name": label, "passed": passed, "detail": detail or ("통과" if passed else "실패")})
+    return results
+
+
 def check_api_health():
     """API 서버 헬스 체크 (선택, 서버 실행 중일 때만)"""
     try:
@@ -181,6 +221,7 @@ def main():
     all_results = []
     all_results.extend(collect_step1())
     all_results.extend(collect_step2())
+    all_results.extend(collect_services())
 
     api_ok = None
     api_detail = ""
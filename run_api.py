@@ -38,4 +38,5 @@ if __name__ == '__main__':
     print("=" * 50)
     print("종료: Ctrl+C")
     print()
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    # SSE(/api/events) 연결은 연결당 스레드 1개를 점유하므로 스레드 모드로 실행
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
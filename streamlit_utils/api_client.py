@@ -1,10 +1,34 @@
 """
 Streamlit용 REST API 클라이언트.
 환경에 따라 Flask API 또는 Supabase 직접 연결을 사용합니다.
+
+Flask API 요청은 프로세스 공유 requests.Session 1개로 보냄 (연결 풀 + keep-alive)
+→ 페이지 rerun마다 TCP/TLS 연결을 새로 맺지 않음. GET만 연결 오류/502·503·504에 백오프 재시도
+응답 압축: Session이 Accept-Encoding(gzip, deflate, brotli 설치 시 br)을 보내고 본문을 자동 해제
+목록 DataFrame 조회(get_*_frame): ?format=columnar(msgpack 설치 시 MessagePack)로 받아 열 배열 그대로 DataFrame 구성
+
+환경 변수:
+- HTTP_POOL_SIZE=10      → 호스트당 유지 연결 수 (Streamlit 세션 스레드 동시 요청 수)
+- HTTP_RETRIES=2         → GET 재시도 횟수 (POST 등 쓰기는 재시도 안 함)
+- HTTP_BACKOFF=0.3       → 재시도 간격 계수(초). 0.3, 0.6, 1.2 ...
+- HTTP_CONNECT_TIMEOUT=3 → 연결 시간 제한(초). 응답 시간 제한은 엔드포인트별 (ENDPOINT_TIMEOUTS)
 """
+import copy
+import json
 import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 columnar JSON
+    msgpack = None
 
 load_dotenv()
 
@@ -51,6 +75,19 @@ API_BASE = _get_api_base()
 TIMEOUT = 15
 HEADERS = {'Content-Type': 'application/json'}
 
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10') or 10)
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2') or 0)
+HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', '0.3') or 0)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3') or 3)
+
+# 경로 접두사별 응답 시간 제한(초). 먼저 일치하는 항목 사용, 없으면 TIMEOUT
+ENDPOINT_TIMEOUTS = (
+    ('/api/health', 3),
+    ('/api/changes', 5),
+    ('/api/sites/search', 10),
+    ('/api/stats', 10),
+)
+
 # API 모드 확인 및 Supabase 서비스 초기화
 _api_mode = os.getenv('API_MODE', '').strip().lower() or 'flask'
 _supabase_service = None
@@ -75,6 +112,48 @@ def _url(path):
     return f"{API_BASE}{p}"
 
 
+def _timeout(path):
+    """(연결, 응답) 시간 제한. 응답 제한은 ENDPOINT_TIMEOUTS 기준"""
+    for prefix, read_timeout in ENDPOINT_TIMEOUTS:
+        if path.startswith(prefix):
+            return HTTP_CONNECT_TIMEOUT, read_timeout
+    return HTTP_CONNECT_TIMEOUT, TIMEOUT
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 공유 requests.Session (연결 풀/keep-alive, GET 재시도). 첫 호출 시 생성"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                connect=HTTP_RETRIES,
+                read=HTTP_RETRIES,
+                status=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+
+def _request(method, path, **kwargs):
+    """공유 세션으로 요청. timeout을 주지 않으면 엔드포인트별 기본값"""
+    kwargs.setdefault('timeout', _timeout(path))
+    return get_session().request(method, _url(path), **kwargs)
+
+
 def _check(res, allow_404=False):
     """응답 검사. 성공이면 data 반환, 실패면 (None, error_message)."""
     try:
@@ -92,61 +171,97 @@ def _check(res, allow_404=False):
     return j.get('data'), None
 
 
+# --- 조건부 GET (ETag / If-None-Match) ---
+# (경로, 쿼리) → (ETag, 응답 JSON). 서버 데이터가 그대로면 304(헤더만)를 받고 저장된 본문 사용
+VALIDATOR_CACHE_MAX = 256
+_validators = OrderedDict()
+_validators_lock = threading.Lock()
+
+
+class _CachedResponse:
+    """저장해 둔 응답 본문을 requests.Response처럼 감쌈 (_check, .json() 호환)"""
+    status_code = 200
+    reason = 'OK'
+    text = ''
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+
+def _body(res):
+    """응답 본문 디코딩 (MessagePack 또는 JSON)"""
+    if msgpack is not None and res.headers.get('Content-Type', '').startswith(MSGPACK_MIMETYPE):
+        return msgpack.unpackb(res.content, raw=False)
+    return res.json()
+
+
+def _get(path, params=None, accept=None):
+    """GET + 검증자 캐시. 304면 저장된 본문 사본, 200이면 ETag와 함께 본문 저장"""
+    key = (path, tuple(sorted((params or {}).items())), accept)
+    with _validators_lock:
+        cached = _validators.get(key)
+    headers = dict(HEADERS)
+    if accept:
+        headers['Accept'] = accept
+    if cached:
+        headers['If-None-Match'] = cached[0]
+    r = _request('GET', path, params=params, headers=headers)
+    if r.status_code == 304 and cached:
+        with _validators_lock:
+            if key in _validators:
+                _validators.move_to_end(key)
+        return _CachedResponse(copy.deepcopy(cached[1]))
+    etag = r.headers.get('ETag')
+    if r.status_code != 200 or not (etag or accept):
+        return r
+    try:
+        body = _body(r)
+    except ValueError:
+        return r
+    if not etag:
+        return _CachedResponse(body)
+    with _validators_lock:
+        _validators[key] = (etag, body)
+        _validators.move_to_end(key)
+        while len(_validators) > VALIDATOR_CACHE_MAX:
+            _validators.popitem(last=False)
+    return _CachedResponse(copy.deepcopy(body))
+
+
 # --- Stats ---
-def get_stats():
-    """GET /api/stats 또는 Supabase 직접 통계 계산"""
-    # Supabase 직접 연결 모드일 때 (Flask API와 동일한 구조로 반환)
+def get_stats(fresh=False):
+    """GET /api/stats 또는 Supabase 직접 통계 (dashboard_stats RPC). fresh=True면 서버 카운터 재집계"""
+    # Supabase 직접 연결 모드일 때 (Flask API와 동일한 구조로 반환, DB에서 집계)
     if _api_mode == 'supabase' and _supabase_service:
         try:
-            sites = _supabase_service.get_all_sites()
-            personnel = _supabase_service.get_all_personnel()
-            certificates = _supabase_service.get_all_certificates()
-
-            by_state = {}
-            for s in sites:
-                st = s.get('현장상태') or ''
-                by_state[st] = by_state.get(st, 0) + 1
-
-            by_role = {}
-            for p in personnel:
-                role = p.get('직책') or ''
-                by_role[role] = by_role.get(role, 0) + 1
-
-            data = {
-                'sites': {
-                    'total': len(sites),
-                    'assigned': len([s for s in sites if s.get('배정상태') == '배정완료']),
-                    'unassigned': len([s for s in sites if s.get('배정상태') == '미배정']),
-                    'by_state': by_state,
-                },
-                'personnel': {
-                    'total': len(personnel),
-                    'available': len([p for p in personnel if p.get('현재상태') == '투입가능']),
-                    'deployed': len([p for p in personnel if p.get('현재상태') == '투입중']),
-                    'by_role': by_role,
-                },
-                'certificates': {
-                    'total': len(certificates),
-                    'available': len([c for c in certificates if c.get('사용가능여부') == '사용가능']),
-                    'in_use': len([c for c in certificates if c.get('사용가능여부') == '사용중']),
-                    'expired': len([c for c in certificates if c.get('사용가능여부') == '만료']),
-                },
-            }
-            return data, None
+            return _supabase_service.get_statistics(), None
         except Exception as e:
             return None, f"Supabase 통계 계산 실패: {str(e)}"
     
     # Flask API 모드
     try:
-        r = requests.get(_url('/api/stats'), timeout=TIMEOUT, headers=HEADERS)
+        r = _get('/api/stats', params={'fresh': 1} if fresh else None)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
 
 
 # --- Sites ---
-def get_sites(company=None, status=None, state=None, limit=None, offset=None):
-    """GET /api/sites 또는 Supabase 직접 조회"""
+def get_sites(company=None, status=None, state=None, limit=None, offset=None, cursor=None):
+    """GET /api/sites 또는 Supabase 직접 조회
+
+    cursor를 넘기면(빈 문자열 = 첫 페이지) 키셋 페이지네이션으로 조회하고
+    {'data': [...], 'next_cursor': str|None}를 반환.
+    """
+    if cursor is not None:
+        return _get_sites_page(company, status, state, limit, cursor)
+
     # Supabase 직접 연결 모드일 때
     if _api_mode == 'supabase' and _supabase_service:
         try:
@@ -174,35 +289,59 @@ def get_sites(company=None, status=None, state=None, limit=None, offset=None):
     if offset is not None:
         params['offset'] = offset
     try:
-        r = requests.get(_url('/api/sites'), params=params, timeout=TIMEOUT, headers=HEADERS)
+        r = _get('/api/sites', params=params)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
 
 
-def search_sites(q):
-    """GET /api/sites/search 또는 Supabase 직접 검색"""
+def _get_sites_page(company, status, state, limit, cursor):
+    """커서 페이지 조회 (페이지당 비용이 위치와 무관)"""
+    if _api_mode == 'supabase' and _supabase_service:
+        try:
+            return _supabase_service.get_sites_page(
+                company=company, status=status, state=state, limit=limit, cursor=cursor
+            ), None
+        except Exception as e:
+            return None, f"Supabase 조회 실패: {str(e)}"
+
+    params = {'cursor': cursor or ''}
+    if company:
+        params['company'] = company
+    if status:
+        params['status'] = status
+    if state:
+        params['state'] = state
+    if limit:
+        params['limit'] = limit
+    try:
+        r = _get('/api/sites', params=params)
+        data, err = _check(r)
+        if err:
+            return None, err
+        return {'data': data or [], 'next_cursor': r.json().get('next_cursor')}, None
+    except Exception as e:
+        return None, f"API 연결 실패: {str(e)}"
+
+
+def search_sites(q, limit=None):
+    """GET /api/sites/search 또는 Supabase 직접 검색 (관련도순, limit 기본 50)"""
     if not (q or str(q).strip()):
         return [], None
     
-    # Supabase 직접 연결 모드일 때
+    # Supabase 직접 연결 모드일 때 (search_sites RPC → 트라이그램 인덱스)
     if _api_mode == 'supabase' and _supabase_service:
         try:
-            all_sites = _supabase_service.get_all_sites()
-            # 클라이언트 사이드 검색
-            query = q.strip().lower()
-            filtered = [
-                s for s in all_sites
-                if query in (s.get('현장명', '') or '').lower() or
-                   query in (s.get('주소', '') or '').lower()
-            ]
-            return filtered, None
+            return _supabase_service.search_sites(q.strip().lower(), limit=limit), None
         except Exception as e:
             return None, f"Supabase 검색 실패: {str(e)}"
     
     # Flask API 모드
+    params = {'q': q.strip()}
+    if limit:
+        params['limit'] = limit
     try:
-        r = requests.get(_url('/api/sites/search'), params={'q': q.strip()}, timeout=TIMEOUT, headers=HEADERS)
+        r = _get('/api/sites/search', params=params)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -223,7 +362,7 @@ def get_site(site_id):
     
     # Flask API 모드
     try:
-        r = requests.get(_url(f'/api/sites/{site_id}'), timeout=TIMEOUT, headers=HEADERS)
+        r = _get(f'/api/sites/{site_id}')
         return _check(r, allow_404=True)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -231,7 +370,7 @@ def get_site(site_id):
 
 def create_site(payload):
     """POST /api/sites. 현장ID는 서버에서 자동 부여 가능."""
-    r = requests.post(_url('/api/sites'), json=payload, timeout=TIMEOUT, headers=HEADERS)
+    r = _request('POST', '/api/sites', json=payload)
     return _check(r)
 
 
@@ -240,20 +379,21 @@ def assign_site(site_id, manager_id, certificate_id, version=None):
     # Supabase 직접 연결 모드일 때
     if _api_mode == 'supabase' and _supabase_service:
         try:
-            _supabase_service.assign_site(site_id, manager_id, certificate_id)
+            _supabase_service.assign_site(site_id, manager_id, certificate_id,
+                                          expected_version=int(version) if version is not None else None)
             return {'success': True}, None
         except Exception as e:
             return None, f"Supabase 배정 실패: {str(e)}"
     
     # Flask API 모드
     body = {'manager_id': manager_id, 'certificate_id': certificate_id}
-    if version:
-        body['version'] = version
     h = dict(HEADERS)
-    if version:
-        h['If-Match'] = version
+    if version is not None:
+        # 정수 행 버전. 서버가 쓰기 안에서 비교 (불일치 시 409)
+        body['version'] = version
+        h['If-Match'] = str(version)
     try:
-        r = requests.post(_url(f'/api/sites/{site_id}/assign'), json=body, timeout=TIMEOUT, headers=h)
+        r = _request('POST', f'/api/sites/{site_id}/assign', json=body, headers=h)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -264,20 +404,20 @@ def unassign_site(site_id, version=None):
     # Supabase 직접 연결 모드일 때
     if _api_mode == 'supabase' and _supabase_service:
         try:
-            _supabase_service.unassign_site(site_id)
+            _supabase_service.unassign_site(site_id, expected_version=int(version) if version is not None else None)
             return {'success': True}, None
         except Exception as e:
             return None, f"Supabase 해제 실패: {str(e)}"
     
     # Flask API 모드
     body = {}
-    if version:
-        body['version'] = version
     h = dict(HEADERS)
-    if version:
-        h['If-Match'] = version
+    if version is not None:
+        # 정수 행 버전. 서버가 쓰기 안에서 비교 (불일치 시 409)
+        body['version'] = version
+        h['If-Match'] = str(version)
     try:
-        r = requests.post(_url(f'/api/sites/{site_id}/unassign'), json=body or None, timeout=TIMEOUT, headers=h)
+        r = _request('POST', f'/api/sites/{site_id}/unassign', json=body or None, headers=h)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -307,7 +447,7 @@ def get_personnel(status=None, role=None):
     if role:
         params['role'] = role
     try:
-        r = requests.get(_url('/api/personnel'), params=params or None, timeout=TIMEOUT, headers=HEADERS)
+        r = _get('/api/personnel', params=params or None)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -336,7 +476,7 @@ def get_certificates(available=None):
     elif available is False or available == 'false':
         params['available'] = 'false'
     try:
-        r = requests.get(_url('/api/certificates'), params=params or None, timeout=TIMEOUT, headers=HEADERS)
+        r = _get('/api/certificates', params=params or None)
         return _check(r)
     except Exception as e:
         return None, f"API 연결 실패: {str(e)}"
@@ -344,10 +484,141 @@ def get_certificates(available=None):
 
 def create_certificate(payload):
     """POST /api/certificates. 자격증ID·소유자ID는 서버에서 자동 부여."""
-    r = requests.post(_url('/api/certificates'), json=payload, timeout=TIMEOUT, headers=HEADERS)
+    r = _request('POST', '/api/certificates', json=payload)
     return _check(r)
 
 
+# --- Changes (델타 동기화) ---
+def get_changes(since=None, limit=None):
+    """GET /api/changes 또는 Supabase change_log 직접 조회
+
+    Returns:
+        tuple: ({'changes': {테이블: {'upserted', 'deleted'}}, 'cursor', 'has_more', 'reset'}, error)
+    """
+    if _api_mode == 'supabase' and _supabase_service:
+        try:
+            return _supabase_service.get_changes(since=since, limit=limit), None
+        except Exception as e:
+            return None, f"Supabase 변경 조회 실패: {str(e)}"
+
+    params = {k: v for k, v in (('since', since), ('limit', limit)) if v}
+    try:
+        r = _request('GET', '/api/changes', params=params or None)
+        data, err = _check(r)
+        if err:
+            return None, err
+        body = r.json()
+        return {
+            'changes': data or {},
+            'cursor': body.get('cursor'),
+            'has_more': bool(body.get('has_more')),
+            'reset': bool(body.get('reset')),
+        }, None
+    except Exception as e:
+        return None, f"API 연결 실패: {str(e)}"
+
+
+# --- DataFrame (열 기반 응답) ---
+def columns_to_frame(data):
+    """columnar 응답 data → DataFrame. 사전 인코딩 열은 코드 배열 그대로 category 열로 구성"""
+    columns = {}
+    dictionaries = data.get('dictionaries') or {}
+    for column, values in zip(data.get('columns', []), data.get('values', [])):
+        dictionary = dictionaries.get(column)
+        if dictionary is not None:
+            columns[column] = pd.Categorical.from_codes(values, categories=dictionary)
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(data.get('length', 0)))
+
+
+def _get_frame(path, params):
+    """목록 API를 ?format=columnar로 조회해 (DataFrame, error) 반환"""
+    try:
+        r = _get(path, params={**params, 'format': 'columnar'},
+                 accept=MSGPACK_MIMETYPE if msgpack is not None else None)
+        data, err = _check(r)
+        if err:
+            return None, err
+        if isinstance(data, list):
+            # 열 기반을 지원하지 않는 서버 (행 목록 응답)
+            return pd.DataFrame(data), None
+        return columns_to_frame(data or {}), None
+    except Exception as e:
+        return None, f"API 연결 실패: {str(e)}"
+
+
+def get_sites_frame(company=None, status=None, state=None):
+    """현장 전체 목록 DataFrame"""
+    if _api_mode == 'supabase' and _supabase_service:
+        data, err = get_sites(company=company, status=status, state=state)
+        return (None, err) if err else (pd.DataFrame((data or {}).get('data', [])), None)
+    params = {k: v for k, v in (('company', company), ('status', status), ('state', state)) if v}
+    return _get_frame('/api/sites', params)
+
+
+def get_personnel_frame(status=None, role=None):
+    """인력 목록 DataFrame"""
+    if _api_mode == 'supabase' and _supabase_service:
+        data, err = get_personnel(status=status, role=role)
+        return (None, err) if err else (pd.DataFrame(data or []), None)
+    params = {k: v for k, v in (('status', status), ('role', role)) if v}
+    return _get_frame('/api/personnel', params)
+
+
+def get_certificates_frame(available=None):
+    """자격증 목록 DataFrame"""
+    if _api_mode == 'supabase' and _supabase_service:
+        data, err = get_certificates(available=available)
+        return (None, err) if err else (pd.DataFrame(data or []), None)
+    available = {True: 'true', False: 'false'}.get(available, available)
+    return _get_frame('/api/certificates', {'available': available} if available else {})
+
+
+# --- Streaming (NDJSON) ---
+def _iter_ndjson(path, params):
+    """목록 API를 stream=1로 호출해 행을 1건씩 반환 (응답 전체를 메모리에 올리지 않음). 실패 시 RuntimeError"""
+    headers = {**HEADERS, 'Accept': 'application/x-ndjson'}
+    with _request('GET', path, params={**params, 'stream': 1}, headers=headers, stream=True) as r:
+        if r.status_code >= 400:
+            _, err = _check(r)
+            raise RuntimeError(err)
+        for line in r.iter_lines():
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get('success') is False and 'error' in row:
+                raise RuntimeError(row['error'].get('message') or '스트리밍 중 오류')
+            yield row
+
+
+def iter_sites(company=None, status=None, state=None):
+    """현장 목록을 1건씩 반환 (내보내기 등 대용량 조회용). 첫 행부터 바로 소비 가능"""
+    if _api_mode == 'supabase' and _supabase_service:
+        yield from _supabase_service.iter_sites(company=company, status=status, state=state)
+        return
+    params = {k: v for k, v in (('company', company), ('status', status), ('state', state)) if v}
+    yield from _iter_ndjson('/api/sites', params)
+
+
+def iter_personnel(status=None, role=None):
+    """인력 목록을 1건씩 반환"""
+    if _api_mode == 'supabase' and _supabase_service:
+        yield from _supabase_service.iter_personnel(status=status, role=role)
+        return
+    params = {k: v for k, v in (('status', status), ('role', role)) if v}
+    yield from _iter_ndjson('/api/personnel', params)
+
+
+def iter_certificates(available=None):
+    """자격증 목록을 1건씩 반환"""
+    available = {True: 'true', False: 'false'}.get(available, available)
+    if _api_mode == 'supabase' and _supabase_service:
+        yield from _supabase_service.iter_certificates(available=available)
+        return
+    yield from _iter_ndjson('/api/certificates', {'available': available} if available else {})
+
+
 def check_api_connection():
     """
     GET /api/health 로 연결 확인.
@@ -379,7 +650,7 @@ def check_api_connection():
         # 배포 환경에서는 API가 별도 서버에 있을 수 있으므로
         # 연결 실패해도 UI는 표시
         try:
-            r = requests.get(_url('/api/health'), timeout=3)
+            r = _request('GET', '/api/health')
             if r.status_code == 200:
                 return True, None
         except Exception:
@@ -388,7 +659,7 @@ def check_api_connection():
     
     # 로컬 개발 환경에서는 상세한 에러 메시지 제공
     try:
-        r = requests.get(_url('/api/health'), timeout=5)
+        r = _request('GET', '/api/health', timeout=(HTTP_CONNECT_TIMEOUT, 5))
         if r.status_code == 200:
             return True, None
         else:
@@ -1,205 +1,574 @@
-"""
-캐싱된 API 클라이언트 래퍼
-Streamlit @st.cache_data를 사용하여 API 호출 최적화
-"""
-import streamlit as st
-from streamlit_utils.api_client import (
-    get_sites as _get_sites,
-    get_personnel as _get_personnel,
-    get_certificates as _get_certificates,
-    get_stats as _get_stats,
-    get_site as _get_site,
-    search_sites as _search_sites,
-    check_api_connection as _check_api_connection,
-)
-
-
-# ========== 캐싱 설정 ==========
-# TTL (Time To Live): 캐시 유효 시간 (초)
-CACHE_TTL_SHORT = 30  # 30초 - 자주 변경되는 데이터 (통계)
-CACHE_TTL_MEDIUM = 60  # 1분 - 중간 빈도 (현장 목록, 인력 목록)
-CACHE_TTL_LONG = 300  # 5분 - 거의 변경되지 않는 데이터 (자격증 목록)
-
-
-# ========== 통계 (짧은 캐시) ==========
-@st.cache_data(ttl=CACHE_TTL_SHORT, show_spinner="통계 로딩 중...")
-def get_stats_cached():
-    """통계 조회 (30초 캐시)
-    
-    Returns:
-        tuple: (data, error)
-    """
-    return _get_stats()
-
-
-# ========== 현장 목록 (중간 캐시) ==========
-@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 목록 로딩 중...")
-def get_sites_cached(company=None, status=None, state=None, limit=None, offset=None):
-    """현장 목록 조회 (1분 캐시)
-    
-    Args:
-        company: 회사구분 필터
-        status: 배정상태 필터
-        state: 현장상태 필터
-        limit: 최대 개수
-        offset: 시작 위치
-        
-    Returns:
-        tuple: (data, error)
-    """
-    return _get_sites(company, status, state, limit, offset)
-
-
-@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 검색 중...")
-def search_sites_cached(q):
-    """현장 검색 (1분 캐시)
-    
-    Args:
-        q: 검색어
-        
-    Returns:
-        tuple: (data, error)
-    """
-    return _search_sites(q)
-
-
-@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 상세 로딩 중...")
-def get_site_cached(site_id):
-    """현장 상세 조회 (1분 캐시)
-    
-    Args:
-        site_id: 현장 ID
-        
-    Returns:
-        tuple: (data, error)
-    """
-    return _get_site(site_id)
-
-
-# ========== 인력 목록 (중간 캐시) ==========
-@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="인력 목록 로딩 중...")
-def get_personnel_cached(status=None, role=None):
-    """인력 목록 조회 (1분 캐시)
-    
-    Args:
-        status: 현재상태 필터
-        role: 직책 필터
-        
-    Returns:
-        tuple: (data, error)
-    """
-    return _get_personnel(status, role)
-
-
-# ========== 자격증 목록 (긴 캐시) ==========
-@st.cache_data(ttl=CACHE_TTL_LONG, show_spinner="자격증 목록 로딩 중...")
-def get_certificates_cached(available=None):
-    """자격증 목록 조회 (5분 캐시)
-    
-    Args:
-        available: 사용가능여부 필터
-        
-    Returns:
-        tuple: (data, error)
-    """
-    return _get_certificates(available)
-
-
-# ========== API 연결 확인 (캐시 없음) ==========
-def check_api_connection_cached():
-    """API 연결 확인 (캐시 없음)
-    
-    Returns:
-        tuple: (is_connected, error_message)
-    """
-    return _check_api_connection()
-
-
-# ========== 캐시 관리 함수 ==========
-def clear_all_caches():
-    """모든 캐시 초기화"""
-    st.cache_data.clear()
-
-
-def clear_stats_cache():
-    """통계 캐시만 초기화"""
-    get_stats_cached.clear()
-
-
-def clear_sites_cache():
-    """현장 관련 캐시 초기화"""
-    get_sites_cached.clear()
-    search_sites_cached.clear()
-    get_site_cached.clear()
-
-
-def clear_personnel_cache():
-    """인력 캐시 초기화"""
-    get_personnel_cached.clear()
-
-
-def clear_certificates_cache():
-    """자격증 캐시 초기화"""
-    get_certificates_cached.clear()
-
-
-# ========== 캐시 상태 표시 ==========
-def render_cache_info():
-    """캐시 정보 표시 (디버깅용)"""
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### 🔄 캐시 관리")
-    
-    col1, col2 = st.sidebar.columns(2)
-    
-    with col1:
-        if st.button("전체 초기화", use_container_width=True, key="clear_all"):
-            clear_all_caches()
-            st.rerun()
-    
-    with col2:
-        if st.button("통계만", use_container_width=True, key="clear_stats"):
-            clear_stats_cache()
-            st.rerun()
-    
-    st.sidebar.caption(f"""
-    **캐시 TTL:**
-    - 통계: {CACHE_TTL_SHORT}초
-    - 현장/인력: {CACHE_TTL_MEDIUM}초
-    - 자격증: {CACHE_TTL_LONG}초
-    """)
-
-
-# ========== 사용 가이드 ==========
-"""
-# 캐싱된 API 사용법
-
-## 기본 사용
-```python
-from streamlit_utils.cached_api import get_sites_cached, get_personnel_cached
-
-# 캐싱된 API 호출
-sites_data, sites_err = get_sites_cached()
-personnel_data, personnel_err = get_personnel_cached(status='투입가능')
-```
-
-## 캐시 초기화
-```python
-from streamlit_utils.cached_api import clear_sites_cache, clear_all_caches
-
-# 특정 캐시만 초기화
-clear_sites_cache()
-
-# 모든 캐시 초기화
-clear_all_caches()
-```
-
-## 캐시 TTL 설정
-- `CACHE_TTL_SHORT = 30`: 통계 (30초)
-- `CACHE_TTL_MEDIUM = 60`: 현장/인력 (1분)
-- `CACHE_TTL_LONG = 300`: 자격증 (5분)
-
-## 주의사항
-1. 데이터 수정 후에는 해당 캐시를 초기화해야 함
-2. 배정/해제 후에는 `clear_sites_cache()` 호출 권장
-3. 실시간 데이터가 필요한 경우 캐시 없는 원본 함수 사용
-"""
+"""
+캐싱된 API 클라이언트 래퍼
+- 현장/인력/자격증 목록: 프로세스당 전체 목록 1벌(복제본)을 보관하고 GET /api/changes로 변경분만 반영
+  (갱신 비용이 전체 크기가 아니라 바뀐 행 수에 비례). 서버가 변경 피드를 지원하지 않으면 TTL 캐시 사용
+- 통계/검색: Streamlit @st.cache_data (TTL)
+- fetch_many: 여러 목록을 동시에 조회 (첫 로드 지연 = 합이 아니라 가장 느린 1건)
+- get_data_model_cached: 세 목록의 DataFrame 모델(data_model.DataModel). 복제본이 바뀔 때만 다시 구성
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from api.utils.filters import certificate_filter, personnel_filter, site_filter
+from api.utils.pagination import clamp_page_size, keyset_page
+from streamlit_utils.data_model import DataModel
+from streamlit_utils.api_client import (
+    get_sites as _get_sites,
+    get_personnel as _get_personnel,
+    get_certificates as _get_certificates,
+    get_stats as _get_stats,
+    get_site as _get_site,
+    get_changes as _get_changes,
+    search_sites as _search_sites,
+    check_api_connection as _check_api_connection,
+)
+
+
+# ========== 캐싱 설정 ==========
+# TTL (Time To Live): 캐시 유효 시간 (초)
+CACHE_TTL_SHORT = 30  # 30초 - 자주 변경되는 데이터 (통계)
+CACHE_TTL_MEDIUM = 60  # 1분 - 중간 빈도 (현장 목록, 인력 목록)
+CACHE_TTL_LONG = 300  # 5분 - 거의 변경되지 않는 데이터 (자격증 목록)
+# 복제본이 /api/changes를 다시 확인하는 최소 간격 (초). 쓰기 직후에는 sync_changes(force=True)
+CHANGES_POLL_INTERVAL = float(os.getenv('CHANGES_POLL_INTERVAL', '5') or 0)
+# fetch_many 동시 요청 수 (api_client 연결 풀 HTTP_POOL_SIZE 이하)
+FETCH_MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', '4') or 4)
+
+_ID_FIELDS = {'sites': '현장ID', 'personnel': '인력ID', 'certificates': '자격증ID'}
+
+
+# ========== 델타 동기화 복제본 ==========
+class _Replica:
+    """테이블별 {ID: 행} + 변경 피드 커서 (프로세스 공유, 스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.cursor = None
+        self.tables = {}
+        self.checked_at = 0.0
+        # 테이블 내용이 바뀔 때마다 증가 (DataModel 재구성 판단용)
+        self.generation = 0
+        # /api/changes 호출 실패(미지원 서버/연결 오류) 시 이 시각까지 TTL 캐시 경로 사용
+        self.disabled_until = 0.0
+
+    @property
+    def disabled(self):
+        return time.monotonic() < self.disabled_until
+
+    def reset(self):
+        with self.lock:
+            self.cursor = None
+            self.tables.clear()
+            self.checked_at = 0.0
+            self.disabled_until = 0.0
+            self.generation += 1
+
+
+_replica = _Replica()
+
+
+def _load_table(table):
+    """테이블 전체 조회 → (행 목록, error)"""
+    if table == 'sites':
+        data, err = _get_sites()
+        if isinstance(data, dict):
+            data = data.get('data')
+    elif table == 'personnel':
+        data, err = _get_personnel()
+    else:
+        data, err = _get_certificates()
+    return (data or []), err
+
+
+def _apply_changes(changes):
+    """변경분을 로드된 테이블에 반영. 반영한 행 수 반환"""
+    applied = 0
+    for table, delta in (changes or {}).items():
+        rows = _replica.tables.get(table)
+        if rows is None:
+            # 아직 로드하지 않은 테이블은 처음 조회할 때 전체를 읽음
+            continue
+        id_field = _ID_FIELDS[table]
+        for row in delta.get('upserted') or []:
+            rows[str(row.get(id_field) or '')] = row
+            applied += 1
+        for row_id in delta.get('deleted') or []:
+            if rows.pop(str(row_id), None) is not None:
+                applied += 1
+    if applied:
+        _replica.generation += 1
+    return applied
+
+
+def sync_changes(force=False):
+    """GET /api/changes로 복제본 갱신. 반영한 행 수 반환 (force=False면 CHANGES_POLL_INTERVAL마다 1회)
+
+    HTTP 조회는 잠금 밖에서 하고(다른 스레드의 복제본 읽기를 막지 않음), 반영은 잠금 안에서
+    조회에 쓴 커서가 아직 현재 커서일 때만 (그 사이 다른 동기화/reset()이 있었으면 결과를 버림)
+    """
+    with _replica.lock:
+        if _replica.disabled:
+            return 0
+        now = time.monotonic()
+        if not force and _replica.cursor is not None and now - _replica.checked_at < CHANGES_POLL_INTERVAL:
+            return 0
+        cursor = _replica.cursor
+    if cursor is None:
+        # 커서를 먼저 받고 전체 조회 → 사이에 생긴 변경은 다음 동기화에서 다시 반영 (멱등)
+        result, err = _get_changes()
+        with _replica.lock:
+            if err:
+                _replica.disabled_until = now + CACHE_TTL_MEDIUM
+            elif _replica.cursor is None:
+                _replica.cursor = result['cursor']
+                _replica.tables.clear()
+                _replica.generation += 1
+                _replica.checked_at = now
+        return 0
+    applied, reset = 0, False
+    while True:
+        result, err = _get_changes(cursor)
+        if err:
+            # 일시 오류: 기존 복제본 유지, 다음 호출에서 재시도
+            break
+        with _replica.lock:
+            if _replica.cursor != cursor:
+                break
+            if result['reset']:
+                _replica.tables.clear()
+                _replica.generation += 1
+                _replica.cursor = result['cursor']
+                _replica.checked_at = now
+                reset = True
+                break
+            applied += _apply_changes(result['changes'])
+            _replica.cursor = cursor = result['cursor']
+            if not result['has_more']:
+                _replica.checked_at = now
+                break
+    if applied or reset:
+        search_sites_cached.clear()
+        _get_stats_ttl.clear()
+    return applied
+
+
+def _replica_rows(table):
+    """복제본 행 목록 (동기화 후). 복제본을 쓸 수 없으면 (None, None), 조회 실패는 (None, error)"""
+    sync_changes()
+    with _replica.lock:
+        if _replica.disabled:
+            return None, None
+        rows = _replica.tables.get(table)
+        if rows is None:
+            data, err = _load_table(table)
+            if err:
+                return None, err
+            id_field = _ID_FIELDS[table]
+            rows = _replica.tables[table] = OrderedDict((str(r.get(id_field) or ''), r) for r in data)
+            _replica.generation += 1
+        # 호출자가 행을 수정해도 복제본은 그대로 (st.cache_data의 사본 반환과 동일)
+        return [dict(r) for r in rows.values()], None
+
+
+def prefetch(*tables):
+    """로드되지 않은 복제본 테이블을 동시에 조회해 채움. 이미 있으면 요청 없음
+
+    조회하는 동안 복제본 잠금을 유지 → 커서가 바뀌지 않아 사이에 생긴 변경분은 다음 동기화에서 반영
+    실패한 테이블은 채우지 않음 (다음 조회에서 오류 반환/재시도)
+    """
+    sync_changes()
+    with _replica.lock:
+        if _replica.disabled:
+            return
+        missing = [t for t in dict.fromkeys(tables) if t in _ID_FIELDS and t not in _replica.tables]
+        if not missing:
+            return
+        if len(missing) == 1:
+            loaded = [_load_table(missing[0])]
+        else:
+            loaded = list(_executor().map(_with_script_ctx(_load_table), missing))
+        for table, (data, err) in zip(missing, loaded):
+            if not err:
+                id_field = _ID_FIELDS[table]
+                _replica.tables[table] = OrderedDict((str(r.get(id_field) or ''), r) for r in data)
+                _replica.generation += 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    """fetch_many용 스레드 풀 (프로세스 공유, 첫 사용 시 생성)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix='dujon-fetch')
+        return _pool
+
+
+def _with_script_ctx(fn):
+    """작업 스레드에서도 st.cache_data(스피너 등)가 현재 스크립트 실행 컨텍스트를 쓰도록 감쌈"""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        return fn
+    if ctx is None:
+        return fn
+
+    def _run(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    return _run
+
+
+def fetch_many(*calls):
+    """독립된 조회를 동시에 실행하고 결과를 호출 순서대로 반환 (각 캐시 항목은 평소처럼 채워짐)
+
+    Args:
+        *calls: 캐시 함수 또는 (캐시 함수, kwargs) 예) get_sites_cached, (get_personnel_cached, {'status': '투입가능'})
+
+    Returns:
+        list: 호출별 (data, error)
+    """
+    calls = [(c, {}) if callable(c) else (c[0], dict(c[1] or {})) for c in calls]
+    # 복제본 대상 테이블은 먼저 동시에 채움 → 이후 호출은 메모리 필터만
+    prefetch(*(_CALL_TABLES[fn] for fn, _ in calls if fn in _CALL_TABLES))
+    with _replica.lock:
+        in_memory = not _replica.disabled and all(
+            _CALL_TABLES.get(fn) in _replica.tables for fn, _ in calls)
+    if in_memory or len(calls) == 1:
+        return [fn(**kwargs) for fn, kwargs in calls]
+    # TTL 캐시 경로(변경 피드 미지원)/통계 등: 네트워크 요청을 동시에
+    futures = [_executor().submit(_with_script_ctx(fn), **kwargs) for fn, kwargs in calls]
+    return [f.result() for f in futures]
+
+
+# ========== DataFrame 모델 (페이지 공용) ==========
+_MODEL_TABLES = ('sites', 'personnel', 'certificates')
+_model = None
+_model_key = None
+_model_lock = threading.Lock()
+
+
+def _build_model(key, loader):
+    """key가 바뀌었을 때만 loader()로 모델을 다시 구성 (프로세스 공유)"""
+    global _model, _model_key
+    with _model_lock:
+        if _model is not None and _model_key == key:
+            return _model
+        _model, _model_key = DataModel(*loader()), key
+        return _model
+
+
+def _replica_model():
+    """복제본에 세 목록이 모두 로드돼 있으면 그 내용의 모델, 아니면 None (요청 없음)"""
+    sync_changes()
+    with _replica.lock:
+        if _replica.disabled or not all(t in _replica.tables for t in _MODEL_TABLES):
+            return None
+        return _build_model(('replica', _replica.generation),
+                            lambda: [list(_replica.tables[t].values()) for t in _MODEL_TABLES])
+
+
+def get_data_model_cached():
+    """현장/인력/자격증 DataFrame 모델 (category 열, 소유자명→자격증 인덱스, 집계)
+
+    복제본 경로: 복제본 내용이 바뀐 경우에만 다시 구성. TTL 경로: 목록 캐시(1분)와 같은 주기로 다시 구성
+
+    Returns:
+        tuple: (DataModel, error)
+    """
+    prefetch(*_MODEL_TABLES)
+    model = _replica_model()
+    if model is not None:
+        return model, None
+    (sites, sites_err), (personnel, personnel_err), (certs, certs_err) = fetch_many(
+        get_sites_cached, get_personnel_cached, get_certificates_cached)
+    err = sites_err or personnel_err or certs_err
+    if err:
+        return None, err
+    if isinstance(sites, dict):
+        sites = sites.get('data')
+    key = ('ttl', int(time.monotonic() // CACHE_TTL_MEDIUM))
+    return _build_model(key, lambda: (sites or [], personnel or [], certs or [])), None
+
+
+# ========== 통계 (짧은 캐시) ==========
+def get_stats_cached():
+    """통계 조회. 복제본에 세 목록이 모두 있으면 DataModel 집계(요청 없음), 아니면 30초 캐시
+    
+    Returns:
+        tuple: (data, error)
+    """
+    model = _replica_model()
+    if model is not None:
+        return model.stats(), None
+    return _get_stats_ttl()
+
+
+@st.cache_data(ttl=CACHE_TTL_SHORT, show_spinner="통계 로딩 중...")
+def _get_stats_ttl():
+    """통계 조회 (30초 캐시)"""
+    return _get_stats()
+
+
+# ========== 현장 목록 (델타 동기화) ==========
+def get_sites_cached(company=None, status=None, state=None, limit=None, offset=None, cursor=None):
+    """현장 목록 조회 (복제본에서 필터/페이지, 변경분만 서버에서 받음)
+    
+    Args:
+        company: 회사구분 필터
+        status: 배정상태 필터
+        state: 현장상태 필터
+        limit: 최대 개수
+        offset: 시작 위치
+        cursor: 커서 페이지네이션 (빈 문자열 = 첫 페이지, 지정 시 offset 무시)
+        
+    Returns:
+        tuple: (data, error)
+    """
+    rows, err = _replica_rows('sites')
+    if err:
+        return None, err
+    if rows is None:
+        return _get_sites_ttl(company, status, state, limit, offset, cursor)
+    rows = [s for s in rows if site_filter(company, status, state)(s)]
+    if cursor is not None:
+        try:
+            page, next_cursor = keyset_page(
+                rows, lambda s: (s.get('등록일') or '', s.get('현장ID') or ''), cursor, clamp_page_size(limit))
+        except ValueError as e:
+            return None, str(e)
+        return {'data': page, 'next_cursor': next_cursor}, None
+    start = offset or 0
+    return (rows[start:start + limit] if limit else rows[start:]), None
+
+
+@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 목록 로딩 중...")
+def _get_sites_ttl(company=None, status=None, state=None, limit=None, offset=None, cursor=None):
+    """현장 목록 조회 (1분 캐시, 변경 피드 미지원 서버용)"""
+    return _get_sites(company, status, state, limit, offset, cursor)
+
+
+@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 검색 중...")
+def search_sites_cached(q, limit=None):
+    """현장 검색 (1분 캐시)
+    
+    Args:
+        q: 검색어
+        limit: 최대 결과 수 (기본 50, 관련도순)
+        
+    Returns:
+        tuple: (data, error)
+    """
+    return _search_sites(q, limit)
+
+
+def get_site_cached(site_id):
+    """현장 상세 조회 (복제본에 있으면 API 호출 없음)
+    
+    Args:
+        site_id: 현장 ID
+        
+    Returns:
+        tuple: (data, error)
+    """
+    rows, _ = _replica_rows('sites')
+    if rows is not None:
+        site = next((s for s in rows if s.get('현장ID') == site_id), None)
+        if site is not None:
+            # 낙관적 잠금 버전은 상세 API와 동일하게 정수 행 버전
+            return {**site, 'version': int(site.get('버전') or 0)}, None
+    return _get_site_ttl(site_id)
+
+
+@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="현장 상세 로딩 중...")
+def _get_site_ttl(site_id):
+    """현장 상세 조회 (1분 캐시)"""
+    return _get_site(site_id)
+
+
+# ========== 인력 목록 (델타 동기화) ==========
+def get_personnel_cached(status=None, role=None):
+    """인력 목록 조회 (복제본에서 필터)
+    
+    Args:
+        status: 현재상태 필터
+        role: 직책 필터
+        
+    Returns:
+        tuple: (data, error)
+    """
+    rows, err = _replica_rows('personnel')
+    if err:
+        return None, err
+    if rows is None:
+        return _get_personnel_ttl(status, role)
+    return [p for p in rows if personnel_filter(status, role)(p)], None
+
+
+@st.cache_data(ttl=CACHE_TTL_MEDIUM, show_spinner="인력 목록 로딩 중...")
+def _get_personnel_ttl(status=None, role=None):
+    """인력 목록 조회 (1분 캐시, 변경 피드 미지원 서버용)"""
+    return _get_personnel(status, role)
+
+
+# ========== 자격증 목록 (델타 동기화) ==========
+def get_certificates_cached(available=None):
+    """자격증 목록 조회 (복제본에서 필터)
+    
+    Args:
+        available: 사용가능여부 필터
+        
+    Returns:
+        tuple: (data, error)
+    """
+    rows, err = _replica_rows('certificates')
+    if err:
+        return None, err
+    if rows is None:
+        return _get_certificates_ttl(available)
+    available = {True: 'true', False: 'false'}.get(available, available)
+    return [c for c in rows if certificate_filter(available)(c)], None
+
+
+@st.cache_data(ttl=CACHE_TTL_LONG, show_spinner="자격증 목록 로딩 중...")
+def _get_certificates_ttl(available=None):
+    """자격증 목록 조회 (5분 캐시, 변경 피드 미지원 서버용)"""
+    return _get_certificates(available)
+
+
+# fetch_many: 복제본으로 처리되는 캐시 함수 → 테이블
+_CALL_TABLES = {
+    get_sites_cached: 'sites',
+    get_site_cached: 'sites',
+    get_personnel_cached: 'personnel',
+    get_certificates_cached: 'certificates',
+}
+
+
+# ========== API 연결 확인 (캐시 없음) ==========
+def check_api_connection_cached():
+    """API 연결 확인 (캐시 없음)
+    
+    Returns:
+        tuple: (is_connected, error_message)
+    """
+    return _check_api_connection()
+
+
+# ========== 캐시 관리 함수 ==========
+def clear_all_caches():
+    """모든 캐시 초기화 (복제본 포함, 다음 조회 시 전체 재조회)"""
+    st.cache_data.clear()
+    _replica.reset()
+
+
+def clear_stats_cache():
+    """통계 캐시만 초기화"""
+    _get_stats_ttl.clear()
+
+
+def _drop_tables(*tables):
+    with _replica.lock:
+        for table in tables:
+            _replica.tables.pop(table, None)
+        _replica.generation += 1
+
+
+def clear_sites_cache():
+    """현장 관련 캐시 초기화 (전체 재조회). 쓰기 후에는 sync_changes(force=True) 권장"""
+    _drop_tables('sites')
+    _get_sites_ttl.clear()
+    search_sites_cached.clear()
+    _get_site_ttl.clear()
+
+
+def clear_personnel_cache():
+    """인력 캐시 초기화"""
+    _drop_tables('personnel')
+    _get_personnel_ttl.clear()
+
+
+def clear_certificates_cache():
+    """자격증 캐시 초기화"""
+    _drop_tables('certificates')
+    _get_certificates_ttl.clear()
+
+
+# ========== 캐시 상태 표시 ==========
+def render_cache_info():
+    """캐시 정보 표시 (디버깅용)"""
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔄 캐시 관리")
+    
+    col1, col2 = st.sidebar.columns(2)
+    
+    with col1:
+        if st.button("전체 초기화", use_container_width=True, key="clear_all"):
+            clear_all_caches()
+            st.rerun()
+    
+    with col2:
+        if st.button("통계만", use_container_width=True, key="clear_stats"):
+            clear_stats_cache()
+            st.rerun()
+    
+    st.sidebar.caption(f"""
+    **캐시 TTL:**
+    - 통계: {CACHE_TTL_SHORT}초
+    - 현장/인력/자격증: 변경분 동기화 ({CHANGES_POLL_INTERVAL:g}초마다 확인)
+    """)
+
+
+# ========== 사용 가이드 ==========
+"""
+# 캐싱된 API 사용법
+
+## 기본 사용
+```python
+from streamlit_utils.cached_api import get_sites_cached, get_personnel_cached
+
+# 캐싱된 API 호출
+sites_data, sites_err = get_sites_cached()
+personnel_data, personnel_err = get_personnel_cached(status='투입가능')
+```
+
+## 여러 목록 동시 조회
+```python
+from streamlit_utils.cached_api import fetch_many, get_personnel_cached, get_certificates_cached
+
+# 첫 로드 지연 = 가장 느린 1건 (순서대로 부르면 합)
+(personnel, p_err), (certs, c_err) = fetch_many(
+    (get_personnel_cached, {'status': '투입가능'}),
+    (get_certificates_cached, {'available': True}),
+)
+```
+
+## 쓰기 후 갱신
+```python
+from streamlit_utils.cached_api import sync_changes, clear_all_caches
+
+# 배정/해제 후: 바뀐 행만 받아 목록에 반영 (전체 재조회 없음)
+sync_changes(force=True)
+
+# 모든 캐시 초기화 (다음 조회 시 전체 재조회)
+clear_all_caches()
+```
+
+## 캐시 TTL 설정
+- `CACHE_TTL_SHORT = 30`: 통계 (30초)
+- `CACHE_TTL_MEDIUM = 60` / `CACHE_TTL_LONG = 300`: 변경 피드 미지원 서버일 때 현장·인력 / 자격증
+- `CHANGES_POLL_INTERVAL = 5`: 현장/인력/자격증 복제본의 변경 확인 간격
+
+## 주의사항
+1. 배정/해제 후에는 `sync_changes(force=True)` 호출 (변경분만 반영)
+2. 서버 재시작 등으로 커서를 이어 받을 수 없으면 자동으로 전체 재조회
+3. 실시간 데이터가 필요한 경우 캐시 없는 원본 함수 사용
+"""
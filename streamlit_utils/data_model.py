@@ -0,0 +1,154 @@
+"""
+현장/인력/자격증 DataFrame 모델 (Streamlit 페이지 공용)
+- 상태/구분 열은 category dtype → 필터는 정수 코드 비교, 집계는 value_counts 1회
+- 소유자명 → 자격증 행 위치 인덱스(groupby 1회) → 인원별 자격증 조회 O(1) (인원마다 전체 목록을 훑지 않음)
+- 집계(value_counts)는 처음 요청할 때 계산해 모델에 보관
+- 모델은 cached_api.get_data_model_cached()가 복제본이 바뀔 때만 다시 구성 (페이지/rerun 간 공유)
+"""
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from api.services.stats_service import COMPANIES, empty_stats
+
+# 테이블별 category 열 (값 종류가 적은 상태/구분 열). 없는 값은 '' (compute_stats와 같은 규칙)
+CATEGORY_COLUMNS = {
+    'sites': ('회사구분', '배정상태', '현장상태'),
+    'personnel': ('현재상태', '직책', '소속'),
+    'certificates': ('사용가능여부', '자격증명'),
+}
+
+Rows = Union[pd.DataFrame, Iterable[Dict]]
+
+
+def to_frame(rows: Rows, table: str) -> pd.DataFrame:
+    """행 목록(또는 DataFrame) → category 열을 갖춘 DataFrame"""
+    df = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows or []))
+    for column in CATEGORY_COLUMNS[table]:
+        if column in df.columns:
+            df[column] = df[column].astype(object).where(df[column].notna(), '').astype('category')
+    return df.reset_index(drop=True)
+
+
+def records(df: pd.DataFrame) -> List[Dict]:
+    """DataFrame → 행 dict 목록 (NaN은 None). 화면 표시/기존 dict 기반 함수 호환용"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _value_counts(series: pd.Series) -> Dict[str, int]:
+    counts = series.value_counts(sort=False)
+    return {str(k): int(v) for k, v in counts.items() if v}
+
+
+def filter_sites(df: pd.DataFrame, manager: Optional[str] = None,
+                 date_start: Optional[str] = None, date_end: Optional[str] = None) -> pd.DataFrame:
+    """현장 추가 필터 (담당소장명 일치, 착공예정일 범위 'YYYY-MM-DD'). 조건이 없으면 그대로"""
+    mask = np.ones(len(df), dtype=bool)
+    if manager and manager.strip() and '담당소장명' in df.columns:
+        mask &= (df['담당소장명'].fillna('').astype(str).str.strip() == manager.strip()).to_numpy()
+    if (date_start or date_end) and '착공예정일' in df.columns:
+        dates = df['착공예정일'].fillna('').astype(str)
+        mask &= (dates != '').to_numpy()
+        if date_start:
+            mask &= (dates >= date_start).to_numpy()
+        if date_end:
+            mask &= (dates <= date_end).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+class DataModel:
+    """현장/인력/자격증 DataFrame + 조인 인덱스/집계 (읽기 전용으로 공유)"""
+
+    def __init__(self, sites: Rows = (), personnel: Rows = (), certificates: Rows = ()):
+        self.sites = to_frame(sites, 'sites')
+        self.personnel = to_frame(personnel, 'personnel')
+        self.certificates = to_frame(certificates, 'certificates')
+        self._certs_by_owner = None
+        self._counts: Dict[tuple, Dict[str, int]] = {}
+
+    # --- 조인 인덱스 ---
+    @property
+    def certs_by_owner(self) -> Dict[str, np.ndarray]:
+        """소유자명 → 자격증 행 위치 배열 (처음 사용 시 groupby 1회)"""
+        if self._certs_by_owner is None:
+            if '소유자명' in self.certificates.columns and len(self.certificates):
+                self._certs_by_owner = self.certificates.groupby('소유자명', sort=False).indices
+            else:
+                self._certs_by_owner = {}
+        return self._certs_by_owner
+
+    def certificates_of(self, name: str) -> pd.DataFrame:
+        """소유자명이 name인 자격증 (행 위치 인덱스 조회)"""
+        positions = self.certs_by_owner.get(name)
+        if positions is None:
+            return self.certificates.iloc[0:0]
+        return self.certificates.iloc[positions]
+
+    # --- 필터 ---
+    def filter_personnel(self, status: Optional[str] = None, role: Optional[str] = None,
+                         name: Optional[str] = None, frame: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """인력 필터 (현재상태/직책 일치, 성명 부분 일치·대소문자 무시)"""
+        df = self.personnel if frame is None else frame
+        mask = np.ones(len(df), dtype=bool)
+        if status and '현재상태' in df.columns:
+            mask &= (df['현재상태'] == status).to_numpy()
+        if role and '직책' in df.columns:
+            mask &= (df['직책'] == role).to_numpy()
+        if name and name.strip() and '성명' in df.columns:
+            mask &= df['성명'].fillna('').astype(str).str.lower().str.contains(
+                name.strip().lower(), regex=False).to_numpy()
+        return df if mask.all() else df[mask]
+
+    def filter_certificates(self, available=None) -> pd.DataFrame:
+        """자격증 필터 (True/'true' → 사용가능, False/'false' → 그 외)"""
+        available = {True: 'true', False: 'false'}.get(available, available)
+        df = self.certificates
+        if available not in ('true', 'false') or '사용가능여부' not in df.columns:
+            return df
+        usable = (df['사용가능여부'] == '사용가능').to_numpy()
+        return df[usable if available == 'true' else ~usable]
+
+    @staticmethod
+    def roles(frame: pd.DataFrame) -> List[str]:
+        """직책 목록 (빈 값 제외, 정렬)"""
+        if '직책' not in frame.columns:
+            return []
+        return sorted(r for r in frame['직책'].unique() if isinstance(r, str) and r)
+
+    # --- 집계 ---
+    def counts(self, table: str, column: str) -> Dict[str, int]:
+        """열 값별 건수 (0건 제외). 모델당 1회 계산"""
+        key = (table, column)
+        if key not in self._counts:
+            df = getattr(self, table)
+            self._counts[key] = _value_counts(df[column]) if column in df.columns else {}
+        return self._counts[key]
+
+    def stats(self) -> Dict:
+        """/api/stats와 같은 형식의 통계 (stats_service.compute_stats와 동일한 규칙)"""
+        stats = empty_stats()
+        sites, personnel, certs = stats['sites'], stats['personnel'], stats['certificates']
+
+        sites['total'] = len(self.sites)
+        assign = self.counts('sites', '배정상태')
+        sites['assigned'] = assign.get('배정완료', 0)
+        sites['unassigned'] = assign.get('미배정', 0)
+        company = self.counts('sites', '회사구분')
+        sites['by_company'] = {c: company.get(c, 0) for c in COMPANIES}
+        sites['by_state'] = dict(self.counts('sites', '현장상태')) if '현장상태' in self.sites.columns \
+            else ({'': len(self.sites)} if len(self.sites) else {})
+
+        personnel['total'] = len(self.personnel)
+        status = self.counts('personnel', '현재상태')
+        personnel['available'] = status.get('투입가능', 0)
+        personnel['deployed'] = status.get('투입중', 0)
+        personnel['by_role'] = dict(self.counts('personnel', '직책')) if '직책' in self.personnel.columns \
+            else ({'': len(self.personnel)} if len(self.personnel) else {})
+
+        certs['total'] = len(self.certificates)
+        usable = self.counts('certificates', '사용가능여부')
+        certs['available'] = usable.get('사용가능', 0)
+        certs['in_use'] = usable.get('사용중', 0)
+        certs['expired'] = usable.get('만료', 0)
+        return stats
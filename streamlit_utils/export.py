@@ -4,7 +4,7 @@ Excel, CSV 내보내기 기능
 """
 import streamlit as st
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 import io
 
@@ -35,7 +35,8 @@ def export_to_excel(
         # 컬럼 너비 자동 조정
         for idx, col in enumerate(data.columns):
             max_length = max(
-                data[col].astype(str).apply(len).max(),
+                # 빈 값(None/NaN)은 길이 0 (category 열 포함)
+                data[col].astype(object).fillna('').astype(str).str.len().max(),
                 len(str(col))
             )
             worksheet.column_dimensions[chr(65 + idx)].width = min(max_length + 2, 50)
@@ -175,16 +176,16 @@ def render_export_section(
         )
 
 
-def prepare_sites_export(sites_data: List[Dict[str, Any]]) -> pd.DataFrame:
+def prepare_sites_export(sites_data: Union[List[Dict[str, Any]], pd.DataFrame]) -> pd.DataFrame:
     """현장 데이터를 내보내기용 DataFrame으로 변환
     
     Args:
-        sites_data: 현장 데이터 리스트
+        sites_data: 현장 데이터 리스트 또는 DataFrame
         
     Returns:
         정리된 DataFrame
     """
-    if not sites_data:
+    if sites_data is None or len(sites_data) == 0:
         return pd.DataFrame()
     
     df = pd.DataFrame(sites_data)
@@ -205,16 +206,16 @@ def prepare_sites_export(sites_data: List[Dict[str, Any]]) -> pd.DataFrame:
     return df
 
 
-def prepare_personnel_export(personnel_data: List[Dict[str, Any]]) -> pd.DataFrame:
+def prepare_personnel_export(personnel_data: Union[List[Dict[str, Any]], pd.DataFrame]) -> pd.DataFrame:
     """인력 데이터를 내보내기용 DataFrame으로 변환
     
     Args:
-        personnel_data: 인력 데이터 리스트
+        personnel_data: 인력 데이터 리스트 또는 DataFrame
         
     Returns:
         정리된 DataFrame
     """
-    if not personnel_data:
+    if personnel_data is None or len(personnel_data) == 0:
         return pd.DataFrame()
     
     df = pd.DataFrame(personnel_data)
@@ -234,16 +235,16 @@ def prepare_personnel_export(personnel_data: List[Dict[str, Any]]) -> pd.DataFra
     return df
 
 
-def prepare_certificates_export(certificates_data: List[Dict[str, Any]]) -> pd.DataFrame:
+def prepare_certificates_export(certificates_data: Union[List[Dict[str, Any]], pd.DataFrame]) -> pd.DataFrame:
     """자격증 데이터를 내보내기용 DataFrame으로 변환
     
     Args:
-        certificates_data: 자격증 데이터 리스트
+        certificates_data: 자격증 데이터 리스트 또는 DataFrame
         
     Returns:
         정리된 DataFrame
     """
-    if not certificates_data:
+    if certificates_data is None or len(certificates_data) == 0:
         return pd.DataFrame()
     
     df = pd.DataFrame(certificates_data)
@@ -0,0 +1,160 @@
+"""
+render_html_app용 HTML 번들 캐시
+- 키: (HTML 파일, 설정 튜플(api_mode, API URL, Supabase URL/키), 최소화 여부)
+- 값: CSS/JS 인라인 + 설정 스크립트까지 끝난 HTML과 원본 파일들의 (mtime, 크기)
+- rerun마다: 메모리 dict 조회 (BUNDLE_CHECK_INTERVAL마다 원본 파일 stat만 확인)
+- 원본이 바뀌었을 때만 다시 읽고 인라인화. 프로세스 재시작 시에는 디스크 번들을 검증 후 재사용
+
+환경 변수:
+- HTML_BUNDLE_CACHE_DIR=.cache/html_bundle → 디스크 번들 위치 (빈 값이면 메모리만)
+- HTML_BUNDLE_MINIFY=0                     → 1이면 빈 줄/들여쓰기 제거 (pre/textarea 제외)
+- BUNDLE_CHECK_INTERVAL=2                  → 원본 변경 확인 간격(초). 0이면 매번 확인
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from streamlit_utils.static_inliner import get_project_root, prepare_html_for_streamlit, referenced_assets
+
+BUNDLE_FORMAT = 1
+HTML_BUNDLE_CACHE_DIR = os.getenv('HTML_BUNDLE_CACHE_DIR', os.path.join('.cache', 'html_bundle')).strip()
+HTML_BUNDLE_MINIFY = os.getenv('HTML_BUNDLE_MINIFY', '0').strip().lower() in ('1', 'true', 'yes')
+BUNDLE_CHECK_INTERVAL = float(os.getenv('BUNDLE_CHECK_INTERVAL', '2') or 0)
+
+_PRESERVE = re.compile(r'(<(pre|textarea)\b.*?</\2>)', re.DOTALL | re.IGNORECASE)
+
+
+class _Bundle:
+    __slots__ = ('html', 'deps', 'checked_at')
+
+    def __init__(self, html, deps):
+        self.html = html
+        self.deps = deps  # {경로: [mtime_ns, 크기]}
+        self.checked_at = time.monotonic()
+
+
+_bundles = {}
+_lock = threading.Lock()
+stats = {'hits': 0, 'disk_hits': 0, 'builds': 0}
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def _fresh(deps):
+    return all(_stat(path) == sig for path, sig in deps.items())
+
+
+def minify_html(html):
+    """빈 줄과 줄 앞뒤 공백 제거 (pre/textarea 안은 그대로)"""
+    parts = _PRESERVE.split(html)
+    out = []
+    # split 결과: [일반, 보존 블록, 태그명, 일반, ...]
+    for i in range(0, len(parts), 3):
+        out.append('\n'.join(line.strip() for line in parts[i].splitlines() if line.strip()))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out)
+
+
+def _disk_path(key):
+    if not HTML_BUNDLE_CACHE_DIR:
+        return None
+    base = HTML_BUNDLE_CACHE_DIR
+    if not os.path.isabs(base):
+        base = str(get_project_root() / base)
+    digest = hashlib.sha256(json.dumps([BUNDLE_FORMAT, *key], ensure_ascii=False).encode('utf-8')).hexdigest()
+    return os.path.join(base, f'{digest[:32]}.json')
+
+
+def _load_disk(key):
+    path = _disk_path(key)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('format') != BUNDLE_FORMAT or not _fresh(data.get('deps') or {}):
+        return None
+    return _Bundle(data['html'], data['deps'])
+
+
+def _save_disk(key, bundle):
+    """원자적 교체 (다른 프로세스가 읽는 중이어도 반쯤 쓴 파일을 보지 않음). 실패해도 메모리 캐시는 유지"""
+    path = _disk_path(key)
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'format': BUNDLE_FORMAT, 'deps': bundle.deps, 'html': bundle.html}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def build_bundle(html_file, config, minify=False):
+    """HTML 읽기 → CSS/JS 인라인 + 설정 스크립트 → (최소화). 원본 파일 시그니처와 함께 반환"""
+    api_mode, api_base_url, supabase_url, supabase_anon_key = config
+    html_path = get_project_root() / html_file
+    if not html_path.exists():
+        raise FileNotFoundError(f"HTML 파일을 찾을 수 없습니다: {html_path}")
+    # 읽기 전에 stat → 읽는 도중 바뀌면 다음 확인 때 다시 빌드
+    deps = {str(html_path): _stat(html_path)}
+    with open(html_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    deps.update((str(path), _stat(path)) for path in referenced_assets(source))
+    html = prepare_html_for_streamlit(
+        source,
+        api_base_url=api_base_url,
+        api_mode=api_mode,
+        supabase_url=supabase_url,
+        supabase_anon_key=supabase_anon_key,
+    )
+    if minify:
+        html = minify_html(html)
+    return _Bundle(html, deps)
+
+
+def get_bundle(html_file, config, minify=None):
+    """캐시된 번들 HTML. 원본(HTML/CSS/JS)이 바뀌었거나 처음이면 빌드"""
+    minify = HTML_BUNDLE_MINIFY if minify is None else minify
+    key = (str(html_file), tuple(config), bool(minify))
+    now = time.monotonic()
+    with _lock:
+        bundle = _bundles.get(key)
+        if bundle is not None and now - bundle.checked_at < BUNDLE_CHECK_INTERVAL:
+            stats['hits'] += 1
+            return bundle.html
+    if bundle is not None and _fresh(bundle.deps):
+        with _lock:
+            bundle.checked_at = now
+            stats['hits'] += 1
+        return bundle.html
+    bundle = _load_disk(key)
+    if bundle is not None:
+        stats['disk_hits'] += 1
+    else:
+        bundle = build_bundle(html_file, config, minify)
+        stats['builds'] += 1
+        _save_disk(key, bundle)
+    with _lock:
+        _bundles[key] = bundle
+    return bundle.html
+
+
+def clear_bundles():
+    """메모리 번들 제거 (디스크 번들은 원본 시그니처로 검증되므로 그대로 둠)"""
+    with _lock:
+        _bundles.clear()
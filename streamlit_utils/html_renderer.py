@@ -6,7 +6,7 @@ import os
 import re
 from pathlib import Path
 import streamlit.components.v1 as components
-from streamlit_utils.static_inliner import prepare_html_for_streamlit
+from streamlit_utils.html_bundle import get_bundle
 
 
 def get_project_root():
@@ -37,10 +37,42 @@ def _detect_streamlit_cloud():
     )
 
 
+def _resolve_config():
+    """번들 설정 튜플 (api_mode, API 기본 URL, Supabase URL, Supabase Anon Key)"""
+    # API 모드 결정 (환경 변수 또는 기본값)
+    api_mode = os.getenv('API_MODE', '').strip().lower() or 'flask'  # 'flask' 또는 'supabase'
+
+    # API 기본 URL 결정
+    api_base_url = os.getenv('API_BASE_URL', '').strip()
+
+    # Supabase 설정 (API_MODE='supabase'일 때 사용)
+    supabase_url = os.getenv('SUPABASE_URL', '').strip()
+    supabase_anon_key = os.getenv('SUPABASE_ANON_KEY', '').strip()
+
+    # API_MODE가 'supabase'이고 Supabase 설정이 있으면 Supabase 직접 연결 사용
+    if api_mode == 'supabase' and supabase_url and supabase_anon_key:
+        # Supabase 직접 연결 모드
+        api_base_url = ''  # API_BASE_URL은 사용하지 않음
+    elif _detect_streamlit_cloud():
+        # 배포 환경에서는 상대 경로 사용 (같은 서버의 /api)
+        # 또는 환경 변수로 설정된 URL 사용
+        if not api_base_url:
+            api_base_url = '/api'
+    else:
+        # 로컬 개발 환경 - 명확하게 절대 URL 사용
+        if not api_base_url:
+            api_base_url = 'http://localhost:5000/api'  # /api 포함하여 명확하게 설정
+        elif not api_base_url.endswith('/api'):
+            # API_BASE_URL이 설정되어 있지만 /api가 없으면 추가
+            api_base_url = api_base_url.rstrip('/') + '/api'
+    return api_mode, api_base_url, supabase_url, supabase_anon_key
+
+
 def render_html_app(html_file='site-management.html', height=800, key=None):
     """
     HTML 앱을 Streamlit에 렌더링
     CSS/JS를 인라인으로 포함하여 Streamlit Cloud에서도 동작
+    인라인화 결과는 html_bundle 캐시 사용 (원본 파일/설정이 바뀔 때만 다시 만듦)
     
     Args:
         html_file: 렌더링할 HTML 파일명
@@ -48,47 +80,7 @@ def render_html_app(html_file='site-management.html', height=800, key=None):
         key: Streamlit 컴포넌트 키
     """
     try:
-        html_content = load_html_file(html_file)
-        
-        # API 모드 결정 (환경 변수 또는 기본값)
-        import os
-        api_mode = os.getenv('API_MODE', '').strip().lower() or 'flask'  # 'flask' 또는 'supabase'
-        
-        # API 기본 URL 결정
-        api_base_url = os.getenv('API_BASE_URL', '').strip()
-        
-        # Supabase 설정 (API_MODE='supabase'일 때 사용)
-        supabase_url = os.getenv('SUPABASE_URL', '').strip()
-        supabase_anon_key = os.getenv('SUPABASE_ANON_KEY', '').strip()
-        
-        # Streamlit Cloud 환경 감지
-        is_streamlit_cloud = _detect_streamlit_cloud()
-        
-        # API_MODE가 'supabase'이고 Supabase 설정이 있으면 Supabase 직접 연결 사용
-        if api_mode == 'supabase' and supabase_url and supabase_anon_key:
-            # Supabase 직접 연결 모드
-            api_base_url = ''  # API_BASE_URL은 사용하지 않음
-        elif is_streamlit_cloud:
-            # 배포 환경에서는 상대 경로 사용 (같은 서버의 /api)
-            # 또는 환경 변수로 설정된 URL 사용
-            if not api_base_url:
-                api_base_url = '/api'
-        else:
-            # 로컬 개발 환경 - 명확하게 절대 URL 사용
-            if not api_base_url:
-                api_base_url = 'http://localhost:5000/api'  # /api 포함하여 명확하게 설정
-            elif not api_base_url.endswith('/api'):
-                # API_BASE_URL이 설정되어 있지만 /api가 없으면 추가
-                api_base_url = api_base_url.rstrip('/') + '/api'
-        
-        # CSS/JS 인라인화 및 Streamlit 준비
-        html_content = prepare_html_for_streamlit(
-            html_content, 
-            api_base_url=api_base_url,
-            api_mode=api_mode,
-            supabase_url=supabase_url,
-            supabase_anon_key=supabase_anon_key
-        )
+        html_content = get_bundle(html_file, _resolve_config())
         
         # Streamlit components로 렌더링
         # 참고: components.html()은 key 인자를 지원하지 않는 버전이 있음 (Streamlit Cloud 등)
@@ -0,0 +1,127 @@
+"""
+Streamlit 실시간 갱신 - Flask GET /api/events (Server-Sent Events) 구독
+
+- 프로세스당 백그라운드 스레드 1개가 이벤트를 받아 cached_api 복제본을 변경분만 동기화하고 세대 번호를 올림
+- 페이지는 render_live_updates()로 가벼운 fragment를 두고, 세대 번호가 바뀌었을 때만 전체 rerun
+  (fragment 확인은 메모리 비교뿐이라 API 요청 없음)
+- Supabase 직접 모드이거나 SSE 연결이 안 되면 기존 방식(변경 피드 주기 확인/TTL 캐시)으로 동작
+
+환경 변수:
+- LIVE_CHECK_INTERVAL=2 → 페이지가 세대 번호를 확인하는 간격(초)
+"""
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+from streamlit_utils import api_client
+
+LIVE_CHECK_INTERVAL = float(os.getenv('LIVE_CHECK_INTERVAL', '2') or 2)
+# 서버 하트비트(15초)보다 길게. 이 시간 동안 아무것도 오지 않으면 재연결
+SSE_READ_TIMEOUT = 60
+SSE_MAX_BACKOFF = 30
+
+
+def iter_sse(lines):
+    """SSE 줄 이터러블 → (id, event, data) 블록 단위로 반환. 주석(:)/retry는 무시"""
+    event_id, event_type, data = None, 'message', []
+    for line in lines:
+        if line is None:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line == '':
+            if data:
+                yield event_id, event_type, '\n'.join(data)
+            event_id, event_type, data = None, 'message', []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        value = value[1:] if value.startswith(' ') else value
+        if field == 'id':
+            event_id = value
+        elif field == 'event':
+            event_type = value
+        elif field == 'data':
+            data.append(value)
+
+
+class _Listener(threading.Thread):
+    """/api/events 구독 스레드. 끊기면 Last-Event-ID로 재연결 (지수 백오프)"""
+
+    def __init__(self, url):
+        super().__init__(name='dujon-live-events', daemon=True)
+        self.url = url
+        self.generation = 0
+        self.last_event_id = None
+        self.connected = False
+
+    def run(self):
+        backoff = 1
+        while True:
+            try:
+                self._consume()
+                backoff = 1
+            except Exception:
+                pass
+            self.connected = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2, SSE_MAX_BACKOFF)
+
+    def _consume(self):
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id:
+            headers['Last-Event-ID'] = self.last_event_id
+        with api_client.get_session().get(self.url, headers=headers, stream=True,
+                                          timeout=(api_client.HTTP_CONNECT_TIMEOUT, SSE_READ_TIMEOUT)) as r:
+            r.raise_for_status()
+            self.connected = True
+            for event_id, _, data in iter_sse(r.iter_lines(decode_unicode=True)):
+                if event_id:
+                    self.last_event_id = event_id
+                self.handle(json.loads(data))
+
+    def handle(self, event):
+        """이벤트 1건 반영: 복제본 델타 동기화 (resync면 전체 재조회 예약) 후 세대 번호 증가"""
+        from streamlit_utils import cached_api
+        if event.get('type') == 'resync':
+            cached_api.clear_all_caches()
+        else:
+            cached_api.sync_changes(force=True)
+            cached_api.clear_stats_cache()
+        self.generation += 1
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_listener():
+    """프로세스 공유 구독 스레드 (Flask API 모드에서만). 없으면 None"""
+    global _listener
+    if api_client._api_mode != 'flask':
+        return None
+    with _listener_lock:
+        if _listener is None:
+            _listener = _Listener(api_client._url('/api/events'))
+            _listener.start()
+        return _listener
+
+
+def render_live_updates(key='live_generation'):
+    """페이지에 실시간 갱신 추가. 다른 사용자의 배정/수정 이벤트가 오면 화면 전체를 다시 그림"""
+    listener = get_listener()
+    if listener is None or not hasattr(st, 'fragment'):
+        return
+    st.session_state.setdefault(key, listener.generation)
+
+    @st.fragment(run_every=LIVE_CHECK_INTERVAL)
+    def _watch():
+        if listener.generation != st.session_state[key]:
+            st.session_state[key] = listener.generation
+            st.rerun(scope='app')
+
+    _watch()
@@ -7,12 +7,30 @@ from pathlib import Path
 import re
 
 
+CSS_PATTERN = r'<link[^>]*rel=["\']stylesheet["\'][^>]*href=["\']([^"\']+)["\'][^>]*>'
+JS_PATTERN = r'<script[^>]*src=["\']([^"\']+)["\'][^>]*></script>'
+
+
 def get_project_root():
     """프로젝트 루트 경로 반환"""
     current_file = Path(__file__).resolve()
     return current_file.parent.parent
 
 
+def _local_path(root, ref):
+    """HTML의 CSS/JS 참조 → 로컬 파일 경로. 외부(CDN) 참조면 None"""
+    if ref.startswith('http') or ref.startswith('//'):
+        return None
+    return root / ref.lstrip('/')
+
+
+def referenced_assets(html_content):
+    """인라인화 대상 로컬 CSS/JS 파일 경로 목록 (html_bundle 캐시의 변경 감지용)"""
+    root = get_project_root()
+    refs = [m.group(1) for pattern in (CSS_PATTERN, JS_PATTERN) for m in re.finditer(pattern, html_content)]
+    return [path for path in (_local_path(root, ref) for ref in refs) if path is not None]
+
+
 def inline_css_and_js(html_content):
     """
     HTML의 외부 CSS/JS 파일을 인라인으로 변환
@@ -26,8 +44,7 @@ def inline_css_and_js(html_content):
     root = get_project_root()
     
     # CSS 파일 인라인화
-    css_pattern = r'<link[^>]*rel=["\']stylesheet["\'][^>]*href=["\']([^"\']+)["\'][^>]*>'
-    css_matches = re.finditer(css_pattern, html_content)
+    css_matches = re.finditer(CSS_PATTERN, html_content)
     
     css_files_processed = []
     for match in reversed(list(css_matches)):  # 역순으로 처리하여 인덱스 변경 방지
@@ -50,8 +67,7 @@ def inline_css_and_js(html_content):
                 print(f"⚠️ CSS 파일을 찾을 수 없습니다: {full_path}")
     
     # JS 파일 인라인화 (외부 CDN은 제외)
-    js_pattern = r'<script[^>]*src=["\']([^"\']+)["\'][^>]*></script>'
-    js_matches = re.finditer(js_pattern, html_content)
+    js_matches = re.finditer(JS_PATTERN, html_content)
     
     js_files_processed = []
     for match in reversed(list(js_matches)):
@@ -0,0 +1,12 @@
+-- =====================================================
+-- 현장 목록 커서(키셋) 페이지네이션용 인덱스
+-- GET /api/sites?cursor=... → ORDER BY created_at DESC, id DESC
+--   WHERE created_at < :c OR (created_at = :c AND id < :id)
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_sites_created_id ON sites(created_at DESC, id DESC);
+
+-- 필터 + 커서 조합 (배정상태/현장상태/회사 필터 후 같은 순서로 탐색)
+CREATE INDEX IF NOT EXISTS idx_sites_assignment_created ON sites(assignment_status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sites_status_created ON sites(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sites_company_created ON sites(company_id, created_at DESC, id DESC);
@@ -0,0 +1,38 @@
+-- =====================================================
+-- 현장 검색 인덱스 (GET /api/sites/search)
+-- - pg_trgm GIN: 현장명/주소 부분 일치(ILIKE '%q%') 및 유사도(%) 검색
+-- - tsvector GIN: 단어 단위 전문 검색 ('simple' 사전, 한글 형태소 분석 없음)
+-- - search_sites(q, max_results): 점수순 현장 id 목록
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_sites_name_trgm ON sites USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_sites_address_trgm ON sites USING gin (address gin_trgm_ops);
+
+ALTER TABLE sites ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(address, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_sites_search_tsv ON sites USING gin (search_tsv);
+
+-- 점수: 현장명 일치(접두 4 / 부분 3) > 주소 일치 2 > 전문 검색 1 + 유사도
+CREATE OR REPLACE FUNCTION search_sites(q TEXT, max_results INT DEFAULT 50)
+RETURNS TABLE (id UUID, score REAL)
+LANGUAGE sql STABLE AS $$
+    SELECT s.id,
+           (CASE
+                WHEN s.name ILIKE q || '%' THEN 4
+                WHEN s.name ILIKE '%' || q || '%' THEN 3
+                WHEN s.address ILIKE '%' || q || '%' THEN 2
+                WHEN s.search_tsv @@ plainto_tsquery('simple', q) THEN 1
+                ELSE 0
+            END
+            + GREATEST(similarity(s.name, q), similarity(coalesce(s.address, ''), q)))::REAL AS score
+    FROM sites s
+    WHERE s.name ILIKE '%' || q || '%'
+       OR s.address ILIKE '%' || q || '%'
+       OR s.search_tsv @@ plainto_tsquery('simple', q)
+       OR s.name % q
+       OR s.address % q
+    ORDER BY score DESC, s.created_at DESC
+    LIMIT GREATEST(1, LEAST(max_results, 500));
+$$;
@@ -0,0 +1,58 @@
+-- =====================================================
+-- 대시보드 통계 집계 (GET /api/stats)
+-- 전체 행을 API로 내려받지 않고 DB에서 GROUP BY/FILTER로 집계해 JSON 1건 반환
+-- 기본값은 API 변환 규칙(_transform_*)과 동일: 배정상태 NULL → 미배정, 현장상태 NULL → 건축허가 등
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION dashboard_stats()
+RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    SELECT jsonb_build_object(
+        'sites', (
+            SELECT jsonb_build_object(
+                'total', count(*),
+                'assigned', count(*) FILTER (WHERE coalesce(s.assignment_status::TEXT, '미배정') = '배정완료'),
+                'unassigned', count(*) FILTER (WHERE coalesce(s.assignment_status::TEXT, '미배정') = '미배정'),
+                'by_company', jsonb_build_object(
+                    '더존종합건설', count(*) FILTER (WHERE coalesce(c.name, c.short_name) = '더존종합건설'),
+                    '더존하우징', count(*) FILTER (WHERE coalesce(c.name, c.short_name) = '더존하우징')
+                )
+            )
+            FROM sites s
+            LEFT JOIN companies c ON c.id = s.company_id
+        ) || jsonb_build_object(
+            'by_state', (
+                SELECT coalesce(jsonb_object_agg(state, n), '{}'::JSONB)
+                FROM (
+                    SELECT coalesce(status::TEXT, '건축허가') AS state, count(*) AS n
+                    FROM sites GROUP BY 1
+                ) t
+            )
+        ),
+        'personnel', (
+            SELECT jsonb_build_object(
+                'total', count(*),
+                'available', count(*) FILTER (WHERE coalesce(status::TEXT, '투입가능') = '투입가능'),
+                'deployed', count(*) FILTER (WHERE status::TEXT = '투입중')
+            )
+            FROM personnel
+        ) || jsonb_build_object(
+            'by_role', (
+                SELECT coalesce(jsonb_object_agg(role, n), '{}'::JSONB)
+                FROM (
+                    SELECT coalesce(position, '') AS role, count(*) AS n
+                    FROM personnel GROUP BY 1
+                ) t
+            )
+        ),
+        'certificates', (
+            SELECT jsonb_build_object(
+                'total', count(*),
+                'available', count(*) FILTER (WHERE coalesce(status::TEXT, '사용가능') = '사용가능'),
+                'in_use', count(*) FILTER (WHERE status::TEXT = '사용중'),
+                'expired', count(*) FILTER (WHERE status::TEXT = '만료')
+            )
+            FROM certificates
+        )
+    );
+$$;
@@ -0,0 +1,117 @@
+-- =====================================================
+-- 소장/자격증 배정·해제 RPC (트랜잭션 1회)
+-- - 기존: PostgREST 호출 약 10회(ID 조회 3, 해제 2, 생성 2, 현장/인력/자격증 갱신)
+--   중간 실패 시 불일치, current_site_count 읽기-수정-쓰기 경쟁
+-- - 변경: 함수 1회 호출 = 단일 트랜잭션. 현장 행을 FOR UPDATE로 잠가 같은 현장 동시 배정 직렬화,
+--   current_site_count는 UPDATE ... SET x = x + 1 로 원자적 증감
+-- - 인자는 legacy_id 또는 UUID 문자열 (API 경로의 ID 그대로 전달)
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION assign_site(p_site_id TEXT, p_manager_id TEXT, p_certificate_id TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_site_id UUID;
+    v_manager_id UUID;
+    v_cert_id UUID;
+    v_now TIMESTAMPTZ := NOW();
+BEGIN
+    SELECT id INTO v_site_id FROM sites
+     WHERE legacy_id = p_site_id OR id::TEXT = p_site_id
+     LIMIT 1
+       FOR UPDATE;
+    IF v_site_id IS NULL THEN
+        RAISE EXCEPTION '현장을 찾을 수 없습니다: %', p_site_id USING ERRCODE = 'P0002';
+    END IF;
+
+    SELECT id INTO v_manager_id FROM personnel
+     WHERE legacy_id = p_manager_id OR id::TEXT = p_manager_id
+     LIMIT 1;
+    IF v_manager_id IS NULL THEN
+        RAISE EXCEPTION '인력을 찾을 수 없습니다: %', p_manager_id USING ERRCODE = 'P0002';
+    END IF;
+
+    SELECT id INTO v_cert_id FROM certificates
+     WHERE legacy_id = p_certificate_id OR id::TEXT = p_certificate_id
+     LIMIT 1;
+    IF v_cert_id IS NULL THEN
+        RAISE EXCEPTION '자격증을 찾을 수 없습니다: %', p_certificate_id USING ERRCODE = 'P0002';
+    END IF;
+
+    -- 기존 배정 해제 (있는 경우)
+    UPDATE site_assignments SET status = '해제', released_at = v_now
+     WHERE site_id = v_site_id AND status = '배정중';
+    UPDATE certificate_assignments SET status = '해제', released_at = v_now
+     WHERE site_id = v_site_id AND status = '배정중';
+
+    -- 새 배정 생성
+    INSERT INTO site_assignments (site_id, personnel_id, role, status)
+    VALUES (v_site_id, v_manager_id, '담당', '배정중');
+    INSERT INTO certificate_assignments (certificate_id, site_id, status)
+    VALUES (v_cert_id, v_site_id, '배정중');
+
+    UPDATE sites SET assignment_status = '배정완료', updated_at = v_now WHERE id = v_site_id;
+
+    -- 원자적 증가 (동시 배정 시 lost update 없음)
+    UPDATE personnel
+       SET status = '투입중',
+           current_site_count = coalesce(current_site_count, 0) + 1,
+           updated_at = v_now
+     WHERE id = v_manager_id;
+
+    UPDATE certificates SET status = '사용중', updated_at = v_now WHERE id = v_cert_id;
+
+    RETURN jsonb_build_object('site_id', v_site_id, 'updated_at', v_now);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION unassign_site(p_site_id TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_site_id UUID;
+    v_manager_id UUID;
+    v_cert_id UUID;
+    v_now TIMESTAMPTZ := NOW();
+BEGIN
+    SELECT id INTO v_site_id FROM sites
+     WHERE legacy_id = p_site_id OR id::TEXT = p_site_id
+     LIMIT 1
+       FOR UPDATE;
+    IF v_site_id IS NULL THEN
+        RAISE EXCEPTION '현장을 찾을 수 없습니다: %', p_site_id USING ERRCODE = 'P0002';
+    END IF;
+
+    -- 배정 해제하면서 해제된 소장/자격증 ID 확보
+    WITH released AS (
+        UPDATE site_assignments SET status = '해제', released_at = v_now
+         WHERE site_id = v_site_id AND status = '배정중'
+        RETURNING personnel_id
+    )
+    SELECT personnel_id INTO v_manager_id FROM released LIMIT 1;
+
+    WITH released AS (
+        UPDATE certificate_assignments SET status = '해제', released_at = v_now
+         WHERE site_id = v_site_id AND status = '배정중'
+        RETURNING certificate_id
+    )
+    SELECT certificate_id INTO v_cert_id FROM released LIMIT 1;
+
+    UPDATE sites SET assignment_status = '미배정', updated_at = v_now WHERE id = v_site_id;
+
+    -- 원자적 감소. 담당 현장이 0이 되면 투입가능으로 전환
+    IF v_manager_id IS NOT NULL THEN
+        UPDATE personnel
+           SET current_site_count = GREATEST(0, coalesce(current_site_count, 0) - 1),
+               status = CASE WHEN coalesce(current_site_count, 0) - 1 <= 0 THEN '투입가능'::personnel_status ELSE status END,
+               updated_at = v_now
+         WHERE id = v_manager_id;
+    END IF;
+
+    IF v_cert_id IS NOT NULL THEN
+        UPDATE certificates SET status = '사용가능', updated_at = v_now WHERE id = v_cert_id;
+    END IF;
+
+    RETURN jsonb_build_object('site_id', v_site_id, 'updated_at', v_now);
+END;
+$$;
@@ -0,0 +1,22 @@
+-- =====================================================
+-- 일괄 배정 RPC (POST /api/sites/assign:batch)
+-- p_items: [{"site_id": "...", "manager_id": "...", "certificate_id": "..."}, ...]
+-- 전체가 하나의 트랜잭션: 한 건이라도 실패하면 모두 롤백
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION assign_sites_batch(p_items JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_item JSONB;
+    v_results JSONB := '[]'::JSONB;
+BEGIN
+    FOR v_item IN SELECT * FROM jsonb_array_elements(coalesce(p_items, '[]'::JSONB))
+    LOOP
+        v_results := v_results || jsonb_build_array(
+            assign_site(v_item->>'site_id', v_item->>'manager_id', v_item->>'certificate_id')
+        );
+    END LOOP;
+    RETURN v_results;
+END;
+$$;
@@ -0,0 +1,48 @@
+-- =====================================================
+-- 컬렉션 버전 (GET 응답 ETag / If-None-Match → 304)
+-- 버전 = 행 수 + max(updated_at). 행 추가/삭제/수정 시 값이 바뀜
+-- updated_at은 API 외부(대시보드/SQL) 수정에서도 갱신되도록 트리거로 보장
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sites_updated_at ON sites;
+CREATE TRIGGER trg_sites_updated_at BEFORE UPDATE ON sites
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_personnel_updated_at ON personnel;
+CREATE TRIGGER trg_personnel_updated_at BEFORE UPDATE ON personnel
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_certificates_updated_at ON certificates;
+CREATE TRIGGER trg_certificates_updated_at BEFORE UPDATE ON certificates
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- max(updated_at)을 인덱스 끝에서 바로 읽음
+CREATE INDEX IF NOT EXISTS idx_sites_updated_at ON sites(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_personnel_updated_at ON personnel(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_certificates_updated_at ON certificates(updated_at DESC);
+
+-- 요청한 테이블들의 버전을 1회 호출로 반환: {"sites": "120:2026-01-05T...", ...}
+CREATE OR REPLACE FUNCTION collection_versions(p_tables TEXT[])
+RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(jsonb_object_agg(t.name, t.version), '{}'::JSONB)
+    FROM (
+        SELECT 'sites' AS name, (SELECT count(*) || ':' || coalesce(max(updated_at)::TEXT, '') FROM sites) AS version
+        WHERE 'sites' = ANY(p_tables)
+        UNION ALL
+        SELECT 'personnel', (SELECT count(*) || ':' || coalesce(max(updated_at)::TEXT, '') FROM personnel)
+        WHERE 'personnel' = ANY(p_tables)
+        UNION ALL
+        SELECT 'certificates', (SELECT count(*) || ':' || coalesce(max(updated_at)::TEXT, '') FROM certificates)
+        WHERE 'certificates' = ANY(p_tables)
+    ) t;
+$$;
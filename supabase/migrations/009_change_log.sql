@@ -0,0 +1,134 @@
+-- =====================================================
+-- 변경 로그 (GET /api/changes?since=<seq> 델타 동기화)
+-- sites/personnel/certificates 행이 추가/수정/삭제될 때마다 트리거가 1행 기록
+-- API 외부(대시보드/SQL) 수정도 포함. seq는 단조 증가 (커서)
+-- 현장 응답에 JOIN되는 배정/소장/자격증 변경은 해당 현장도 변경으로 기록
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS change_log (
+    seq BIGSERIAL PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    row_id UUID NOT NULL,
+    legacy_id TEXT,
+    op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log(changed_at);
+
+ALTER TABLE change_log ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "change_log_read" ON change_log;
+CREATE POLICY "change_log_read" ON change_log FOR SELECT USING (true);
+
+-- 행 변경 → change_log 1행 (트리거 함수는 SECURITY DEFINER: RLS와 무관하게 기록)
+CREATE OR REPLACE FUNCTION log_row_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (table_name, row_id, legacy_id, op)
+        VALUES (TG_TABLE_NAME, OLD.id, OLD.legacy_id, 'delete');
+        RETURN OLD;
+    END IF;
+    INSERT INTO change_log (table_name, row_id, legacy_id, op)
+    VALUES (TG_TABLE_NAME, NEW.id, NEW.legacy_id, 'upsert');
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sites_change_log ON sites;
+CREATE TRIGGER trg_sites_change_log AFTER INSERT OR UPDATE OR DELETE ON sites
+    FOR EACH ROW EXECUTE FUNCTION log_row_change();
+
+DROP TRIGGER IF EXISTS trg_personnel_change_log ON personnel;
+CREATE TRIGGER trg_personnel_change_log AFTER INSERT OR UPDATE OR DELETE ON personnel
+    FOR EACH ROW EXECUTE FUNCTION log_row_change();
+
+DROP TRIGGER IF EXISTS trg_certificates_change_log ON certificates;
+CREATE TRIGGER trg_certificates_change_log AFTER INSERT OR UPDATE OR DELETE ON certificates
+    FOR EACH ROW EXECUTE FUNCTION log_row_change();
+
+-- 배정 관계 변경 → 해당 현장 upsert (현장 응답의 담당소장/사용자격증이 바뀜)
+CREATE OR REPLACE FUNCTION log_assignment_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    INSERT INTO change_log (table_name, row_id, legacy_id, op)
+    SELECT 'sites', s.id, s.legacy_id, 'upsert'
+    FROM sites s
+    WHERE s.id IN (
+        CASE WHEN TG_OP <> 'INSERT' THEN OLD.site_id END,
+        CASE WHEN TG_OP <> 'DELETE' THEN NEW.site_id END
+    );
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_site_assignments_change_log ON site_assignments;
+CREATE TRIGGER trg_site_assignments_change_log AFTER INSERT OR UPDATE OR DELETE ON site_assignments
+    FOR EACH ROW EXECUTE FUNCTION log_assignment_change();
+
+DROP TRIGGER IF EXISTS trg_certificate_assignments_change_log ON certificate_assignments;
+CREATE TRIGGER trg_certificate_assignments_change_log AFTER INSERT OR UPDATE OR DELETE ON certificate_assignments
+    FOR EACH ROW EXECUTE FUNCTION log_assignment_change();
+
+-- 인력 이름/연락처 수정 → 그 인력이 배정된 현장, 소유한 자격증도 upsert (JOIN 컬럼)
+CREATE OR REPLACE FUNCTION log_personnel_dependents()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    IF NEW.name IS NOT DISTINCT FROM OLD.name AND NEW.phone IS NOT DISTINCT FROM OLD.phone THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO change_log (table_name, row_id, legacy_id, op)
+    SELECT 'certificates', c.id, c.legacy_id, 'upsert' FROM certificates c WHERE c.personnel_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, legacy_id, op)
+    SELECT DISTINCT 'sites', s.id, s.legacy_id, 'upsert'
+    FROM sites s
+    WHERE s.id IN (
+        SELECT sa.site_id FROM site_assignments sa WHERE sa.personnel_id = NEW.id AND sa.status = '배정중'
+        UNION
+        SELECT ca.site_id FROM certificate_assignments ca
+        JOIN certificates c ON c.id = ca.certificate_id
+        WHERE c.personnel_id = NEW.id AND ca.status = '배정중'
+    );
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_personnel_dependents_change_log ON personnel;
+CREATE TRIGGER trg_personnel_dependents_change_log AFTER UPDATE ON personnel
+    FOR EACH ROW EXECUTE FUNCTION log_personnel_dependents();
+
+-- 자격증 종류/소유자 변경 → 그 자격증을 사용 중인 현장 upsert
+CREATE OR REPLACE FUNCTION log_certificate_dependents()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    IF NEW.cert_type_id IS NOT DISTINCT FROM OLD.cert_type_id
+       AND NEW.personnel_id IS NOT DISTINCT FROM OLD.personnel_id THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO change_log (table_name, row_id, legacy_id, op)
+    SELECT DISTINCT 'sites', s.id, s.legacy_id, 'upsert'
+    FROM sites s
+    JOIN certificate_assignments ca ON ca.site_id = s.id
+    WHERE ca.certificate_id = NEW.id AND ca.status = '배정중';
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_certificates_dependents_change_log ON certificates;
+CREATE TRIGGER trg_certificates_dependents_change_log AFTER UPDATE ON certificates
+    FOR EACH ROW EXECUTE FUNCTION log_certificate_dependents();
+
+-- 보관 기간이 지난 로그 정리 (pg_cron 등으로 주기 실행)
+-- 정리된 구간의 커서로 요청하면 API가 reset=true를 반환 → 클라이언트 전체 재조회
+CREATE OR REPLACE FUNCTION prune_change_log(p_keep INTERVAL DEFAULT INTERVAL '7 days')
+RETURNS BIGINT
+LANGUAGE sql AS $$
+    WITH deleted AS (
+        DELETE FROM change_log WHERE changed_at < NOW() - p_keep RETURNING 1
+    )
+    SELECT count(*) FROM deleted;
+$$;
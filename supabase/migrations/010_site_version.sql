@@ -0,0 +1,175 @@
+-- =====================================================
+-- 현장 행 버전 (낙관적 잠금)
+-- - 기존: updated_at 날짜(YYYY-MM-DD)를 버전으로 사용 → 같은 날 두 번 수정하면 충돌 미검출,
+--   검사를 위해 쓰기 전 현장 조회 1회 추가
+-- - 변경: sites.version 정수. UPDATE마다 트리거가 1 증가 (API 외부 수정 포함)
+--   쓰기 RPC는 현장 행을 FOR UPDATE로 잠근 뒤 p_expected_version과 비교 (compare-and-swap)
+--   불일치 시 SQLSTATE PT409 (PostgREST HTTP 409)
+-- =====================================================
+
+ALTER TABLE sites ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_site_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sites_version ON sites;
+CREATE TRIGGER trg_sites_version BEFORE UPDATE ON sites
+    FOR EACH ROW EXECUTE FUNCTION bump_site_version();
+
+-- 잠근 현장 행의 버전 비교 (p_expected_version이 NULL이면 검사 생략)
+CREATE OR REPLACE FUNCTION check_site_version(p_site_id TEXT, p_current BIGINT, p_expected_version BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_expected_version IS NOT NULL AND p_current <> p_expected_version THEN
+        RAISE EXCEPTION '데이터가 다른 사용자에 의해 수정되었습니다. 현재 버전: %, 요청 버전: %. 최신 데이터를 다시 조회한 뒤 시도하세요.',
+            p_current, p_expected_version USING ERRCODE = 'PT409';
+    END IF;
+END;
+$$;
+
+-- 인자가 늘어나므로 기존 시그니처 제거 (이름 인자 호출 시 오버로드 모호성 방지)
+DROP FUNCTION IF EXISTS assign_site(TEXT, TEXT, TEXT);
+DROP FUNCTION IF EXISTS unassign_site(TEXT);
+
+CREATE OR REPLACE FUNCTION assign_site(
+    p_site_id TEXT, p_manager_id TEXT, p_certificate_id TEXT, p_expected_version BIGINT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_site_id UUID;
+    v_version BIGINT;
+    v_manager_id UUID;
+    v_cert_id UUID;
+    v_now TIMESTAMPTZ := NOW();
+BEGIN
+    SELECT id, version INTO v_site_id, v_version FROM sites
+     WHERE legacy_id = p_site_id OR id::TEXT = p_site_id
+     LIMIT 1
+       FOR UPDATE;
+    IF v_site_id IS NULL THEN
+        RAISE EXCEPTION '현장을 찾을 수 없습니다: %', p_site_id USING ERRCODE = 'P0002';
+    END IF;
+    PERFORM check_site_version(p_site_id, v_version, p_expected_version);
+
+    SELECT id INTO v_manager_id FROM personnel
+     WHERE legacy_id = p_manager_id OR id::TEXT = p_manager_id
+     LIMIT 1;
+    IF v_manager_id IS NULL THEN
+        RAISE EXCEPTION '인력을 찾을 수 없습니다: %', p_manager_id USING ERRCODE = 'P0002';
+    END IF;
+
+    SELECT id INTO v_cert_id FROM certificates
+     WHERE legacy_id = p_certificate_id OR id::TEXT = p_certificate_id
+     LIMIT 1;
+    IF v_cert_id IS NULL THEN
+        RAISE EXCEPTION '자격증을 찾을 수 없습니다: %', p_certificate_id USING ERRCODE = 'P0002';
+    END IF;
+
+    -- 기존 배정 해제 (있는 경우)
+    UPDATE site_assignments SET status = '해제', released_at = v_now
+     WHERE site_id = v_site_id AND status = '배정중';
+    UPDATE certificate_assignments SET status = '해제', released_at = v_now
+     WHERE site_id = v_site_id AND status = '배정중';
+
+    -- 새 배정 생성
+    INSERT INTO site_assignments (site_id, personnel_id, role, status)
+    VALUES (v_site_id, v_manager_id, '담당', '배정중');
+    INSERT INTO certificate_assignments (certificate_id, site_id, status)
+    VALUES (v_cert_id, v_site_id, '배정중');
+
+    UPDATE sites SET assignment_status = '배정완료', updated_at = v_now WHERE id = v_site_id
+    RETURNING version INTO v_version;
+
+    -- 원자적 증가 (동시 배정 시 lost update 없음)
+    UPDATE personnel
+       SET status = '투입중',
+           current_site_count = coalesce(current_site_count, 0) + 1,
+           updated_at = v_now
+     WHERE id = v_manager_id;
+
+    UPDATE certificates SET status = '사용중', updated_at = v_now WHERE id = v_cert_id;
+
+    RETURN jsonb_build_object('site_id', v_site_id, 'updated_at', v_now, 'version', v_version);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION unassign_site(p_site_id TEXT, p_expected_version BIGINT DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_site_id UUID;
+    v_version BIGINT;
+    v_manager_id UUID;
+    v_cert_id UUID;
+    v_now TIMESTAMPTZ := NOW();
+BEGIN
+    SELECT id, version INTO v_site_id, v_version FROM sites
+     WHERE legacy_id = p_site_id OR id::TEXT = p_site_id
+     LIMIT 1
+       FOR UPDATE;
+    IF v_site_id IS NULL THEN
+        RAISE EXCEPTION '현장을 찾을 수 없습니다: %', p_site_id USING ERRCODE = 'P0002';
+    END IF;
+    PERFORM check_site_version(p_site_id, v_version, p_expected_version);
+
+    -- 배정 해제하면서 해제된 소장/자격증 ID 확보
+    WITH released AS (
+        UPDATE site_assignments SET status = '해제', released_at = v_now
+         WHERE site_id = v_site_id AND status = '배정중'
+        RETURNING personnel_id
+    )
+    SELECT personnel_id INTO v_manager_id FROM released LIMIT 1;
+
+    WITH released AS (
+        UPDATE certificate_assignments SET status = '해제', released_at = v_now
+         WHERE site_id = v_site_id AND status = '배정중'
+        RETURNING certificate_id
+    )
+    SELECT certificate_id INTO v_cert_id FROM released LIMIT 1;
+
+    UPDATE sites SET assignment_status = '미배정', updated_at = v_now WHERE id = v_site_id
+    RETURNING version INTO v_version;
+
+    -- 원자적 감소. 담당 현장이 0이 되면 투입가능으로 전환
+    IF v_manager_id IS NOT NULL THEN
+        UPDATE personnel
+           SET current_site_count = GREATEST(0, coalesce(current_site_count, 0) - 1),
+               status = CASE WHEN coalesce(current_site_count, 0) - 1 <= 0 THEN '투입가능'::personnel_status ELSE status END,
+               updated_at = v_now
+         WHERE id = v_manager_id;
+    END IF;
+
+    IF v_cert_id IS NOT NULL THEN
+        UPDATE certificates SET status = '사용가능', updated_at = v_now WHERE id = v_cert_id;
+    END IF;
+
+    RETURN jsonb_build_object('site_id', v_site_id, 'updated_at', v_now, 'version', v_version);
+END;
+$$;
+
+-- 일괄 배정: 항목의 "version"도 비교 (한 건이라도 충돌하면 전체 롤백)
+CREATE OR REPLACE FUNCTION assign_sites_batch(p_items JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_item JSONB;
+    v_results JSONB := '[]'::JSONB;
+BEGIN
+    FOR v_item IN SELECT * FROM jsonb_array_elements(coalesce(p_items, '[]'::JSONB))
+    LOOP
+        v_results := v_results || jsonb_build_array(
+            assign_site(v_item->>'site_id', v_item->>'manager_id', v_item->>'certificate_id',
+                        (v_item->>'version')::BIGINT)
+        );
+    END LOOP;
+    RETURN v_results;
+END;
+$$;
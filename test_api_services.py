@@ -0,0 +1,1970 @@
+"""
+API 서비스 계층 검증 테스트 (캐시/인덱스 등 성능 관련 모듈)
+
+Google API/Supabase/Flask 서버 없이 가짜 백엔드로 동작만 검증합니다.
+실행: python test_api_services.py
+"""
+
+import sys
+import os
+import threading
+
+# 프로젝트 루트를 path에 추가 (api 패키지 import용)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class _FakeBackend:
+    """호출 횟수를 세는 가짜 백엔드"""
+
+    def __init__(self):
+        self.calls = {}
+        self.version = 1
+        self.sites = [
+            {'현장ID': 'S001', '현장명': '평택 푸르지오', '주소': '경기도 평택시', '회사구분': '더존종합건설',
+             '배정상태': '미배정', '현장상태': '착공예정', '담당소장ID': '', '사용자격증ID': '', '수정일': '2026-01-05'},
+        ]
+        self.personnel = [{'인력ID': 'P001', '성명': '김현장', '직책': '소장', '현재상태': '투입가능', '현재담당현장수': '0'}]
+        self.certificates = [{'자격증ID': 'C001', '자격증명': '건축기사', '소유자명': '김현장', '사용가능여부': '사용가능'}]
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def get_all_sites(self, limit=None, offset=0):
+        self._count('get_all_sites')
+        return [dict(s) for s in self.sites]
+
+    def get_site_by_id(self, site_id):
+        self._count('get_site_by_id')
+        return next((dict(s) for s in self.sites if s['현장ID'] == site_id), None)
+
+    def get_all_personnel(self):
+        self._count('get_all_personnel')
+        return [dict(p) for p in self.personnel]
+
+    def get_personnel_by_id(self, pid):
+        self._count('get_personnel_by_id')
+        return next((dict(p) for p in self.personnel if p['인력ID'] == pid), None)
+
+    def get_all_certificates(self):
+        self._count('get_all_certificates')
+        return [dict(c) for c in self.certificates]
+
+    def get_certificate_by_id(self, cid):
+        self._count('get_certificate_by_id')
+        return next((dict(c) for c in self.certificates if c['자격증ID'] == cid), None)
+
+    def collection_versions(self, tables):
+        self._count('collection_versions')
+        return {t: str(self.version) for t in tables}
+
+    def update_site(self, site_id, data, expected_version=None):
+        self._count('update_site')
+        self.version += 1
+        for s in self.sites:
+            if s['현장ID'] == site_id:
+                s.update(data)
+
+    def assign_site(self, site_id, manager_id, certificate_id, expected_version=None):
+        self._count('assign_site')
+        self.update_site(site_id, {'배정상태': '배정완료', '담당소장ID': manager_id, '사용자격증ID': certificate_id})
+
+
+def test_cache_service():
+    """읽기 캐시: 반복 조회는 백엔드 1회, 쓰기 후 즉시 무효화"""
+    print("[성능] api.services.cache_service 검증 중...")
+    try:
+        from api.services.cache_service import CachedBackend, SnapshotCache
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=16))
+    for _ in range(3):
+        db.get_all_sites()
+    if backend.calls.get('get_all_sites') != 1:
+        print(f"      스냅샷 캐시 미적용: {backend.calls}")
+        return False
+
+    # 스냅샷이 있으면 단건 조회는 인덱스에서 처리
+    site = db.get_site_by_id('S001')
+    if not site or backend.calls.get('get_site_by_id'):
+        print(f"      단건 조회 인덱스 미사용: {backend.calls}")
+        return False
+
+    db.update_site('S001', {'현장명': '변경됨'})
+    if db.get_all_sites()[0]['현장명'] != '변경됨' or backend.calls['get_all_sites'] != 2:
+        print("      쓰기 후 무효화 실패")
+        return False
+
+    db.get_all_personnel()
+    db.assign_site('S001', 'P001', 'C001')
+    db.get_all_personnel()
+    if backend.calls['get_all_personnel'] != 2:
+        print("      배정 후 인력 캐시 무효화 실패")
+        return False
+
+    # 행 단위 복사: 호출자 수정도, 백엔드 내부 행 변경(SheetsRepository.on_update)도 캐시에 번지지 않음
+    backend.get_all_personnel = lambda: backend.personnel
+    db.cache.clear()
+    db.get_all_personnel()[0]['성명'] = '호출자 수정'
+    backend.personnel[0]['성명'] = '백엔드 수정'
+    if db.get_all_personnel()[0]['성명'] != '김현장' or db.get_personnel_by_id('P001')['성명'] != '김현장':
+        print("      캐시 행이 호출자/백엔드와 공유됨")
+        return False
+
+    # LRU: 최대 항목 수 초과 시 오래된 항목부터 제거
+    cache = SnapshotCache(ttl=60, max_entries=2)
+    for i in range(3):
+        cache.put(('sites', i), ('sites',), cache.versions(('sites',)), i)
+    if cache.get(('sites', 0))[0] or not cache.get(('sites', 2))[0]:
+        print("      LRU 제거 동작 오류")
+        return False
+
+    print("      통과")
+    return True
+
+
+class _FakeSheets:
+    """read_sheet/batch_update/append_row 호출을 기록하는 가짜 SheetsService (쓰기 전 A열 확인은 checks에 따로 기록)"""
+
+    def __init__(self):
+        from api.services.sheets_service import SHEET_SITES, SHEET_PERSONNEL, SHEET_CERTIFICATES
+        self.reads = []
+        self.checks = []
+        self.batch_updates = []
+        self.appends = []
+        self.values = {
+            SHEET_SITES: [['S001', '평택 푸르지오', '', '더존종합건설', '경기도 평택시', '', '', '', '', '', '착공예정', '',
+                           '', '', '', '', '', '', '', '', '미배정', '2025-11-01', '2026-01-05', '3']],
+            SHEET_PERSONNEL: [['P001', '김현장', '소장', '더존종합건설', '010-1234-5678', '', '', '투입가능', '0', '', '', '']],
+            SHEET_CERTIFICATES: [['C001', '건축기사', '12-34', 'P001', '김현장', '010-1234-5678', '', '', '', '사용가능', '', '', '']],
+        }
+
+    def read_sheet(self, range_name):
+        self.reads.append(range_name)
+        return [list(r) for r in self.values[range_name.split('!')[0]]]
+
+    def read_sheets(self, range_names):
+        if all(self._is_id_cell(name) for name in range_names):
+            self.checks.append(tuple(range_names))
+        else:
+            self.reads.append(tuple(range_names))
+        return [self._range(name) for name in range_names]
+
+    @staticmethod
+    def _is_id_cell(name):
+        cell = name.partition('!')[2]
+        return cell[:1] == 'A' and cell[1:].isdigit()
+
+    def _range(self, name):
+        """'시트!A5' 단일 셀(쓰기 전 ID 확인) 또는 시트 전체"""
+        sheet, _, cell = name.partition('!')
+        if self._is_id_cell(name):
+            rows = self.values[sheet]
+            idx = int(cell[1:]) - 2
+            return [[rows[idx][0]]] if 0 <= idx < len(rows) and rows[idx] else []
+        return [list(r) for r in self.values[sheet]]
+
+    def batch_update(self, updates):
+        self.batch_updates.append(updates)
+
+    def append_row(self, sheet_name, values):
+        self.values[sheet_name].append(list(values))
+        return len(self.values[sheet_name]) + 1
+
+    def append_rows(self, sheet_name, rows):
+        self.appends.append(len(rows))
+        first = len(self.values[sheet_name]) + 2
+        self.values[sheet_name].extend(list(r) for r in rows)
+        return first
+
+
+def test_sheets_repository():
+    """Sheets 인덱스: ID 조회 O(1), 배정은 batchGet 1회 + batchUpdate 1회"""
+    print("[성능] api.services.sheets_service.SheetsRepository 검증 중...")
+    try:
+        from api.services.sheets_service import SheetsService, SheetsRepository
+        from api.services.db_service import _SheetsAdapter
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.append_row = fake.append_row
+    service.repo = SheetsRepository(service)
+
+    adapter = _SheetsAdapter(service)
+    adapter.assign_site('S001', 'P001', 'C001')
+    if len(fake.reads) != 1 or len(fake.checks) != 1 or len(fake.batch_updates) != 1:
+        print(f"      배정 왕복 횟수 이상: reads={len(fake.reads)}, checks={len(fake.checks)}, "
+              f"batchUpdate={len(fake.batch_updates)}")
+        return False
+
+    site = service.get_site_by_id('S001')
+    if site['배정상태'] != '배정완료' or site['담당소장명'] != '김현장':
+        print(f"      배정 후 인덱스 증분 갱신 실패: {site}")
+        return False
+    if service.get_personnel_by_id('P001')['현재담당현장수'] != '1' or len(fake.reads) != 1:
+        print("      인력 인덱스 갱신 실패 또는 불필요한 재조회 발생")
+        return False
+
+    adapter.create_personnel({'인력ID': 'P002', '성명': '이소장'})
+    if service.find_row_by_id(adapter._personnel, 'P002') != 3 or len(fake.reads) != 1:
+        print("      append 후 행 번호 인덱스 갱신 실패")
+        return False
+
+    tables = service.get_all_tables()
+    if len(fake.reads) != 2 or len(fake.reads[-1]) != 3 or len(tables['personnel']) != 2:
+        print("      get_all_tables가 batchGet 1회로 세 시트를 읽지 않음")
+        return False
+    service.get_all_sites()
+    service.get_all_personnel()
+    if len(fake.reads) != 2:
+        print("      목록 조회가 인덱스 TTL과 무관하게 시트를 다시 읽음")
+        return False
+
+    # 시트에서 직접 행 삽입 → 인덱스 행 번호가 밀림: A열 확인에서 걸러 다시 읽은 뒤 옮겨진 행에 씀
+    fake.values[adapter._personnel].insert(0, ['P900', '직접입력'])
+    fake.batch_updates.clear()
+    adapter.update_personnel('P001', {'비고': '확인'})
+    ranges = [u['range'] for batch in fake.batch_updates for u in batch]
+    if ranges != [f'{adapter._personnel}!J3'] or len(fake.reads) != 3:
+        print(f"      행 이동 후 잘못된 행에 씀: {ranges}, reads={len(fake.reads)}")
+        return False
+
+    print("      통과")
+    return True
+
+
+class _FakeQuery:
+    """PostgREST 쿼리 빌더 흉내 (호출한 체인을 기록)"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.ops = []
+
+    def __getattr__(self, name):
+        def _op(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+            return self
+        return _op
+
+    def execute(self):
+        self.client.executed.append((self.table, self.ops))
+        rows = self.client.rows.get(self.table, [])
+        if any(op[0] == 'single' for op in self.ops):
+            rows = rows[0] if rows else None
+        return type('R', (), {'data': rows, 'count': self.client.count})()
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.executed = []
+        self.count = 42
+        self.rows = {
+            'companies': [{'id': 'uuid-c1', 'name': '더존종합건설', 'short_name': '더존'}],
+            'sites': [{'legacy_id': 'S001', 'name': '평택', 'status': '착공예정', 'assignment_status': '미배정'}],
+        }
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def test_supabase_pagination():
+    """Supabase 페이지 조회: 필터/개수 서버 처리, 회사 ID 캐시"""
+    print("[성능] SupabaseService.get_sites_paginated 검증 중...")
+    try:
+        from api.services.supabase_service import SupabaseService
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSupabase()
+    service = SupabaseService()
+    service._client = fake
+    for _ in range(2):
+        page = service.get_sites_paginated(company='더존', status='미배정', state='착공예정', limit=10, offset=0)
+    if page['total'] != 42 or len(page['data']) != 1:
+        print(f"      total/data 이상: {page}")
+        return False
+
+    tables = [t for t, _ in fake.executed]
+    if tables.count('companies') != 1 or tables.count('sites') != 2:
+        print(f"      요청 횟수 이상 (회사 1회 + 현장 페이지당 1회 기대): {tables}")
+        return False
+    ops = fake.executed[-1][1]
+    eqs = {args[0]: args[1] for name, args, _ in ops if name == 'eq'}
+    if eqs != {'company_id': 'uuid-c1', 'assignment_status': '미배정', 'status': '착공예정'}:
+        print(f"      서버 사이드 필터 누락: {eqs}")
+        return False
+    if not any(name == 'select' and kw.get('count') == 'exact' for name, _, kw in ops):
+        print("      count='exact'가 데이터 조회와 함께 요청되지 않음")
+        return False
+
+    if service.get_sites_paginated(company='없는회사')['total'] != 0:
+        print("      알 수 없는 회사 필터가 전체 결과를 반환함")
+        return False
+
+    # 검색 폴백(RPC 없음): 검색어는 컬럼별 .ilike() 값으로만, LIKE 와일드카드는 이스케이프
+    fake.executed.clear()
+    found = service.search_sites('50%_a\\b*),name.ilike."')
+    patterns = [(args[0], args[1]) for _, ops in fake.executed for name, args, _ in ops if name == 'ilike']
+    if any(name == 'or_' for _, ops in fake.executed for name, _, _ in ops) or len(found) != 1:
+        print(f"      검색어가 or_ 필터에 들어감 또는 병합 이상: {fake.executed}")
+        return False
+    if patterns != [(column, '%50\\%\\_a\\\\b\\*),name.ilike."%') for column in ('name', 'address')]:
+        print(f"      ILIKE 패턴 이스케이프 이상: {patterns}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_keyset_pagination():
+    """커서 페이지: 전체 순회 시 누락/중복 없음, 중간 삽입에도 안정, 잘못된 커서 거부"""
+    print("[성능] api.utils.pagination (키셋 커서) 검증 중...")
+    try:
+        from api.utils.pagination import keyset_page, decode_cursor, encode_cursor, CursorError
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    def key(s):
+        return (s['등록일'], s['현장ID'])
+
+    rows = [{'현장ID': f'S{i:03d}', '등록일': f'2026-01-{(i % 5) + 1:02d}'} for i in range(23)]
+    seen, cursor, pages = [], '', 0
+    while cursor is not None:
+        page, cursor = keyset_page(rows, key, cursor, 5)
+        seen.extend(s['현장ID'] for s in page)
+        pages += 1
+        if pages == 2:
+            # 순회 중 새 현장 등록 (가장 최신) → 이후 페이지에 영향 없어야 함
+            rows.append({'현장ID': 'S999', '등록일': '2026-02-01'})
+    if len(seen) != 23 or len(set(seen)) != 23 or pages != 5:
+        print(f"      순회 결과 이상: pages={pages}, seen={len(seen)}, unique={len(set(seen))}")
+        return False
+
+    if decode_cursor(encode_cursor('2026-01-05T10:00:00+00:00', 'uuid-1')) != ('2026-01-05T10:00:00+00:00', 'uuid-1'):
+        print("      커서 인코딩/디코딩 불일치")
+        return False
+    try:
+        decode_cursor('not-a-cursor')
+        print("      잘못된 커서를 거부하지 않음")
+        return False
+    except CursorError:
+        pass
+
+    # Supabase: OFFSET 없이 (created_at, id) 조건 + limit+1 조회
+    from api.services.supabase_service import SupabaseService
+    fake = _FakeSupabase()
+    uuid = '00000000-0000-4000-8000-00000000000{}'.format
+    fake.rows['sites'] = [{'id': uuid(i), 'created_at': f'2026-01-0{9 - i}T00:00:00+00:00'} for i in range(3)]
+    service = SupabaseService()
+    service._client = fake
+    page = service.get_sites_page(limit=2, cursor=encode_cursor('2026-01-10T00:00:00+00:00', uuid(9)))
+    ops = fake.executed[-1][1]
+    names = [name for name, _, _ in ops]
+    if 'range' in names or ('limit', (3,), {}) not in ops or 'or_' not in names:
+        print(f"      Supabase 키셋 쿼리 구성 이상: {names}")
+        return False
+    if len(page['data']) != 2 or decode_cursor(page['next_cursor']) != ('2026-01-08T00:00:00+00:00', uuid(1)):
+        print(f"      next_cursor 이상: {page['next_cursor']}")
+        return False
+
+    # 필터 문자열에 들어가는 커서 값은 ISO 시각 + UUID만 허용
+    executed = len(fake.executed)
+    for bad in (encode_cursor('2026-01-10T00:00:00+00:00', '1),id.gt.0'), encode_cursor('x",id.gt."', uuid(1))):
+        try:
+            service.get_sites_page(limit=2, cursor=bad)
+            print("      주입 커서를 거부하지 않음")
+            return False
+        except CursorError:
+            pass
+    if len(fake.executed) != executed:
+        print("      잘못된 커서로 쿼리 실행됨")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_search_index():
+    """현장 검색 역색인: 부분/초성/오타 매칭, 점수순, 증분 갱신"""
+    print("[성능] api.services.search_index 검증 중...")
+    try:
+        from api.services.search_index import SiteSearchIndex
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    index = SiteSearchIndex()
+    index.build([
+        {'현장ID': 'S001', '현장명': '평택 푸르지오', '주소': '경기도 평택시 고덕동'},
+        {'현장ID': 'S002', '현장명': '용인 수지 주택', '주소': '경기도 용인시 평택로 12'},
+        {'현장ID': 'S003', '현장명': '서울 강남 오피스', '주소': '서울특별시 강남구'},
+    ])
+    ids = [s['현장ID'] for s in index.search('평택')]
+    if ids != ['S001', 'S002']:
+        print(f"      점수순 부분 일치 이상 (현장명 > 주소 기대): {ids}")
+        return False
+    if [s['현장ID'] for s in index.search('ㄱㄴ')] != ['S003']:
+        print("      초성 검색 실패")
+        return False
+    if [s['현장ID'] for s in index.search('푸르지우')] != ['S001']:
+        print("      오타 허용(n-gram 유사도) 검색 실패")
+        return False
+    if [s['현장ID'] for s in index.search('평', limit=1)] != ['S001']:
+        print("      limit/짧은 질의 처리 이상")
+        return False
+
+    # SheetsRepository 증분 갱신 연동
+    from api.services.sheets_service import SheetsService, SheetsRepository, SHEET_SITES
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.repo = SheetsRepository(service)
+    if [s['현장ID'] for s in service.search_sites('푸르')] != ['S001']:
+        print("      Sheets 검색 연동 실패")
+        return False
+    service.repo.on_update(SHEET_SITES, 'S001', {'현장명': '평택 자이'})
+    service.repo.on_append(SHEET_SITES, ['S002', '천안 푸르지오'] + [''] * 21)
+    if [s['현장ID'] for s in service.search_sites('푸르')] != ['S002'] or len(fake.reads) != 1:
+        print("      증분 갱신 후 검색 결과 이상 또는 불필요한 재조회")
+        return False
+
+    print("      통과")
+    return True
+
+
+def _legacy_stats(sites, personnel, certificates):
+    """기존 /api/stats 리스트 컴프리헨션 집계 (응답 형식 비교용)"""
+    by_state, by_role = {}, {}
+    for s in sites:
+        by_state[s.get('현장상태') or ''] = by_state.get(s.get('현장상태') or '', 0) + 1
+    for p in personnel:
+        by_role[p.get('직책') or ''] = by_role.get(p.get('직책') or '', 0) + 1
+    return {
+        'sites': {
+            'total': len(sites),
+            'assigned': len([s for s in sites if s['배정상태'] == '배정완료']),
+            'unassigned': len([s for s in sites if s['배정상태'] == '미배정']),
+            'by_company': {
+                '더존종합건설': len([s for s in sites if s['회사구분'] == '더존종합건설']),
+                '더존하우징': len([s for s in sites if s['회사구분'] == '더존하우징']),
+            },
+            'by_state': by_state,
+        },
+        'personnel': {
+            'total': len(personnel),
+            'available': len([p for p in personnel if p['현재상태'] == '투입가능']),
+            'deployed': len([p for p in personnel if p['현재상태'] == '투입중']),
+            'by_role': by_role,
+        },
+        'certificates': {
+            'total': len(certificates),
+            'available': len([c for c in certificates if c['사용가능여부'] == '사용가능']),
+            'in_use': len([c for c in certificates if c['사용가능여부'] == '사용중']),
+            'expired': len([c for c in certificates if c['사용가능여부'] == '만료']),
+        },
+    }
+
+
+def test_stats_service():
+    """통계 집계: 기존 응답과 동일, Sheets는 스냅샷 1회 순회, Supabase는 RPC 1회"""
+    print("[성능] api.services.stats_service 검증 중...")
+    try:
+        from api.services.stats_service import compute_stats
+        from api.services.sheets_service import SheetsService, SheetsRepository
+        from api.services.supabase_service import SupabaseService
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    backend.sites.append(dict(backend.sites[0], 현장ID='S002', 회사구분='더존하우징', 배정상태='배정완료', 현장상태='공사 중'))
+    backend.personnel.append(dict(backend.personnel[0], 인력ID='P002', 직책='공무', 현재상태='투입중'))
+    backend.certificates.append(dict(backend.certificates[0], 자격증ID='C002', 사용가능여부='만료'))
+    args = (backend.sites, backend.personnel, backend.certificates)
+    if compute_stats(*args) != _legacy_stats(*args):
+        print("      기존 집계 결과와 불일치")
+        return False
+
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.repo = SheetsRepository(service)
+    service.get_statistics()
+    stats = service.get_statistics()
+    if len(fake.reads) != 1 or stats['sites']['unassigned'] != 1 or stats['personnel']['available'] != 1:
+        print(f"      Sheets 통계 이상: reads={fake.reads}, stats={stats}")
+        return False
+
+    supa = _FakeSupabase()
+    supa.rpc = lambda name, params=None: type('Q', (), {'execute': lambda self: type('R', (), {
+        'data': {'sites': {'total': 3, 'by_state': {'착공예정': 3}}, 'certificates': {'in_use': 2}}})()})()
+    service = SupabaseService()
+    service._client = supa
+    stats = service.get_statistics()
+    if supa.executed or stats['sites']['total'] != 3 or stats['sites']['by_company']['더존하우징'] != 0 \
+            or stats['certificates']['in_use'] != 2 or stats['personnel']['by_role'] != {}:
+        print(f"      Supabase RPC 통계 병합 이상: {stats}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_stats_counter():
+    """통계 카운터: 시드 1회 후 O(1) 조회, 쓰기(배정/해제 포함)는 재조회 없이 델타 반영, 시드 중 쓰기/드리프트 교정"""
+    print("[성능] api.services.stats_service.StatsCounter 검증 중...")
+    try:
+        from api.services.cache_service import CachedBackend, SnapshotCache
+        from api.services.stats_service import StatsCounter, compute_stats
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    backend.get_statistics = lambda fresh=False: (backend._count('get_statistics'), compute_stats(
+        backend.sites, backend.personnel, backend.certificates))[1]
+
+    def assign(site_id, manager_id, certificate_id, expected_version=None):
+        backend._count('assign_site')
+        backend.update_site(site_id, {'배정상태': '배정완료', '담당소장ID': manager_id, '사용자격증ID': certificate_id})
+        backend.personnel[0].update({'현재상태': '투입중', '현재담당현장수': '1'})
+        backend.certificates[0]['사용가능여부'] = '사용중'
+
+    def unassign(site_id, expected_version=None):
+        backend._count('unassign_site')
+        backend.update_site(site_id, {'배정상태': '미배정', '담당소장ID': '', '사용자격증ID': ''})
+        backend.personnel[0].update({'현재상태': '투입가능', '현재담당현장수': '0'})
+        backend.certificates[0]['사용가능여부'] = '사용가능'
+    backend.assign_site, backend.unassign_site = assign, unassign
+
+    counter = StatsCounter(lambda: backend.get_statistics(fresh=True), reconcile_interval=0)
+    db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=64), stats=counter)
+    db.get_statistics()
+    db.get_statistics()
+    if backend.calls.get('get_statistics') != 1:
+        print(f"      시드 후에도 재집계 발생: {backend.calls}")
+        return False
+
+    # 라우트가 읽은 행(캐시)으로 델타 계산 → 쓰기 경로에서 행 재조회 없음
+    db.get_site_by_id('S001')
+    db.update_site('S001', {'현장상태': '공사 중'})
+    db.update_site('S001', {'특이사항': '메모'})
+    stats = db.get_statistics()
+    expected = compute_stats(backend.sites, backend.personnel, backend.certificates)
+    if stats != expected or backend.calls['get_statistics'] != 1 or backend.calls['get_site_by_id'] != 1:
+        print(f"      델타 반영 결과/조회 횟수 이상: {stats} != {expected}, calls={backend.calls}")
+        return False
+
+    # 배정/해제: 읽어 둔 현장/소장/자격증 행으로 델타 반영 → 재집계·쓰기 경로 조회 없음
+    db.get_all_tables()
+    db.assign_site('S001', 'P001', 'C001')
+    stats = db.get_statistics()
+    if stats != compute_stats(backend.sites, backend.personnel, backend.certificates) \
+            or backend.calls['get_statistics'] != 1:
+        print(f"      배정 델타 이상 또는 재집계 발생: {stats}, calls={backend.calls}")
+        return False
+    if stats['sites']['by_state'] != {'공사 중': 1} or stats['personnel']['deployed'] != 1 \
+            or stats['certificates']['in_use'] != 1:
+        print(f"      by_state/인력/자격증 카운터 이상: {stats}")
+        return False
+    db.get_all_tables()
+    db.unassign_site('S001')
+    stats = db.get_statistics()
+    if stats != compute_stats(backend.sites, backend.personnel, backend.certificates) \
+            or backend.calls['get_statistics'] != 1 or stats['personnel']['available'] != 1:
+        print(f"      해제 델타 이상 또는 재집계 발생: {stats}, calls={backend.calls}")
+        return False
+    if backend.calls.get('get_personnel_by_id') or backend.calls.get('get_certificate_by_id') \
+            or backend.calls['get_site_by_id'] != 1:
+        print(f"      배정/해제 쓰기 경로에서 조회 발생: {backend.calls}")
+        return False
+
+    # 변경 전 행을 모르면(캐시 없음) 무효화 → 다음 조회 때 1회 재집계
+    db.cache.clear()
+    db.assign_site('S001', 'P001', 'C001')
+    if db.get_statistics() != compute_stats(backend.sites, backend.personnel, backend.certificates) \
+            or backend.calls['get_statistics'] != 2:
+        print(f"      변경 전 행 없을 때 재집계 이상: {backend.calls}")
+        return False
+
+    # 외부 직접 수정 → 재검증에서 드리프트 교정
+    backend.certificates.append({'자격증ID': 'C009', '사용가능여부': '만료'})
+    if not counter.reconcile() or db.get_statistics()['certificates']['expired'] != 1:
+        print("      재검증 드리프트 교정 실패")
+        return False
+    if db.get_statistics(fresh=True) != compute_stats(backend.sites, backend.personnel, backend.certificates) \
+            or backend.calls['get_statistics'] != 4:
+        print("      fresh=True 재집계 미동작")
+        return False
+
+    # 첫 시드 집계 도중 쓰기 → 집계 결과 버리고 다시 집계 (쓰기 유실 없음)
+    seeds = []
+
+    def racing_loader():
+        stats = compute_stats(backend.sites, backend.personnel, backend.certificates)
+        if not seeds:
+            racing.update_site('S001', {'현장상태': '준공'})
+        seeds.append(stats)
+        return stats
+
+    racing = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=64),
+                           stats=StatsCounter(racing_loader, reconcile_interval=0))
+    if racing.get_statistics()['sites']['by_state'] != {'준공': 1} or len(seeds) != 2:
+        print(f"      시드 중 쓰기 유실: seeds={len(seeds)}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_assign_rpc():
+    """Supabase 배정/해제: RPC 1회 호출, 함수 없으면 기존 방식 폴백"""
+    print("[성능] SupabaseService.assign_site (RPC) 검증 중...")
+    try:
+        from api.services.supabase_service import SupabaseService
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    class _RpcError(Exception):
+        def __init__(self, code, message):
+            super().__init__(message)
+            self.code, self.message = code, message
+
+    calls = []
+
+    def rpc(name, params=None, error=None):
+        def execute():
+            calls.append((name, params))
+            if error:
+                raise error
+            return type('R', (), {'data': {'site_id': 'uuid-s1'}})()
+        return type('Q', (), {'execute': staticmethod(execute)})()
+
+    fake = _FakeSupabase()
+    fake.rpc = rpc
+    service = SupabaseService()
+    service._client = fake
+    service.assign_site('S001', 'P001', 'C001')
+    service.unassign_site('S001')
+    if [c[0] for c in calls] != ['assign_site', 'unassign_site'] or fake.executed:
+        print(f"      RPC 외 추가 요청 발생: rpc={calls}, table={len(fake.executed)}")
+        return False
+    if calls[0][1] != {'p_site_id': 'S001', 'p_manager_id': 'P001', 'p_certificate_id': 'C001'}:
+        print(f"      RPC 인자 이상: {calls[0][1]}")
+        return False
+
+    fake.rpc = lambda name, params=None: rpc(name, params, _RpcError('P0002', '현장을 찾을 수 없습니다: S404'))
+    try:
+        service.assign_site('S404', 'P001', 'C001')
+        print("      RPC 오류가 전달되지 않음")
+        return False
+    except ValueError as e:
+        if '현장을 찾을 수 없습니다' not in str(e):
+            print(f"      RPC 오류 메시지 이상: {e}")
+            return False
+
+    # 알 수 없는 오류(연결/권한 등)는 ValueError로 바꾸지 않고 그대로 전달
+    fake.rpc = lambda name, params=None: rpc(name, params, _RpcError('42501', 'permission denied'))
+    try:
+        service.assign_site('S001', 'P001', 'C001')
+        print("      RPC 오류가 전달되지 않음")
+        return False
+    except ValueError:
+        print("      권한 오류가 ValueError로 바뀜")
+        return False
+    except _RpcError:
+        pass
+
+    # 함수 없음(PGRST202) → 기존 방식 폴백, 이후 RPC 재시도 안 함
+    fake.rpc = lambda name, params=None: rpc(name, params, _RpcError('PGRST202', 'Could not find the function'))
+    fake.rows['sites'] = [{'id': 'uuid-s1', 'personnel_id': 'uuid-p1', 'certificate_id': 'uuid-c1'}]
+    service.unassign_site('S001')
+    service.unassign_site('S001')
+    if [c[0] for c in calls].count('unassign_site') != 2 or not fake.executed:
+        print(f"      RPC 미설치 폴백 이상: rpc={calls}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_assign_batch():
+    """일괄 배정: 스냅샷 1회 검증, batchUpdate 1회, 항목별 결과(409 포함, 쓰기 시점 충돌도 항목별)"""
+    print("[성능] POST /api/sites/assign:batch 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+        from api.services.sheets_service import SheetsService, SheetsRepository, SHEET_SITES, SHEET_CERTIFICATES
+        from api.services.db_service import _SheetsAdapter
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    site2 = list(fake.values[SHEET_SITES][0])
+    site2[0], site2[1] = 'S002', '용인 주택'
+    site3 = list(site2)
+    site3[0] = 'S003'
+    fake.values[SHEET_SITES] += [site2, site3]
+    cert2 = list(fake.values[SHEET_CERTIFICATES][0])
+    cert2[0] = 'C002'
+    fake.values[SHEET_CERTIFICATES].append(cert2)
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.repo = SheetsRepository(service)
+
+    saved = db_service._db
+    db_service._db = _SheetsAdapter(service)
+    try:
+        res = app.test_client().post('/api/sites/assign:batch', json={'items': [
+            {'site_id': 'S001', 'manager_id': 'P001', 'certificate_id': 'C001', 'version': 3},
+            {'site_id': 'S002', 'manager_id': 'P001', 'certificate_id': 'C001'},
+            {'site_id': 'S003', 'manager_id': 'P001', 'certificate_id': 'C002', 'version': 1},
+            {'site_id': 'S404', 'manager_id': 'P001', 'certificate_id': 'C002'},
+            {'site_id': 'S002', 'manager_id': 'P001', 'certificate_id': 'C002'},
+        ]})
+    finally:
+        db_service._db = saved
+
+    body = res.get_json()
+    statuses = [r['status'] for r in body['data']]
+    if res.status_code != 207 or statuses != [200, 400, 409, 404, 200]:
+        print(f"      항목별 결과 이상: HTTP {res.status_code}, {statuses}")
+        return False
+    if len(fake.batch_updates) != 1 or len(fake.reads) != 1:
+        print(f"      왕복 횟수 이상: reads={len(fake.reads)}, batchUpdate={len(fake.batch_updates)}")
+        return False
+    if service.get_personnel_by_id('P001')['현재담당현장수'] != '2':
+        print("      같은 소장 다건 배정 시 담당수 누적 실패")
+        return False
+
+    # 캐시된 스냅샷 이후 외부 수정: 캐시보다 새 버전을 보낸 항목은 통과(거짓 409 없음),
+    # 쓰기 시점 충돌은 해당 항목만 409 + 나머지는 반영 (207)
+    fake = _FakeSheets()
+    fake.values[SHEET_SITES] += [site2, site3]
+    fake.values[SHEET_CERTIFICATES].append(cert2)
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.repo = SheetsRepository(service)
+    db = CachedBackend(_SheetsAdapter(service), SnapshotCache(ttl=60, max_entries=64))
+    db.get_all_tables()
+    service.repo.on_update(SHEET_SITES, 'S001', {'버전': '5'})
+    service.repo.on_update(SHEET_SITES, 'S002', {'버전': '4'})
+    db_service._db = db
+    try:
+        res = app.test_client().post('/api/sites/assign:batch', json={'items': [
+            {'site_id': 'S001', 'manager_id': 'P001', 'certificate_id': 'C001', 'version': 5},
+            {'site_id': 'S002', 'manager_id': 'P001', 'certificate_id': 'C002', 'version': 3},
+        ]})
+    finally:
+        db_service._db = saved
+    body = res.get_json()
+    statuses = [r['status'] for r in body['data']]
+    if res.status_code != 207 or statuses != [200, 409] or body['data'][0]['data']['version'] != 6:
+        print(f"      쓰기 시점 충돌 항목별 처리 이상: HTTP {res.status_code}, {body}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_bulk_import():
+    """대량 가져오기: 기존 ID 집합 1회, 청크당 append 1회, 행 오류/중복 보고"""
+    print("[성능] POST /api/import 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.sheets_service import SheetsService, SheetsRepository, SHEET_PERSONNEL
+        from api.services.db_service import _SheetsAdapter
+        from api.services.db_service import ConfigRequiredError
+        from api.services.import_service import import_records
+        from api.services.validation import ValidationError, validate_site_data
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.append_rows = fake.append_rows
+    service.repo = SheetsRepository(service)
+    adapter = _SheetsAdapter(service)
+
+    csv_text = (
+        "현장ID,현장명,회사구분,주소,위도,경도,현장상태,배정상태\n"
+        "S001,평택 푸르지오,더존종합건설,경기도 평택시,36.99,126.97,착공예정,미배정\n"
+        "S101,수원 힐스테이트,더존종합건설,경기도 수원시,37.26,127.02,착공예정,미배정\n"
+        "S102,용인 주택,없는회사,경기도 용인시,,,착공예정,미배정\n"
+        "S103,화성 타운,더존하우징,경기도 화성시,,,,\n"
+        "S101,수원 힐스테이트,더존종합건설,경기도 수원시,,,착공예정,미배정\n"
+        "S104,오산 빌라,더존하우징,경기도 오산시,북위37,127.07,착공예정,미배정\n"
+    )
+    saved = db_service._db
+    db_service._db = adapter
+    try:
+        res = app.test_client().post('/api/import?type=sites&chunk_size=1', data=csv_text.encode('utf-8-sig'),
+                                     content_type='text/csv')
+    finally:
+        db_service._db = saved
+
+    body = res.get_json()
+    codes = [(e['row'], e['code']) for e in body['data']['errors']]
+    if res.status_code != 207 or body['summary'] != {'total': 6, 'inserted': 2, 'skipped': 2, 'failed': 2}:
+        print(f"      결과 이상: HTTP {res.status_code}, {body.get('summary')}")
+        return False
+    if codes != [(2, 'DUPLICATE_ID'), (4, 'VALIDATION_ERROR'), (6, 'DUPLICATE_ID'), (7, 'VALIDATION_ERROR')]:
+        print(f"      행 오류 보고 이상: {codes}")
+        return False
+    # 위도/경도 숫자 검사는 가져오기 전용 (공용 validate_site_data → POST/PUT /api/sites 동작은 그대로)
+    try:
+        validate_site_data({'위도': '북위37'}, is_update=True)
+    except ValidationError:
+        print("      위도/경도 검사가 공용 현장 검증에 포함됨")
+        return False
+
+    # 설정 누락만 503 CONFIG_REQUIRED, 그 밖의 ValueError는 500 IMPORT_ERROR
+    class _NoConfig:
+        def existing_ids(self, kind):
+            raise ConfigRequiredError('SUPABASE_URL, SUPABASE_KEY를 설정해 주세요.')
+
+    class _Broken:
+        def existing_ids(self, kind):
+            raise ValueError('invalid literal')
+
+    labels = []
+    for db in (_NoConfig(), _Broken()):
+        db_service._db = db
+        try:
+            r = app.test_client().post('/api/import?type=sites', data=b'[]', content_type='application/json')
+        finally:
+            db_service._db = saved
+        labels.append((r.status_code, r.get_json()['error']['code']))
+    if labels != [(503, 'CONFIG_REQUIRED'), (500, 'IMPORT_ERROR')]:
+        print(f"      가져오기 오류 분류 이상: {labels}")
+        return False
+    site = service.get_site_by_id('S103')
+    if not site or site['현장상태'] != '건축허가' or len(fake.reads) != 1:
+        print(f"      인덱스 반영 이상: {site}, reads={len(fake.reads)}")
+        return False
+
+    # 5,000행: 기존 ID 조회 1회 + 청크 5회 append
+    fake.appends = []
+    rows = ((i + 2, {'인력ID': f'P{i:05d}', '성명': f'인력{i}', '직책': '소장'}) for i in range(5000))
+    result = import_records(adapter, 'personnel', rows, chunk_size=1000)
+    if result['inserted'] != 5000 or fake.appends != [1000] * 5 or len(fake.values[SHEET_PERSONNEL]) != 5001:
+        print(f"      청크 쓰기 이상: {result['inserted']}, appends={fake.appends}")
+        return False
+    if service.repo.row_number(SHEET_PERSONNEL, 'P04999') != 5002 or len(fake.reads) != 2:
+        print("      행 번호 인덱스 갱신 실패")
+        return False
+    print("      통과")
+    return True
+
+
+def test_ndjson_streaming():
+    """목록 NDJSON 스트리밍: 필터 적용, Supabase 키셋 페이지 연속 조회, 도중 오류는 마지막 줄"""
+    print("[성능] 목록 API stream=1 (NDJSON) 검증 중...")
+    try:
+        import json
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.sheets_service import SheetsService, SheetsRepository, SHEET_SITES
+        from api.services.db_service import _SheetsAdapter
+        from api.services.supabase_service import SupabaseService
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    site2 = list(fake.values[SHEET_SITES][0])
+    site2[0], site2[3] = 'S002', '더존하우징'
+    fake.values[SHEET_SITES].append(site2)
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.repo = SheetsRepository(service)
+
+    class _Broken:
+        def iter_sites(self, **kwargs):
+            yield {'현장ID': 'S001'}
+            raise RuntimeError('연결 끊김')
+
+    client = app.test_client()
+    saved = db_service._db
+    try:
+        # 스트림 응답은 다음 요청 전에 끝까지 읽음 (요청 컨텍스트가 스트림 종료 시 해제됨)
+        db_service._db = _SheetsAdapter(service)
+        res = client.get('/api/sites?stream=1&company=더존하우징')
+        lines = [json.loads(l) for l in res.get_data(as_text=True).splitlines()]
+        res2 = client.get('/api/personnel', headers={'Accept': 'application/x-ndjson'})
+        people = [json.loads(l)['인력ID'] for l in res2.get_data(as_text=True).splitlines()]
+        db_service._db = _Broken()
+        res3 = client.get('/api/sites?stream=1')
+        tail = [json.loads(l) for l in res3.get_data(as_text=True).splitlines()]
+    finally:
+        db_service._db = saved
+
+    if res.mimetype != 'application/x-ndjson' or [l['현장ID'] for l in lines] != ['S002']:
+        print(f"      현장 스트림 이상: {res.mimetype}, {lines}")
+        return False
+    if people != ['P001']:
+        print("      Accept 헤더 스트림 이상")
+        return False
+    if len(tail) != 2 or tail[-1].get('error', {}).get('code') != 'STREAM_ERROR':
+        print(f"      도중 오류 보고 이상: {tail}")
+        return False
+
+    # Supabase: 페이지 크기 2, 5건 → 키셋 페이지 3회
+    class _Pages:
+        def __init__(self, pages):
+            self.pages = pages
+
+        def get(self, table, default=None):
+            return self.pages.pop(0) if self.pages else []
+
+    rows = [{'legacy_id': f'P{i}', 'name': f'인력{i}', 'id': f'id{i}', 'created_at': f'2026-01-0{9 - i}'} for i in range(5)]
+    supa = _FakeSupabase()
+    supa.rows = _Pages([rows[:2], rows[2:4], rows[4:]])
+    sb = SupabaseService()
+    sb._client = supa
+    streamed = [p['인력ID'] for p in sb._iter_keyset('personnel', '*', lambda r: {'인력ID': r['legacy_id']}, page_size=2)]
+    if streamed != ['P0', 'P1', 'P2', 'P3', 'P4'] or len(supa.executed) != 3:
+        print(f"      키셋 스트림 이상: {streamed}, 요청 {len(supa.executed)}회")
+        return False
+    cursor_ops = [args[0] for name, args, _ in supa.executed[1][1] if name == 'or_']
+    if not cursor_ops or 'id.lt.id1' not in cursor_ops[0]:
+        print(f"      다음 페이지 키셋 조건 누락: {cursor_ops}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_conditional_get():
+    """ETag/304: 버전이 같으면 뷰 실행 없이 304, 쓰기/외부 수정 후에는 새 ETag"""
+    print("[성능] ETag / If-None-Match 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=16))
+    client = app.test_client()
+    saved = db_service._db
+    db_service._db = db
+    try:
+        first = client.get('/api/personnel')
+        etag = first.headers.get('ETag')
+        again = client.get('/api/personnel', headers={'If-None-Match': etag})
+        calls = dict(backend.calls)
+        other = client.get('/api/personnel?status=투입가능', headers={'If-None-Match': etag})
+        db.assign_site('S001', 'P001', 'C001')
+        after_write = client.get('/api/personnel', headers={'If-None-Match': etag})
+    finally:
+        db_service._db = saved
+
+    if first.status_code != 200 or not etag or first.headers.get('Cache-Control') != 'no-cache':
+        print(f"      ETag 미부여: {first.status_code}, {dict(first.headers)}")
+        return False
+    if again.status_code != 304 or again.get_data() or calls['get_all_personnel'] != 1:
+        print(f"      304 미응답 또는 뷰 실행됨: {again.status_code}, {calls}")
+        return False
+    if calls['collection_versions'] != 1:
+        print(f"      버전 조회가 캐시되지 않음: {calls}")
+        return False
+    if other.status_code != 200 or after_write.status_code != 200 or after_write.headers.get('ETag') == etag:
+        print(f"      쿼리/쓰기 후 ETag 구분 실패: {other.status_code}, {after_write.status_code}")
+        return False
+
+    # 외부 수정: 버전 캐시 만료 후 백엔드 버전이 바뀌어 있으면 스냅샷도 버림
+    db.get_all_personnel()
+    loads = backend.calls['get_all_personnel']
+    backend.version += 1
+    db.cache._entries.pop(('personnel', 'version'), None)  # TTL 만료 흉내
+    db.collection_versions(('personnel',))
+    db.get_all_personnel()
+    if backend.calls['get_all_personnel'] != loads + 1:
+        print("      외부 수정 감지 후 스냅샷 미갱신")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_change_feed():
+    """변경 피드: 쓰기/외부 편집이 커서 이후 델타로 나오고, 클라이언트 복제본은 델타만 반영"""
+    print("[성능] GET /api/changes 델타 동기화 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        import streamlit_utils.cached_api as cached_api
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+        from api.services.db_service import _SheetsAdapter
+        from api.services.sheets_service import SheetsService, SheetsRepository
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.append_row = fake.append_row
+    service.repo = SheetsRepository(service)
+    adapter = _SheetsAdapter(service)
+    client = app.test_client()
+    saved = db_service._db
+    db_service._db = CachedBackend(adapter, SnapshotCache(ttl=60, max_entries=16))
+    try:
+        start = client.get('/api/changes').get_json()
+        adapter.assign_site('S001', 'P001', 'C001')
+        adapter.create_personnel({'인력ID': 'P002', '성명': '이소장'})
+        delta = client.get(f"/api/changes?since={start['cursor']}").get_json()
+        paged = client.get(f"/api/changes?since={start['cursor']}&limit=2").get_json()
+        # 시트 직접 편집: 재로딩 시 이전 인덱스와 비교해 삭제/수정 감지
+        fake.values[adapter._personnel] = [['P002', '이소장(수정)']]
+        service.repo.load(adapter._personnel, force=True)
+        external = client.get(f"/api/changes?since={delta['cursor']}").get_json()
+        bad = client.get('/api/changes?since=abc.xyz')
+        stale = client.get('/api/changes?since=00000000.1').get_json()
+    finally:
+        db_service._db = saved
+
+    if not start['reset'] or not start['cursor']:
+        print(f"      since 없는 요청이 현재 커서를 반환하지 않음: {start}")
+        return False
+    data = delta['data']
+    if ([s['배정상태'] for s in data['sites']['upserted']] != ['배정완료']
+            or sorted(p['인력ID'] for p in data['personnel']['upserted']) != ['P001', 'P002']
+            or [c['현재사용현장ID'] for c in data['certificates']['upserted']] != ['S001']
+            or delta['reset'] or delta['has_more']):
+        print(f"      쓰기 후 델타 불일치: {delta}")
+        return False
+    if not paged['has_more'] or paged['cursor'] == delta['cursor']:
+        print(f"      limit 초과 시 has_more/중간 커서 없음: {paged}")
+        return False
+    people = external['data']['personnel']
+    if people['deleted'] != ['P001'] or [p['성명'] for p in people['upserted']] != ['이소장(수정)']:
+        print(f"      시트 직접 편집 감지 실패: {external}")
+        return False
+    if bad.status_code != 400 or not stale['reset']:
+        print(f"      잘못된/만료 커서 처리 이상: {bad.status_code}, {stale}")
+        return False
+
+    # 클라이언트 복제본: 전체 조회 1회 후에는 변경분만 반영
+    loads, lock_free = [], []
+    feed = {'cursor': 'c0', 'changes': {}}
+
+    def probe_lock():
+        # /api/changes 조회 중 다른 스레드가 복제본 잠금을 얻을 수 있어야 함
+        acquired = cached_api._replica.lock.acquire(timeout=1)
+        if acquired:
+            cached_api._replica.lock.release()
+        lock_free.append(acquired)
+
+    def fake_changes(since=None, limit=None):
+        probe = threading.Thread(target=probe_lock)
+        probe.start()
+        probe.join()
+        if since is None:
+            return {'changes': {}, 'cursor': feed['cursor'], 'has_more': False, 'reset': True}, None
+        changes, feed['changes'] = feed['changes'], {}
+        return {'changes': changes, 'cursor': feed['cursor'], 'has_more': False, 'reset': False}, None
+
+    def fake_sites(*args):
+        loads.append(args)
+        return [{'현장ID': 'S001', '배정상태': '미배정'}, {'현장ID': 'S002', '배정상태': '미배정'}], None
+
+    originals = (cached_api._get_changes, cached_api._get_sites)
+    cached_api._get_changes, cached_api._get_sites = fake_changes, fake_sites
+    cached_api._replica.reset()
+    try:
+        first, _ = cached_api.get_sites_cached()
+        feed['changes'] = {'sites': {'upserted': [{'현장ID': 'S001', '배정상태': '배정완료'}], 'deleted': ['S002']}}
+        feed['cursor'] = 'c1'
+        applied = cached_api.sync_changes(force=True)
+        after, _ = cached_api.get_sites_cached(status='배정완료')
+    finally:
+        cached_api._get_changes, cached_api._get_sites = originals
+        cached_api._replica.reset()
+    if len(first) != 2 or applied != 2 or after != [{'현장ID': 'S001', '배정상태': '배정완료'}] or len(loads) != 1:
+        print(f"      복제본 델타 반영 실패: first={first}, after={after}, loads={len(loads)}")
+        return False
+    if not lock_free or not all(lock_free):
+        print(f"      /api/changes 조회 중 복제본 잠금 유지: {lock_free}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_event_bus():
+    """실시간 이벤트: 쓰기 라우트 → 구독자 팬아웃, 느린 구독자는 resync, Last-Event-ID 재전송, SSE 프레임"""
+    print("[성능] GET /api/events SSE 푸시 검증 중...")
+    try:
+        import api.routes.events as events_route
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+        from api.services.db_service import _SheetsAdapter
+        from api.services.event_bus import EventBus, TooManySubscribers, bus
+        from api.services.sheets_service import SheetsService, SheetsRepository
+        from streamlit_utils.live_updates import iter_sse
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    # 버스 단위: 팬아웃 / 큐 초과 시 resync 1건 / 재연결 재전송 / 구독 상한
+    small = EventBus(queue_size=2, history=3, max_subscribers=2)
+    fast, _ = small.subscribe()
+    slow, _ = small.subscribe()
+    first = small.publish('site.assigned', 'S001')
+    if fast.get(timeout=0)['event_id'] != first['event_id']:
+        print("      구독자에게 이벤트가 전달되지 않음")
+        return False
+    for i in range(3):
+        small.publish('site.updated', f'S00{i}')
+    drained = [slow.get(timeout=0) for _ in range(3)]
+    if [e and e['type'] for e in drained] != ['resync', 'site.updated', None]:
+        print(f"      큐 초과 시 resync로 대체되지 않음: {drained}")
+        return False
+    try:
+        small.subscribe()
+        print("      구독 상한 초과가 거부되지 않음")
+        return False
+    except TooManySubscribers:
+        pass
+    fast.close()
+    slow.close()
+    _, backlog = small.subscribe(f'{small.epoch}-2')
+    _, expired = small.subscribe(f'{small.epoch}-0')
+    if [e['id'] for e in backlog] != [3, 4] or [e['type'] for e in expired] != ['resync']:
+        print(f"      Last-Event-ID 재전송 이상: {backlog}, {expired}")
+        return False
+
+    # 라우트: 배정 완료 후 이벤트 발행, SSE 스트림으로 전달
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.append_row = fake.append_row
+    service.repo = SheetsRepository(service)
+    client = app.test_client()
+    saved = db_service._db, events_route.EVENT_STREAM_MAX_AGE
+    db_service._db = CachedBackend(_SheetsAdapter(service), SnapshotCache(ttl=60, max_entries=16))
+    events_route.EVENT_STREAM_MAX_AGE = 0.2
+    sub, _ = bus.subscribe()
+    try:
+        res = client.post('/api/sites/S001/assign', json={'manager_id': 'P001', 'certificate_id': 'C001'})
+        event = sub.get(timeout=1)
+        sub.close()
+        stream = client.get('/api/events', headers={'Last-Event-ID': event['event_id'].rsplit('-', 1)[0] + f"-{event['id'] - 1}"})
+        body = stream.get_data(as_text=True)
+    finally:
+        db_service._db, events_route.EVENT_STREAM_MAX_AGE = saved
+    if res.status_code != 200 or not event or event['type'] != 'site.assigned' or event['entity_id'] != 'S001':
+        print(f"      배정 후 이벤트 미발행: {res.status_code}, {event}")
+        return False
+    frames = list(iter_sse(body.split('\n')))
+    if (stream.mimetype != 'text/event-stream' or not body.startswith('retry:')
+            or [(i, t) for i, t, _ in frames] != [(event['event_id'], 'site.assigned')]):
+        print(f"      SSE 프레임 이상: {body!r}")
+        return False
+    if bus.subscriber_count != 0:
+        print(f"      스트림 종료 후 구독이 남음: {bus.subscriber_count}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_row_version():
+    """행 버전: 같은 날 두 번 수정해도 충돌 검출, 버전 비교는 쓰기 안에서 (추가 조회 없음)"""
+    print("[정합성] 현장 행 버전 compare-and-swap 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.db_service import _SheetsAdapter
+        from api.services.sheets_service import SheetsService, SheetsRepository, SHEET_SITES
+        from api.services.supabase_service import SupabaseService
+        from api.services.sync_manager import ConflictError
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    fake = _FakeSheets()
+    service = SheetsService()
+    service.read_sheet = fake.read_sheet
+    service.read_sheets = fake.read_sheets
+    service.batch_update = fake.batch_update
+    service.repo = SheetsRepository(service)
+    client = app.test_client()
+    saved = db_service._db
+    db_service._db = _SheetsAdapter(service)
+    try:
+        detail = client.get('/api/sites/S001').get_json()['data']
+        reads = len(fake.reads)
+        first = client.put('/api/sites/S001', json={'특이사항': '1차'}, headers={'If-Match': '"3"'})
+        same_day = client.put('/api/sites/S001', json={'특이사항': '2차', 'version': 3})
+        legacy = client.put('/api/sites/S001', json={'특이사항': '2차', 'version': '2026-01-05'})
+        assigned = client.post('/api/sites/S001/assign', json={'manager_id': 'P001', 'certificate_id': 'C001', 'version': 4})
+        stale = client.post('/api/sites/S001/unassign', json={'version': 4})
+        unassigned = client.post('/api/sites/S001/unassign', headers={'If-Match': 'W/"5"'})
+        writes, extra_reads = len(fake.batch_updates), len(fake.reads) - reads
+    finally:
+        db_service._db = saved
+
+    if detail['version'] != 3:
+        print(f"      상세 응답 버전 이상: {detail['version']}")
+        return False
+    statuses = [r.status_code for r in (first, same_day, legacy, assigned, stale, unassigned)]
+    versions = [r.get_json()['data']['version'] for r in (first, assigned, unassigned)]
+    if statuses != [200, 409, 409, 200, 409, 200] or versions != [4, 5, 6]:
+        print(f"      CAS 결과 이상: {statuses}, versions={versions}")
+        return False
+    if writes != 3 or extra_reads != 0 or len(fake.checks) != writes:
+        print(f"      충돌 시 쓰기 발생 또는 버전 확인용 추가 조회: batchUpdate={writes}, reads={extra_reads}")
+        return False
+    if not any(u['range'] == f'{SHEET_SITES}!X2' and u['values'] == [[4]] for u in fake.batch_updates[0]):
+        print(f"      버전 컬럼(X) 갱신 누락: {fake.batch_updates[0]}")
+        return False
+
+    # Supabase: 조건부 UPDATE 1회 (WHERE version = ?), RPC 충돌(PT409) → ConflictError
+    supa = _FakeSupabase()
+    supa.rows['sites'] = [{'id': 'uuid-s1', 'legacy_id': 'S001', 'version': 8}]
+    backend = SupabaseService()
+    backend._client = supa
+    new_version = backend.update_site('S001', {'특이사항': '메모'}, expected_version=7)
+    ops = supa.executed[-1][1]
+    if new_version != 8 or len(supa.executed) != 1 or ('eq', ('version', 7), {}) not in ops:
+        print(f"      Supabase 조건부 갱신 이상: version={new_version}, ops={ops}")
+        return False
+
+    class _RpcError(Exception):
+        code, message = 'PT409', '데이터가 다른 사용자에 의해 수정되었습니다'
+
+    def rpc(name, params=None):
+        def execute():
+            raise _RpcError()
+        return type('Q', (), {'execute': staticmethod(execute)})()
+
+    supa.rpc = rpc
+    try:
+        backend.assign_site('S001', 'P001', 'C001', expected_version=1)
+        print("      RPC 버전 충돌이 ConflictError로 전달되지 않음")
+        return False
+    except ConflictError:
+        pass
+
+    print("      통과")
+    return True
+
+
+def test_unit_of_work():
+    """요청 단위 identity map: 배정/수정 1건에서 현장/인력/자격증 ID 조회는 각 1회 (통계 카운터 시드 상태 포함)"""
+    print("[성능] 쓰기 라우트 중복 조회 제거 (unit of work) 검증 중...")
+    try:
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache, wrap_with_cache
+        from api.services.stats_service import StatsCounter, compute_stats, empty_stats
+        from api.services.supabase_service import SupabaseService
+        from api.services.unit_of_work import UnitOfWork
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    uow, calls = UnitOfWork(), []
+    loader = lambda entity_id: calls.append(entity_id)
+    uow.load('sites', 'S404', loader)
+    uow.load('sites', 'S404', loader)
+    uow.remember_uuid('sites', 'S001', 'uuid-s1')
+    uow.forget()
+    uow.load('sites', 'S404', loader)
+    if calls != ['S404', 'S404'] or uow.uuid('sites', 'uuid-s1') != 'uuid-s1':
+        print(f"      UnitOfWork 메모/무효화 이상: calls={calls}")
+        return False
+
+    class _RpcError(Exception):
+        code, message = 'PGRST202', 'Could not find the function'
+
+    def assign(rpc_installed):
+        supa = _FakeSupabase()
+        supa.rows['sites'] = [{'id': 'uuid-s1', 'legacy_id': 'S001', 'assignment_status': '미배정', 'version': 3}]
+        supa.rows['personnel'] = [{'id': 'uuid-p1', 'legacy_id': 'P001', 'status': '투입가능', 'current_site_count': 0}]
+        supa.rows['certificates'] = [{'id': 'uuid-c1', 'legacy_id': 'C001', 'status': '사용가능'}]
+        rpc_calls = []
+
+        def rpc(name, params=None):
+            def execute():
+                rpc_calls.append((name, params))
+                if not rpc_installed:
+                    raise _RpcError()
+                return type('R', (), {'data': {'site_id': 'uuid-s1', 'version': 4}})()
+            return type('Q', (), {'execute': staticmethod(execute)})()
+
+        supa.rpc = rpc
+        backend = SupabaseService()
+        backend._client = supa
+        saved = db_service._db
+        # 운영과 같이 시드된 통계 카운터 포함 (배정은 카운터 무효화만, 조회 추가 없음)
+        counter = StatsCounter(empty_stats, reconcile_interval=0)
+        counter.snapshot()
+        db_service._db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=16), stats=counter)
+        try:
+            r = app.test_client().post('/api/sites/S001/assign', json={'manager_id': 'P001', 'certificate_id': 'C001'})
+        finally:
+            db_service._db = saved
+        lookups = {}
+        for table, ops in supa.executed:
+            if any(op[0] == 'select' for op in ops) and any(op[0] == 'or_' for op in ops):
+                lookups[table] = lookups.get(table, 0) + 1
+        return r, rpc_calls, lookups
+
+    r, rpc_calls, lookups = assign(rpc_installed=True)
+    if r.status_code != 200 or lookups != {'sites': 1, 'personnel': 1, 'certificates': 1}:
+        print(f"      RPC 배정 조회 횟수 이상: status={r.status_code}, lookups={lookups}")
+        return False
+    if rpc_calls[0][1] != {'p_site_id': 'uuid-s1', 'p_manager_id': 'uuid-p1', 'p_certificate_id': 'uuid-c1'}:
+        print(f"      RPC에 확인된 UUID가 전달되지 않음: {rpc_calls[0][1]}")
+        return False
+
+    # RPC 미설치 폴백: 라우트 검증에서 확인한 UUID 재사용 (legacy_id 재조회 없음)
+    r, _, lookups = assign(rpc_installed=False)
+    if r.status_code != 200 or lookups != {'sites': 1, 'personnel': 1, 'certificates': 1}:
+        print(f"      폴백 배정 조회 횟수 이상: status={r.status_code}, lookups={lookups}")
+        return False
+
+    # 수정: wrap_with_cache 구성에서 통계 델타는 라우트가 읽은 행(UnitOfWork) 사용 → 현장 조회 1회
+    backend = _FakeBackend()
+    backend.get_statistics = lambda fresh=False: (backend._count('get_statistics'), compute_stats(
+        backend.sites, backend.personnel, backend.certificates))[1]
+    db = wrap_with_cache(backend)
+    if not isinstance(db, CachedBackend) or db.stats_counter is None:
+        print("      wrap_with_cache 구성 이상")
+        return False
+    db.get_statistics()
+    saved = db_service._db
+    db_service._db = db
+    try:
+        r = app.test_client().put('/api/sites/S001', json={'현장상태': '공사 중'})
+    finally:
+        db_service._db = saved
+    stats = db.get_statistics()
+    if r.status_code != 200 or backend.calls.get('get_site_by_id') != 1 or backend.calls['get_statistics'] != 1 \
+            or stats != compute_stats(backend.sites, backend.personnel, backend.certificates):
+        print(f"      수정 후 조회/통계 이상: status={r.status_code}, calls={backend.calls}")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_id_resolver():
+    """참조 ID 해석 캐시: prefetch 후 쓰기/단건 조회는 왕복 1회, 생성 시 무효화"""
+    print("[성능] legacy_id ↔ UUID 해석 캐시 검증 중...")
+    try:
+        from api.services.id_resolver import IdResolver, NS_PERSONNEL_NAMES
+        from api.services.supabase_service import SupabaseService
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    lru = IdResolver(max_entries=2)
+    lru.put('sites', 'S001', 'uuid-s1')
+    lru.put('sites', 'S002', 'uuid-s2')
+    lru.get('sites', 'S001')
+    lru.put('sites', 'S003', 'uuid-s3')
+    lru.put('sites', 'S004', None)
+    if lru.get('sites', 'S002') is not None or lru.get('sites', 'S001') != 'uuid-s1' or lru.size('sites') != 2:
+        print("      LRU 제거 순서 이상")
+        return False
+
+    supa = _FakeSupabase()
+    supa.rows['sites'] = [{'id': 'uuid-s1', 'legacy_id': 'S001', 'name': '평택', 'version': 2}]
+    supa.rows['personnel'] = [{'id': 'uuid-p1', 'legacy_id': 'P001', 'name': '김소장'}]
+    supa.rows['certificates'] = [{'id': 'uuid-c1', 'legacy_id': 'C001'}]
+    supa.rows['certificate_types'] = [{'id': 'uuid-t1', 'name': '건축기사'}]
+    rpc_calls = []
+
+    def rpc(name, params=None):
+        def execute():
+            rpc_calls.append((name, params))
+            return type('R', (), {'data': {'site_id': 'uuid-s1', 'version': 3}})()
+        return type('Q', (), {'execute': staticmethod(execute)})()
+
+    supa.rpc = rpc
+    service = SupabaseService()
+    service._client = supa
+    sizes = service.prefetch_ids()
+    if sizes['sites'] != 2 or sizes['company_names'] != 2 or sizes['cert_type_names'] != 1:
+        print(f"      prefetch 적재 이상: {sizes}")
+        return False
+
+    supa.executed.clear()
+    service.get_site_by_id('S001')
+    service.update_certificate('C001', {'자격증명': '건축기사', '소유자명': '김소장'})
+    service.update_personnel('P001', {'소속': '더존', '비고': '메모'})
+    service.assign_site('S001', 'P001', 'C001')
+    tables = [table for table, _ in supa.executed]
+    if tables != ['sites', 'certificates', 'personnel']:
+        print(f"      참조 ID 조회가 추가로 발생: {tables}")
+        return False
+    if any(op[0] == 'or_' for _, ops in supa.executed for op in ops):
+        print("      UUID를 알고 있는데 legacy_id 조건 사용")
+        return False
+    if rpc_calls[0][1] != {'p_site_id': 'uuid-s1', 'p_manager_id': 'uuid-p1', 'p_certificate_id': 'uuid-c1'}:
+        print(f"      RPC 인자에 UUID 미사용: {rpc_calls[0][1]}")
+        return False
+
+    # 생성 시 같은 성명 항목 제거 → 다음 해석은 다시 조회
+    service.create_personnel({'인력ID': 'P009', '성명': '김소장'})
+    if service._ids.get(NS_PERSONNEL_NAMES, '김소장') is not None:
+        print("      생성 후 소유자명 캐시가 무효화되지 않음")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_http_session():
+    """Streamlit API 클라이언트: 공유 세션으로 연결 재사용, GET만 재시도, 엔드포인트별 시간 제한"""
+    print("[성능] API 클라이언트 연결 풀/keep-alive 검증 중...")
+    try:
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import streamlit_utils.api_client as api_client
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    ports, hits = set(), {'GET': 0, 'POST': 0}
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self):
+            ports.add(self.client_address[1])
+            hits[self.command] += 1
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            # /flaky: 첫 요청만 503
+            status = 503 if self.path.startswith('/api/flaky') and hits[self.command] == 1 else 200
+            body = b'{"success": true, "data": {"ok": true}}'
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = api_client.API_BASE, api_client._session, api_client.HTTP_BACKOFF
+    api_client.API_BASE = f'http://127.0.0.1:{server.server_address[1]}'
+    api_client._session, api_client.HTTP_BACKOFF = None, 0
+    try:
+        for _ in range(3):
+            api_client._request('GET', '/api/personnel')
+        reused = len(ports)
+        hits['GET'] = 0
+        flaky_get = api_client._request('GET', '/api/flaky').status_code
+        hits['POST'] = 0
+        flaky_post = api_client._request('POST', '/api/flaky', json={}).status_code
+        same = api_client.get_session() is api_client.get_session()
+    finally:
+        server.shutdown()
+        server.server_close()
+        api_client.API_BASE, api_client._session, api_client.HTTP_BACKOFF = saved
+
+    if reused != 1 or not same:
+        print(f"      연결이 재사용되지 않음: 연결 {reused}개")
+        return False
+    if flaky_get != 200 or hits['GET'] != 2 or flaky_post != 503 or hits['POST'] != 1:
+        print(f"      재시도 이상: GET={flaky_get}/{hits['GET']}회, POST={flaky_post}/{hits['POST']}회")
+        return False
+    if api_client._timeout('/api/changes') != (api_client.HTTP_CONNECT_TIMEOUT, 5) or \
+            api_client._timeout('/api/sites/S001')[1] != api_client.TIMEOUT:
+        print("      엔드포인트별 시간 제한 이상")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_fetch_many():
+    """여러 목록 동시 조회: 첫 로드 지연이 합이 아니라 가장 느린 1건, 각 캐시는 평소처럼 채워짐"""
+    print("[성능] cached_api.fetch_many 동시 조회 검증 중...")
+    try:
+        import time
+        import streamlit_utils.cached_api as cached_api
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    delay, loads = 0.2, []
+
+    def slow(table, rows):
+        def load(*args):
+            loads.append(table)
+            time.sleep(delay)
+            return rows, None
+        return load
+
+    def changes(since=None, limit=None):
+        return {'changes': {}, 'cursor': 'c0', 'has_more': False, 'reset': since is None}, None
+
+    names = ('_get_changes', '_get_sites', '_get_personnel', '_get_certificates')
+    originals = [getattr(cached_api, n) for n in names]
+    cached_api._get_changes = changes
+    cached_api._get_sites = slow('sites', [{'현장ID': 'S001'}])
+    cached_api._get_personnel = slow('personnel', [{'인력ID': 'P001', '현재상태': '투입가능'}])
+    cached_api._get_certificates = slow('certificates', [{'자격증ID': 'C001', '사용가능여부': '사용가능'}])
+    cached_api.clear_all_caches()
+    calls = (cached_api.get_sites_cached,
+             (cached_api.get_personnel_cached, {'status': '투입가능'}),
+             (cached_api.get_certificates_cached, {'available': True}))
+    try:
+        started = time.monotonic()
+        results = cached_api.fetch_many(*calls)
+        cold = time.monotonic() - started
+        started = time.monotonic()
+        cached_api.fetch_many(*calls)
+        warm = time.monotonic() - started
+        replica_loads = sorted(loads)
+        # 변경 피드 미지원 서버 → TTL 캐시 경로도 동시에
+        cached_api._get_changes = lambda since=None, limit=None: (None, 'not found')
+        cached_api.clear_all_caches()
+        del loads[:]
+        started = time.monotonic()
+        ttl_results = cached_api.fetch_many(*calls)
+        ttl_cold = time.monotonic() - started
+    finally:
+        for n, fn in zip(names, originals):
+            setattr(cached_api, n, fn)
+        cached_api.clear_all_caches()
+
+    if [len(data) for data, _ in results] != [1, 1, 1] or replica_loads != ['certificates', 'personnel', 'sites']:
+        print(f"      복제본 조회 결과 이상: {results}, loads={replica_loads}")
+        return False
+    if cold >= delay * 2 or warm >= delay:
+        print(f"      동시 조회되지 않음: cold={cold:.2f}s, warm={warm:.2f}s")
+        return False
+    if [len(data) for data, _ in ttl_results] != [1, 1, 1] or len(loads) != 3 or ttl_cold >= delay * 2:
+        print(f"      TTL 경로 동시 조회 이상: {ttl_results}, loads={loads}, {ttl_cold:.2f}s")
+        return False
+
+    print("      통과")
+    return True
+
+
+def test_html_bundle():
+    """HTML 번들 캐시: rerun은 메모리 조회, 원본 변경 시에만 재빌드, 재시작 후 디스크 번들 재사용"""
+    print("[성능] render_html_app HTML 번들 캐시 검증 중...")
+    try:
+        import tempfile
+        import streamlit_utils.html_bundle as html_bundle
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    config = ('flask', 'http://localhost:5000/api', '', '')
+    saved = html_bundle.HTML_BUNDLE_CACHE_DIR, html_bundle.BUNDLE_CHECK_INTERVAL
+    counts = dict(html_bundle.stats)
+    # 원본은 프로젝트 루트 기준 경로로 참조되므로 루트 아래 임시 폴더 사용
+    with tempfile.TemporaryDirectory(dir=ROOT) as tmp:
+        name = os.path.basename(tmp)
+        html_file = f'{name}/app.html'
+        with open(os.path.join(tmp, 'app.html'), 'w', encoding='utf-8') as f:
+            f.write(f'<html><head><link rel="stylesheet" href="{name}/app.css"></head><body></body></html>')
+        css_path = os.path.join(tmp, 'app.css')
+        with open(css_path, 'w', encoding='utf-8') as f:
+            f.write('body { color: red; }')
+        html_bundle.HTML_BUNDLE_CACHE_DIR = os.path.join(tmp, 'cache')
+        html_bundle.BUNDLE_CHECK_INTERVAL = 0
+        html_bundle.clear_bundles()
+        try:
+            first = html_bundle.get_bundle(html_file, config)
+            second = html_bundle.get_bundle(html_file, config)
+            other = html_bundle.get_bundle(html_file, ('flask', '/api', '', ''))
+            # 재시작: 메모리 캐시가 없어도 디스크 번들이 원본과 같으면 재사용
+            html_bundle.clear_bundles()
+            restored = html_bundle.get_bundle(html_file, config)
+            with open(css_path, 'w', encoding='utf-8') as f:
+                f.write('body { color: blue; margin: 0; }')
+            changed = html_bundle.get_bundle(html_file, config)
+        finally:
+            html_bundle.HTML_BUNDLE_CACHE_DIR, html_bundle.BUNDLE_CHECK_INTERVAL = saved
+            html_bundle.clear_bundles()
+    builds = html_bundle.stats['builds'] - counts['builds']
+    disk_hits = html_bundle.stats['disk_hits'] - counts['disk_hits']
+
+    if first != second or 'color: red' not in first or '<link' in first or 'localhost:5000/api' not in first:
+        print("      번들 재사용/인라인화 이상")
+        return False
+    if other == first or restored != first or 'color: blue' not in changed or builds != 3 or disk_hits != 1:
+        print(f"      설정별 키/디스크 재사용/변경 감지 이상: builds={builds}, disk_hits={disk_hits}")
+        return False
+    minified = html_bundle.minify_html('<div>\n    <p>a</p>\n\n</div>\n<pre>  x\n    y</pre>')
+    if minified != '<div>\n<p>a</p>\n</div><pre>  x\n    y</pre>':
+        print(f"      최소화 결과 이상: {minified!r}")
+        return False
+
+    print("      통과")
+    return True
+
+def test_static_assets():
+    """정적 파일: index는 해시 URL 참조, 해시 URL은 immutable + 미리 압축본, 원래 URL은 ETag/304"""
+    print("[성능] 정적 파일 해시 URL/사전 압축 검증 중...")
+    try:
+        import gzip
+        import re
+        import tempfile
+        from api.app import app
+        from api.utils.assets import IMMUTABLE, AssetManifest
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    client = app.test_client()
+    html = client.get('/').get_data(as_text=True)
+    match = re.search(r'href="(/css/style\.[0-9a-f]{12}\.css)"', html)
+    if not match or 'href="css/style.css"' in html:
+        print("      index의 css 참조가 해시 URL로 바뀌지 않음")
+        return False
+    with open(os.path.join(ROOT, 'css', 'style.css'), 'rb') as f:
+        original = f.read()
+
+    hashed = client.get(match.group(1), headers={'Accept-Encoding': 'gzip, deflate'})
+    if (hashed.status_code != 200 or hashed.headers.get('Content-Encoding') != 'gzip'
+            or hashed.headers.get('Cache-Control') != IMMUTABLE or 'Accept-Encoding' not in hashed.headers.get('Vary', '')
+            or gzip.decompress(hashed.get_data()) != original):
+        print(f"      해시 URL 응답 이상: {hashed.status_code} {dict(hashed.headers)}")
+        return False
+    identity = client.get(match.group(1), headers={'Accept-Encoding': 'gzip;q=0'})
+    if identity.headers.get('Content-Encoding') or identity.get_data() != original:
+        print("      gzip;q=0 요청에 압축본 응답")
+        return False
+
+    plain = client.get('/css/style.css')
+    etag = plain.headers.get('ETag')
+    revalidated = client.get('/css/style.css', headers={'If-None-Match': etag})
+    if plain.headers.get('Cache-Control') != 'no-cache' or not etag or revalidated.status_code != 304:
+        print(f"      원래 URL 재검증 이상: etag={etag}, status={revalidated.status_code}")
+        return False
+    if client.get('/css/../app.py').status_code not in (403, 404) or client.get('/css/missing.css').status_code != 404:
+        print("      경로 검사/없는 파일 처리 이상")
+        return False
+
+    # 원본 변경: 확인 간격이 지나면 새 해시 URL, 이전 해시 URL은 목록에서 제거
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'css'))
+        css_path = os.path.join(tmp, 'css', 'a.css')
+        with open(css_path, 'w', encoding='utf-8') as f:
+            f.write('a { color: red; }')
+        manifest = AssetManifest(tmp)
+        before = manifest.url('css/a.css')
+        with open(css_path, 'w', encoding='utf-8') as f:
+            f.write('a { color: blue; }')
+        manifest.refresh(interval=1)   # 간격 전: 그대로
+        unchanged = manifest.url('css/a.css')
+        manifest.checked_at -= 2
+        manifest.refresh(interval=1)
+        after = manifest.url('css/a.css')
+    if unchanged != before or after == before or manifest.lookup(before)[0] is not None:
+        print(f"      변경 감지 이상: {before} → {after}")
+        return False
+
+    print("      통과")
+    return True
+
+def test_response_compression():
+    """API 응답 압축: 큰 JSON은 gzip + 약한 ETag(304 유지), 작은 응답/스트림/미요청은 그대로"""
+    print("[성능] /api JSON 응답 압축 검증 중...")
+    try:
+        import gzip
+        import json
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    template = backend.personnel[0]
+    backend.personnel = [dict(template, 인력ID=f'P{i:04d}', 성명=f'김현장{i}') for i in range(300)]
+    db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=16))
+    client = app.test_client()
+    saved = db_service._db
+    db_service._db = db
+    try:
+        plain = client.get('/api/personnel')
+        packed = client.get('/api/personnel', headers={'Accept-Encoding': 'gzip'})
+        revalidated = client.get('/api/personnel', headers={'Accept-Encoding': 'gzip', 'If-None-Match': packed.headers.get('ETag', '')})
+        small = client.get('/api/certificates', headers={'Accept-Encoding': 'gzip'})
+        stream = client.get('/api/personnel?stream=1', headers={'Accept-Encoding': 'gzip'})
+        stream_body = stream.get_data()
+    finally:
+        db_service._db = saved
+
+    raw = plain.get_data()
+    if plain.headers.get('Content-Encoding') or 'Accept-Encoding' not in plain.headers.get('Vary', ''):
+        print(f"      Accept-Encoding 없는 요청 처리 이상: {dict(plain.headers)}")
+        return False
+    # timestamp는 요청마다 다르므로 data만 비교
+    if (packed.headers.get('Content-Encoding') != 'gzip'
+            or json.loads(gzip.decompress(packed.get_data()))['data'] != json.loads(raw)['data']):
+        print(f"      gzip 응답 이상: {dict(packed.headers)}")
+        return False
+    ratio = len(raw) / len(packed.get_data())
+    if ratio < 5:
+        print(f"      압축률 부족: {ratio:.1f}x")
+        return False
+    if not packed.headers.get('ETag', '').startswith('W/') or revalidated.status_code != 304:
+        print(f"      압축 응답 ETag/304 이상: {packed.headers.get('ETag')}, {revalidated.status_code}")
+        return False
+    if small.headers.get('Content-Encoding') or stream.headers.get('Content-Encoding') or not stream_body.startswith(b'{'):
+        print("      작은 응답/스트림이 압축됨")
+        return False
+
+    print(f"      통과 ({len(raw)} → {len(packed.get_data())} bytes, {ratio:.1f}x)")
+    return True
+
+def test_columnar_format():
+    """열 기반 응답: 키 1회 + 사전 인코딩으로 크기 감소, DataFrame 복원 결과는 행 목록과 동일"""
+    print("[성능] ?format=columnar 목록 응답 검증 중...")
+    try:
+        import json
+        import pandas as pd
+        import api.services.db_service as db_service
+        from api.app import app
+        from api.services.cache_service import CachedBackend, SnapshotCache
+        from streamlit_utils.api_client import columns_to_frame
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    backend = _FakeBackend()
+    statuses = ['투입가능', '투입중', '휴직']
+    backend.personnel = [
+        {'인력ID': f'P{i:04d}', '성명': f'김현장{i}', '직책': '소장' if i % 4 else '공무',
+         '현재상태': statuses[i % 3], '현재담당현장수': str(i % 3), '비고': None if i % 2 else '야간 가능'}
+        for i in range(500)
+    ]
+    db = CachedBackend(backend, SnapshotCache(ttl=60, max_entries=16))
+    client = app.test_client()
+    saved = db_service._db
+    db_service._db = db
+    try:
+        rows_res = client.get('/api/personnel')
+        col_res = client.get('/api/personnel?format=columnar')
+        revalidated = client.get('/api/personnel?format=columnar', headers={'If-None-Match': col_res.headers.get('ETag', '')})
+    finally:
+        db_service._db = saved
+
+    rows = rows_res.get_json()['data']
+    body = col_res.get_json()
+    data = body['data']
+    if body.get('format') != 'columnar' or data['length'] != len(rows) or len(data['columns']) != 6:
+        print(f"      열 기반 구조 이상: {body.get('format')}, {data.get('columns')}")
+        return False
+    if set(data['dictionaries']) != {'직책', '현재상태', '현재담당현장수', '비고'}:
+        print(f"      사전 인코딩 열 이상: {sorted(data['dictionaries'])}")
+        return False
+    if col_res.headers.get('ETag') == rows_res.headers.get('ETag') or revalidated.status_code != 304:
+        print("      표현별 ETag 구분/304 이상")
+        return False
+    size_rows, size_cols = len(rows_res.get_data()), len(col_res.get_data())
+    if size_cols * 2 > size_rows:
+        print(f"      크기 감소 부족: {size_rows} → {size_cols}")
+        return False
+
+    frame = columns_to_frame(data)
+    expected = pd.DataFrame(rows)
+    if str(frame['현재상태'].dtype) != 'category' or set(frame.columns) != set(expected.columns) or len(frame) != len(expected):
+        print(f"      DataFrame 변환 이상: {frame.dtypes.to_dict()}")
+        return False
+    restored = json.loads(frame.astype(object).where(frame.notna(), None).to_json(orient='records', force_ascii=False))
+    if restored != rows:
+        print("      DataFrame 복원 값이 행 목록과 다름")
+        return False
+
+    print(f"      통과 ({size_rows} → {size_cols} bytes)")
+    return True
+
+def test_data_model():
+    """DataFrame 모델: 필터/집계가 행 목록 방식과 같고, 인원별 자격증은 인덱스 조회, 복제본이 바뀔 때만 재구성"""
+    print("[성능] streamlit_utils.data_model 검증 중...")
+    try:
+        import time
+        import streamlit_utils.cached_api as cached_api
+        from api.services.stats_service import compute_stats
+        from streamlit_utils.data_model import DataModel, filter_sites, records
+    except Exception as e:
+        print(f"      실패: {e}")
+        return False
+
+    statuses, roles = ['투입가능', '투입중', '휴직'], ['소장', '공무', '']
+    personnel = [{'인력ID': f'P{i:04d}', '성명': f'김현장{i}', '직책': roles[i % 3], '현재상태': statuses[i % 3]}
+                 for i in range(1500)]
+    certs = [{'자격증ID': f'C{i:05d}', '자격증명': '건축기사', '소유자명': f'김현장{(i * 7) % 1500}',
+              '사용가능여부': ['사용가능', '사용중', '만료'][i % 3]} for i in range(3000)]
+    sites = [{'현장ID': f'S{i:04d}', '회사구분': ['더존종합건설', '더존하우징', None][i % 3],
+              '배정상태': '배정완료' if i % 2 else '미배정', '현장상태': ['착공예정', '공사 중', None][i % 3],
+              '담당소장명': f'김현장{i % 10}', '착공예정일': f'2026-0{1 + i % 9}-15'} for i in range(600)]
+    model = DataModel(sites, personnel, certs)
+
+    if model.stats() != compute_stats(sites, personnel, certs):
+        print("      집계가 compute_stats와 다름")
+        return False
+    picked = model.filter_personnel(status='투입가능', role='소장', name='현장1')
+    expected = [p['인력ID'] for p in personnel
+                if p['현재상태'] == '투입가능' and p['직책'] == '소장' and '현장1' in p['성명']]
+    if list(picked['인력ID']) != expected or str(model.personnel['현재상태'].dtype) != 'category':
+        print("      인력 필터 결과 이상")
+        return False
+    if len(model.filter_certificates(True)) != sum(c['사용가능여부'] == '사용가능' for c in certs):
+        print("      자격증 필터 결과 이상")
+        return False
+    narrowed = filter_sites(model.sites, manager='김현장3', date_start='2026-03-01', date_end='2026-06-30')
+    expected = [s['현장ID'] for s in sites
+                if s['담당소장명'] == '김현장3' and '2026-03-01' <= s['착공예정일'] <= '2026-06-30']
+    if list(narrowed['현장ID']) != expected or records(model.sites.head(3))[2]['회사구분'] != '':
+        print("      현장 필터/행 변환 이상")
+        return False
+
+    # 인원별 자격증: 인원마다 전체 목록 순회(O(N·M)) 대신 소유자명 인덱스
+    started = time.monotonic()
+    naive = {p['성명']: [c['자격증ID'] for c in certs if c['소유자명'] == p['성명']] for p in personnel}
+    naive_time = time.monotonic() - started
+    started = time.monotonic()
+    index = model.certs_by_owner
+    ids = model.certificates['자격증ID'].to_numpy()
+    indexed = {p['성명']: list(ids[index[p['성명']]]) if p['성명'] in index else [] for p in personnel}
+    indexed_time = time.monotonic() - started
+    if indexed != naive or list(model.certificates_of('김현장7')['자격증ID']) != naive['김현장7']:
+        print("      인원별 자격증 인덱스 결과 이상")
+        return False
+    if indexed_time >= naive_time:
+        print(f"      인덱스 조회가 느림: {indexed_time:.3f}s vs {naive_time:.3f}s")
+        return False
+
+    # 공유 모델: 복제본 변경분이 반영될 때만 다시 구성, 통계는 요청 없이 모델에서
+    feed = {'changes': {}}
+
+    def changes(since=None, limit=None):
+        delta, feed['changes'] = feed['changes'], {}
+        return {'changes': delta, 'cursor': f'c{len(str(delta))}', 'has_more': False, 'reset': False}, None
+
+    def no_stats(*args, **kwargs):
+        raise AssertionError('stats API 호출됨')
+
+    names = ('_get_changes', '_get_sites', '_get_personnel', '_get_certificates', '_get_stats')
+    originals = [getattr(cached_api, n) for n in names]
+    cached_api._get_changes = changes
+    cached_api._get_sites = lambda *a, **k: (sites, None)
+    cached_api._get_personnel = lambda *a, **k: (personnel, None)
+    cached_api._get_certificates = lambda *a, **k: (certs, None)
+    cached_api._get_stats = no_stats
+    cached_api.clear_all_caches()
+    try:
+        first, _ = cached_api.get_data_model_cached()
+        again, _ = cached_api.get_data_model_cached()
+        feed['changes'] = {'personnel': {'upserted': [dict(personnel[0], 현재상태='투입중')], 'deleted': []}}
+        cached_api.sync_changes(force=True)
+        updated, _ = cached_api.get_data_model_cached()
+        stats, stats_err = cached_api.get_stats_cached()
+    finally:
+        for n, fn in zip(names, originals):
+            setattr(cached_api, n, fn)
+        cached_api.clear_all_caches()
+    if first is not again or updated is first:
+        print("      모델 재사용/재구성 이상")
+        return False
+    if stats_err or stats['personnel']['available'] != model.stats()['personnel']['available'] - 1:
+        print(f"      복제본 통계 이상: {stats_err}")
+        return False
+
+    print(f"      통과 (인원별 자격증 {naive_time * 1000:.0f}ms → {indexed_time * 1000:.0f}ms)")
+    return True
+
+def main():
+    print("=" * 60)
+    print("API 서비스 계층 검증 테스트")
+    print("=" * 60)
+    print()
+
+    results = []
+    results.append(("읽기 캐시 (스냅샷/TTL/LRU/무효화)", test_cache_service()))
+    results.append(("Sheets ID 인덱스 (O(1) 조회/증분 갱신)", test_sheets_repository()))
+    results.append(("Supabase 페이지 조회 (서버 사이드 필터/개수)", test_supabase_pagination()))
+    results.append(("커서 페이지네이션 (키셋)", test_keyset_pagination()))
+    results.append(("현장 검색 역색인 (자모 n-gram)", test_search_index()))
+    results.append(("통계 집계 (DB 집계/1회 순회)", test_stats_service()))
+    results.append(("통계 증분 카운터 (델타/재검증)", test_stats_counter()))
+    results.append(("배정/해제 RPC (왕복 1회)", test_assign_rpc()))
+    results.append(("일괄 배정 (스냅샷 검증/batchUpdate 1회)", test_assign_batch()))
+    results.append(("대량 가져오기 (청크 append/중복 제거)", test_bulk_import()))
+    results.append(("목록 NDJSON 스트리밍", test_ndjson_streaming()))
+    results.append(("조건부 GET (ETag/304)", test_conditional_get()))
+    results.append(("변경 피드 (델타 동기화)", test_change_feed()))
+    results.append(("실시간 이벤트 (SSE 푸시)", test_event_bus()))
+    results.append(("행 버전 (compare-and-swap)", test_row_version()))
+    results.append(("요청 단위 identity map (중복 조회 제거)", test_unit_of_work()))
+    results.append(("참조 ID 해석 캐시 (LRU/prefetch)", test_id_resolver()))
+    results.append(("API 클라이언트 연결 풀 (keep-alive/재시도)", test_http_session()))
+    results.append(("목록 동시 조회 (fetch_many)", test_fetch_many()))
+    results.append(("HTML 번들 캐시 (render_html_app)", test_html_bundle()))
+    results.append(("정적 파일 해시 URL/사전 압축", test_static_assets()))
+    results.append(("API 응답 압축 (gzip/br)", test_response_compression()))
+    results.append(("열 기반 목록 응답 (columnar)", test_columnar_format()))
+    results.append(("DataFrame 모델 (필터/집계/자격증 인덱스)", test_data_model()))
+
+    print()
+    print("-" * 60)
+    passed = sum(1 for _, ok in results if ok)
+    total = len(results)
+    for name, ok in results:
+        status = "OK" if ok else "FAIL"
+        print(f"  {name}: {status}")
+    print("-" * 60)
+    print(f"결과: {passed}/{total} 통과")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())